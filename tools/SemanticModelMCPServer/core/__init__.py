@@ -1,16 +1,20 @@
 """
 Core module for Semantic Model MCP Server
 
-This package contains core functionality including authentication 
-and Azure token management utilities.
+This package contains core functionality including authentication,
+Azure token management and XMLA connection pooling utilities.
 """
 
 from .auth import get_access_token
 from .azure_token_manager import get_cached_azure_token, clear_token_cache, get_token_cache_status
+from .xmla_connection_pool import xmla_connection_pool, get_xmla_pool_status, clear_xmla_connection_pool
 
 __all__ = [
     'get_access_token',
     'get_cached_azure_token', 
     'clear_token_cache',
-    'get_token_cache_status'
+    'get_token_cache_status',
+    'xmla_connection_pool',
+    'get_xmla_pool_status',
+    'clear_xmla_connection_pool'
 ]
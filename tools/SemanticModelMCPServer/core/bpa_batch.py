@@ -0,0 +1,294 @@
+"""
+Batch Best Practice Analysis
+
+This module runs the BPA rules over many semantic models in one call. Model
+definitions are fetched concurrently on a small thread pool, since fetching is
+bound by XMLA round trips and TOM serialization, and the rule evaluation of
+each fetched model runs in a process pool so large models do not serialize on
+the GIL.
+
+Every model gets its own analysis result instead of sharing the analyzer's
+violations list, and violations are streamed to an NDJSON or Parquet file as
+each model finishes, so memory stays bounded by the models in flight.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.bpa_analyzer import BPAAnalyzer
+from core.lazy_imports import optional_import
+from core.model_definition_cache import get_cached_model_definition
+
+
+OUTPUT_FORMATS = ("ndjson", "parquet")
+DEFAULT_FETCH_WORKERS = 4
+
+# Columns written for each violation, in output order
+VIOLATION_COLUMNS = (
+    "workspace_name", "dataset_name", "rule_id", "rule_name", "category", "severity", "severity_level",
+    "description", "object_type", "object_name", "table_name", "fix_expression", "details",
+)
+
+
+@dataclass
+class BPAModelRun:
+    """Outcome and timings of analyzing one model in a batch."""
+
+    workspace_name: str
+    dataset_name: str
+    violation_count: int = 0
+    summary: Dict[str, Any] = field(default_factory=dict)
+    objects_analyzed: int = 0
+    fetch_seconds: float = 0.0
+    analyze_seconds: float = 0.0
+    error: Optional[str] = None
+    error_stage: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the run to a JSON friendly dictionary."""
+        result = asdict(self)
+        result["fetch_seconds"] = round(self.fetch_seconds, 3)
+        result["analyze_seconds"] = round(self.analyze_seconds, 3)
+        return result
+
+
+@dataclass
+class BPABatchResult:
+    """Result of a batch run with one BPAModelRun per requested model."""
+
+    runs: List[BPAModelRun]
+    output_path: Optional[str]
+    output_format: str
+    wall_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the batch result to a JSON friendly dictionary."""
+        failed = [run for run in self.runs if run.error]
+        return {
+            "models_requested": len(self.runs),
+            "models_analyzed": len(self.runs) - len(failed),
+            "models_failed": len(failed),
+            "total_violations": sum(run.violation_count for run in self.runs),
+            "output_path": self.output_path,
+            "output_format": self.output_format,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "total_fetch_seconds": round(sum(run.fetch_seconds for run in self.runs), 3),
+            "total_analyze_seconds": round(sum(run.analyze_seconds for run in self.runs), 3),
+            "models": [run.to_dict() for run in self.runs],
+        }
+
+
+# Analyzer of the current worker process, created once by _init_worker
+_worker_analyzer: Optional[BPAAnalyzer] = None
+
+
+def _init_worker(rules_file: str) -> None:
+    """Load and compile the rules once per worker process."""
+    global _worker_analyzer
+    _worker_analyzer = BPAAnalyzer(rules_file)
+
+
+def _analyze_definition(tmsl: str, analyzer: Optional[BPAAnalyzer] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any], int, float]:
+    """
+    Analyze one model definition.
+
+    Args:
+        tmsl: TMSL definition as a JSON string
+        analyzer: Analyzer to use, defaults to the worker process analyzer
+
+    Returns:
+        Tuple of violation dictionaries, summary, objects analyzed and seconds
+    """
+    result = (analyzer or _worker_analyzer).analyze(tmsl)
+    if not result.model_found:
+        raise ValueError("No model found in the TMSL definition")
+    return result.to_dicts(), result.get_summary(), result.objects_analyzed, result.analysis_seconds
+
+
+class _NdjsonWriter:
+    """Writes one JSON object per violation and line."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            self._file.write(json.dumps(row, ensure_ascii=False))
+            self._file.write("\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Writes one Parquet row group per model."""
+
+    def __init__(self, path: str):
+        # pyarrow is only needed for the Parquet output format, import it on first use
+        pyarrow = optional_import("pyarrow")
+        if pyarrow is None:
+            raise ImportError("pyarrow is not installed. Please install it using: pip install pyarrow")
+        self._pyarrow = pyarrow
+        fields = [
+            pyarrow.field(name, pyarrow.int32() if name == "severity_level" else pyarrow.string())
+            for name in VIOLATION_COLUMNS
+        ]
+        self._schema = pyarrow.schema(fields)
+        self._writer = optional_import("pyarrow.parquet").ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        columns = {name: [row.get(name) for row in rows] for name in VIOLATION_COLUMNS}
+        self._writer.write_table(self._pyarrow.table(columns, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def _create_writer(output_path: str, output_format: str):
+    if output_format == "parquet":
+        return _ParquetWriter(output_path)
+    return _NdjsonWriter(output_path)
+
+
+def fetch_bpa_definition(workspace_name: str, dataset_name: str, use_cache: bool = True) -> str:
+    """Fetch the TMSL definition of a model with the properties BPA rules read."""
+    return get_cached_model_definition(workspace_name, dataset_name, profile="bpa", use_cache=use_cache).tmsl
+
+
+def _fetch_definition(fetch_definition: Callable[[str, str, bool], str], workspace_name: str,
+                      dataset_name: str, use_cache: bool) -> Tuple[str, float]:
+    """Fetch a model definition and time the call."""
+    started = time.perf_counter()
+    tmsl = fetch_definition(workspace_name, dataset_name, use_cache)
+    return tmsl, time.perf_counter() - started
+
+
+def default_output_path(output_format: str = "ndjson") -> str:
+    """Get a timestamped output file path in the temp directory."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(tempfile.gettempdir(), f"bpa_batch_{timestamp}.{output_format}")
+
+
+def run_batch_bpa(
+    datasets: Iterable[Tuple[str, str]],
+    rules_file: str,
+    output_path: Optional[str] = None,
+    output_format: str = "ndjson",
+    fetch_workers: int = DEFAULT_FETCH_WORKERS,
+    analysis_workers: Optional[int] = None,
+    use_processes: bool = True,
+    use_cache: bool = True,
+    on_model_done: Optional[Callable[[BPAModelRun], None]] = None,
+    fetch_definition: Callable[[str, str, bool], str] = fetch_bpa_definition,
+) -> BPABatchResult:
+    """
+    Run the BPA rules over many models.
+
+    Fetches and analyses overlap: a model is handed to the analysis pool as
+    soon as its definition arrives, and its violations are written as soon as
+    its analysis finishes. At most fetch_workers + 2 * analysis_workers models
+    are in flight at any time.
+
+    Args:
+        datasets: (workspace name, dataset name) pairs to analyze
+        rules_file: Path of the BPA rules JSON file
+        output_path: File to stream violations to, defaults to a file in the temp directory
+        output_format: One of "ndjson" or "parquet"
+        fetch_workers: Number of concurrent model definition fetches
+        analysis_workers: Number of analysis processes, defaults to the CPU count
+        use_processes: False to analyze on threads in this process instead
+        use_cache: False to serialize every model again instead of using cached definitions
+        on_model_done: Called with each model's run as soon as it is analyzed or failed
+        fetch_definition: Function returning the TMSL of (workspace name, dataset
+            name, use_cache), replaceable to analyze definitions from elsewhere
+
+    Returns:
+        BPABatchResult with per-model outcomes and timings
+
+    Raises:
+        ValueError: If the output format is unknown
+        ImportError: If the Parquet format is requested without pyarrow
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}. Supported: {list(OUTPUT_FORMATS)}")
+
+    started = time.perf_counter()
+    runs = [BPAModelRun(workspace_name=workspace, dataset_name=dataset) for workspace, dataset in datasets]
+    output_path = output_path or default_output_path(output_format)
+    writer = _create_writer(output_path, output_format)
+
+    fetch_workers = max(1, fetch_workers)
+    analysis_workers = max(1, analysis_workers or os.cpu_count() or 1)
+    max_in_flight = fetch_workers + 2 * analysis_workers
+
+    fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="bpa-fetch")
+    if use_processes:
+        analysis_pool = ProcessPoolExecutor(max_workers=analysis_workers, initializer=_init_worker, initargs=(rules_file,))
+        analyzer = None
+    else:
+        # BPAAnalyzer.analyze keeps no state, so one analyzer serves all threads
+        analysis_pool = ThreadPoolExecutor(max_workers=analysis_workers, thread_name_prefix="bpa-analyze")
+        analyzer = BPAAnalyzer(rules_file)
+
+    pending = iter(runs)
+    in_flight: Dict[Future, Tuple[str, BPAModelRun]] = {}
+
+    def submit_fetches() -> None:
+        while len(in_flight) < max_in_flight:
+            run = next(pending, None)
+            if run is None:
+                return
+            future = fetch_pool.submit(_fetch_definition, fetch_definition, run.workspace_name, run.dataset_name, use_cache)
+            in_flight[future] = ("fetch", run)
+
+    try:
+        submit_fetches()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, run = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    run.error = str(e) or type(e).__name__
+                    run.error_stage = stage
+                    logging.debug(f"BPA batch {stage} failed for {run.workspace_name}/{run.dataset_name}: {run.error}")
+                    if on_model_done:
+                        on_model_done(run)
+                    continue
+
+                if stage == "fetch":
+                    tmsl, run.fetch_seconds = result
+                    in_flight[analysis_pool.submit(_analyze_definition, tmsl, analyzer)] = ("analyze", run)
+                    continue
+
+                violations, run.summary, run.objects_analyzed, run.analyze_seconds = result
+                run.violation_count = len(violations)
+                for violation in violations:
+                    violation["workspace_name"] = run.workspace_name
+                    violation["dataset_name"] = run.dataset_name
+                writer.write(violations)
+                if on_model_done:
+                    on_model_done(run)
+            submit_fetches()
+    finally:
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        analysis_pool.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+
+    return BPABatchResult(
+        runs=runs,
+        output_path=output_path,
+        output_format=output_format,
+        wall_seconds=time.perf_counter() - started,
+    )
@@ -0,0 +1,900 @@
+"""
+BPA Rule Expression Compiler
+
+This module compiles Best Practice Analyzer rule expressions, written in the
+Dynamic LINQ dialect used by Tabular Editor, into Python predicates. Rules are
+parsed once when they are loaded; evaluating a rule against a model object is
+then a chain of closure calls, with regular expressions compiled ahead of time.
+
+Supported are the operators, literals, lambda methods (Any, All, Where, Count,
+...), string methods and static helpers (RegEx, Convert, Math, string, char)
+used by the rules in bpa.json. Members are resolved case-insensitively against
+the model objects from core.bpa_model.
+"""
+
+import functools
+import operator
+import re
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+# A compiled expression takes the lambda scope stack: the root object first,
+# the innermost lambda parameter ("it") last.
+Scope = Tuple[Any, ...]
+CompiledExpression = Callable[[Scope], Any]
+
+
+class BPAExpressionError(ValueError):
+    """Raised when a rule expression cannot be parsed or compiled."""
+
+
+class BPAEvaluationError(Exception):
+    """Raised when a compiled expression fails for a particular object."""
+
+
+# ---------------------------------------------------------------------------
+# Tokenizer
+# ---------------------------------------------------------------------------
+
+_OPERATORS = ("&&", "||", "==", "!=", "<>", "<=", ">=", "=", "<", ">", "!", "+", "-", "*", "/", "%", "(", ")", "[", "]", ".", ",")
+_KEYWORDS = {"and", "or", "not", "it", "outerit", "current", "null", "true", "false"}
+# Escapes unescaped in string literals. Everything else (\s, \(, \[ ...) is
+# kept verbatim because rules pass these strings on as regular expressions.
+_STRING_ESCAPES = {"n": "\n", "r": "\r", "t": "\t"}
+_NUMBER = re.compile(r"\d+(\.\d+)?")
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def _tokenize(expression: str) -> List[Tuple[str, Any]]:
+    """Split an expression into (kind, value) tokens."""
+    tokens: List[Tuple[str, Any]] = []
+    i = 0
+    length = len(expression)
+
+    while i < length:
+        char = expression[i]
+        if char.isspace():
+            i += 1
+            continue
+
+        if char in "\"'":
+            # Doubled delimiters escape the delimiter, as in Dynamic LINQ
+            value = []
+            i += 1
+            while True:
+                if i >= length:
+                    raise BPAExpressionError(f"Unterminated string literal in: {expression}")
+                current = expression[i]
+                if current == char:
+                    if i + 1 < length and expression[i + 1] == char:
+                        value.append(char)
+                        i += 2
+                        continue
+                    i += 1
+                    break
+                if current == "\\" and i + 1 < length and expression[i + 1] in _STRING_ESCAPES:
+                    value.append(_STRING_ESCAPES[expression[i + 1]])
+                    i += 2
+                    continue
+                value.append(current)
+                i += 1
+            tokens.append(("str", "".join(value)))
+            continue
+
+        match = _NUMBER.match(expression, i)
+        if match:
+            text = match.group(0)
+            tokens.append(("num", float(text) if match.group(1) else int(text)))
+            i = match.end()
+            continue
+
+        match = _IDENTIFIER.match(expression, i)
+        if match:
+            text = match.group(0)
+            if text.lower() in _KEYWORDS:
+                tokens.append(("kw", text.lower()))
+            else:
+                tokens.append(("id", text))
+            i = match.end()
+            continue
+
+        for operator in _OPERATORS:
+            if expression.startswith(operator, i):
+                tokens.append(("op", operator))
+                i += len(operator)
+                break
+        else:
+            raise BPAExpressionError(f"Unexpected character '{char}' at position {i} in: {expression}")
+
+    tokens.append(("eof", None))
+    return tokens
+
+
+# ---------------------------------------------------------------------------
+# Runtime helpers
+# ---------------------------------------------------------------------------
+
+def _constant(value: Any) -> CompiledExpression:
+    """Compile a constant, keeping the value visible for constant folding."""
+    def evaluate(scope: Scope) -> Any:
+        return value
+    evaluate.constant = value  # type: ignore[attr-defined]
+    evaluate.uses_it = False  # type: ignore[attr-defined]
+    evaluate.uses_outer = False  # type: ignore[attr-defined]
+    evaluate.cost = 0  # type: ignore[attr-defined]
+    return evaluate
+
+
+def _is_constant(compiled: CompiledExpression) -> bool:
+    return hasattr(compiled, "constant")
+
+
+_MEMBER_MAPS: Dict[type, Dict[str, str]] = {}
+
+
+def _member_map(cls: type) -> Dict[str, str]:
+    """Map lower-cased public member names of a class to their real names."""
+    members = _MEMBER_MAPS.get(cls)
+    if members is None:
+        members = {name.lower(): name for name in dir(cls) if name[:1].isupper()}
+        _MEMBER_MAPS[cls] = members
+    return members
+
+
+def _resolve_member(cls: type, name: str) -> Callable[[Any], Any]:
+    """Resolve a member name to a getter for objects of one type."""
+    lowered = name.lower()
+    if cls is type(None):
+        def null_member(obj: Any) -> Any:
+            raise BPAEvaluationError(f"Member '{name}' accessed on null")
+        return null_member
+    if issubclass(cls, (list, tuple, str)) and lowered in ("count", "length"):
+        return len
+    attribute = _member_map(cls).get(lowered)
+    if attribute is not None:
+        return operator.attrgetter(attribute)
+    if hasattr(cls, "_raw_member"):
+        return lambda obj: obj._raw_member(name)
+
+    def unknown_member(obj: Any) -> Any:
+        raise BPAEvaluationError(f"Unknown member '{name}' on {cls.__name__}")
+    return unknown_member
+
+
+def _member_getter(name: str) -> Callable[[Any], Any]:
+    """Create a getter for a member, resolved once per object type."""
+    getters: Dict[type, Callable[[Any], Any]] = {}
+
+    def get_member(obj: Any) -> Any:
+        getter = getters.get(type(obj))
+        if getter is None:
+            getter = getters[type(obj)] = _resolve_member(type(obj), name)
+        return getter(obj)
+    return get_member
+
+
+def _to_string(value: Any) -> str:
+    """Convert a value the way .NET ToString() would for rule comparisons."""
+    if value is None:
+        raise BPAEvaluationError("ToString() called on null")
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    if isinstance(value, str):
+        return value
+    name = getattr(value, "Name", None)
+    return name if isinstance(name, str) else str(value)
+
+
+def _equals(left: Any, right: Any) -> bool:
+    if left is None or right is None:
+        return left is right
+    if isinstance(left, (str, int, float)) and isinstance(right, (str, int, float)):
+        return left == right
+    return left is right
+
+
+def _compare(operator: str) -> Callable[[Any, Any], bool]:
+    def compare(left: Any, right: Any) -> bool:
+        # Lifted comparisons with null are false, as in C#
+        if left is None or right is None:
+            return False
+        if operator == "<":
+            return left < right
+        if operator == "<=":
+            return left <= right
+        if operator == ">":
+            return left > right
+        return left >= right
+    return compare
+
+
+def _add(left: Any, right: Any) -> Any:
+    if isinstance(left, str) or isinstance(right, str):
+        return ("" if left is None else _to_string(left)) + ("" if right is None else _to_string(right))
+    return left + right
+
+
+def _divide(left: Any, right: Any) -> Any:
+    if isinstance(left, int) and isinstance(right, int):
+        return int(left / right)
+    return left / right
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_dotnet_regex(pattern: str) -> "re.Pattern":
+    """
+    Compile a .NET regular expression for use with Python's re module.
+
+    Inline (?i) flags may appear anywhere in .NET patterns; they are removed
+    and applied to the whole pattern.
+
+    Args:
+        pattern: The .NET pattern
+
+    Returns:
+        Compiled pattern
+
+    Raises:
+        BPAExpressionError: If the pattern is not valid
+    """
+    flags = 0
+    if "(?i)" in pattern:
+        flags |= re.IGNORECASE
+        pattern = pattern.replace("(?i)", "")
+    try:
+        return re.compile(pattern, flags)
+    except re.error as e:
+        raise BPAExpressionError(f"Invalid regular expression '{pattern}': {e}")
+
+
+def _to_int(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        value = value.strip()
+        try:
+            return int(value)
+        except ValueError:
+            raise BPAEvaluationError(f"'{value}' is not an integer")
+    return int(value)
+
+
+def _to_decimal(value: Any) -> float:
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise BPAEvaluationError(f"'{value}' is not a number")
+
+
+def _index_of(text: str, value: str, comparison: Optional[str] = None) -> int:
+    if comparison and comparison.lower().endswith("ignorecase"):
+        return text.lower().find(value.lower())
+    return text.find(value)
+
+
+def _substring(text: str, start: int, length: Optional[int] = None) -> str:
+    end = len(text) if length is None else start + length
+    if start < 0 or end > len(text) or end < start:
+        raise BPAEvaluationError(f"Substring({start}, {length}) out of range for '{text}'")
+    return text[start:end]
+
+
+# String methods take the evaluated arguments
+_STRING_METHODS: Dict[str, Callable[..., Any]] = {
+    "toupper": lambda s: s.upper(),
+    "tolower": lambda s: s.lower(),
+    "trim": lambda s: s.strip(),
+    "tostring": lambda s: s,
+    "contains": lambda s, value: value in s,
+    "startswith": lambda s, value: s.startswith(value),
+    "endswith": lambda s, value: s.endswith(value),
+    "equals": lambda s, value: s == value,
+    "indexof": _index_of,
+    "replace": lambda s, old, new: s.replace(old, new or "") if old else s,
+    "substring": _substring,
+    "tochararray": lambda s: list(s),
+}
+
+
+def _predicate_matches(predicate: CompiledExpression, scope: Scope, item: Any) -> bool:
+    return bool(predicate(scope + (item,)))
+
+
+def _sequence_any(items: List[Any], args: List[CompiledExpression], scope: Scope) -> bool:
+    if not args:
+        return len(items) > 0
+    predicate = args[0]
+    return any(_predicate_matches(predicate, scope, item) for item in items)
+
+
+def _sequence_all(items: List[Any], args: List[CompiledExpression], scope: Scope) -> bool:
+    predicate = args[0]
+    return all(_predicate_matches(predicate, scope, item) for item in items)
+
+
+def _sequence_where(items: List[Any], args: List[CompiledExpression], scope: Scope) -> List[Any]:
+    predicate = args[0]
+    return [item for item in items if _predicate_matches(predicate, scope, item)]
+
+
+def _sequence_count(items: List[Any], args: List[CompiledExpression], scope: Scope) -> int:
+    if not args:
+        return len(items)
+    return len(_sequence_where(items, args, scope))
+
+
+def _sequence_first(items: List[Any], args: List[CompiledExpression], scope: Scope) -> Any:
+    matches = _sequence_where(items, args, scope) if args else items
+    if not matches:
+        raise BPAEvaluationError("First() called on an empty sequence")
+    return matches[0]
+
+
+def _sequence_first_or_default(items: List[Any], args: List[CompiledExpression], scope: Scope) -> Any:
+    matches = _sequence_where(items, args, scope) if args else items
+    return matches[0] if matches else None
+
+
+def _sequence_select(items: List[Any], args: List[CompiledExpression], scope: Scope) -> List[Any]:
+    selector = args[0]
+    return [selector(scope + (item,)) for item in items]
+
+
+def _sequence_contains(items: List[Any], args: List[CompiledExpression], scope: Scope) -> bool:
+    value = args[0](scope)
+    return any(_equals(item, value) for item in items)
+
+
+# Sequence methods take the unevaluated arguments, which are lambdas over the
+# items for Any, All, Where, Count, First and Select
+_SEQUENCE_METHODS: Dict[str, Callable[[List[Any], List[CompiledExpression], Scope], Any]] = {
+    "any": _sequence_any,
+    "all": _sequence_all,
+    "where": _sequence_where,
+    "count": _sequence_count,
+    "first": _sequence_first,
+    "firstordefault": _sequence_first_or_default,
+    "select": _sequence_select,
+    "contains": _sequence_contains,
+}
+
+
+def _is_null_or_whitespace(value: Any) -> bool:
+    return value is None or str(value).strip() == ""
+
+
+def _char_is_control(value: str) -> bool:
+    code = ord(value)
+    return code < 0x20 or 0x7F <= code <= 0x9F
+
+
+# Static functions take the evaluated arguments
+_STATIC_FUNCTIONS: Dict[Tuple[str, str], Callable[..., Any]] = {
+    ("string", "isnullorwhitespace"): _is_null_or_whitespace,
+    ("string", "isnullorempty"): lambda value: value is None or value == "",
+    ("char", "iscontrol"): _char_is_control,
+    ("char", "iswhitespace"): lambda value: value.isspace(),
+    ("char", "isletter"): lambda value: value.isalpha(),
+    ("char", "isdigit"): lambda value: value.isdigit(),
+    ("char", "isupper"): lambda value: value.isupper(),
+    ("char", "islower"): lambda value: value.islower(),
+    ("convert", "toint64"): _to_int,
+    ("convert", "toint32"): _to_int,
+    ("convert", "todecimal"): _to_decimal,
+    ("convert", "todouble"): _to_decimal,
+    ("convert", "tostring"): lambda value: "" if value is None else _to_string(value),
+    ("math", "max"): max,
+    ("math", "min"): min,
+    ("math", "abs"): abs,
+}
+
+# Enum types whose members are written as Type.Member in rules. Members
+# evaluate to their names, which is how core.bpa_model exposes enum properties.
+_ENUM_TYPES = {
+    "datatype",
+    "crossfilteringbehavior",
+    "relationshipendcardinality",
+    "partitionsourcetype",
+    "modetype",
+    "aggregatefunction",
+    "objecttype",
+    "metadatapermission",
+}
+_STATIC_TYPES = {type_name for type_name, _ in _STATIC_FUNCTIONS} | {"regex"} | _ENUM_TYPES
+
+
+def _regex_is_match(input_expression: CompiledExpression, pattern_expression: CompiledExpression) -> CompiledExpression:
+    """Compile RegEx.IsMatch, compiling constant patterns ahead of time."""
+    if _is_constant(pattern_expression):
+        pattern = compile_dotnet_regex(pattern_expression.constant)  # type: ignore[attr-defined]
+
+        def is_match(scope: Scope) -> bool:
+            value = input_expression(scope)
+            if value is None:
+                raise BPAEvaluationError("RegEx.IsMatch called with null input")
+            return pattern.search(value) is not None
+        return is_match
+
+    def is_match_dynamic(scope: Scope) -> bool:
+        value = input_expression(scope)
+        if value is None:
+            raise BPAEvaluationError("RegEx.IsMatch called with null input")
+        try:
+            pattern = compile_dotnet_regex(pattern_expression(scope))
+        except BPAExpressionError as e:
+            raise BPAEvaluationError(str(e))
+        return pattern.search(value) is not None
+    return is_match_dynamic
+
+
+# ---------------------------------------------------------------------------
+# Parser / compiler
+# ---------------------------------------------------------------------------
+
+class _Compiler:
+    """
+    Recursive descent parser that emits closures instead of an AST.
+
+    Every closure is tagged with uses_it (depends on the innermost lambda
+    parameter) and uses_outer (depends on outerIt or current). Equality and
+    "and" closures also keep their operands, so lambda predicates like
+    Any(Name == current.Name and ...) can be answered from a hash lookup on
+    the collection instead of a scan.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.position = 0
+
+    # Token helpers
+
+    def _peek(self, offset: int = 0) -> Tuple[str, Any]:
+        return self.tokens[min(self.position + offset, len(self.tokens) - 1)]
+
+    def _advance(self) -> Tuple[str, Any]:
+        token = self.tokens[self.position]
+        self.position += 1
+        return token
+
+    def _accept(self, kind: str, *values: Any) -> Optional[Tuple[str, Any]]:
+        token = self._peek()
+        if token[0] == kind and (not values or token[1] in values):
+            return self._advance()
+        return None
+
+    def _expect(self, kind: str, value: Any = None) -> Tuple[str, Any]:
+        token = self._peek()
+        if token[0] != kind or (value is not None and token[1] != value):
+            expected = value if value is not None else kind
+            raise BPAExpressionError(f"Expected '{expected}' but found '{token[1]}' in: {self.expression}")
+        return self._advance()
+
+    # Grammar
+
+    def compile(self) -> CompiledExpression:
+        compiled = self._or()
+        self._expect("eof")
+
+        # At the top level an error and false both mean "no violation", so
+        # the "and" operands can run cheapest first without changing results
+        conjuncts = getattr(compiled, "conjuncts", None)
+        if conjuncts:
+            ordered = tuple(sorted(conjuncts, key=lambda conjunct: conjunct.cost))
+            compiled = _node(lambda scope: all(conjunct(scope) for conjunct in ordered), *ordered)
+        return compiled
+
+    def _or(self) -> CompiledExpression:
+        left = self._and()
+        while self._accept("kw", "or") or self._accept("op", "||"):
+            right = self._and()
+            left = _node((lambda a, b: lambda scope: bool(a(scope)) or bool(b(scope)))(left, right), left, right)
+        return left
+
+    def _and(self) -> CompiledExpression:
+        left = self._comparison()
+        while self._accept("kw", "and") or self._accept("op", "&&"):
+            right = self._comparison()
+            conjuncts = getattr(left, "conjuncts", [left]) + [right]
+            left = _node((lambda a, b: lambda scope: bool(a(scope)) and bool(b(scope)))(left, right), left, right)
+            left.conjuncts = conjuncts  # type: ignore[attr-defined]
+        return left
+
+    def _comparison(self) -> CompiledExpression:
+        left = self._additive()
+        while True:
+            token = self._accept("op", "==", "=", "!=", "<>", "<", "<=", ">", ">=")
+            if not token:
+                return left
+            right = self._additive()
+            operator = token[1]
+            if operator in ("==", "="):
+                compiled = _node((lambda a, b: lambda scope: _equals(a(scope), b(scope)))(left, right), left, right)
+                compiled.equality = (left, right)  # type: ignore[attr-defined]
+            elif operator in ("!=", "<>"):
+                compiled = _node((lambda a, b: lambda scope: not _equals(a(scope), b(scope)))(left, right), left, right)
+            else:
+                compiled = _node((lambda a, b, compare: lambda scope: compare(a(scope), b(scope)))(left, right, _compare(operator)), left, right)
+            left = compiled
+
+    def _additive(self) -> CompiledExpression:
+        left = self._multiplicative()
+        while True:
+            token = self._accept("op", "+", "-")
+            if not token:
+                return left
+            right = self._multiplicative()
+            operation = _add if token[1] == "+" else (lambda a, b: a - b)
+            if _is_constant(left) and _is_constant(right):
+                left = _constant(operation(left.constant, right.constant))  # type: ignore[attr-defined]
+            else:
+                left = _node((lambda a, b, op: lambda scope: op(a(scope), b(scope)))(left, right, operation), left, right)
+
+    def _multiplicative(self) -> CompiledExpression:
+        left = self._unary()
+        while True:
+            token = self._accept("op", "*", "/", "%")
+            if not token:
+                return left
+            right = self._unary()
+            if token[1] == "*":
+                operation = lambda a, b: a * b
+            elif token[1] == "/":
+                operation = _divide
+            else:
+                operation = lambda a, b: a % b
+            left = _node((lambda a, b, op: lambda scope: op(a(scope), b(scope)))(left, right, operation), left, right)
+
+    def _unary(self) -> CompiledExpression:
+        if self._accept("kw", "not") or self._accept("op", "!"):
+            operand = self._unary()
+            return _node(lambda scope: not operand(scope), operand)
+        if self._accept("op", "-"):
+            operand = self._unary()
+            if _is_constant(operand):
+                return _constant(-operand.constant)  # type: ignore[attr-defined]
+            return _node(lambda scope: -operand(scope), operand)
+        return self._postfix(self._primary())
+
+    def _arguments(self) -> List[CompiledExpression]:
+        self._expect("op", "(")
+        arguments: List[CompiledExpression] = []
+        if not self._accept("op", ")"):
+            arguments.append(self._or())
+            while self._accept("op", ","):
+                arguments.append(self._or())
+            self._expect("op", ")")
+        return arguments
+
+    def _postfix(self, target: CompiledExpression) -> CompiledExpression:
+        while True:
+            if self._accept("op", "."):
+                name = self._expect("id")[1]
+                if self._peek() == ("op", "("):
+                    target = self._method_call(target, name, self._arguments())
+                else:
+                    target = _node((lambda t, get: lambda scope: get(t(scope)))(target, _member_getter(name)), target)
+            elif self._accept("op", "["):
+                index = self._or()
+                self._expect("op", "]")
+                target = _node((lambda t, i: lambda scope: _index(t(scope), i(scope)))(target, index), target, index)
+            else:
+                return target
+
+    def _primary(self) -> CompiledExpression:
+        kind, value = self._advance()
+
+        if kind in ("str", "num"):
+            return _constant(value)
+        if kind == "kw":
+            if value == "null":
+                return _constant(None)
+            if value in ("true", "false"):
+                return _constant(value == "true")
+            if value == "it":
+                return _node(lambda scope: scope[-1], uses_it=True)
+            if value == "outerit":
+                return _node(lambda scope: scope[-2] if len(scope) > 1 else scope[-1], uses_outer=True)
+            if value == "current":
+                return _node(lambda scope: scope[0], uses_outer=True)
+            raise BPAExpressionError(f"Unexpected keyword '{value}' in: {self.expression}")
+        if kind == "op" and value == "(":
+            inner = self._or()
+            self._expect("op", ")")
+            return inner
+        if kind != "id":
+            raise BPAExpressionError(f"Unexpected token '{value}' in: {self.expression}")
+
+        lowered = value.lower()
+        next_token = self._peek()
+
+        if lowered == "char" and next_token == ("op", "("):
+            arguments = self._arguments()
+            if len(arguments) != 1:
+                raise BPAExpressionError(f"char() takes one argument in: {self.expression}")
+            argument = arguments[0]
+            if _is_constant(argument):
+                return _constant(chr(argument.constant))  # type: ignore[attr-defined]
+            return _node(lambda scope: chr(argument(scope)), argument)
+
+        if lowered in _STATIC_TYPES and next_token == ("op", ".") and self._peek(1)[0] == "id":
+            member = self._peek(1)[1]
+            is_call = self._peek(2) == ("op", "(")
+            if is_call and ((lowered, member.lower()) in _STATIC_FUNCTIONS or (lowered, member.lower()) == ("regex", "ismatch")):
+                self.position += 2
+                return self._static_call(lowered, member.lower(), self._arguments())
+            if not is_call and lowered in _ENUM_TYPES:
+                self.position += 2
+                return _constant(member)
+
+        # Anything else is a member or method of the current lambda parameter
+        it = _node(lambda scope: scope[-1], uses_it=True)
+        if next_token == ("op", "("):
+            return self._method_call(it, value, self._arguments())
+        get_member = _member_getter(value)
+        return _node(lambda scope: get_member(scope[-1]), it)
+
+    def _static_call(self, type_name: str, function: str, arguments: List[CompiledExpression]) -> CompiledExpression:
+        if (type_name, function) == ("regex", "ismatch"):
+            if len(arguments) != 2:
+                raise BPAExpressionError(f"RegEx.IsMatch takes two arguments in: {self.expression}")
+            compiled = _node(_regex_is_match(arguments[0], arguments[1]), *arguments, cost=10)
+            compiled.regex = (arguments[0], arguments[1])  # type: ignore[attr-defined]
+            return compiled
+
+        implementation = _STATIC_FUNCTIONS[(type_name, function)]
+        if len(arguments) == 1:
+            argument = arguments[0]
+            return _node(lambda scope: implementation(argument(scope)), argument)
+        return _node(lambda scope: implementation(*[argument(scope) for argument in arguments]), *arguments)
+
+    def _method_call(self, target: CompiledExpression, name: str, arguments: List[CompiledExpression]) -> CompiledExpression:
+        lowered = name.lower()
+        string_method = _STRING_METHODS.get(lowered)
+        sequence_method = _SEQUENCE_METHODS.get(lowered)
+        plan = _lookup_plan(arguments[0]) if lowered in _FILTERING_METHODS and len(arguments) == 1 else None
+        regex_plan = _regex_plan(arguments[0]) if lowered == "any" and len(arguments) == 1 else None
+
+        def call(scope: Scope) -> Any:
+            obj = target(scope)
+            if obj is None:
+                raise BPAEvaluationError(f"Method '{name}' called on null")
+            if isinstance(obj, str):
+                if string_method is None:
+                    raise BPAEvaluationError(f"Unknown string method '{name}'")
+                return string_method(obj, *[argument(scope) for argument in arguments])
+            if isinstance(obj, (list, tuple)):
+                if sequence_method is not None:
+                    if regex_plan is not None:
+                        matched = _any_regex_match(obj, regex_plan, scope)
+                        if matched is not None:
+                            return matched
+                    if plan is not None:
+                        obj = _lookup_candidates(obj, plan, scope)
+                    return sequence_method(obj, arguments, scope)
+            if lowered == "tostring":
+                return _to_string(obj)
+            attribute = _member_map(type(obj)).get(lowered)
+            if attribute is None:
+                raise BPAEvaluationError(f"Unknown method '{name}' on {type(obj).__name__}")
+            return getattr(obj, attribute)(*[argument(scope) for argument in arguments])
+
+        if lowered in _LAMBDA_METHODS:
+            # A lambda's own "it" is the item; only its outer references leak out
+            outer = [argument for argument in arguments if argument.uses_outer]
+            return _node(call, target, uses_it=bool(outer), uses_outer=bool(outer), cost=100 * (1 + sum(argument.cost for argument in arguments)))
+        return _node(call, target, *arguments)
+
+
+def _node(
+    evaluate: CompiledExpression,
+    *children: CompiledExpression,
+    uses_it: bool = False,
+    uses_outer: bool = False,
+    cost: int = 1,
+) -> CompiledExpression:
+    """Tag a closure with the scope levels it depends on and a rough cost."""
+    evaluate.uses_it = uses_it or any(child.uses_it for child in children)  # type: ignore[attr-defined]
+    evaluate.uses_outer = uses_outer or any(child.uses_outer for child in children)  # type: ignore[attr-defined]
+    evaluate.cost = cost + sum(child.cost for child in children)  # type: ignore[attr-defined]
+    return evaluate
+
+
+_LAMBDA_METHODS = {"any", "all", "where", "count", "first", "firstordefault", "select"}
+# Lambda methods that only need the items matching the predicate
+_FILTERING_METHODS = {"any", "where", "count", "first", "firstordefault"}
+
+# Marks a collection lookup that could not be built
+_NO_LOOKUP = object()
+
+
+def _lookup_plan(predicate: CompiledExpression) -> Optional[Tuple[CompiledExpression, CompiledExpression]]:
+    """
+    Find an equality conjunct usable as a hash lookup.
+
+    Returns:
+        (key, probe) where key depends only on the item and probe does not
+        depend on the item, or None
+    """
+    for conjunct in getattr(predicate, "conjuncts", [predicate]):
+        equality = getattr(conjunct, "equality", None)
+        if equality is None:
+            continue
+        for key, probe in (equality, equality[::-1]):
+            if key.uses_it and not key.uses_outer and not probe.uses_it:
+                return key, probe
+    return None
+
+
+def _regex_plan(predicate: CompiledExpression) -> Optional[Tuple[CompiledExpression, CompiledExpression]]:
+    """
+    Detect Any(RegEx.IsMatch(<item text>, <pattern>)) predicates.
+
+    Returns:
+        (input, pattern) where input depends only on the item and pattern does
+        not depend on the item, or None
+    """
+    regex = getattr(predicate, "regex", None)
+    if regex is None:
+        return None
+    input_expression, pattern_expression = regex
+    if input_expression.uses_it and not input_expression.uses_outer and not pattern_expression.uses_it:
+        return regex
+    return None
+
+
+def _any_regex_match(items: List[Any], plan: Tuple[CompiledExpression, CompiledExpression], scope: Scope) -> Optional[bool]:
+    """
+    Match one pattern against the cached texts of a model collection.
+
+    The pattern is compiled once per call and the item texts once per
+    collection, instead of evaluating the predicate closure per item.
+
+    Returns:
+        Whether any item matches, or None if the fast path does not apply
+    """
+    lookups = getattr(items, "lookups", None)
+    if lookups is None:
+        return None
+
+    input_expression, pattern_expression = plan
+    values_key = ("values", input_expression)
+    values = lookups.get(values_key)
+    if values is None:
+        try:
+            values = [input_expression((item,)) for item in items]
+            if any(not isinstance(value, str) for value in values):
+                values = _NO_LOOKUP
+        except Exception:
+            values = _NO_LOOKUP
+        lookups[values_key] = values
+    if values is _NO_LOOKUP:
+        return None
+
+    try:
+        pattern = compile_dotnet_regex(pattern_expression(scope))
+    except (BPAExpressionError, TypeError):
+        return None
+    search = pattern.search
+    return any(search(value) is not None for value in values)
+
+
+def _lookup_candidates(items: List[Any], plan: Tuple[CompiledExpression, CompiledExpression], scope: Scope) -> List[Any]:
+    """
+    Narrow a collection to the items whose lookup key equals the probe.
+
+    Only collections with a "lookups" dictionary (the model collections of
+    core.bpa_model) are indexed. The full predicate is still evaluated on the
+    candidates, so this never changes results.
+    """
+    lookups = getattr(items, "lookups", None)
+    if lookups is None:
+        return items
+
+    key, probe = plan
+    lookup = lookups.get(key)
+    if lookup is None:
+        lookup = {}
+        try:
+            for item in items:
+                lookup.setdefault(key((item,)), []).append(item)
+        except Exception:
+            lookup = _NO_LOOKUP
+        lookups[key] = lookup
+    if lookup is _NO_LOOKUP:
+        return items
+
+    try:
+        return lookup.get(probe(scope), [])
+    except TypeError:
+        return items
+
+
+def _index(obj: Any, key: Any) -> Any:
+    if obj is None:
+        raise BPAEvaluationError("Indexer used on null")
+    try:
+        return obj[key]
+    except (IndexError, KeyError, TypeError) as e:
+        raise BPAEvaluationError(f"Invalid index {key!r}: {e}")
+
+
+def compile_expression(expression: str) -> CompiledExpression:
+    """
+    Compile a BPA rule expression.
+
+    Args:
+        expression: Rule expression in Tabular Editor's Dynamic LINQ dialect
+
+    Returns:
+        Callable taking the scope stack, e.g. (obj,) for the object under
+        test, and returning the expression value
+
+    Raises:
+        BPAExpressionError: If the expression uses unsupported syntax
+    """
+    if not expression or not expression.strip():
+        raise BPAExpressionError("Empty rule expression")
+    return _Compiler(expression).compile()
+
+
+def expression_identifiers(expression: str) -> Set[str]:
+    """
+    Get the identifiers (member, method and type names) an expression uses.
+
+    Args:
+        expression: Rule expression in Tabular Editor's Dynamic LINQ dialect
+
+    Returns:
+        Lower-cased identifiers, excluding keywords and string literals
+
+    Raises:
+        BPAExpressionError: If the expression cannot be tokenized
+    """
+    return {value.lower() for kind, value in _tokenize(expression) if kind == "id"}
+
+
+def model_search_identifiers(expression: str) -> Optional[Set[str]]:
+    """
+    Get the identifiers used in the parts of an expression that search the model.
+
+    These are the member chains starting at Model, e.g.
+    Model.AllMeasures.Any(Expression == current.Expression), including the
+    arguments of their method calls.
+
+    Args:
+        expression: Rule expression in Tabular Editor's Dynamic LINQ dialect
+
+    Returns:
+        Lower-cased identifiers, or None if the expression never uses Model
+
+    Raises:
+        BPAExpressionError: If the expression cannot be tokenized
+    """
+    tokens = _tokenize(expression)
+    identifiers: Optional[Set[str]] = None
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i]
+        i += 1
+        if kind != "id" or value.lower() != "model":
+            continue
+        if identifiers is None:
+            identifiers = set()
+        # Follow the member chain, including bracketed arguments
+        depth = 0
+        while i < len(tokens):
+            kind, value = tokens[i]
+            if kind == "op" and value in ("(", "["):
+                depth += 1
+            elif kind == "op" and value in (")", "]"):
+                if depth == 0:
+                    break
+                depth -= 1
+            elif depth == 0 and not (kind == "id" or (kind == "op" and value == ".")):
+                break
+            if kind == "id":
+                identifiers.add(value.lower())
+            i += 1
+    return identifiers
@@ -0,0 +1,1082 @@
+"""
+BPA Model Index
+
+This module wraps a TMSL model definition in lightweight objects that expose
+the Tabular Object Model (TOM) members BPA rule expressions refer to, such as
+Table.IsHidden, Column.UsedInRelationships or Measure.ReferencedBy.
+
+The model is walked once. During that walk every object is recorded with its
+rule scope (Table, CalculatedTable, DataColumn, Measure, ...), and reverse
+references like relationship usage, sort-by columns and RLS filters are
+resolved so rules do not search the model for them. DAX dependencies
+(DependsOn / ReferencedBy) are scanned on first use.
+
+Every object also has a stable key and a fingerprint of its own TMSL
+properties, which incremental analysis uses to find the objects that changed
+between two versions of a model.
+"""
+
+import json
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+def _text(value: Any) -> str:
+    """Get a string property, joining lines split by SplitMultilineStrings."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "\n".join(str(line) for line in value)
+    return str(value)
+
+
+def _enum(value: Any, default: str) -> str:
+    """Convert a camelCase TMSL enum value to its TOM member name."""
+    if not value:
+        return default
+    value = str(value)
+    return value[:1].upper() + value[1:]
+
+
+class ModelObject:
+    """Base class for model objects visible to rule expressions."""
+
+    object_type = "Object"
+    object_type_name = "Object"
+    # TMSL properties holding child objects, which have their own fingerprints
+    _child_properties: Tuple[str, ...] = ()
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex", table: Optional["TableObject"] = None):
+        self._data = data
+        self._index = index
+        self._table = table
+        self._used_in_relationships: List["RelationshipObject"] = []
+        self._depends_on: List["Dependency"] = []
+        self._referenced_by = ReferenceList()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.Name!r}>"
+
+    def _raw_member(self, name: str) -> Any:
+        """Fall back to the TMSL property for members without a TOM mapping."""
+        return self._data.get(name[:1].lower() + name[1:])
+
+    def _display_name(self) -> str:
+        return self.Name
+
+    def _table_name(self) -> Optional[str]:
+        return self._table.Name if self._table is not None else None
+
+    def _details(self) -> Optional[str]:
+        return None
+
+    def _key(self) -> Tuple[str, str, str]:
+        """Identify the object across versions of the model."""
+        return self.object_type, self._table_name() or "", self._display_name()
+
+    def _fingerprint_data(self) -> Dict[str, Any]:
+        if not self._child_properties:
+            return self._data
+        return {name: value for name, value in self._data.items() if name not in self._child_properties}
+
+    def _fingerprint(self) -> str:
+        """Serialize the object's own properties for change detection."""
+        return json.dumps(self._fingerprint_data(), sort_keys=True, default=str)
+
+    @property
+    def Name(self) -> str:
+        return _text(self._data.get("name"))
+
+    @property
+    def Description(self) -> str:
+        return _text(self._data.get("description"))
+
+    @property
+    def IsHidden(self) -> bool:
+        return bool(self._data.get("isHidden", False))
+
+    @property
+    def DisplayFolder(self) -> str:
+        return _text(self._data.get("displayFolder"))
+
+    @property
+    def ObjectType(self) -> str:
+        return self.object_type
+
+    @property
+    def ObjectTypeName(self) -> str:
+        return self.object_type_name
+
+    @property
+    def Model(self) -> "ModelRoot":
+        return self._index.model
+
+    @property
+    def Table(self) -> Optional["TableObject"]:
+        return self._table
+
+    @property
+    def UsedInRelationships(self) -> List["RelationshipObject"]:
+        return self._used_in_relationships
+
+    @property
+    def DependsOn(self) -> List["Dependency"]:
+        self._index.ensure_dependencies()
+        return self._depends_on
+
+    @property
+    def ReferencedBy(self) -> "ReferenceList":
+        self._index.ensure_dependencies()
+        return self._referenced_by
+
+    def GetAnnotation(self, name: str) -> Optional[str]:
+        for annotation in self._data.get("annotations", []):
+            if annotation.get("name") == name:
+                return _text(annotation.get("value"))
+        return None
+
+    def HasAnnotation(self, name: str) -> bool:
+        return self.GetAnnotation(name) is not None
+
+
+class ModelCollection(list):
+    """A collection of model objects that caches lookups built by rules."""
+
+    def __init__(self, *args: Any):
+        super().__init__(*args)
+        # Lookup tables keyed by the compiled key expression, see
+        # core.bpa_expression._lookup_candidates
+        self.lookups: Dict[Any, Any] = {}
+
+
+class ReferenceList(list):
+    """Objects referencing a model object through DAX."""
+
+    @property
+    def AllMeasures(self) -> List["MeasureObject"]:
+        return [obj for obj in self if obj.object_type == "Measure"]
+
+    @property
+    def AllColumns(self) -> List["ColumnObject"]:
+        return [obj for obj in self if obj.object_type == "Column"]
+
+
+class DaxReference:
+    """A single DAX reference to an object."""
+
+    __slots__ = ("FullyQualified",)
+
+    def __init__(self, fully_qualified: bool):
+        self.FullyQualified = fully_qualified
+
+
+class Dependency:
+    """References from one DAX expression to one object (a DependsOn entry)."""
+
+    __slots__ = ("Key", "Value")
+
+    def __init__(self, key: ModelObject):
+        self.Key = key
+        self.Value: List[DaxReference] = []
+
+
+class ModelRoot(ModelObject):
+    object_type = "Model"
+    object_type_name = "Model"
+    _child_properties = ("tables", "relationships", "perspectives", "roles", "dataSources", "expressions")
+
+    @property
+    def Model(self) -> "ModelRoot":
+        return self
+
+    @property
+    def Name(self) -> str:
+        return _text(self._data.get("name")) or "Model"
+
+    @property
+    def Tables(self) -> List["TableObject"]:
+        return self._index.tables
+
+    @property
+    def AllColumns(self) -> List["ColumnObject"]:
+        return self._index.columns
+
+    @property
+    def AllMeasures(self) -> List["MeasureObject"]:
+        return self._index.measures
+
+    @property
+    def AllPartitions(self) -> List["PartitionObject"]:
+        return self._index.partitions
+
+    @property
+    def AllHierarchies(self) -> List["HierarchyObject"]:
+        return self._index.hierarchies
+
+    @property
+    def AllLevels(self) -> List["LevelObject"]:
+        return self._index.levels
+
+    @property
+    def AllCalculationItems(self) -> List["CalculationItemObject"]:
+        return self._index.calculation_items
+
+    @property
+    def Relationships(self) -> List["RelationshipObject"]:
+        return self._index.relationships
+
+    @property
+    def Roles(self) -> List["RoleObject"]:
+        return self._index.roles
+
+    @property
+    def Perspectives(self) -> List["PerspectiveObject"]:
+        return self._index.perspectives
+
+    @property
+    def DataSources(self) -> List["DataSourceObject"]:
+        return self._index.data_sources
+
+    @property
+    def Expressions(self) -> List["NamedExpressionObject"]:
+        return self._index.expressions
+
+    @property
+    def DefaultPowerBIDataSourceVersion(self) -> str:
+        return _enum(self._data.get("defaultPowerBIDataSourceVersion"), "PowerBI_V1")
+
+    @property
+    def DefaultMode(self) -> str:
+        return _enum(self._data.get("defaultMode"), "Import")
+
+
+class TableObject(ModelObject):
+    object_type = "Table"
+    _child_properties = ("columns", "measures", "partitions", "hierarchies", "calculationGroup")
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex"):
+        super().__init__(data, index)
+        self.columns: List["ColumnObject"] = ModelCollection()
+        self.measures: List["MeasureObject"] = ModelCollection()
+        self.partitions: List["PartitionObject"] = ModelCollection()
+        self.hierarchies: List["HierarchyObject"] = ModelCollection()
+        self.calculation_items: List["CalculationItemObject"] = ModelCollection()
+        self.row_level_security: Dict[str, str] = {}
+        self.object_level_security: List[str] = []
+        self.perspectives = defaultdict(bool)
+
+        partition_types = [(partition.get("source") or {}).get("type") for partition in data.get("partitions", [])]
+        if data.get("calculationGroup"):
+            self.scope = "CalculationGroup"
+        elif "calculated" in partition_types:
+            self.scope = "CalculatedTable"
+        else:
+            self.scope = "Table"
+
+    @property
+    def Table(self) -> "TableObject":
+        return self
+
+    def _table_name(self) -> Optional[str]:
+        return None
+
+    def _fingerprint_data(self) -> Dict[str, Any]:
+        data = super()._fingerprint_data()
+        calculation_group = self._data.get("calculationGroup")
+        if calculation_group:
+            data["calculationGroup"] = {name: value for name, value in calculation_group.items() if name != "calculationItems"}
+        return data
+
+    @property
+    def ObjectTypeName(self) -> str:
+        if self.scope == "CalculationGroup":
+            return "Calculation Group Table"
+        if self.scope == "CalculatedTable":
+            return "Calculated Table"
+        default_mode = self._index.model_data.get("defaultMode")
+        modes = [partition.get("mode", default_mode) for partition in self._data.get("partitions", [])]
+        if "directQuery" in modes:
+            return "Table (DirectQuery)"
+        return "Table"
+
+    @property
+    def DataCategory(self) -> str:
+        return _text(self._data.get("dataCategory"))
+
+    @property
+    def Columns(self) -> List["ColumnObject"]:
+        return self.columns
+
+    @property
+    def Measures(self) -> List["MeasureObject"]:
+        return self.measures
+
+    @property
+    def Partitions(self) -> List["PartitionObject"]:
+        return self.partitions
+
+    @property
+    def Hierarchies(self) -> List["HierarchyObject"]:
+        return self.hierarchies
+
+    @property
+    def CalculationItems(self) -> List["CalculationItemObject"]:
+        return self.calculation_items
+
+    @property
+    def RowLevelSecurity(self) -> List[str]:
+        return list(self.row_level_security.values())
+
+    @property
+    def ObjectLevelSecurity(self) -> List[str]:
+        return self.object_level_security
+
+    @property
+    def InPerspective(self) -> Dict[str, bool]:
+        return self.perspectives
+
+    @property
+    def SourceExpression(self) -> str:
+        return _text(self._data.get("sourceExpression"))
+
+    @property
+    def Expression(self) -> str:
+        for partition in self.partitions:
+            if partition.SourceType == "Calculated":
+                return partition.Query
+        return ""
+
+
+class ColumnObject(ModelObject):
+    object_type = "Column"
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex", table: TableObject):
+        super().__init__(data, index, table)
+        self.used_in_sort_by: List["ColumnObject"] = []
+        self.used_in_hierarchies: List["HierarchyObject"] = []
+        self.used_in_variations: List[Dict[str, Any]] = []
+        self.object_level_security: List[str] = []
+        self.sort_by_column: Optional["ColumnObject"] = None
+
+        column_type = data.get("type", "data")
+        if column_type == "calculated":
+            self.scope = "CalculatedColumn"
+        elif column_type == "calculatedTableColumn" or (table.scope == "CalculatedTable" and column_type != "rowNumber"):
+            self.scope = "CalculatedTableColumn"
+        else:
+            self.scope = "DataColumn"
+        self.object_type_name = {"CalculatedColumn": "Calculated Column", "CalculatedTableColumn": "Calculated Table Column"}.get(self.scope, "Data Column")
+
+    @property
+    def Type(self) -> str:
+        return _enum(self._data.get("type"), "Data")
+
+    @property
+    def DataType(self) -> str:
+        return _enum(self._data.get("dataType"), "Automatic")
+
+    @property
+    def DataCategory(self) -> str:
+        return _text(self._data.get("dataCategory"))
+
+    @property
+    def Expression(self) -> str:
+        return _text(self._data.get("expression"))
+
+    @property
+    def SourceColumn(self) -> str:
+        return _text(self._data.get("sourceColumn"))
+
+    @property
+    def FormatString(self) -> str:
+        return _text(self._data.get("formatString"))
+
+    @property
+    def SummarizeBy(self) -> str:
+        return _enum(self._data.get("summarizeBy"), "Default")
+
+    @property
+    def IsKey(self) -> bool:
+        return bool(self._data.get("isKey", False))
+
+    @property
+    def IsAvailableInMDX(self) -> bool:
+        return bool(self._data.get("isAvailableInMdx", True))
+
+    @property
+    def AlternateOf(self) -> Optional[Dict[str, Any]]:
+        return self._data.get("alternateOf")
+
+    @property
+    def SortByColumn(self) -> Optional["ColumnObject"]:
+        return self.sort_by_column
+
+    @property
+    def UsedInSortBy(self) -> List["ColumnObject"]:
+        return self.used_in_sort_by
+
+    @property
+    def UsedInHierarchies(self) -> List["HierarchyObject"]:
+        return self.used_in_hierarchies
+
+    @property
+    def UsedInVariations(self) -> List[Dict[str, Any]]:
+        return self.used_in_variations
+
+    @property
+    def ObjectLevelSecurity(self) -> List[str]:
+        return self.object_level_security
+
+    @property
+    def DaxObjectName(self) -> str:
+        return f"'{self._table.Name}'[{self.Name}]"
+
+
+class MeasureObject(ModelObject):
+    object_type = "Measure"
+    object_type_name = "Measure"
+    scope = "Measure"
+    _child_properties = ("kpi",)
+
+    @property
+    def Expression(self) -> str:
+        return _text(self._data.get("expression"))
+
+    @property
+    def FormatString(self) -> str:
+        return _text(self._data.get("formatString"))
+
+    @property
+    def DataType(self) -> str:
+        return _enum(self._data.get("dataType"), "Unknown")
+
+    @property
+    def KPI(self) -> Optional["KpiObject"]:
+        return self._index.kpis_by_measure.get(id(self))
+
+    @property
+    def DaxObjectName(self) -> str:
+        return f"[{self.Name}]"
+
+
+class KpiObject(ModelObject):
+    object_type = "KPI"
+    object_type_name = "KPI"
+    scope = "KPI"
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex", measure: MeasureObject):
+        super().__init__(data, index, measure.Table)
+        self.measure = measure
+
+    @property
+    def Name(self) -> str:
+        return self.measure.Name
+
+    @property
+    def Measure(self) -> MeasureObject:
+        return self.measure
+
+    @property
+    def TargetExpression(self) -> str:
+        return _text(self._data.get("targetExpression"))
+
+    @property
+    def StatusExpression(self) -> str:
+        return _text(self._data.get("statusExpression"))
+
+    @property
+    def TrendExpression(self) -> str:
+        return _text(self._data.get("trendExpression"))
+
+    @property
+    def Expression(self) -> str:
+        return "\n".join(filter(None, (self.TargetExpression, self.StatusExpression, self.TrendExpression)))
+
+
+class PartitionObject(ModelObject):
+    object_type = "Partition"
+    object_type_name = "Partition"
+    scope = "Partition"
+
+    @property
+    def _source(self) -> Dict[str, Any]:
+        return self._data.get("source") or {}
+
+    @property
+    def SourceType(self) -> str:
+        return _enum(self._source.get("type"), "Query")
+
+    @property
+    def Query(self) -> str:
+        source = self._source
+        return _text(source.get("expression", source.get("query")))
+
+    @property
+    def Expression(self) -> str:
+        return self.Query
+
+    @property
+    def Mode(self) -> str:
+        return _enum(self._data.get("mode", self._index.model_data.get("defaultMode")), "Import")
+
+    @property
+    def DataSource(self) -> Optional["DataSourceObject"]:
+        return self._index.data_sources_by_name.get(self._source.get("dataSource"))
+
+
+class HierarchyObject(ModelObject):
+    object_type = "Hierarchy"
+    object_type_name = "Hierarchy"
+    scope = "Hierarchy"
+    _child_properties = ("levels",)
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex", table: TableObject):
+        super().__init__(data, index, table)
+        self.levels: List["LevelObject"] = ModelCollection()
+
+    @property
+    def Levels(self) -> List["LevelObject"]:
+        return self.levels
+
+
+class LevelObject(ModelObject):
+    object_type = "Level"
+    object_type_name = "Level"
+    scope = "Level"
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex", hierarchy: HierarchyObject):
+        super().__init__(data, index, hierarchy.Table)
+        self.hierarchy = hierarchy
+        self.column: Optional[ColumnObject] = None
+
+    def _key(self) -> Tuple[str, str, str]:
+        return self.object_type, self._table_name() or "", f"{self.hierarchy.Name}.{self.Name}"
+
+    @property
+    def Hierarchy(self) -> HierarchyObject:
+        return self.hierarchy
+
+    @property
+    def Column(self) -> Optional[ColumnObject]:
+        return self.column
+
+
+class RelationshipObject(ModelObject):
+    object_type = "Relationship"
+    object_type_name = "Relationship"
+    scope = "Relationship"
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex"):
+        super().__init__(data, index)
+        self.from_table = index.tables_by_name.get(data.get("fromTable"))
+        self.to_table = index.tables_by_name.get(data.get("toTable"))
+        self.from_column = index.columns_by_name.get((data.get("fromTable"), data.get("fromColumn")))
+        self.to_column = index.columns_by_name.get((data.get("toTable"), data.get("toColumn")))
+
+    def _display_name(self) -> str:
+        return f"{self._data.get('fromTable', '')} -> {self._data.get('toTable', '')}"
+
+    def _key(self) -> Tuple[str, str, str]:
+        # Several relationships can connect the same two tables
+        return self.object_type, self.Name, self._details() or ""
+
+    def _details(self) -> Optional[str]:
+        data = self._data
+        return f"From: {data.get('fromTable', '')}[{data.get('fromColumn', '')}] To: {data.get('toTable', '')}[{data.get('toColumn', '')}]"
+
+    @property
+    def FromTable(self) -> Optional[TableObject]:
+        return self.from_table
+
+    @property
+    def ToTable(self) -> Optional[TableObject]:
+        return self.to_table
+
+    @property
+    def FromColumn(self) -> Optional[ColumnObject]:
+        return self.from_column
+
+    @property
+    def ToColumn(self) -> Optional[ColumnObject]:
+        return self.to_column
+
+    @property
+    def FromCardinality(self) -> str:
+        return _enum(self._data.get("fromCardinality"), "Many")
+
+    @property
+    def ToCardinality(self) -> str:
+        return _enum(self._data.get("toCardinality"), "One")
+
+    @property
+    def CrossFilteringBehavior(self) -> str:
+        return _enum(self._data.get("crossFilteringBehavior"), "OneDirection")
+
+    @property
+    def SecurityFilteringBehavior(self) -> str:
+        return _enum(self._data.get("securityFilteringBehavior"), "OneDirection")
+
+    @property
+    def IsActive(self) -> bool:
+        return bool(self._data.get("isActive", True))
+
+
+class PerspectiveObject(ModelObject):
+    object_type = "Perspective"
+    object_type_name = "Perspective"
+    scope = "Perspective"
+
+
+class RoleObject(ModelObject):
+    object_type = "Role"
+    object_type_name = "Role"
+    scope = "ModelRole"
+    _child_properties = ("tablePermissions",)
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex"):
+        super().__init__(data, index)
+        self.table_permissions: List["TablePermissionObject"] = ModelCollection()
+
+    @property
+    def Members(self) -> List[Dict[str, Any]]:
+        return self._data.get("members", [])
+
+    @property
+    def ModelPermission(self) -> str:
+        return _enum(self._data.get("modelPermission"), "Read")
+
+    @property
+    def TablePermissions(self) -> List["TablePermissionObject"]:
+        return self.table_permissions
+
+    @property
+    def RowLevelSecurity(self) -> List[str]:
+        return [permission.Expression for permission in self.table_permissions if permission.Expression]
+
+
+class TablePermissionObject(ModelObject):
+    object_type = "TablePermission"
+    object_type_name = "Table Permission"
+    scope = "TablePermission"
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex", role: RoleObject):
+        super().__init__(data, index, index.tables_by_name.get(data.get("name")))
+        self.role = role
+
+    def _display_name(self) -> str:
+        return f"{self.role.Name}.{self._data.get('name', '')}"
+
+    def _table_name(self) -> Optional[str]:
+        return None
+
+    @property
+    def Role(self) -> RoleObject:
+        return self.role
+
+    @property
+    def Expression(self) -> str:
+        return _text(self._data.get("filterExpression"))
+
+    @property
+    def FilterExpression(self) -> str:
+        return self.Expression
+
+    @property
+    def MetadataPermission(self) -> str:
+        return _enum(self._data.get("metadataPermission"), "Default")
+
+
+class CalculationItemObject(ModelObject):
+    object_type = "CalculationItem"
+    object_type_name = "Calculation Item"
+    scope = "CalculationItem"
+
+    @property
+    def Expression(self) -> str:
+        return _text(self._data.get("expression"))
+
+    @property
+    def FormatStringExpression(self) -> str:
+        return _text((self._data.get("formatStringDefinition") or {}).get("expression"))
+
+    @property
+    def CalculationGroup(self) -> TableObject:
+        return self._table
+
+    @property
+    def Ordinal(self) -> int:
+        return int(self._data.get("ordinal", -1))
+
+
+class DataSourceObject(ModelObject):
+    object_type = "DataSource"
+
+    def __init__(self, data: Dict[str, Any], index: "BPAModelIndex"):
+        super().__init__(data, index)
+        self.used_by_partitions: List[PartitionObject] = []
+        self.scope = "StructuredDataSource" if self.Type == "Structured" else "ProviderDataSource"
+        self.object_type_name = "Structured Data Source" if self.Type == "Structured" else "Provider Data Source"
+
+    @property
+    def Type(self) -> str:
+        return _enum(self._data.get("type"), "Provider")
+
+    @property
+    def ConnectionString(self) -> str:
+        return _text(self._data.get("connectionString"))
+
+    @property
+    def UsedByPartitions(self) -> List[PartitionObject]:
+        return self.used_by_partitions
+
+
+class NamedExpressionObject(ModelObject):
+    object_type = "Expression"
+    object_type_name = "Shared Expression"
+    scope = "NamedExpression"
+
+    @property
+    def Expression(self) -> str:
+        return _text(self._data.get("expression"))
+
+    @property
+    def Kind(self) -> str:
+        return _enum(self._data.get("kind"), "M")
+
+
+# Object types whose properties a member reads, for members that navigate
+# to other objects or are derived from them. Used to decide whether a change
+# can affect rules that search the whole model.
+_DAX_OBJECT_TYPES = ("Measure", "KPI", "Column", "Table", "CalculationItem", "TablePermission")
+_MEMBER_OBJECT_TYPES: Dict[str, Tuple[str, ...]] = {
+    "model": ("Model",),
+    "tables": ("Table", "Partition"),
+    "table": ("Table", "Partition"),
+    "fromtable": ("Table", "Partition"),
+    "totable": ("Table", "Partition"),
+    "calculationgroup": ("Table", "Partition"),
+    "objecttypename": ("Partition",),
+    "expression": ("Partition",),
+    "columns": ("Column",),
+    "allcolumns": ("Column",),
+    "column": ("Column",),
+    "fromcolumn": ("Column",),
+    "tocolumn": ("Column",),
+    "sortbycolumn": ("Column",),
+    "usedinsortby": ("Column",),
+    "usedinvariations": ("Column",),
+    "measures": ("Measure",),
+    "allmeasures": ("Measure",),
+    "measure": ("Measure",),
+    "kpi": ("KPI",),
+    "calculationitems": ("CalculationItem",),
+    "allcalculationitems": ("CalculationItem",),
+    "relationships": ("Relationship",),
+    "usedinrelationships": ("Relationship",),
+    "roles": ("Role", "TablePermission"),
+    "role": ("Role",),
+    "tablepermissions": ("TablePermission",),
+    "rowlevelsecurity": ("TablePermission",),
+    "objectlevelsecurity": ("TablePermission",),
+    "hierarchies": ("Hierarchy",),
+    "allhierarchies": ("Hierarchy",),
+    "hierarchy": ("Hierarchy",),
+    "usedinhierarchies": ("Hierarchy", "Level"),
+    "levels": ("Level",),
+    "alllevels": ("Level",),
+    "partitions": ("Partition",),
+    "allpartitions": ("Partition",),
+    "usedbypartitions": ("Partition",),
+    "datasources": ("DataSource",),
+    "datasource": ("DataSource",),
+    "perspectives": ("Perspective",),
+    "inperspective": ("Perspective",),
+    "expressions": ("Expression",),
+    "referencedby": _DAX_OBJECT_TYPES,
+    "dependson": _DAX_OBJECT_TYPES,
+}
+
+
+def member_object_types(identifiers: Set[str]) -> Set[str]:
+    """
+    Get the object types that members with the given names can read.
+
+    Args:
+        identifiers: Lower-cased member names
+
+    Returns:
+        Object types (Table, Column, Measure, ...) the members navigate to
+    """
+    object_types: Set[str] = set()
+    for identifier in identifiers:
+        object_types.update(_MEMBER_OBJECT_TYPES.get(identifier, ()))
+    return object_types
+
+
+# Strings and comments are blanked before DAX references are scanned
+_DAX_STRINGS_AND_COMMENTS = re.compile(r'"(?:[^"]|"")*"|//[^\n]*|--[^\n]*|/\*.*?\*/', re.DOTALL)
+# 'Table'[Name], Table[Name] or [Name]
+_DAX_REFERENCE = re.compile(r"(?:'((?:[^']|'')+)'|([A-Za-z_][A-Za-z0-9_]*))?\[((?:[^\]]|\]\])+)\]")
+
+
+class BPAModelIndex:
+    """
+    Model objects of a TMSL model, indexed for rule evaluation.
+
+    Attributes:
+        model: The model root object
+        scoped_objects: (scope, object) pairs in model order, one per object
+            that rules can apply to
+    """
+
+    def __init__(self, model: Dict[str, Any]):
+        """
+        Build the index in a single walk over the model.
+
+        Args:
+            model: The "model" object of a TMSL database definition
+        """
+        self.model_data = model
+        self.model = ModelRoot(model, self)
+        self.scoped_objects: List[Tuple[str, ModelObject]] = [("Model", self.model)]
+
+        self.tables: List[TableObject] = ModelCollection()
+        self.columns: List[ColumnObject] = ModelCollection()
+        self.measures: List[MeasureObject] = ModelCollection()
+        self.kpis_by_measure: Dict[int, KpiObject] = {}
+        self.partitions: List[PartitionObject] = ModelCollection()
+        self.hierarchies: List[HierarchyObject] = ModelCollection()
+        self.levels: List[LevelObject] = ModelCollection()
+        self.calculation_items: List[CalculationItemObject] = ModelCollection()
+        self.relationships: List[RelationshipObject] = ModelCollection()
+        self.perspectives: List[PerspectiveObject] = ModelCollection()
+        self.roles: List[RoleObject] = ModelCollection()
+        self.table_permissions: List[TablePermissionObject] = ModelCollection()
+        self.data_sources: List[DataSourceObject] = ModelCollection()
+        self.expressions: List[NamedExpressionObject] = ModelCollection()
+
+        self.tables_by_name: Dict[str, TableObject] = {}
+        self.columns_by_name: Dict[Tuple[str, str], ColumnObject] = {}
+        self.data_sources_by_name: Dict[str, DataSourceObject] = {}
+        self._dependencies_resolved = False
+
+        for data in model.get("dataSources", []):
+            data_source = DataSourceObject(data, self)
+            self.data_sources.append(data_source)
+            self.data_sources_by_name[data_source.Name] = data_source
+            self.scoped_objects.append((data_source.scope, data_source))
+
+        for data in model.get("tables", []):
+            self._add_table(data)
+
+        for data in model.get("relationships", []):
+            relationship = RelationshipObject(data, self)
+            self.relationships.append(relationship)
+            self.scoped_objects.append(("Relationship", relationship))
+            for obj in (relationship.from_table, relationship.to_table, relationship.from_column, relationship.to_column):
+                if obj is not None and relationship not in obj._used_in_relationships:
+                    obj._used_in_relationships.append(relationship)
+
+        for data in model.get("perspectives", []):
+            perspective = PerspectiveObject(data, self)
+            self.perspectives.append(perspective)
+            self.scoped_objects.append(("Perspective", perspective))
+            for table_data in data.get("tables", []):
+                table = self.tables_by_name.get(table_data.get("name"))
+                if table is not None:
+                    table.perspectives[perspective.Name] = True
+
+        for data in model.get("roles", []):
+            self._add_role(data)
+
+        for data in model.get("expressions", []):
+            expression = NamedExpressionObject(data, self)
+            self.expressions.append(expression)
+            self.scoped_objects.append(("NamedExpression", expression))
+
+    def _add_table(self, data: Dict[str, Any]) -> None:
+        table = TableObject(data, self)
+        self.tables.append(table)
+        self.tables_by_name[table.Name] = table
+        self.scoped_objects.append((table.scope, table))
+
+        for column_data in data.get("columns", []):
+            column = ColumnObject(column_data, self, table)
+            table.columns.append(column)
+            self.columns.append(column)
+            self.columns_by_name[(table.Name, column.Name)] = column
+            self.scoped_objects.append((column.scope, column))
+
+        # Column cross references need all columns of the table
+        for column in table.columns:
+            sort_by = column._data.get("sortByColumn")
+            if sort_by:
+                column.sort_by_column = self.columns_by_name.get((table.Name, sort_by))
+                if column.sort_by_column is not None:
+                    column.sort_by_column.used_in_sort_by.append(column)
+            for variation in column._data.get("variations", []):
+                default_column = variation.get("defaultColumn") or {}
+                target = self.columns_by_name.get((default_column.get("table"), default_column.get("column")))
+                if target is not None:
+                    target.used_in_variations.append(variation)
+
+        for measure_data in data.get("measures", []):
+            measure = MeasureObject(measure_data, self, table)
+            table.measures.append(measure)
+            self.measures.append(measure)
+            self.scoped_objects.append(("Measure", measure))
+            if measure_data.get("kpi"):
+                kpi = KpiObject(measure_data["kpi"], self, measure)
+                self.kpis_by_measure[id(measure)] = kpi
+                self.scoped_objects.append(("KPI", kpi))
+
+        for hierarchy_data in data.get("hierarchies", []):
+            hierarchy = HierarchyObject(hierarchy_data, self, table)
+            table.hierarchies.append(hierarchy)
+            self.hierarchies.append(hierarchy)
+            self.scoped_objects.append(("Hierarchy", hierarchy))
+            for level_data in hierarchy_data.get("levels", []):
+                level = LevelObject(level_data, self, hierarchy)
+                level.column = self.columns_by_name.get((table.Name, level_data.get("column")))
+                hierarchy.levels.append(level)
+                self.levels.append(level)
+                self.scoped_objects.append(("Level", level))
+                if level.column is not None and hierarchy not in level.column.used_in_hierarchies:
+                    level.column.used_in_hierarchies.append(hierarchy)
+
+        for partition_data in data.get("partitions", []):
+            partition = PartitionObject(partition_data, self, table)
+            table.partitions.append(partition)
+            self.partitions.append(partition)
+            self.scoped_objects.append(("Partition", partition))
+            if partition.DataSource is not None:
+                partition.DataSource.used_by_partitions.append(partition)
+
+        for item_data in (data.get("calculationGroup") or {}).get("calculationItems", []):
+            item = CalculationItemObject(item_data, self, table)
+            table.calculation_items.append(item)
+            self.calculation_items.append(item)
+            self.scoped_objects.append(("CalculationItem", item))
+
+    def _add_role(self, data: Dict[str, Any]) -> None:
+        role = RoleObject(data, self)
+        self.roles.append(role)
+        self.scoped_objects.append(("ModelRole", role))
+
+        for permission_data in data.get("tablePermissions", []):
+            permission = TablePermissionObject(permission_data, self, role)
+            role.table_permissions.append(permission)
+            self.table_permissions.append(permission)
+            self.scoped_objects.append(("TablePermission", permission))
+
+            table = permission.Table
+            if table is None:
+                continue
+            if permission.Expression:
+                table.row_level_security[role.Name] = permission.Expression
+            if "metadataPermission" in permission_data:
+                table.object_level_security.append(permission.MetadataPermission)
+            for column_permission in permission_data.get("columnPermissions", []):
+                column = self.columns_by_name.get((table.Name, column_permission.get("name")))
+                if column is not None:
+                    column.object_level_security.append(_enum(column_permission.get("metadataPermission"), "Default"))
+
+    def keyed_objects(self) -> List[Tuple[Tuple[str, str, str], str, ModelObject]]:
+        """
+        Get the scoped objects with their keys, in model order.
+
+        Returns:
+            (key, scope, object) triples. Duplicate keys get a suffix so every
+            key is unique within the index.
+        """
+        keyed = []
+        seen: Set[Tuple[str, str, str]] = set()
+        for scope, obj in self.scoped_objects:
+            key = obj._key()
+            if key in seen:
+                occurrence = 2
+                while (key[0], key[1], f"{key[2]}#{occurrence}") in seen:
+                    occurrence += 1
+                key = (key[0], key[1], f"{key[2]}#{occurrence}")
+            seen.add(key)
+            keyed.append((key, scope, obj))
+        return keyed
+
+    def related_table_names(self, obj: ModelObject) -> Set[str]:
+        """
+        Get the names of the tables an object belongs to or refers to.
+
+        These are the tables whose objects rule results for this object can
+        depend on: its own table, relationship ends, secured and perspective
+        tables, the tables of partitions using a data source and the tables of
+        DAX objects it depends on or is referenced by.
+        """
+        self.ensure_dependencies()
+        related: List[Optional[ModelObject]] = [obj._table]
+        if isinstance(obj, TableObject):
+            related.append(obj)
+        elif isinstance(obj, RelationshipObject):
+            related.extend((obj.from_table, obj.to_table))
+        elif isinstance(obj, RoleObject):
+            related.extend(permission.Table for permission in obj.table_permissions)
+        elif isinstance(obj, DataSourceObject):
+            related.extend(partition.Table for partition in obj.used_by_partitions)
+
+        names = {table.Name for table in related if table is not None}
+        if isinstance(obj, PerspectiveObject):
+            names.update(_text(table.get("name")) for table in obj._data.get("tables", []))
+        for dependency in obj._depends_on:
+            if dependency.Key._table is not None:
+                names.add(dependency.Key._table.Name)
+        for owner in obj._referenced_by:
+            if owner._table is not None:
+                names.add(owner._table.Name)
+        return names
+
+    def ensure_dependencies(self) -> None:
+        """Scan all DAX expressions for references, once per index."""
+        if self._dependencies_resolved:
+            return
+        self._dependencies_resolved = True
+
+        tables = {table.Name.lower(): table for table in self.tables}
+        columns = {(table.lower(), column.lower()): obj for (table, column), obj in self.columns_by_name.items()}
+        measures = {measure.Name.lower(): measure for measure in self.measures}
+
+        owners: List[Tuple[ModelObject, str]] = []
+        owners.extend((measure, measure.Expression) for measure in self.measures)
+        owners.extend((kpi, kpi.Expression) for kpi in self.kpis_by_measure.values())
+        owners.extend((column, column.Expression) for column in self.columns if column.scope == "CalculatedColumn")
+        owners.extend((table, table.Expression) for table in self.tables if table.scope == "CalculatedTable")
+        owners.extend((item, item.Expression) for item in self.calculation_items)
+        owners.extend((permission, permission.Expression) for permission in self.table_permissions)
+
+        for owner, expression in owners:
+            if not expression:
+                continue
+            dependencies: Dict[int, Dependency] = {}
+            owner_table = owner.Table
+            for match in _DAX_REFERENCE.finditer(_DAX_STRINGS_AND_COMMENTS.sub(" ", expression)):
+                quoted_table, table_name, name = match.groups()
+                table_name = (quoted_table.replace("''", "'") if quoted_table else table_name or "").lower()
+                name = name.replace("]]", "]").lower()
+
+                if table_name:
+                    target = columns.get((table_name, name))
+                    if target is None and table_name in tables:
+                        target = measures.get(name)
+                else:
+                    target = measures.get(name)
+                    if target is None and owner_table is not None:
+                        target = columns.get((owner_table.Name.lower(), name))
+                if target is None or target is owner:
+                    continue
+
+                dependency = dependencies.get(id(target))
+                if dependency is None:
+                    dependency = dependencies[id(target)] = Dependency(target)
+                    target._referenced_by.append(owner)
+                dependency.Value.append(DaxReference(bool(table_name)))
+
+            owner._depends_on = list(dependencies.values())
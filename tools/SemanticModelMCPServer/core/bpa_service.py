@@ -4,8 +4,47 @@ Best Practice Analyzer integration for the Semantic Model MCP Server
 
 import os
 import json
-from typing import Dict, List, Any, Optional
-from .bpa_analyzer import BPAAnalyzer, BPAViolation, BPASeverity
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from .bpa_analyzer import BPAAnalyzer, BPAAnalysisSnapshot, BPAViolation, BPASeverity
+from .bpa_batch import DEFAULT_FETCH_WORKERS, BPAModelRun, run_batch_bpa
+from .tmsl_document import parse_tmsl
+
+class BPASnapshotCache:
+    """Thread-safe LRU store of the last analyzed version of each model"""
+    
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._snapshots: "OrderedDict[str, BPAAnalysisSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[BPAAnalysisSnapshot]:
+        """Get the snapshot stored for a model, if any"""
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None:
+                self._snapshots.move_to_end(key)
+            return snapshot
+    
+    def put(self, key: str, snapshot: BPAAnalysisSnapshot) -> None:
+        """Store a model's snapshot, evicting the least recently used over budget"""
+        with self._lock:
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while len(self._snapshots) > self.max_entries:
+                self._snapshots.popitem(last=False)
+    
+    def clear(self) -> int:
+        """Drop all snapshots and return how many were dropped"""
+        with self._lock:
+            count = len(self._snapshots)
+            self._snapshots.clear()
+        return count
+
+# Shared across BPAService instances, so repeated analyses of a model in the
+# edit loop only re-evaluate what changed
+bpa_snapshot_cache = BPASnapshotCache()
 
 class BPAService:
     """Service class for integrating BPA functionality into the MCP server"""
@@ -25,12 +64,17 @@ class BPAService:
         if os.path.exists(self.rules_file):
             self.analyzer = BPAAnalyzer(self.rules_file)
     
-    def analyze_model_from_tmsl(self, tmsl_definition: str) -> Dict[str, Any]:
+    def analyze_model_from_tmsl(self, tmsl_definition: str, incremental: bool = False,
+                                snapshot_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze a TMSL model and return BPA violations
         
         Args:
             tmsl_definition: TMSL JSON string
+            incremental: Diff against the last analyzed version of the model and
+                only re-evaluate rules for what changed
+            snapshot_key: Identifies the model across calls, defaults to the
+                database name in the TMSL
             
         Returns:
             Dictionary containing analysis results
@@ -43,25 +87,22 @@ class BPAService:
             }
         
         try:
-            # Preprocess TMSL definition to handle formatting issues
-            cleaned_tmsl = self._clean_tmsl_json(tmsl_definition)
+            # Parse TMSL, cleaning up formatting issues only if it is not valid JSON;
+            # a definition just validated or deployed is not parsed again
+            tmsl_model = parse_tmsl(tmsl_definition, lenient=True).data
             
-            # Parse TMSL
-            tmsl_model = json.loads(cleaned_tmsl)
+            if incremental:
+                return self._analyze_incremental(tmsl_model, snapshot_key or self._snapshot_key(tmsl_model))
             
-            # Run analysis
-            violations = self.analyzer.analyze_model(tmsl_model)
-            
-            # Get summary
-            summary = self.analyzer.get_violations_summary()
-            
-            # Export violations
-            violations_dict = self.analyzer.export_violations_to_dict()
+            # Run analysis; the result is built from this analysis only, so
+            # concurrent analyses on a shared service do not mix violations
+            result = self.analyzer.analyze(tmsl_model)
+            self.analyzer.violations = result.violations
             
             return {
                 'success': True,
-                'violations': violations_dict,
-                'summary': summary,
+                'violations': result.to_dicts(),
+                'summary': result.get_summary(),
                 'rules_count': len(self.analyzer.rules),
                 'analysis_complete': True
             }
@@ -79,6 +120,73 @@ class BPAService:
                 'summary': {}
             }
     
+    def _analyze_incremental(self, tmsl_model: Dict[str, Any], snapshot_key: str) -> Dict[str, Any]:
+        """Analyze a parsed TMSL model against the stored snapshot of its last version"""
+        result, snapshot = self.analyzer.analyze_incremental(tmsl_model, bpa_snapshot_cache.get(snapshot_key))
+        if snapshot is not None:
+            bpa_snapshot_cache.put(snapshot_key, snapshot)
+        self.analyzer.violations = result.violations
+        
+        return {
+            'success': True,
+            'violations': result.to_dicts(),
+            'summary': result.get_summary(),
+            'rules_count': len(self.analyzer.rules),
+            'analysis_complete': True,
+            'incremental': {
+                'reused_previous_results': result.incremental,
+                'changed_objects': result.changed_objects,
+                'reevaluated_objects': result.objects_analyzed,
+                'analysis_seconds': round(result.analysis_seconds, 3)
+            }
+        }
+    
+    @staticmethod
+    def _snapshot_key(tmsl_model: Dict[str, Any]) -> str:
+        """Identify a TMSL model by its database or model name"""
+        database = tmsl_model.get('create', {}).get('database', {}) or tmsl_model.get('createOrReplace', {}).get('database', {})
+        name = database.get('name') or tmsl_model.get('name') or tmsl_model.get('model', {}).get('name') or ''
+        return f"tmsl:{name.strip().lower()}"
+    
+    def analyze_models_batch(self, datasets: List[Tuple[str, str]], output_path: Optional[str] = None,
+                             output_format: str = 'ndjson', fetch_workers: int = DEFAULT_FETCH_WORKERS,
+                             analysis_workers: Optional[int] = None,
+                             on_model_done: Optional[Callable[[BPAModelRun], None]] = None) -> Dict[str, Any]:
+        """
+        Analyze many models and stream their violations to a file
+        
+        Args:
+            datasets: (workspace name, dataset name) pairs to analyze
+            output_path: File to write violations to, defaults to a temp file
+            output_format: 'ndjson' or 'parquet'
+            fetch_workers: Number of concurrent model definition fetches
+            analysis_workers: Number of analysis processes, defaults to the CPU count
+            on_model_done: Called with each model's run as soon as it finishes
+            
+        Returns:
+            Dictionary with per-model summaries and timings
+        """
+        if not self.analyzer:
+            return {
+                'error': 'BPA rules not loaded. Please check if bpa.json exists.',
+                'models': []
+            }
+        
+        result = run_batch_bpa(
+            datasets,
+            self.rules_file,
+            output_path=output_path,
+            output_format=output_format,
+            fetch_workers=fetch_workers,
+            analysis_workers=analysis_workers,
+            on_model_done=on_model_done
+        )
+        return {
+            'success': True,
+            **result.to_dict(),
+            'rules_count': len(self.analyzer.rules)
+        }
+    
     def get_violations_by_severity(self, severity_name: str) -> List[Dict[str, Any]]:
         """Get violations filtered by severity level"""
         if not self.analyzer:
@@ -167,6 +275,7 @@ class BPAService:
             'total_rules': len(self.analyzer.rules),
             'categories': categories,
             'severities': severities,
+            'uncompiled_rules': self.analyzer.compile_errors,
             'rules_file': self.rules_file
         }
     
@@ -258,49 +367,3 @@ class BPAService:
             report['violations_by_category'] = categories
         
         return report
-    
-    def _clean_tmsl_json(self, tmsl_definition: str) -> str:
-        """
-        Clean and preprocess TMSL JSON string to handle common formatting issues
-        
-        Args:
-            tmsl_definition: Raw TMSL JSON string
-            
-        Returns:
-            Cleaned JSON string ready for parsing
-        """
-        # Remove carriage returns and normalize line endings
-        cleaned = tmsl_definition.replace('\r\n', '\n').replace('\r', '\n')
-        
-        # Remove any leading/trailing whitespace
-        cleaned = cleaned.strip()
-        
-        # If the string is already valid JSON, try parsing it first
-        try:
-            # Test if it's already valid JSON
-            json.loads(cleaned)
-            return cleaned
-        except json.JSONDecodeError:
-            # If not valid, try additional cleaning steps
-            pass
-        
-        # Handle common issues with escaped JSON strings
-        # If the string starts and ends with quotes, it might be a JSON string containing JSON
-        if cleaned.startswith('"') and cleaned.endswith('"'):
-            try:
-                # Try to decode it as a JSON string
-                decoded = json.loads(cleaned)
-                if isinstance(decoded, str):
-                    # If successful and result is a string, use that as the TMSL
-                    cleaned = decoded
-            except json.JSONDecodeError:
-                # If that fails, remove the outer quotes manually
-                cleaned = cleaned[1:-1]
-        
-        # Handle escaped quotes and backslashes
-        cleaned = cleaned.replace('\\"', '"').replace('\\\\', '\\')
-        
-        # Handle escaped newlines in JSON strings
-        cleaned = cleaned.replace('\\n', '\n').replace('\\t', '\t')
-        
-        return cleaned
@@ -0,0 +1,303 @@
+"""
+Column Profiler
+
+This module profiles the columns of semantic model tables with DAX that is
+aggregated on the server, instead of pulling rows to the client.
+
+The row count and, per column, the distinct count, blank count, minimum and
+maximum of all chosen tables are computed by ROW() queries that are sent
+together as one request with several EVALUATE statements. The most frequent
+values of columns below a cardinality limit follow in a second request. For
+huge tables the statistics can be computed over a sample of the first rows
+of each table.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.dax_batch import BatchQuery, BatchQueryResult, execute_request
+from core.local_powerbi_session import LocalModelMetadata
+
+DEFAULT_TOP_VALUES = 5
+# Columns with more distinct values get no top values; their values are nearly unique anyway
+DEFAULT_TOP_VALUES_MAX_DISTINCT = 100000
+# Columns per ROW() query; all queries still go in one request
+COLUMNS_PER_QUERY = 50
+
+# INFO.COLUMNS() [Type] of the hidden RowNumber column
+_ROW_NUMBER_COLUMN_TYPE = 3
+
+# INFO.COLUMNS() data type codes
+DATA_TYPE_NAMES: Dict[int, str] = {
+    2: "String",
+    6: "Int64",
+    8: "Double",
+    9: "DateTime",
+    10: "Decimal",
+    11: "Boolean",
+    17: "Binary",
+    19: "Unknown",
+    20: "Variant",
+}
+_AUTOMATIC_DATA_TYPE = 1
+
+_SOURCE_VARIABLE = "__source"
+
+
+def _table_ref(table_name: str) -> str:
+    return "'" + table_name.replace("'", "''") + "'"
+
+
+def _column_ref(table_name: str, column_name: str) -> str:
+    return _table_ref(table_name) + "[" + column_name.replace("]", "]]") + "]"
+
+
+def _to_int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class ProfiledColumn:
+    """A column to profile and its statistics."""
+
+    name: str
+    data_type: str
+    distinct_count: Optional[int] = None
+    blank_count: Optional[int] = None
+    min_value: Any = None
+    max_value: Any = None
+    top_values: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+
+    @property
+    def has_min_max(self) -> bool:
+        # MIN and MAX do not accept Boolean columns
+        return self.data_type != "Boolean"
+
+
+@dataclass
+class ProfiledTable:
+    """A table to profile and its columns."""
+
+    name: str
+    columns: List[ProfiledColumn] = field(default_factory=list)
+    row_count: Optional[int] = None
+    profiled_rows: Optional[int] = None
+    errors: List[str] = field(default_factory=list)
+
+
+def select_tables(metadata: LocalModelMetadata, table_names: List[str]) -> Tuple[List[ProfiledTable], List[str]]:
+    """
+    Pick the tables to profile and their columns from the model metadata.
+
+    The hidden RowNumber column and binary columns are left out.
+
+    Args:
+        metadata: INFO.TABLES() and INFO.COLUMNS() rows of the model
+        table_names: Names of the tables to profile, matched case-insensitively
+
+    Returns:
+        Tuple of the tables to profile and the table names not found in the model
+    """
+    tables_by_id = {str(row.get("[ID]")): str(row.get("[Name]")) for row in metadata.tables}
+    wanted = {name.lower(): name for name in table_names}
+    tables: Dict[str, ProfiledTable] = {}
+    for table_name in tables_by_id.values():
+        if table_name.lower() in wanted:
+            tables[table_name.lower()] = ProfiledTable(table_name)
+
+    for row in metadata.columns:
+        table = tables.get(tables_by_id.get(str(row.get("[TableID]")), "").lower())
+        if table is None or _to_int(row.get("[Type]")) == _ROW_NUMBER_COLUMN_TYPE:
+            continue
+        data_type = _to_int(row.get("[ExplicitDataType]"))
+        if data_type in (None, _AUTOMATIC_DATA_TYPE):
+            data_type = _to_int(row.get("[InferredDataType]"))
+        type_name = DATA_TYPE_NAMES.get(data_type, "Unknown")
+        if type_name == "Binary":
+            continue
+        name = row.get("[ExplicitName]") or row.get("[InferredName]")
+        if name:
+            table.columns.append(ProfiledColumn(str(name), type_name))
+
+    missing = [name for key, name in wanted.items() if key not in tables]
+    return [tables[key] for key in wanted if key in tables], missing
+
+
+def _source(table: ProfiledTable, sample_rows: Optional[int]) -> Tuple[str, str]:
+    """The VAR prefix and the table expression the statistics are computed over."""
+    if sample_rows:
+        return f"VAR {_SOURCE_VARIABLE} = TOPN({int(sample_rows)}, {_table_ref(table.name)})\nRETURN ", _SOURCE_VARIABLE
+    return "", _table_ref(table.name)
+
+
+def build_stats_queries(tables: List[ProfiledTable], sample_rows: Optional[int] = None,
+                        columns_per_query: int = COLUMNS_PER_QUERY) -> List[Tuple[BatchQuery, ProfiledTable, List[ProfiledColumn]]]:
+    """
+    Build the ROW() queries computing the statistics of all columns.
+
+    Args:
+        tables: Tables to profile
+        sample_rows: Compute the column statistics over the first sample_rows
+            rows of each table; None for all rows
+        columns_per_query: Maximum columns per query
+
+    Returns:
+        List of the query, its table and the columns it computes
+    """
+    queries = []
+    for table in tables:
+        prefix, source = _source(table, sample_rows)
+        chunks = [table.columns[start:start + columns_per_query] for start in range(0, len(table.columns), columns_per_query)] or [[]]
+        for chunk_index, chunk in enumerate(chunks):
+            expressions = []
+            if chunk_index == 0:
+                expressions.append(f'"row_count", COUNTROWS({_table_ref(table.name)})')
+                expressions.append(f'"profiled_rows", COUNTROWS({source})')
+            for index, column in enumerate(chunk):
+                ref = _column_ref(table.name, column.name)
+                if sample_rows:
+                    expressions.append(f'"c{index}_distinct", COUNTROWS(DISTINCT(SELECTCOLUMNS({source}, "v", {ref})))')
+                    expressions.append(f'"c{index}_blank", COUNTROWS(FILTER({source}, ISBLANK({ref})))')
+                    if column.has_min_max:
+                        expressions.append(f'"c{index}_min", MINX({source}, {ref})')
+                        expressions.append(f'"c{index}_max", MAXX({source}, {ref})')
+                else:
+                    expressions.append(f'"c{index}_distinct", DISTINCTCOUNT({ref})')
+                    expressions.append(f'"c{index}_blank", COUNTBLANK({ref})')
+                    if column.has_min_max:
+                        expressions.append(f'"c{index}_min", MIN({ref})')
+                        expressions.append(f'"c{index}_max", MAX({ref})')
+            query_id = f"stats:{table.name}:{chunk_index}"
+            dax = f"EVALUATE\n{prefix}ROW(\n    " + ",\n    ".join(expressions) + "\n)"
+            queries.append((BatchQuery(query_id, dax, max_rows=1), table, chunk))
+    return queries
+
+
+def build_top_values_queries(tables: List[ProfiledTable], top_values: int, max_distinct: int,
+                             sample_rows: Optional[int] = None) -> List[Tuple[BatchQuery, ProfiledColumn]]:
+    """
+    Build the queries reading the most frequent values of each column.
+
+    Columns whose distinct count is unknown or above max_distinct are skipped.
+    Ties are broken by value, so each query returns at most top_values rows.
+
+    Returns:
+        List of the query and its column
+    """
+    queries = []
+    for table in tables:
+        prefix, source = _source(table, sample_rows)
+        for column in table.columns:
+            if column.distinct_count is None or column.distinct_count > max_distinct:
+                continue
+            ref = _column_ref(table.name, column.name)
+            if sample_rows:
+                grouped = f'GROUPBY({source}, {ref}, "__count", COUNTX(CURRENTGROUP(), 1))'
+            else:
+                grouped = f'SUMMARIZECOLUMNS({ref}, "__count", COUNTROWS({source}))'
+            dax = f"EVALUATE\n{prefix}TOPN({int(top_values)}, {grouped}, [__count], DESC, {ref}, ASC)"
+            queries.append((BatchQuery(f"top:{table.name}:{column.name}", dax, max_rows=top_values), column))
+    return queries
+
+
+def _row_values(result: BatchQueryResult) -> Dict[str, Any]:
+    rows = result.result.to_rows() if result.result is not None else []
+    return {name.strip("[]"): value for name, value in rows[0].items()} if rows else {}
+
+
+def profile_tables(run_on_connection: Callable[[Callable[[Any], Any]], Any], metadata: LocalModelMetadata,
+                   table_names: List[str], top_values: int = DEFAULT_TOP_VALUES,
+                   top_values_max_distinct: int = DEFAULT_TOP_VALUES_MAX_DISTINCT,
+                   sample_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Profile the columns of the chosen tables.
+
+    Args:
+        run_on_connection: Function running a callable on an open connection
+        metadata: INFO.* metadata of the model
+        table_names: Names of the tables to profile
+        top_values: Most frequent values returned per column; 0 for none
+        top_values_max_distinct: Columns with more distinct values get no top values
+        sample_rows: Compute the statistics over the first sample_rows rows of each table
+
+    Returns:
+        Dictionary with the statistics per table and column, the tables not
+        found, and the number of requests and queries sent
+    """
+    tables, missing = select_tables(metadata, table_names)
+    stats_queries = build_stats_queries(tables, sample_rows)
+    requests = 0
+    if stats_queries:
+        results = run_on_connection(lambda connection: execute_request(connection, [query for query, _, _ in stats_queries], 0))
+        requests += 1
+        for (query, table, columns), result in zip(stats_queries, results):
+            if result.error is not None:
+                table.errors.append(str(result.error))
+                for column in columns:
+                    column.error = "Statistics query failed"
+                continue
+            values = _row_values(result)
+            if "row_count" in values:
+                table.row_count = _to_int(values.get("row_count"))
+                table.profiled_rows = _to_int(values.get("profiled_rows"))
+            for index, column in enumerate(columns):
+                column.distinct_count = _to_int(values.get(f"c{index}_distinct"))
+                column.blank_count = _to_int(values.get(f"c{index}_blank"))
+                column.min_value = values.get(f"c{index}_min")
+                column.max_value = values.get(f"c{index}_max")
+
+    top_queries = build_top_values_queries(tables, top_values, top_values_max_distinct, sample_rows) if top_values > 0 else []
+    if top_queries:
+        results = run_on_connection(lambda connection: execute_request(connection, [query for query, _ in top_queries], 1))
+        requests += 1
+        for (query, column), result in zip(top_queries, results):
+            if result.error is not None:
+                logging.debug(f"Top values query {query.query_id} failed: {result.error}")
+                column.error = str(result.error)
+                continue
+            data = result.result.data if result.result is not None else []
+            column.top_values = [{"value": value, "count": _to_int(count)} for value, count in zip(*data)] if len(data) >= 2 else []
+
+    return {
+        "tables": [_table_summary(table, sample_rows) for table in tables],
+        "missing_tables": missing,
+        "requests_sent": requests,
+        "query_count": len(stats_queries) + len(top_queries),
+    }
+
+
+def _table_summary(table: ProfiledTable, sample_rows: Optional[int]) -> Dict[str, Any]:
+    profiled_rows = table.profiled_rows
+    columns = []
+    for column in table.columns:
+        entry: Dict[str, Any] = {
+            "column": column.name,
+            "data_type": column.data_type,
+            "distinct_count": column.distinct_count,
+            "blank_count": column.blank_count,
+            "blank_pct": round(100.0 * column.blank_count / profiled_rows, 2) if profiled_rows and column.blank_count is not None else None,
+        }
+        if column.has_min_max:
+            entry["min"] = column.min_value
+            entry["max"] = column.max_value
+        if column.top_values is not None:
+            entry["top_values"] = column.top_values
+        if column.error:
+            entry["error"] = column.error
+        columns.append(entry)
+    summary: Dict[str, Any] = {
+        "table": table.name,
+        "row_count": table.row_count,
+        "profiled_rows": profiled_rows,
+        "sampled": bool(sample_rows) and table.row_count is not None and profiled_rows is not None and profiled_rows < table.row_count,
+        "column_count": len(columns),
+        "columns": columns,
+    }
+    if table.errors:
+        summary["errors"] = table.errors
+    return summary
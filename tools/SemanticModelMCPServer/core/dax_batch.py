@@ -0,0 +1,257 @@
+"""
+DAX Query Batches
+
+This module runs many small DAX queries (row counts per table, distinct
+counts per column, TOPN samples) with as few round trips as possible.
+
+Queries that are a single EVALUATE without a DEFINE block are combined into
+one request with several EVALUATE statements, whose result sets are read one
+after another. All other queries, and the combined requests, run concurrently
+on pooled connections. If a combined request fails, its queries are run one
+by one so a single bad query does not fail the others.
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+from core.dax_query_cache import DAX_LITERALS, normalize_dax_query
+from core.dax_result_reader import DaxResult, read_dax_result
+from core.xmla_connection_pool import XmlaConnectionPool, xmla_connection_pool
+
+DEFAULT_MAX_CONCURRENCY = 4
+# EVALUATE statements combined into one request
+DEFAULT_MAX_QUERIES_PER_REQUEST = 16
+MAX_BATCH_QUERIES = 200
+
+_EVALUATE = re.compile(r"\bEVALUATE\b", re.IGNORECASE)
+
+_CONNECTION_ERROR_WORDS = ("connection", "network", "session")
+
+
+def _is_connection_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(word in message for word in _CONNECTION_ERROR_WORDS)
+
+
+def is_multiplexable(dax_query: str) -> bool:
+    """
+    Check whether a query can share a request with other queries.
+
+    Only queries with exactly one EVALUATE statement and no DEFINE block are
+    combined: a DEFINE block applies to every EVALUATE of a request, and DMV
+    queries cannot be combined at all.
+
+    Args:
+        dax_query: The DAX query text
+
+    Returns:
+        True if the query can be combined with others
+    """
+    code = DAX_LITERALS.sub(" ", normalize_dax_query(dax_query or ""))
+    return code.lstrip().upper().startswith("EVALUATE") and len(_EVALUATE.findall(code)) == 1
+
+
+@dataclass
+class BatchQuery:
+    """A query of a batch and its result budget."""
+
+    query_id: str
+    dax_query: str
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+
+@dataclass
+class BatchQueryResult:
+    """The outcome of one query of a batch."""
+
+    query_id: str
+    result: Optional[DaxResult] = None
+    error: Optional[Exception] = None
+    # "multiplexed", "single" or "cache"
+    execution: str = "single"
+    request: Optional[int] = None
+    duration_ms: float = 0.0
+
+
+def plan_requests(queries: List[BatchQuery], multiplex: bool = True,
+                  max_queries_per_request: int = DEFAULT_MAX_QUERIES_PER_REQUEST) -> List[List[BatchQuery]]:
+    """
+    Split a batch into requests.
+
+    Combinable queries are grouped up to max_queries_per_request per request;
+    every other query is a request of its own.
+
+    Args:
+        queries: The queries of the batch
+        multiplex: False to send every query on its own
+        max_queries_per_request: Maximum EVALUATE statements per request
+
+    Returns:
+        List of requests, each a list of queries
+    """
+    requests: List[List[BatchQuery]] = []
+    combinable: List[BatchQuery] = []
+    for query in queries:
+        if multiplex and is_multiplexable(query.dax_query):
+            combinable.append(query)
+        else:
+            requests.append([query])
+    size = max(1, max_queries_per_request)
+    for start in range(0, len(combinable), size):
+        requests.append(combinable[start:start + size])
+    return requests
+
+
+def _execute_single(connection: Any, query: BatchQuery, request: int) -> BatchQueryResult:
+    """Run one query on its own; query errors are returned, connection errors raised."""
+    started = time.perf_counter()
+    try:
+        command = connection.CreateCommand()
+        command.CommandText = query.dax_query
+        reader = command.ExecuteReader()
+        try:
+            result = read_dax_result(reader, max_rows=query.max_rows, max_bytes=query.max_bytes)
+            if result.truncated:
+                command.Cancel()
+        finally:
+            reader.Close()
+    except Exception as e:
+        if _is_connection_error(e):
+            raise
+        return BatchQueryResult(query.query_id, error=e, request=request,
+                                duration_ms=(time.perf_counter() - started) * 1000)
+    return BatchQueryResult(query.query_id, result=result, request=request,
+                            duration_ms=(time.perf_counter() - started) * 1000)
+
+
+def _execute_multiplexed(connection: Any, queries: List[BatchQuery], request: int) -> List[BatchQueryResult]:
+    """
+    Run queries as one request with several EVALUATE statements.
+
+    The duration of each query is the time until its result set was read,
+    counted from the end of the previous one. Queries whose result set the
+    engine did not return are run one by one.
+    """
+    command = connection.CreateCommand()
+    command.CommandText = "\n".join(query.dax_query.strip() for query in queries)
+    results: List[BatchQueryResult] = []
+    started = time.perf_counter()
+    reader = command.ExecuteReader()
+    try:
+        for index, query in enumerate(queries):
+            if index > 0 and not reader.NextResult():
+                break
+            # Rows past a query's budget are skipped by NextResult
+            result = read_dax_result(reader, max_rows=query.max_rows, max_bytes=query.max_bytes)
+            finished = time.perf_counter()
+            results.append(BatchQueryResult(query.query_id, result=result, execution="multiplexed",
+                                            request=request, duration_ms=(finished - started) * 1000))
+            started = finished
+    finally:
+        reader.Close()
+
+    if len(results) < len(queries):
+        logging.debug(f"Combined DAX request returned {len(results)} of {len(queries)} result sets, running the rest one by one")
+        results.extend(_execute_single(connection, query, request) for query in queries[len(results):])
+    return results
+
+
+def execute_request(connection: Any, queries: List[BatchQuery], request: int) -> List[BatchQueryResult]:
+    """
+    Run one planned request on an open connection.
+
+    Args:
+        connection: Open AdomdConnection
+        queries: Queries of the request; more than one are combined
+        request: Number of the request, reported with each result
+
+    Returns:
+        One result per query, in order
+
+    Raises:
+        Exception: On connection errors, so the caller can retry on another connection
+    """
+    if len(queries) == 1:
+        return [_execute_single(connection, queries[0], request)]
+    try:
+        return _execute_multiplexed(connection, queries, request)
+    except Exception as e:
+        if _is_connection_error(e):
+            raise
+        # One failing EVALUATE fails the whole request; run them one by one for per-query errors
+        logging.debug(f"Combined DAX request failed, running its queries one by one: {e}")
+        return [_execute_single(connection, query, request) for query in queries]
+
+
+def pooled_runner(workspace_name: str, dataset_name: str, access_token: str,
+                  pool: XmlaConnectionPool = xmla_connection_pool) -> Callable[[Callable[[Any], Any]], Any]:
+    """
+    Create a function that runs a callable on a pooled connection of a dataset.
+
+    A connection-level failure on a reused connection is retried once on a
+    new connection, like execute_dax_query.
+
+    Returns:
+        Function taking a callable that receives the open connection
+    """
+    def run(function: Callable[[Any], Any]) -> Any:
+        for attempt in range(2):
+            pooled = pool.acquire(workspace_name, dataset_name, access_token)
+            try:
+                result = function(pooled.connection)
+            except Exception as e:
+                connection_error = _is_connection_error(e)
+                pool.release(pooled, healthy=not connection_error)
+                if attempt == 0 and pooled.reused and connection_error:
+                    logging.debug(f"Pooled XMLA connection failed, retrying with a new connection: {e}")
+                    continue
+                raise
+            pool.release(pooled)
+            return result
+    return run
+
+
+def run_batch(queries: List[BatchQuery], run_on_connection: Callable[[Callable[[Any], Any]], Any],
+              multiplex: bool = True, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+              max_queries_per_request: int = DEFAULT_MAX_QUERIES_PER_REQUEST) -> List[BatchQueryResult]:
+    """
+    Run a batch of queries.
+
+    Args:
+        queries: The queries to run
+        run_on_connection: Function running a callable on an open connection, e.g. from pooled_runner
+        multiplex: False to send every query on its own
+        max_concurrency: Maximum requests running at the same time, each on its own connection
+        max_queries_per_request: Maximum EVALUATE statements per combined request
+
+    Returns:
+        One result per query, in the order of the queries
+    """
+    requests = plan_requests(queries, multiplex, max_queries_per_request)
+    results: dict = {}
+    lock = threading.Lock()
+
+    def run_request(index: int, request_queries: List[BatchQuery]) -> None:
+        try:
+            request_results = run_on_connection(lambda connection: execute_request(connection, request_queries, index))
+        except Exception as e:
+            request_results = [BatchQueryResult(query.query_id, error=e, request=index) for query in request_queries]
+        with lock:
+            for query, result in zip(request_queries, request_results):
+                results[id(query)] = result
+
+    workers = max(1, min(max_concurrency, len(requests)))
+    if workers == 1:
+        for index, request_queries in enumerate(requests):
+            run_request(index, request_queries)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dax-batch") as executor:
+            for future in [executor.submit(run_request, index, request_queries) for index, request_queries in enumerate(requests)]:
+                future.result()
+    return [results[id(query)] for query in queries]
@@ -0,0 +1,420 @@
+"""
+DAX Query Benchmark
+
+This module runs a suite of DAX queries several times per cache state, records
+duration percentiles and row counts, and compares the results with a stored
+baseline to flag regressions.
+
+Suites use the YAML format of the DAXPerformanceTesting notebook: a list of
+entries with a queryId and the query text under daxQuery (or another key, like
+the notebook's runQueryType). Queries run through an executor, either one on a
+pooled XMLA connection or a local stand-in that simulates durations, so the
+harness itself can be exercised without a capacity.
+"""
+
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from xml.sax.saxutils import escape
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from core.lazy_imports import optional_import
+from core.xmla_connection_pool import XmlaConnectionPool, xmla_connection_pool
+
+# cold: caches cleared before every measured run
+# warm: one unmeasured run fills the caches, measured runs follow without clearing
+CACHE_MODES = ("cold", "warm")
+
+DEFAULT_RUNS = 5
+DEFAULT_QUERY_KEY = "daxQuery"
+# A query regresses when its median is this much slower than the baseline...
+DEFAULT_REGRESSION_THRESHOLD_PCT = 20.0
+# ...and at least this many milliseconds slower, so that noise on fast queries is ignored
+DEFAULT_MIN_REGRESSION_MS = 5.0
+
+BASELINE_VERSION = 1
+
+PERCENTILES = (50, 90, 95, 99)
+
+_CLEAR_CACHE_COMMAND = (
+    '<ClearCache xmlns="http://schemas.microsoft.com/analysisservices/2003/engine">'
+    '<Object><DatabaseID>{database_id}</DatabaseID></Object></ClearCache>'
+)
+
+
+@dataclass
+class BenchmarkQuery:
+    """A query of a benchmark suite."""
+
+    query_id: str
+    dax_query: str
+
+
+def parse_benchmark_suite(text: str, query_key: str = DEFAULT_QUERY_KEY) -> List[BenchmarkQuery]:
+    """
+    Parse a benchmark suite.
+
+    The suite is a YAML (or JSON) list of entries like
+    {"queryId": 1, "daxQuery": "EVALUATE ..."}, or a mapping with such a list
+    under "queries".
+
+    Args:
+        text: YAML or JSON text of the suite
+        query_key: Key of the query text in each entry
+
+    Returns:
+        The queries in suite order
+
+    Raises:
+        ValueError: If the suite cannot be parsed or an entry is invalid
+    """
+    yaml = optional_import("yaml")
+    try:
+        data = yaml.safe_load(text) if yaml is not None else json.loads(text)
+    except Exception as e:
+        hint = "" if yaml is not None else " (PyYAML is not installed, so only JSON suites can be read)"
+        raise ValueError(f"Could not parse the benchmark suite{hint}: {e}")
+
+    if isinstance(data, dict):
+        data = data.get("queries")
+    if not isinstance(data, list) or not data:
+        raise ValueError("The benchmark suite must be a non-empty list of queries")
+
+    queries = []
+    seen = set()
+    for index, entry in enumerate(data, start=1):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Entry {index} of the benchmark suite is not a mapping")
+        dax_query = entry.get(query_key)
+        if not isinstance(dax_query, str) or not dax_query.strip():
+            raise ValueError(f"Entry {index} of the benchmark suite has no '{query_key}'")
+        query_id = str(entry.get("queryId", index))
+        if query_id in seen:
+            raise ValueError(f"Duplicate queryId '{query_id}' in the benchmark suite")
+        seen.add(query_id)
+        queries.append(BenchmarkQuery(query_id=query_id, dax_query=dax_query))
+    return queries
+
+
+class QueryExecutor(ABC):
+    """Runs benchmark queries. Subclasses connect it to a model."""
+
+    @abstractmethod
+    def execute(self, dax_query: str) -> int:
+        """Run a query to completion and return its row count."""
+
+    @abstractmethod
+    def clear_cache(self) -> None:
+        """Clear the caches of the model."""
+
+
+class StandInExecutor(QueryExecutor):
+    """
+    Local executor that simulates query durations without a model.
+
+    A query takes its base duration, plus a cold penalty on the first run after
+    the cache was cleared. Used to try out suites and test the harness.
+    """
+
+    def __init__(self, durations_ms: Optional[Dict[str, float]] = None, default_duration_ms: float = 10.0,
+                 cold_penalty_ms: float = 20.0, row_counts: Optional[Dict[str, int]] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the stand-in executor.
+
+        Args:
+            durations_ms: Base duration per query text
+            default_duration_ms: Base duration of queries not in durations_ms
+            cold_penalty_ms: Extra duration of a query's first run after a cache clear
+            row_counts: Row count per query text (default 1)
+            sleep: Function used to wait, replaceable to control time in tests
+        """
+        self.durations_ms = durations_ms or {}
+        self.default_duration_ms = default_duration_ms
+        self.cold_penalty_ms = cold_penalty_ms
+        self.row_counts = row_counts or {}
+        self._sleep = sleep
+        self._cached: set = set()
+        self.executed = 0
+        self.cache_clears = 0
+
+    def execute(self, dax_query: str) -> int:
+        duration_ms = self.durations_ms.get(dax_query, self.default_duration_ms)
+        if dax_query not in self._cached:
+            duration_ms += self.cold_penalty_ms
+            self._cached.add(dax_query)
+        self._sleep(duration_ms / 1000)
+        self.executed += 1
+        return self.row_counts.get(dax_query, 1)
+
+    def clear_cache(self) -> None:
+        self._cached.clear()
+        self.cache_clears += 1
+
+
+class XmlaQueryExecutor(QueryExecutor):
+    """Executor running benchmark queries on a dataset over pooled XMLA connections."""
+
+    def __init__(self, workspace_name: str, dataset_name: str, access_token: str,
+                 pool: XmlaConnectionPool = xmla_connection_pool):
+        """
+        Initialize the executor.
+
+        Args:
+            workspace_name: The Power BI workspace name
+            dataset_name: The dataset name
+            access_token: Access token for the XMLA endpoint
+            pool: Connection pool to take connections from
+        """
+        self.workspace_name = workspace_name
+        self.dataset_name = dataset_name
+        self._access_token = access_token
+        self._pool = pool
+        self._database_id: Optional[str] = None
+
+    def execute(self, dax_query: str) -> int:
+        with self._pool.connection(self.workspace_name, self.dataset_name, self._access_token) as pooled:
+            command = pooled.connection.CreateCommand()
+            command.CommandText = dax_query
+            reader = command.ExecuteReader()
+            try:
+                # Read every row so the duration includes the transfer, without keeping the values
+                row_count = 0
+                while reader.Read():
+                    row_count += 1
+            finally:
+                reader.Close()
+            return row_count
+
+    def clear_cache(self) -> None:
+        with self._pool.connection(self.workspace_name, self.dataset_name, self._access_token) as pooled:
+            if self._database_id is None:
+                self._database_id = self._read_database_id(pooled.connection)
+            command = pooled.connection.CreateCommand()
+            command.CommandText = _CLEAR_CACHE_COMMAND.format(database_id=escape(self._database_id))
+            command.ExecuteNonQuery()
+
+    def _read_database_id(self, connection: Any) -> str:
+        # ClearCache needs the database id, which differs from the dataset name in the service
+        command = connection.CreateCommand()
+        command.CommandText = "SELECT [CATALOG_NAME], [DATABASE_ID] FROM $SYSTEM.DBSCHEMA_CATALOGS"
+        reader = command.ExecuteReader()
+        try:
+            while reader.Read():
+                if str(reader.GetValue(0)).lower() == self.dataset_name.lower():
+                    return str(reader.GetValue(1))
+        finally:
+            reader.Close()
+        return self.dataset_name
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Percentile with linear interpolation between the closest ranks.
+
+    Args:
+        values: Measured values, at least one
+        pct: Percentile between 0 and 100
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100
+    lower, upper = math.floor(position), math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+@dataclass
+class QueryStats:
+    """Measured runs of one query in one cache mode."""
+
+    query_id: str
+    cache_mode: str
+    durations_ms: List[float] = field(default_factory=list)
+    row_counts: List[int] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "query_id": self.query_id,
+            "cache_mode": self.cache_mode,
+            "runs": len(self.durations_ms),
+            "failed_runs": len(self.errors),
+        }
+        if self.durations_ms:
+            data.update({
+                "min_ms": round(min(self.durations_ms), 2),
+                "max_ms": round(max(self.durations_ms), 2),
+                "mean_ms": round(sum(self.durations_ms) / len(self.durations_ms), 2),
+                **{f"p{pct}_ms": round(percentile(self.durations_ms, pct), 2) for pct in PERCENTILES},
+            })
+        if self.row_counts:
+            data["row_count"] = self.row_counts[-1]
+            if len(set(self.row_counts)) > 1:
+                data["row_count_varies"] = sorted(set(self.row_counts))
+        if self.errors:
+            data["error"] = self.errors[-1]
+        return data
+
+
+def run_benchmark(queries: List[BenchmarkQuery], executor: QueryExecutor, runs: int = DEFAULT_RUNS,
+                  cache_modes: Optional[List[str]] = None,
+                  on_query_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Run every query of a suite several times in each cache mode.
+
+    A failed run is recorded and the remaining runs continue. A query whose
+    first run fails in a cache mode is not run again in that mode. In cold
+    mode, a run whose cache clear fails is not measured and counts as failed.
+
+    Args:
+        queries: Queries of the suite
+        executor: Executor running the queries
+        runs: Measured runs per query and cache mode
+        cache_modes: Cache modes to measure, default all of CACHE_MODES
+        on_query_done: Optional callback receiving each query summary as soon as it is measured
+
+    Returns:
+        Summary per query and cache mode with duration percentiles and row count
+    """
+    cache_modes = list(cache_modes or CACHE_MODES)
+    unknown = [mode for mode in cache_modes if mode not in CACHE_MODES]
+    if unknown:
+        raise ValueError(f"Unknown cache modes: {unknown}. Supported: {list(CACHE_MODES)}")
+    if runs < 1:
+        raise ValueError("runs must be at least 1")
+
+    summaries = []
+    for query in queries:
+        for cache_mode in cache_modes:
+            stats = QueryStats(query_id=query.query_id, cache_mode=cache_mode)
+            if cache_mode == "warm":
+                try:
+                    executor.execute(query.dax_query)
+                except Exception as e:
+                    stats.errors.append(str(e))
+            for _ in range(runs if not stats.errors else 0):
+                if cache_mode == "cold":
+                    try:
+                        executor.clear_cache()
+                    except Exception as e:
+                        stats.errors.append(f"Clearing the cache failed: {e}")
+                        if not stats.durations_ms:
+                            break
+                        continue
+                started = time.perf_counter()
+                try:
+                    row_count = executor.execute(query.dax_query)
+                except Exception as e:
+                    stats.errors.append(str(e))
+                    if not stats.durations_ms:
+                        break
+                    continue
+                stats.durations_ms.append((time.perf_counter() - started) * 1000)
+                stats.row_counts.append(row_count)
+
+            summary = stats.summary()
+            summaries.append(summary)
+            if on_query_done is not None:
+                on_query_done(summary)
+    return summaries
+
+
+def build_baseline(summaries: List[Dict[str, Any]], suite_name: str = "") -> Dict[str, Any]:
+    """
+    Build a baseline document from benchmark results.
+
+    Returns:
+        JSON friendly baseline with the results keyed by "<queryId>/<cache mode>"
+    """
+    return {
+        "version": BASELINE_VERSION,
+        "suite": suite_name,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "results": {f"{summary['query_id']}/{summary['cache_mode']}": summary
+                    for summary in summaries if summary.get("runs")},
+    }
+
+
+def compare_to_baseline(summaries: List[Dict[str, Any]], baseline: Dict[str, Any],
+                        threshold_pct: float = DEFAULT_REGRESSION_THRESHOLD_PCT,
+                        min_delta_ms: float = DEFAULT_MIN_REGRESSION_MS) -> Dict[str, Any]:
+    """
+    Compare benchmark results with a baseline.
+
+    Medians are compared: a query regresses when it is threshold_pct slower and
+    at least min_delta_ms slower, and improves when it is faster by the same
+    margins. A row count that differs from the baseline is always flagged.
+
+    Args:
+        summaries: Results of run_benchmark
+        baseline: Baseline built by build_baseline
+        threshold_pct: Relative change of the median that counts
+        min_delta_ms: Absolute change of the median that counts
+
+    Returns:
+        Dictionary with regressions, improvements, row count changes and the
+        queries missing from the baseline
+    """
+    baseline_results = baseline.get("results", {})
+    comparison: Dict[str, Any] = {
+        "baseline_created_at": baseline.get("created_at"),
+        "threshold_pct": threshold_pct,
+        "min_delta_ms": min_delta_ms,
+        "regressions": [],
+        "improvements": [],
+        "row_count_changes": [],
+        "not_in_baseline": [],
+    }
+
+    for summary in summaries:
+        key = f"{summary['query_id']}/{summary['cache_mode']}"
+        previous = baseline_results.get(key)
+        if previous is None or "p50_ms" not in previous:
+            comparison["not_in_baseline"].append(key)
+            continue
+        if "p50_ms" not in summary:
+            comparison["regressions"].append({"query": key, "reason": f"failed: {summary.get('error')}"})
+            continue
+
+        delta_ms = summary["p50_ms"] - previous["p50_ms"]
+        change_pct = delta_ms * 100 / previous["p50_ms"] if previous["p50_ms"] else None
+        entry = {
+            "query": key,
+            "baseline_p50_ms": previous["p50_ms"],
+            "p50_ms": summary["p50_ms"],
+            "delta_ms": round(delta_ms, 2),
+            "change_pct": round(change_pct, 1) if change_pct is not None else None,
+        }
+        if abs(delta_ms) >= min_delta_ms and (change_pct is None or abs(change_pct) >= threshold_pct):
+            comparison["regressions" if delta_ms > 0 else "improvements"].append(entry)
+
+        if "row_count" in previous and summary.get("row_count") != previous["row_count"]:
+            comparison["row_count_changes"].append({
+                "query": key, "baseline_row_count": previous["row_count"], "row_count": summary.get("row_count"),
+            })
+
+    comparison["passed"] = not comparison["regressions"] and not comparison["row_count_changes"]
+    return comparison
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    """
+    Read a baseline file.
+
+    Raises:
+        ValueError: If the file is not a baseline of this version
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if not isinstance(baseline, dict) or baseline.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path} is not a DAX benchmark baseline (version {BASELINE_VERSION})")
+    return baseline
+
+
+def save_baseline(path: str, baseline: Dict[str, Any]) -> None:
+    """Write a baseline file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2)
+
@@ -0,0 +1,414 @@
+"""
+DAX Query Result Cache
+
+This module caches DAX query results so repeated exploratory queries
+(INFO.TABLES(), TOPN samples, column statistics) do not run against the
+capacity again.
+
+Entries are keyed by dataset identity, the identity of the access token
+(results can be filtered by row-level security), the dataset's refresh state
+and the normalized query text, so a refresh or a schema change makes older
+entries unreachable. Entries are evicted least-recently-used once the entry or
+size budget is exceeded, and a dataset's entries are dropped explicitly after
+it is updated through TMSL.
+
+Only results of Import models are cached: DirectQuery, Dual, Push and Direct
+Lake data changes without the refresh state changing. Queries using volatile
+functions (NOW, TODAY, USERPRINCIPALNAME, RAND, ...) are never cached.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from core.dax_result_reader import DaxResult
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# How long a dataset's refresh state is trusted before it is read again
+REFRESH_STATE_TTL_SECONDS = 30
+
+# Last data and schema update of the model, read from the cube schema rowset
+REFRESH_STATE_QUERY = "SELECT [LAST_DATA_UPDATE], [LAST_SCHEMA_UPDATE] FROM $SYSTEM.MDSCHEMA_CUBES WHERE [CUBE_SOURCE] = 1"
+
+# Storage modes of the model and its partitions (TOM ModeType: 0 Import, 2 Default)
+MODEL_MODE_QUERY = "SELECT [DefaultMode] FROM $SYSTEM.TMSCHEMA_MODEL"
+PARTITION_MODES_QUERY = "SELECT [Mode] FROM $SYSTEM.TMSCHEMA_PARTITIONS"
+_IMPORT_MODE = 0
+_DEFAULT_MODE = 2
+
+# Refresh state of datasets whose results must not be cached
+UNCACHEABLE_STATE = "uncacheable"
+
+# Functions whose result changes between runs or depends on the caller
+VOLATILE_FUNCTIONS = (
+    "NOW", "TODAY", "UTCNOW", "UTCTODAY", "RAND", "RANDBETWEEN",
+    "USERNAME", "USERPRINCIPALNAME", "USEROBJECTID", "USERCULTURE", "CUSTOMDATA",
+)
+_VOLATILE_CALL = re.compile(r"\b(?:" + "|".join(VOLATILE_FUNCTIONS) + r")\s*\(", re.IGNORECASE)
+
+# String literals, quoted table names and bracketed column names
+DAX_LITERALS = re.compile(r"\"(?:[^\"]|\"\")*\"|'(?:[^']|'')*'|\[(?:[^\]]|\]\])*\]")
+
+CacheKey = Tuple[str, str, str, str, str, Optional[int], Optional[int]]
+
+
+def normalize_dax_query(dax_query: str) -> str:
+    """
+    Normalize DAX query text for use as a cache key.
+
+    Comments are removed and whitespace runs outside string literals, quoted
+    table names and bracketed column names are collapsed to a single space.
+    Case is preserved because string literals are case sensitive.
+
+    Args:
+        dax_query: The DAX query text
+
+    Returns:
+        Normalized query text
+    """
+    result = []
+    i = 0
+    length = len(dax_query)
+    pending_space = False
+
+    while i < length:
+        char = dax_query[i]
+        pair = dax_query[i:i + 2]
+
+        if pair == "//" or pair == "--":
+            end = dax_query.find("\n", i)
+            i = length if end == -1 else end
+            pending_space = True
+            continue
+        if pair == "/*":
+            end = dax_query.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            pending_space = True
+            continue
+        if char.isspace():
+            pending_space = True
+            i += 1
+            continue
+
+        if pending_space and result:
+            result.append(" ")
+        pending_space = False
+
+        if char in "\"'[":
+            closing = "]" if char == "[" else char
+            end = i + 1
+            while end < length:
+                if dax_query[end] == closing:
+                    # Doubled delimiters are escapes inside literals and names
+                    if end + 1 < length and dax_query[end + 1] == closing:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            result.append(dax_query[i:end + 1])
+            i = end + 1
+            continue
+
+        result.append(char)
+        i += 1
+
+    return "".join(result)
+
+
+def is_cacheable_query(dax_query: str) -> bool:
+    """
+    Check whether a query's result can be cached.
+
+    Args:
+        dax_query: The DAX query text
+
+    Returns:
+        False if the query calls a volatile function outside literals and names
+    """
+    return not _VOLATILE_CALL.search(DAX_LITERALS.sub(" ", dax_query or ""))
+
+
+def _read_column(connection: Any, query: str) -> list:
+    command = connection.CreateCommand()
+    command.CommandText = query
+    reader = command.ExecuteReader()
+    try:
+        values = []
+        while reader.Read():
+            values.append(reader.GetValue(0))
+        return values
+    finally:
+        reader.Close()
+
+
+def query_import_only(connection: Any) -> bool:
+    """
+    Check whether all partitions of the model are in Import mode.
+
+    Args:
+        connection: Open AdomdConnection with the dataset as catalog
+
+    Returns:
+        True for Import models; False otherwise or if the modes could not be read
+    """
+    try:
+        default_modes = [int(mode) for mode in _read_column(connection, MODEL_MODE_QUERY)]
+        default_mode = default_modes[0] if default_modes else _IMPORT_MODE
+        modes = {default_mode if int(mode) == _DEFAULT_MODE else int(mode)
+                 for mode in _read_column(connection, PARTITION_MODES_QUERY)}
+        return modes <= {_IMPORT_MODE}
+    except Exception as e:
+        logging.debug(f"Could not read dataset storage modes: {e}")
+        return False
+
+
+def query_cache_state(connection: Any) -> Optional[str]:
+    """
+    Read the state DAX results of the model are cached under.
+
+    Args:
+        connection: Open AdomdConnection with the dataset as catalog
+
+    Returns:
+        The refresh state for Import models, UNCACHEABLE_STATE for models with
+        other storage modes, or None if the state could not be read
+    """
+    refresh_state = query_refresh_state(connection)
+    if refresh_state is None:
+        return None
+    return refresh_state if query_import_only(connection) else UNCACHEABLE_STATE
+
+
+def query_refresh_state(connection: Any) -> Optional[str]:
+    """
+    Read the refresh state of the model on an open ADOMD.NET connection.
+
+    Args:
+        connection: Open AdomdConnection with the dataset as catalog
+
+    Returns:
+        String combining the last data and schema update times, or None if
+        the state could not be read
+    """
+    try:
+        command = connection.CreateCommand()
+        command.CommandText = REFRESH_STATE_QUERY
+        reader = command.ExecuteReader()
+        try:
+            states = []
+            while reader.Read():
+                states.append(f"{reader.GetValue(0)}|{reader.GetValue(1)}")
+        finally:
+            reader.Close()
+        return ";".join(sorted(states)) if states else None
+    except Exception as e:
+        logging.debug(f"Could not read dataset refresh state: {e}")
+        return None
+
+
+@dataclass
+class _CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    # Lookups and stores of uncacheable datasets or volatile queries
+    skipped: int = 0
+
+
+class DaxQueryCache:
+    """Thread-safe LRU cache of DAX query results."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        refresh_state_ttl_seconds: float = REFRESH_STATE_TTL_SECONDS,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            max_bytes: Maximum approximate size of all cached results
+            refresh_state_ttl_seconds: How long a dataset refresh state is reused
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.refresh_state_ttl_seconds = refresh_state_ttl_seconds
+        self._entries: "OrderedDict[CacheKey, DaxResult]" = OrderedDict()
+        self._refresh_states: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._total_bytes = 0
+        self._stats = _CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _dataset_key(workspace_name: str, dataset_name: str) -> Tuple[str, str]:
+        return workspace_name.strip().lower(), dataset_name.strip().lower()
+
+    def get_refresh_state(self, workspace_name: str, dataset_name: str) -> Optional[str]:
+        """
+        Get the dataset's refresh state if it was read recently.
+
+        Returns:
+            The refresh state, or None if it has to be read again
+        """
+        with self._lock:
+            entry = self._refresh_states.get(self._dataset_key(workspace_name, dataset_name))
+            if entry and time.time() - entry[1] < self.refresh_state_ttl_seconds:
+                return entry[0]
+            return None
+
+    def set_refresh_state(self, workspace_name: str, dataset_name: str, refresh_state: str) -> None:
+        """Remember the dataset's refresh state for the refresh state TTL."""
+        with self._lock:
+            self._refresh_states[self._dataset_key(workspace_name, dataset_name)] = (refresh_state, time.time())
+
+    def _key(
+        self,
+        workspace_name: str,
+        dataset_name: str,
+        identity: str,
+        refresh_state: str,
+        dax_query: str,
+        max_rows: Optional[int],
+        max_bytes: Optional[int],
+    ) -> CacheKey:
+        return (
+            *self._dataset_key(workspace_name, dataset_name),
+            identity,
+            refresh_state,
+            normalize_dax_query(dax_query),
+            max_rows,
+            max_bytes,
+        )
+
+    def _skip(self, refresh_state: str, dax_query: str) -> bool:
+        """Check for an uncacheable dataset or volatile query, counting it."""
+        if refresh_state != UNCACHEABLE_STATE and is_cacheable_query(dax_query):
+            return False
+        with self._lock:
+            self._stats.skipped += 1
+        return True
+
+    def get(
+        self,
+        workspace_name: str,
+        dataset_name: str,
+        identity: str,
+        refresh_state: str,
+        dax_query: str,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> Optional[DaxResult]:
+        """
+        Get a cached result.
+
+        Args:
+            identity: Identity of the access token, see get_token_identity
+
+        Returns:
+            The cached DaxResult, or None on a cache miss or if the result
+            must not be cached
+        """
+        if self._skip(refresh_state, dax_query):
+            return None
+        key = self._key(workspace_name, dataset_name, identity, refresh_state, dax_query, max_rows, max_bytes)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return result
+
+    def put(
+        self,
+        workspace_name: str,
+        dataset_name: str,
+        identity: str,
+        refresh_state: str,
+        dax_query: str,
+        result: DaxResult,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        """Store a result, evicting least recently used entries over budget."""
+        if result.approx_bytes > self.max_bytes or self._skip(refresh_state, dax_query):
+            return
+        key = self._key(workspace_name, dataset_name, identity, refresh_state, dax_query, max_rows, max_bytes)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous.approx_bytes
+            self._entries[key] = result
+            self._total_bytes += result.approx_bytes
+            self._stats.stores += 1
+            while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.approx_bytes
+                self._stats.evictions += 1
+
+    def invalidate(self, workspace_name: str, dataset_name: str) -> int:
+        """
+        Drop all cached results and the refresh state of a dataset.
+
+        Returns:
+            Number of cached results dropped
+        """
+        dataset_key = self._dataset_key(workspace_name, dataset_name)
+        with self._lock:
+            self._refresh_states.pop(dataset_key, None)
+            keys = [key for key in self._entries if key[:2] == dataset_key]
+            for key in keys:
+                self._total_bytes -= self._entries.pop(key).approx_bytes
+            self._stats.invalidations += 1
+        if keys:
+            logging.debug(f"Invalidated {len(keys)} cached DAX results for {dataset_key}")
+        return len(keys)
+
+    def clear(self) -> int:
+        """
+        Drop all cached results and refresh states.
+
+        Returns:
+            Number of cached results dropped
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._refresh_states.clear()
+            self._total_bytes = 0
+        return count
+
+    def get_status(self) -> dict:
+        """
+        Get the current status of the cache.
+
+        Returns:
+            Dictionary with entry counts per dataset, size and counters
+        """
+        with self._lock:
+            datasets: Dict[str, int] = {}
+            for key in self._entries:
+                name = f"{key[0]}/{key[1]}"
+                datasets[name] = datasets.get(name, 0) + 1
+            return {
+                "entries": len(self._entries),
+                "approx_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "entries_by_dataset": datasets,
+                "stats": self._stats.__dict__.copy(),
+            }
+
+
+# Shared cache used by execute_dax_query
+dax_query_cache = DaxQueryCache()
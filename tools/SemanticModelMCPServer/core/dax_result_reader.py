@@ -0,0 +1,201 @@
+"""
+DAX Result Reader
+
+This module reads ADOMD.NET data readers into per-column buffers under row and
+byte budgets. The column names are read once per result, and each row is
+copied with a single GetValues call where pythonnet is available, instead of a
+GetName and GetValue interop call for every cell.
+
+Results can be returned as row dictionaries, compact columnar JSON, CSV, or
+Arrow IPC (when pyarrow is installed).
+"""
+
+import base64
+import csv
+import io
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from core.lazy_imports import optional_import
+
+DEFAULT_MAX_ROWS = 10000
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+OUTPUT_FORMATS = ("rows", "columnar", "csv", "arrow")
+
+# Rough per-value size used for the byte budget
+_FIXED_VALUE_BYTES = 8
+
+
+@dataclass
+class DaxResult:
+    """Column-oriented result of a DAX query."""
+
+    columns: List[str]
+    data: List[List[Any]]
+    row_count: int = 0
+    approx_bytes: int = 0
+    truncated: bool = False
+    truncation_reason: Optional[str] = None
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+    def truncation_info(self) -> Dict[str, Any]:
+        """Get the truncation metadata for the result."""
+        return {
+            "truncated": self.truncated,
+            "truncation_reason": self.truncation_reason,
+            "row_count": self.row_count,
+            "approx_bytes": self.approx_bytes,
+            "max_rows": self.max_rows,
+            "max_bytes": self.max_bytes,
+        }
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Convert the result to a list of row dictionaries."""
+        return [dict(zip(self.columns, values)) for values in zip(*self.data)] if self.columns else []
+
+    def to_columnar(self) -> Dict[str, Any]:
+        """Convert the result to compact columnar JSON."""
+        return {"columns": self.columns, "data": self.data, **self.truncation_info()}
+
+    def to_csv(self) -> str:
+        """Convert the result to CSV text with a header row."""
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(self.columns)
+        writer.writerows(zip(*self.data))
+        return output.getvalue()
+
+    def to_arrow_ipc(self) -> bytes:
+        """
+        Convert the result to an Arrow IPC stream.
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        # pyarrow is only needed for the Arrow output format, import it on first use
+        pyarrow = optional_import("pyarrow")
+        if pyarrow is None:
+            raise ImportError("pyarrow is not installed. Please install it using: pip install pyarrow")
+        optional_import("pyarrow.ipc")
+        table = pyarrow.table({name: values for name, values in zip(self.columns, self.data)})
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def to_output(self, output_format: str = "rows") -> Any:
+        """
+        Convert the result to the requested output format.
+
+        Args:
+            output_format: One of "rows", "columnar", "csv" or "arrow"
+
+        Returns:
+            List of row dictionaries for "rows", otherwise a dictionary with
+            the payload and truncation metadata
+        """
+        if output_format == "rows":
+            return self.to_rows()
+        if output_format == "columnar":
+            return self.to_columnar()
+        if output_format == "csv":
+            return {"columns": self.columns, "csv": self.to_csv(), **self.truncation_info()}
+        if output_format == "arrow":
+            return {
+                "columns": self.columns,
+                "arrow_ipc_base64": base64.b64encode(self.to_arrow_ipc()).decode("ascii"),
+                **self.truncation_info(),
+            }
+        raise ValueError(f"Unsupported output format: {output_format}. Supported: {list(OUTPUT_FORMATS)}")
+
+
+def _convert_value(value: Any) -> Any:
+    """Convert a reader value to a JSON friendly value."""
+    if value is None:
+        return None
+    if isinstance(value, (bool, int, float)):
+        return value
+    if hasattr(value, "isoformat"):  # DateTime objects
+        return value.isoformat()
+    if isinstance(value, str):
+        return value if value != "" else None
+    text = str(value)
+    if text == "":  # DBNull and empty values
+        return None
+    return value
+
+
+def _estimate_size(value: Any) -> int:
+    """Estimate the serialized size of a converted value."""
+    if isinstance(value, str):
+        return len(value) + 2
+    return _FIXED_VALUE_BYTES
+
+
+def _create_values_buffer(field_count: int) -> Optional[Any]:
+    """Create a .NET object array for GetValues, or None outside pythonnet."""
+    try:
+        from System import Array, Object  # type: ignore
+
+        return Array.CreateInstance(Object, field_count)
+    except Exception:
+        return None
+
+
+def read_dax_result(
+    reader: Any,
+    max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+) -> DaxResult:
+    """
+    Read an ADOMD.NET data reader into column buffers.
+
+    Reading stops at the first row that would exceed max_rows or max_bytes, and
+    the result is flagged as truncated. The reader is not closed.
+
+    Args:
+        reader: An open AdomdDataReader (or any object with the same members)
+        max_rows: Maximum number of rows to read, None for no limit
+        max_bytes: Approximate maximum payload size, None for no limit
+
+    Returns:
+        DaxResult with the rows read and truncation metadata
+    """
+    field_count = reader.FieldCount
+    columns = [str(reader.GetName(i)) for i in range(field_count)]
+    data: List[List[Any]] = [[] for _ in range(field_count)]
+    appends = [column.append for column in data]
+    result = DaxResult(columns=columns, data=data, max_rows=max_rows, max_bytes=max_bytes)
+
+    buffer = _create_values_buffer(field_count)
+    row_count = 0
+    approx_bytes = 0
+
+    while reader.Read():
+        if max_rows is not None and row_count >= max_rows:
+            result.truncated = True
+            result.truncation_reason = "max_rows"
+            break
+
+        if buffer is not None:
+            reader.GetValues(buffer)
+            values = [_convert_value(value) for value in buffer]
+        else:
+            values = [_convert_value(reader.GetValue(i)) for i in range(field_count)]
+
+        row_bytes = sum(_estimate_size(value) for value in values)
+        if max_bytes is not None and approx_bytes + row_bytes > max_bytes:
+            result.truncated = True
+            result.truncation_reason = "max_bytes"
+            break
+
+        for append, value in zip(appends, values):
+            append(value)
+        row_count += 1
+        approx_bytes += row_bytes
+
+    result.row_count = row_count
+    result.approx_bytes = approx_bytes
+    return result
@@ -0,0 +1,71 @@
+"""
+.NET Assembly Loader
+
+This module loads the Analysis Services client assemblies shipped in the
+dotnet folder once per process, instead of calling clr.AddReference on every
+tool call.
+"""
+
+import logging
+import os
+import threading
+from typing import Iterable, Set
+
+DOTNET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dotnet")
+
+# Assemblies needed to run DAX queries over ADOMD.NET
+ADOMD_ASSEMBLIES = (
+    "Microsoft.AnalysisServices.Tabular.dll",
+    "Microsoft.Identity.Client.dll",
+    "Microsoft.IdentityModel.Abstractions.dll",
+    "Microsoft.AnalysisServices.AdomdClient.dll",
+)
+
+# Assemblies needed to read and deploy models through TOM
+TOM_ASSEMBLIES = (
+    "Microsoft.AnalysisServices.dll",
+    "Microsoft.AnalysisServices.Tabular.dll",
+    "Microsoft.Identity.Client.dll",
+    "Microsoft.IdentityModel.Abstractions.dll",
+)
+
+_loaded_assemblies: Set[str] = set()
+_load_lock = threading.Lock()
+
+
+def load_assemblies(assemblies: Iterable[str]) -> None:
+    """
+    Add references to the given assemblies from the dotnet folder.
+
+    Assemblies already referenced by this process are skipped, so callers can
+    invoke this on every request at no cost.
+
+    Args:
+        assemblies: Assembly file names relative to the dotnet folder
+
+    Raises:
+        Exception: If an assembly cannot be loaded
+    """
+    pending = [name for name in assemblies if name not in _loaded_assemblies]
+    if not pending:
+        return
+
+    with _load_lock:
+        import clr
+
+        for name in pending:
+            if name in _loaded_assemblies:
+                continue
+            clr.AddReference(os.path.join(DOTNET_DIR, name))
+            _loaded_assemblies.add(name)
+            logging.debug(f"Loaded .NET assembly: {name}")
+
+
+def get_loaded_assemblies() -> list:
+    """
+    Get the assemblies referenced so far.
+
+    Returns:
+        Sorted list of loaded assembly file names
+    """
+    return sorted(_loaded_assemblies)
@@ -0,0 +1,213 @@
+"""
+Fabric and Power BI REST Helpers
+
+This module holds the HTTP plumbing shared by the Fabric metadata tools: one
+pooled requests session so calls reuse TCP/TLS connections, a paging helper
+that follows Power BI @odata.nextLink links and Fabric continuation tokens,
+and a TTL cache of workspace and item name to id lookups.
+
+Resolving a name used to list every workspace or lakehouse on each call.
+Listings now fill the name cache as a side effect, so agent workflows that
+resolve the same names again and again only pay for the first lookup.
+"""
+
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POWERBI_API_BASE = "https://api.powerbi.com/v1.0/myorg"
+FABRIC_API_BASE = "https://api.fabric.microsoft.com/v1"
+
+DEFAULT_TIMEOUT_SECONDS = 30
+NAME_CACHE_TTL_SECONDS = 15 * 60
+# Safety limit for paging, far above any real workspace
+MAX_PAGES = 1000
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Get the shared HTTP session, creating it on first use.
+
+    The session keeps up to 16 connections per host alive and retries GET
+    requests that fail with a gateway error.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=2,
+                    backoff_factor=0.5,
+                    status_forcelist=(502, 503, 504),
+                    allowed_methods=frozenset(["GET"]),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _page_items(body: Dict[str, Any]) -> List[dict]:
+    # Power BI and most Fabric APIs use "value", the lakehouse tables API uses "data"
+    if "value" in body:
+        return body.get("value") or []
+    return body.get("data") or []
+
+
+def get_all_pages(url: str, headers: Dict[str, str], timeout: float = DEFAULT_TIMEOUT_SECONDS) -> Tuple[requests.Response, List[dict]]:
+    """
+    GET a list endpoint and follow its continuation links.
+
+    Args:
+        url: URL of the first page
+        headers: Request headers, including the authorization header
+        timeout: Timeout of each page request in seconds
+
+    Returns:
+        Tuple of the last response and the items of all pages. If a page
+        fails, the failed response is returned and the caller should check
+        its status code.
+    """
+    session = get_http_session()
+    items: List[dict] = []
+    next_url, params = url, None
+    for _ in range(MAX_PAGES):
+        response = session.get(next_url, headers=headers, params=params, timeout=timeout)
+        if response.status_code != 200:
+            return response, items
+
+        body = response.json()
+        items.extend(_page_items(body))
+
+        if body.get("@odata.nextLink"):
+            next_url, params = body["@odata.nextLink"], None
+        elif body.get("continuationUri"):
+            next_url, params = body["continuationUri"], None
+        elif body.get("continuationToken"):
+            next_url, params = url, {"continuationToken": body["continuationToken"]}
+        else:
+            break
+    return response, items
+
+
+@dataclass
+class NameCacheStats:
+    """Counters of the name to id cache."""
+
+    hits: int = 0
+    misses: int = 0
+    expirations: int = 0
+
+
+class NameIdCache:
+    """
+    Thread-safe TTL cache of workspace and item name to id lookups.
+
+    Entries are keyed by kind ("workspace", "dataset", "lakehouse"), scope (the
+    workspace id for items, empty for workspaces) and the case-insensitive name.
+    """
+
+    def __init__(self, ttl_seconds: float = NAME_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a resolved id is reused
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self.stats = NameCacheStats()
+
+    @staticmethod
+    def _key(kind: str, name: str, scope: str) -> Tuple[str, str, str]:
+        return kind, (scope or "").strip().lower(), name.strip().lower()
+
+    def get(self, kind: str, name: str, scope: str = "") -> Optional[str]:
+        """
+        Get the id of a named object.
+
+        Returns:
+            The id, or None if missing or expired
+        """
+        key = self._key(kind, name, scope)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            if time.time() - entry[1] >= self.ttl_seconds:
+                del self._entries[key]
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            return entry[0]
+
+    def put(self, kind: str, name: str, item_id: str, scope: str = "") -> None:
+        """Store the id of a named object."""
+        if not name or not item_id:
+            return
+        with self._lock:
+            self._entries[self._key(kind, name, scope)] = (item_id, time.time())
+
+    def put_many(self, kind: str, items: Iterable[dict], name_key: str, scope: str = "") -> None:
+        """
+        Store the ids of listed objects.
+
+        Args:
+            kind: Kind of the objects
+            items: Objects as returned by a list API, with an "id" field
+            name_key: Field holding the object name ("name" or "displayName")
+            scope: Workspace id for items inside a workspace
+        """
+        now = time.time()
+        with self._lock:
+            for item in items:
+                name, item_id = item.get(name_key), item.get("id")
+                if name and item_id:
+                    self._entries[self._key(kind, name, scope)] = (item_id, now)
+
+    def discard(self, kind: str, name: str, scope: str = "") -> None:
+        """Forget the id of a named object, e.g. after it turned out to be stale."""
+        with self._lock:
+            self._entries.pop(self._key(kind, name, scope), None)
+
+    def clear(self) -> int:
+        """
+        Drop all cached ids.
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the number of cached ids per kind and the cache counters."""
+        with self._lock:
+            per_kind: Dict[str, int] = {}
+            for kind, _, _ in self._entries:
+                per_kind[kind] = per_kind.get(kind, 0) + 1
+            return {
+                "entries": len(self._entries),
+                "entries_per_kind": per_kind,
+                "ttl_seconds": self.ttl_seconds,
+                "stats": asdict(self.stats),
+            }
+
+
+# Shared cache used by the Fabric metadata tools
+fabric_name_cache = NameIdCache()
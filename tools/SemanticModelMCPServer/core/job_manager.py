@@ -0,0 +1,286 @@
+"""
+Background Job Manager
+
+This module runs long tool calls (model definitions, TMSL deployments, BPA
+analyses, large DAX queries) in the background, so a tool can return a job id
+right away and the agent can start more work or poll for the result later.
+
+Jobs run on a bounded thread pool. Jobs that change a dataset carry a
+serialization key, and jobs with the same key run one after another in
+submission order without occupying a worker while they wait.
+"""
+
+import itertools
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+DEFAULT_MAX_WORKERS = 4
+# Finished jobs kept for polling; the oldest are dropped first
+DEFAULT_MAX_FINISHED_JOBS = 200
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+
+@dataclass
+class Job:
+    """A tool call running in the background."""
+
+    job_id: str
+    tool: str
+    description: str
+    serialize_key: Optional[str] = None
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Optional[str] = None
+    partial_results: List[Any] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """
+        Convert the job to a JSON friendly dictionary.
+
+        Args:
+            include_result: False to leave out the result and partial results
+
+        Returns:
+            Job status, timings and, if requested, the results
+        """
+        now = time.time()
+        data = {
+            "job_id": self.job_id,
+            "tool": self.tool,
+            "description": self.description,
+            "status": self.status,
+            "queued_seconds": round((self.started_at or self.finished_at or now) - self.created_at, 3),
+            "run_seconds": round((self.finished_at or now) - self.started_at, 3) if self.started_at else None,
+            "progress": self.progress,
+            "partial_result_count": len(self.partial_results),
+        }
+        if self.error:
+            data["error"] = self.error
+        if include_result:
+            data["partial_results"] = list(self.partial_results)
+            if self.status == "succeeded":
+                data["result"] = _decode_result(self.result)
+        return data
+
+
+def _decode_result(result: Any) -> Any:
+    # Tools return JSON strings; embed them as objects so the status is one JSON document
+    if isinstance(result, str):
+        try:
+            return json.loads(result)
+        except json.JSONDecodeError:
+            return result
+    return result
+
+
+class JobContext:
+    """Handle passed to job functions that report progress or partial results."""
+
+    def __init__(self, manager: "JobManager", job: Job):
+        self._manager = manager
+        self._job = job
+
+    def set_progress(self, progress: str) -> None:
+        """Set a short progress message, e.g. "3 of 10 models analyzed"."""
+        with self._manager._lock:
+            self._job.progress = progress
+
+    def add_partial_result(self, partial_result: Any) -> None:
+        """Publish a result that is complete before the whole job is."""
+        with self._manager._lock:
+            self._job.partial_results.append(partial_result)
+
+
+class JobManager:
+    """Runs tool calls in the background and keeps their results for polling."""
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS):
+        """
+        Initialize the job manager.
+
+        Args:
+            max_workers: Number of jobs running at the same time
+            max_finished_jobs: Number of finished jobs kept for polling
+        """
+        self.max_workers = max_workers
+        self.max_finished_jobs = max_finished_jobs
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._functions: Dict[str, Callable[[], Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        # Jobs waiting for an earlier job with the same serialization key
+        self._waiting: Dict[str, Deque[str]] = {}
+        self._active_keys: set = set()
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def submit(self, tool: str, function: Callable[..., Any], description: str = "",
+               serialize_key: Optional[str] = None, with_context: bool = False) -> Job:
+        """
+        Run a function in the background.
+
+        Args:
+            tool: Name of the tool the job runs
+            function: Function without arguments returning the tool result
+            description: Short description shown when polling, e.g. the dataset
+            serialize_key: Jobs with the same key run one at a time, in order
+            with_context: True to call function with a JobContext argument
+
+        Returns:
+            The queued job
+        """
+        job = Job(job_id=f"job-{next(self._sequence)}-{uuid.uuid4().hex[:8]}", tool=tool,
+                  description=description, serialize_key=serialize_key)
+        if with_context:
+            self._functions[job.job_id] = lambda: function(JobContext(self, job))
+        else:
+            self._functions[job.job_id] = function
+
+        with self._lock:
+            self._jobs[job.job_id] = job
+            if serialize_key is not None and serialize_key in self._active_keys:
+                self._waiting.setdefault(serialize_key, deque()).append(job.job_id)
+                return job
+            if serialize_key is not None:
+                self._active_keys.add(serialize_key)
+            self._start(job)
+        return job
+
+    def _start(self, job: Job) -> None:
+        # Called with the lock held
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mcp-job")
+        self._futures[job.job_id] = self._executor.submit(self._run, job)
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            if job.status == "cancelled":
+                return
+            job.status = "running"
+            job.started_at = time.time()
+        function = self._functions.pop(job.job_id)
+
+        try:
+            result = function()
+            status, error = "succeeded", None
+        except Exception as e:
+            logging.debug(f"Job {job.job_id} ({job.tool}) failed: {e}")
+            result, status, error = None, "failed", str(e) or type(e).__name__
+
+        with self._lock:
+            job.result, job.status, job.error = result, status, error
+            job.finished_at = time.time()
+            self._futures.pop(job.job_id, None)
+            self._release_key(job.serialize_key)
+            self._trim()
+
+    def _release_key(self, serialize_key: Optional[str]) -> None:
+        # Called with the lock held; starts the next waiting job with the key
+        if serialize_key is None:
+            return
+        waiting = self._waiting.get(serialize_key)
+        while waiting:
+            next_job = self._jobs.get(waiting.popleft())
+            if next_job is not None and next_job.status == "queued":
+                self._start(next_job)
+                return
+        self._waiting.pop(serialize_key, None)
+        self._active_keys.discard(serialize_key)
+
+    def _trim(self) -> None:
+        # Called with the lock held
+        finished = [job_id for job_id, job in self._jobs.items() if job.is_finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id, or None if unknown or already dropped."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_status(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a job.
+
+        Returns:
+            The job as a dictionary, or None if the job is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict(include_result) if job is not None else None
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List the known jobs, newest first, without their results.
+
+        Args:
+            status: Optional status to filter by
+        """
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if status is None or job.status == status]
+            return [job.to_dict(include_result=False) for job in reversed(jobs)]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job that has not started yet.
+
+        Returns:
+            True if the job was cancelled, False if it is unknown, running or finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return False
+            future = self._futures.pop(job_id, None)
+            if future is not None:
+                # Started jobs own their key; hand it to the next waiting job
+                future.cancel()
+                self._release_key(job.serialize_key)
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            self._functions.pop(job_id, None)
+            self._trim()
+            return True
+
+
+def dataset_job_key(workspace_name: str, dataset_name: str) -> str:
+    """Serialization key for jobs that change a dataset."""
+    return f"{workspace_name.strip().lower()}/{dataset_name.strip().lower()}"
+
+
+# Shared job manager used by all tools that can run in the background
+job_manager = JobManager()
+
+
+def start_tool_job(tool: str, function: Callable[..., Any], description: str = "",
+                   serialize_key: Optional[str] = None, with_context: bool = False) -> Dict[str, Any]:
+    """
+    Start a tool call as a background job on the shared job manager.
+
+    Returns:
+        Dictionary with the job id to return from the tool instead of its result
+    """
+    job = job_manager.submit(tool, function, description, serialize_key=serialize_key, with_context=with_context)
+    return {
+        "success": True,
+        "job_id": job.job_id,
+        "tool": tool,
+        "status": job.status,
+        "message": f"Started {tool} in the background. Call get_job_status with job_id '{job.job_id}' to get the result.",
+    }
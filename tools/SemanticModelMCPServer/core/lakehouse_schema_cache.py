@@ -0,0 +1,160 @@
+"""
+Lakehouse Schema Cache
+
+This module caches the table columns of Fabric lakehouses, as read from the
+SQL Analytics Endpoint's INFORMATION_SCHEMA, so generating DirectLake TMSL
+templates does not query the endpoint once per table.
+
+Columns are read for many tables at once with set-based queries, chunked so
+the IN lists stay small. A snapshot per lakehouse remembers the tables read so
+far, and later template generations only query the tables it does not know
+yet. Snapshots expire after a TTL, since tables in a lakehouse can change.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DEFAULT_TTL_SECONDS = 10 * 60
+# Table names per INFORMATION_SCHEMA.COLUMNS query
+TABLES_PER_QUERY = 100
+
+# Schemas that never hold lakehouse tables
+SYSTEM_SCHEMAS = (
+    "INFORMATION_SCHEMA", "sys", "db_accessadmin", "db_backupoperator", "db_datareader", "db_datawriter",
+    "db_ddladmin", "db_denydatareader", "db_denydatawriter", "db_owner", "db_securityadmin", "guest",
+)
+
+
+def _sql_literal(value: str) -> str:
+    """Quote a value as a T-SQL string literal."""
+    return "N'" + value.replace("'", "''") + "'"
+
+
+def build_columns_queries(table_names: Iterable[str], tables_per_query: int = TABLES_PER_QUERY) -> List[str]:
+    """
+    Build INFORMATION_SCHEMA.COLUMNS queries for a set of tables.
+
+    Args:
+        table_names: Table names to read the columns of
+        tables_per_query: Maximum number of tables per query
+
+    Returns:
+        One query per chunk of tables, returning TABLE_SCHEMA, TABLE_NAME,
+        COLUMN_NAME, DATA_TYPE and IS_NULLABLE ordered by table and ordinal
+    """
+    names = list(dict.fromkeys(table_names))
+    queries = []
+    for start in range(0, len(names), tables_per_query):
+        chunk = names[start:start + tables_per_query]
+        queries.append(
+            "SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, IS_NULLABLE "
+            "FROM INFORMATION_SCHEMA.COLUMNS "
+            f"WHERE TABLE_NAME IN ({', '.join(_sql_literal(name) for name in chunk)}) "
+            "ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION"
+        )
+    return queries
+
+
+@dataclass
+class LakehouseSchemaSnapshot:
+    """Schemas and table columns read from one lakehouse."""
+
+    schemas: List[str]
+    fetched_at: float
+    # Lower-cased table name -> {schema: columns in ordinal order}
+    tables: Dict[str, Dict[str, List[dict]]] = field(default_factory=dict)
+    # Lower-cased names of tables that were queried, found or not
+    queried_tables: Set[str] = field(default_factory=set)
+
+    def missing_tables(self, table_names: Iterable[str]) -> List[str]:
+        """Get the tables whose columns have not been read yet."""
+        return [name for name in table_names if name.lower() not in self.queried_tables]
+
+    def add_columns(self, table_names: Iterable[str], rows: Iterable[dict]) -> None:
+        """
+        Record the result of a columns query.
+
+        Args:
+            table_names: Tables the query asked for
+            rows: Result rows with TABLE_SCHEMA, TABLE_NAME and column fields
+        """
+        for row in rows:
+            schemas = self.tables.setdefault(row["TABLE_NAME"].lower(), {})
+            schemas.setdefault(row["TABLE_SCHEMA"], []).append(row)
+        self.queried_tables.update(name.lower() for name in table_names)
+
+    def get_table(self, table_name: str, preferred_schema: str) -> Tuple[Optional[str], List[dict]]:
+        """
+        Get the columns of a table.
+
+        Args:
+            table_name: Table name
+            preferred_schema: Schema to use when the table exists in several schemas
+
+        Returns:
+            Tuple of the table's schema (None if the table was not found) and its columns
+        """
+        schemas = self.tables.get(table_name.lower())
+        if not schemas:
+            return None, []
+        if preferred_schema in schemas:
+            return preferred_schema, schemas[preferred_schema]
+        schema = sorted(schemas)[0]
+        return schema, schemas[schema]
+
+
+class LakehouseSchemaCache:
+    """Thread-safe TTL cache of lakehouse schema snapshots."""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a snapshot is reused
+        """
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: Dict[Tuple[str, str], LakehouseSchemaSnapshot] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(workspace_id: str, lakehouse_id: str) -> Tuple[str, str]:
+        return workspace_id.strip().lower(), lakehouse_id.strip().lower()
+
+    def get(self, workspace_id: str, lakehouse_id: str) -> Optional[LakehouseSchemaSnapshot]:
+        """
+        Get the snapshot of a lakehouse.
+
+        Returns:
+            The snapshot, or None if missing or expired
+        """
+        key = self._key(workspace_id, lakehouse_id)
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and time.time() - snapshot.fetched_at >= self.ttl_seconds:
+                del self._snapshots[key]
+                return None
+            return snapshot
+
+    def put(self, workspace_id: str, lakehouse_id: str, snapshot: LakehouseSchemaSnapshot) -> None:
+        """Store the snapshot of a lakehouse."""
+        with self._lock:
+            self._snapshots[self._key(workspace_id, lakehouse_id)] = snapshot
+
+    def clear(self) -> int:
+        """
+        Drop all snapshots.
+
+        Returns:
+            Number of snapshots dropped
+        """
+        with self._lock:
+            count = len(self._snapshots)
+            self._snapshots.clear()
+        return count
+
+
+# Shared cache used by generate_directlake_tmsl_template
+lakehouse_schema_cache = LakehouseSchemaCache()
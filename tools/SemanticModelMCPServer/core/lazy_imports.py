@@ -0,0 +1,46 @@
+"""
+Lazy Optional Imports
+
+This module imports heavy optional dependencies (pyodbc, pyarrow, psutil) the
+first time a tool needs them instead of when the server starts. MCP clients
+spawn the server on demand, so everything imported at startup delays the
+client's initialize request.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Dict, Optional
+
+# Modules deliberately kept out of server startup, checked by testing/benchmark_startup.py
+DEFERRED_MODULES = ("clr", "pyodbc", "pyarrow", "psutil", "msal", "azure.identity")
+
+_modules: Dict[str, Optional[ModuleType]] = {}
+_import_lock = threading.Lock()
+
+
+def optional_import(name: str) -> Optional[ModuleType]:
+    """
+    Import a module on first use.
+
+    The result, including a failed import, is remembered, so callers can
+    invoke this on every request at no cost.
+
+    Args:
+        name: Dotted module name, e.g. "pyarrow.parquet"
+
+    Returns:
+        The module, or None if it is not installed
+    """
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+
+    with _import_lock:
+        if name not in _modules:
+            try:
+                _modules[name] = importlib.import_module(name)
+            except ImportError:
+                _modules[name] = None
+        return _modules[name]
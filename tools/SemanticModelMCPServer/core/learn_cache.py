@@ -0,0 +1,416 @@
+"""
+Microsoft Learn Cache
+
+This module keeps Microsoft Learn responses in a local SQLite database, so
+repeated searches and page lookups are answered in milliseconds and keep
+working when learn.microsoft.com cannot be reached.
+
+Responses expire after a per-kind TTL and are evicted least-recently-used
+once the entry or size budget is exceeded. Expired responses are still served
+when the network call fails. The same database can hold a full-text index
+(SQLite FTS5) of frequently used DAX, Power BI and Fabric pages, which is
+searched locally before going online. The database is a single file and can be
+built on a connected machine and copied to a restricted one.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+# Set to a file path to move the cache, or to "off" to disable it
+CACHE_PATH_ENV_VAR = "SEMANTIC_MODEL_MCP_LEARN_CACHE"
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".semantic_model_mcp", "learn_cache.sqlite3")
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# How long a response is served without asking Microsoft Learn again
+CACHE_TTL_SECONDS: Dict[str, int] = {
+    "search": 24 * 3600,
+    "learning_paths": 7 * 24 * 3600,
+    "modules": 7 * 24 * 3600,
+    "content": 7 * 24 * 3600,
+}
+
+# Pages indexed by build_learn_offline_index when no URLs are given
+FREQUENT_DOC_PAGES: Tuple[str, ...] = (
+    "https://learn.microsoft.com/en-us/dax/dax-overview",
+    "https://learn.microsoft.com/en-us/dax/dax-function-reference",
+    "https://learn.microsoft.com/en-us/dax/best-practices/dax-divide-function-operator",
+    "https://learn.microsoft.com/en-us/dax/best-practices/dax-variables",
+    "https://learn.microsoft.com/en-us/dax/best-practices/dax-avoid-avoid-filter-as-filter-argument",
+    "https://learn.microsoft.com/en-us/dax/best-practices/dax-countrows",
+    "https://learn.microsoft.com/en-us/dax/best-practices/dax-error-functions",
+    "https://learn.microsoft.com/en-us/dax/calculate-function-dax",
+    "https://learn.microsoft.com/en-us/dax/summarizecolumns-function-dax",
+    "https://learn.microsoft.com/en-us/dax/info-functions-dax",
+    "https://learn.microsoft.com/en-us/dax/dax-queries",
+    "https://learn.microsoft.com/en-us/power-bi/guidance/star-schema",
+    "https://learn.microsoft.com/en-us/power-bi/guidance/relationships-many-to-many",
+    "https://learn.microsoft.com/en-us/power-bi/guidance/import-modeling-data-reduction",
+    "https://learn.microsoft.com/en-us/power-bi/guidance/auto-date-time",
+    "https://learn.microsoft.com/en-us/power-bi/guidance/dax-avoid-avoid-filter-as-filter-argument",
+    "https://learn.microsoft.com/en-us/power-bi/transform-model/desktop-relationships-understand",
+    "https://learn.microsoft.com/en-us/power-bi/enterprise/directlake-overview",
+    "https://learn.microsoft.com/en-us/fabric/fundamentals/direct-lake-overview",
+    "https://learn.microsoft.com/en-us/fabric/fundamentals/direct-lake-develop",
+    "https://learn.microsoft.com/en-us/fabric/fundamentals/direct-lake-manage",
+    "https://learn.microsoft.com/en-us/fabric/data-engineering/delta-optimization-and-v-order",
+    "https://learn.microsoft.com/en-us/fabric/data-engineering/lakehouse-overview",
+    "https://learn.microsoft.com/en-us/power-bi/enterprise/service-premium-connect-tools",
+    "https://learn.microsoft.com/en-us/analysis-services/tmsl/tabular-model-scripting-language-tmsl-reference",
+    "https://learn.microsoft.com/en-us/analysis-services/tmsl/tmsl-reference-tabular-objects",
+    "https://learn.microsoft.com/en-us/analysis-services/tom/introduction-to-the-tabular-object-model-tom-in-analysis-services-amo",
+    "https://learn.microsoft.com/en-us/analysis-services/tabular-models/tabular-models-ssas",
+)
+
+# Characters of page text kept in the index per page
+MAX_PAGE_CHARS = 200000
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SKIPPED_HTML_TAGS = {"script", "style", "nav", "header", "footer", "noscript", "svg", "form", "button"}
+
+
+def _now() -> float:
+    return time.time()
+
+
+class _PageTextParser(HTMLParser):
+    """Collects the title and the readable text of a docs page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.parts: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+        self._in_main = 0
+        self.main_parts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_HTML_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "main":
+            self._in_main += 1
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_HTML_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "main" and self._in_main:
+            self._in_main -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_depth or not data.strip():
+            return
+        self.parts.append(data.strip())
+        if self._in_main:
+            self.main_parts.append(data.strip())
+
+
+def extract_page_text(html: str) -> Tuple[str, str]:
+    """
+    Extract the title and readable text of an HTML docs page.
+
+    Scripts, styles and navigation are dropped; if the page has a <main>
+    element, only its text is kept.
+
+    Args:
+        html: The page HTML
+
+    Returns:
+        Tuple of title and text
+    """
+    parser = _PageTextParser()
+    parser.feed(html)
+    parser.close()
+    title = parser.title.strip()
+    # Learn page titles end with " | Microsoft Learn"
+    title = title.split(" | ")[0].strip()
+    text = " ".join(parser.main_parts or parser.parts)
+    return title, text[:MAX_PAGE_CHARS]
+
+
+def _fts_query(query: str, match_all: bool) -> Optional[str]:
+    """Build an FTS5 query from free text, quoting each word so no FTS syntax leaks through."""
+    words = _WORD.findall(query or "")
+    if not words:
+        return None
+    return (" " if match_all else " OR ").join(f'"{word}"' for word in words)
+
+
+@dataclass
+class _CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale_hits: int = 0
+    stores: int = 0
+    evictions: int = 0
+    index_searches: int = 0
+    index_hits: int = 0
+
+
+class LearnCache:
+    """Thread-safe persistent cache of Microsoft Learn responses and pages."""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES, ttl_seconds: Optional[Dict[str, int]] = None):
+        """
+        Initialize the cache. The database is opened on first use.
+
+        Args:
+            path: SQLite database file, ":memory:" for a cache that is not kept,
+                "off" to disable caching; defaults to the environment variable
+                SEMANTIC_MODEL_MCP_LEARN_CACHE or ~/.semantic_model_mcp/learn_cache.sqlite3
+            max_entries: Maximum number of cached responses
+            max_bytes: Maximum total size of cached responses
+            ttl_seconds: Time to live per response kind, overriding CACHE_TTL_SECONDS
+        """
+        self.path = path or os.environ.get(CACHE_PATH_ENV_VAR) or DEFAULT_CACHE_PATH
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = {**CACHE_TTL_SECONDS, **(ttl_seconds or {})}
+        self.fts_available = False
+        self._db: Optional[sqlite3.Connection] = None
+        self._open_error: Optional[str] = None
+        self._stats = _CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path.lower() != "off"
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database and create the tables; None if the cache is disabled or unusable."""
+        if self._db is not None or not self.enabled or self._open_error:
+            return self._db
+        try:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, timeout=5)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, size INTEGER NOT NULL, "
+                "fetched_at REAL NOT NULL, last_used_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at)")
+            try:
+                db.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5("
+                    "url UNINDEXED, title, content, indexed_at UNINDEXED, tokenize = 'porter unicode61')"
+                )
+                self.fts_available = True
+            except sqlite3.OperationalError as e:
+                # SQLite builds without FTS5 still get the response cache
+                logging.info(f"SQLite FTS5 is not available, the offline Learn index is disabled: {e}")
+            db.commit()
+            self._db = db
+        except (sqlite3.Error, OSError) as e:
+            logging.warning(f"Microsoft Learn cache disabled, cannot open {self.path}: {e}")
+            self._open_error = str(e)
+        return self._db
+
+    @staticmethod
+    def make_key(kind: str, **params: Any) -> str:
+        """
+        Build the cache key of a request.
+
+        Args:
+            kind: Response kind, one of the CACHE_TTL_SECONDS keys
+            **params: Request parameters; None values are left out and text
+                is compared ignoring case and repeated whitespace
+
+        Returns:
+            Cache key
+        """
+        normalized = {name: " ".join(value.split()).lower() if isinstance(value, str) else value
+                      for name, value in sorted(params.items()) if value is not None}
+        digest = hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"{kind}:{digest}"
+
+    def get(self, kind: str, key: str, allow_stale: bool = False) -> Optional[Tuple[Any, float]]:
+        """
+        Get a cached response.
+
+        Args:
+            kind: Response kind
+            key: Cache key from make_key
+            allow_stale: True to return a response past its TTL, e.g. when the network call failed
+
+        Returns:
+            Tuple of the response and its age in seconds, or None if missing or expired
+        """
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None
+            row = db.execute("SELECT payload, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats.misses += 1
+                return None
+            age = _now() - row[1]
+            if age > self.ttl_seconds.get(kind, 0):
+                if not allow_stale:
+                    self._stats.misses += 1
+                    return None
+                self._stats.stale_hits += 1
+            else:
+                self._stats.hits += 1
+            db.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (_now(), key))
+            db.commit()
+            return json.loads(row[0]), age
+
+    def put(self, kind: str, key: str, response: Any) -> None:
+        """Store a response, evicting the least recently used over budget."""
+        payload = json.dumps(response)
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            now = _now()
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, payload, size, fetched_at, last_used_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, payload, len(payload), now, now),
+            )
+            self._stats.stores += 1
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        count, total = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY last_used_at").fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        self._stats.evictions += evicted
+
+    def index_page(self, url: str, title: str, content: str) -> bool:
+        """
+        Add a page to the offline index, replacing an earlier copy.
+
+        Returns:
+            True if the page was indexed, False if the index is not available
+        """
+        with self._lock:
+            db = self._connect()
+            if db is None or not self.fts_available:
+                return False
+            db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            db.execute("INSERT INTO pages (url, title, content, indexed_at) VALUES (?, ?, ?, ?)",
+                       (url, title, content, _now()))
+            db.commit()
+            return True
+
+    def indexed_urls(self) -> List[str]:
+        """URLs of the pages in the offline index."""
+        with self._lock:
+            db = self._connect()
+            if db is None or not self.fts_available:
+                return []
+            return [row[0] for row in db.execute("SELECT url FROM pages")]
+
+    def search_index(self, query: str, top: int = 10) -> List[Dict[str, Any]]:
+        """
+        Search the offline index.
+
+        Pages containing all words of the query are preferred; if there are
+        none, pages containing any word are returned. Results are ranked by BM25.
+
+        Args:
+            query: Free text query
+            top: Maximum number of results
+
+        Returns:
+            List of results with title, url and a snippet around the matches
+        """
+        with self._lock:
+            db = self._connect()
+            if db is None or not self.fts_available:
+                return []
+            self._stats.index_searches += 1
+            rows = []
+            for match_all in (True, False):
+                fts_query = _fts_query(query, match_all)
+                if fts_query is None:
+                    return []
+                rows = db.execute(
+                    "SELECT title, url, snippet(pages, 2, '', '', ' ... ', 24), bm25(pages, 10.0, 1.0) AS rank "
+                    "FROM pages WHERE pages MATCH ? ORDER BY rank LIMIT ?",
+                    (fts_query, top),
+                ).fetchall()
+                if rows:
+                    break
+            if rows:
+                self._stats.index_hits += 1
+            return [{"title": title, "url": url, "snippet": snippet} for title, url, snippet, _ in rows]
+
+    def clear(self, include_index: bool = False) -> Dict[str, int]:
+        """
+        Drop the cached responses and, if requested, the offline index.
+
+        Returns:
+            Number of responses and pages dropped
+        """
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return {"responses": 0, "pages": 0}
+            responses = db.execute("DELETE FROM responses").rowcount
+            pages = 0
+            if include_index and self.fts_available:
+                pages = db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+                db.execute("DELETE FROM pages")
+            db.commit()
+            return {"responses": responses, "pages": pages}
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the current status of the cache.
+
+        Returns:
+            Dictionary with the database location, sizes per kind, budgets and counters
+        """
+        with self._lock:
+            db = self._connect()
+            status: Dict[str, Any] = {
+                "path": self.path,
+                "enabled": db is not None,
+                "open_error": self._open_error,
+                "fts_available": self.fts_available,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": dict(self.ttl_seconds),
+                "stats": self._stats.__dict__.copy(),
+            }
+            if db is None:
+                return status
+            status["responses"] = {
+                kind: {"entries": count, "bytes": size}
+                for kind, count, size in db.execute("SELECT kind, COUNT(*), SUM(size) FROM responses GROUP BY kind")
+            }
+            status["indexed_pages"] = db.execute("SELECT COUNT(*) FROM pages").fetchone()[0] if self.fts_available else 0
+            return status
+
+
+# Shared cache used by the Microsoft Learn tools
+learn_cache = LearnCache()
@@ -0,0 +1,428 @@
+"""
+Local Power BI Desktop Sessions
+
+This module keeps one open ADOMD.NET connection per local Power BI Desktop
+instance and serves all local tools from it, instead of opening a connection
+for every table, column or measure lookup.
+
+The model metadata (tables, columns, measures and relationships) is read in a
+single round trip with one multi-EVALUATE INFO.* query and cached until the
+model's refresh state changes, which Power BI Desktop updates whenever the
+model is edited or refreshed.
+"""
+
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from core.dax_query_cache import query_refresh_state
+from core.dax_result_reader import DaxResult, read_dax_result
+from core.xmla_connection_pool import _close_connection, _open_adomd_connection
+
+# INFO functions read for the model metadata, in the order of the result sets
+METADATA_QUERIES: Dict[str, str] = {
+    "tables": "EVALUATE INFO.TABLES()",
+    "columns": "EVALUATE INFO.COLUMNS()",
+    "measures": "EVALUATE INFO.MEASURES()",
+    "relationships": "EVALUATE INFO.RELATIONSHIPS()",
+}
+
+# Metadata is reused without a refresh state check for this long when the
+# refresh state cannot be read
+METADATA_FALLBACK_TTL_SECONDS = 30
+
+# System.Data.ConnectionState.Open
+_CONNECTION_STATE_OPEN = 1
+
+_DATA_SOURCE = re.compile(r"data source\s*=\s*([^;]+)", re.IGNORECASE)
+
+_CONNECTION_ERROR_WORDS = ("connection", "network", "session", "transport", "socket", "closed")
+
+
+def session_key(connection_string: str) -> str:
+    """
+    Get the session key of a local connection string.
+
+    Connection strings naming the same instance ("Data Source=localhost:51542"
+    and "data source = LOCALHOST:51542;") share a session.
+    """
+    match = _DATA_SOURCE.search(connection_string or "")
+    source = match.group(1) if match else connection_string or ""
+    return source.strip().lower()
+
+
+def is_connection_error(error: Exception) -> bool:
+    """True if an error means the connection failed rather than the query."""
+    message = str(error).lower()
+    return any(word in message for word in _CONNECTION_ERROR_WORDS)
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1")
+    return bool(value)
+
+
+@dataclass
+class LocalModelMetadata:
+    """Tables, columns, measures and relationships of a local model, as INFO.* rows."""
+
+    tables: List[Dict[str, Any]] = field(default_factory=list)
+    columns: List[Dict[str, Any]] = field(default_factory=list)
+    measures: List[Dict[str, Any]] = field(default_factory=list)
+    relationships: List[Dict[str, Any]] = field(default_factory=list)
+    refresh_state: Optional[str] = None
+    fetched_at: float = field(default_factory=time.time)
+    round_trips: int = 1
+
+    def table_names(self) -> Dict[str, str]:
+        """Table names by table id."""
+        return {_text(row.get("[ID]")): _text(row.get("[Name]")) for row in self.tables}
+
+    def column_names(self) -> Dict[str, str]:
+        """Column names by column id."""
+        return {_text(row.get("[ID]")): _text(row.get("[ExplicitName]") or row.get("[InferredName]")) for row in self.columns}
+
+    def table_info(self) -> List[Dict[str, Any]]:
+        """Tables in the format of the local exploration tools."""
+        return [
+            {
+                'id': _text(row.get("[ID]")),
+                'name': _text(row.get("[Name]")),
+                'data_category': _text(row.get("[DataCategory]")),
+                'description': _text(row.get("[Description]")),
+                'is_hidden': _flag(row.get("[IsHidden]")),
+                'is_visible': not _flag(row.get("[IsHidden]")),
+                'modified_time': _text(row.get("[ModifiedTime]")),
+                'lineage_tag': _text(row.get("[LineageTag]")),
+            }
+            for row in self.tables
+        ]
+
+    def column_info(self, table_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Columns in the format of the local exploration tools, optionally of one table."""
+        table_names = self.table_names()
+        columns = []
+        for row in self.columns:
+            table_id = _text(row.get("[TableID]"))
+            mapped_table_name = table_names.get(table_id, 'Unknown')
+            if table_name and mapped_table_name != table_name:
+                continue
+            columns.append({
+                'table_id': table_id,
+                'table_name': mapped_table_name,
+                'column_id': _text(row.get("[ID]")),
+                'explicit_name': _text(row.get("[ExplicitName]")),
+                'inferred_name': _text(row.get("[InferredName]")),
+                'data_type': _text(row.get("[ExplicitDataType]")),
+                'is_hidden': _flag(row.get("[IsHidden]")),
+                'is_visible': not _flag(row.get("[IsHidden]")),
+                'is_key': _flag(row.get("[IsKey]")),
+                'description': _text(row.get("[Description]")),
+                'display_folder': _text(row.get("[DisplayFolder]")),
+                'expression': _text(row.get("[Expression]")),
+                'lineage_tag': _text(row.get("[LineageTag]")),
+            })
+        return columns
+
+    def measure_info(self) -> List[Dict[str, Any]]:
+        """Measures in the format of the local exploration tools."""
+        table_names = self.table_names()
+        return [
+            {
+                'table_id': _text(row.get("[TableID]")),
+                'table_name': table_names.get(_text(row.get("[TableID]")), 'Unknown'),
+                'measure_id': _text(row.get("[ID]")),
+                'name': _text(row.get("[Name]")),
+                'description': _text(row.get("[Description]")),
+                'expression': _text(row.get("[Expression]")),
+                'is_hidden': _flag(row.get("[IsHidden]")),
+                'is_visible': not _flag(row.get("[IsHidden]")),
+                'display_folder': _text(row.get("[DisplayFolder]")),
+                'data_type': _text(row.get("[DataType]")),
+                'format_string': _text(row.get("[FormatString]")),
+                'lineage_tag': _text(row.get("[LineageTag]")),
+            }
+            for row in self.measures
+        ]
+
+    def relationship_info(self) -> List[Dict[str, Any]]:
+        """Relationships with their table and column names."""
+        table_names, column_names = self.table_names(), self.column_names()
+        return [
+            {
+                'relationship_id': _text(row.get("[ID]")),
+                'name': _text(row.get("[Name]")),
+                'from_table': table_names.get(_text(row.get("[FromTableID]")), 'Unknown'),
+                'from_column': column_names.get(_text(row.get("[FromColumnID]")), 'Unknown'),
+                'to_table': table_names.get(_text(row.get("[ToTableID]")), 'Unknown'),
+                'to_column': column_names.get(_text(row.get("[ToColumnID]")), 'Unknown'),
+                'is_active': _flag(row.get("[IsActive]")),
+                'cross_filtering_behavior': _text(row.get("[CrossFilteringBehavior]")),
+                'from_cardinality': _text(row.get("[FromCardinality]")),
+                'to_cardinality': _text(row.get("[ToCardinality]")),
+            }
+            for row in self.relationships
+        ]
+
+
+@dataclass
+class _SessionStats:
+    connections_opened: int = 0
+    queries: int = 0
+    metadata_hits: int = 0
+    metadata_fetches: int = 0
+    reconnects: int = 0
+
+
+class LocalPowerBISession:
+    """One open connection to a local Power BI Desktop instance and its cached metadata."""
+
+    def __init__(self, connection_string: str, connection_factory: Callable[[str], Any] = _open_adomd_connection):
+        """
+        Initialize the session. The connection is opened on first use.
+
+        Args:
+            connection_string: Local connection string (e.g. "Data Source=localhost:51542")
+            connection_factory: Callable that opens a connection for a connection string
+        """
+        self.connection_string = connection_string
+        self._connection_factory = connection_factory
+        self._connection: Any = None
+        self._metadata: Optional[LocalModelMetadata] = None
+        self._stats = _SessionStats()
+        self._last_used_at: Optional[float] = None
+        # ADOMD.NET connections run one command at a time
+        self._lock = threading.RLock()
+
+    def run(self, function: Callable[[Any], Any]) -> Any:
+        """
+        Call a function with the session's open connection.
+
+        If a reused connection turns out to be broken (e.g. Power BI Desktop
+        restarted the model), it is reopened and the call is retried once.
+
+        Args:
+            function: Function receiving the open AdomdConnection
+
+        Returns:
+            The function's result
+        """
+        with self._lock:
+            for attempt in range(2):
+                reused = self._connection is not None
+                connection = self._open()
+                try:
+                    return function(connection)
+                except Exception as e:
+                    broken = not self._is_open(connection) or is_connection_error(e)
+                    if not broken:
+                        raise
+                    self._reset()
+                    if attempt == 0 and reused:
+                        logging.debug(f"Local Power BI connection failed, reconnecting: {e}")
+                        self._stats.reconnects += 1
+                        continue
+                    raise
+                finally:
+                    self._last_used_at = time.time()
+
+    def execute(self, dax_query: str, max_rows: Optional[int] = None, max_bytes: Optional[int] = None) -> DaxResult:
+        """
+        Run a DAX query on the session's connection.
+
+        Args:
+            dax_query: The DAX query
+            max_rows: Maximum number of rows to read, None for no limit
+            max_bytes: Approximate maximum payload size, None for no limit
+
+        Returns:
+            DaxResult with typed values
+        """
+        def query(connection: Any) -> DaxResult:
+            command = connection.CreateCommand()
+            command.CommandText = dax_query
+            reader = command.ExecuteReader()
+            try:
+                result = read_dax_result(reader, max_rows=max_rows, max_bytes=max_bytes)
+                if result.truncated:
+                    command.Cancel()
+                return result
+            finally:
+                reader.Close()
+
+        with self._lock:
+            self._stats.queries += 1
+            return self.run(query)
+
+    def get_metadata(self, refresh: bool = False) -> LocalModelMetadata:
+        """
+        Get the model metadata, reading it again only if the model changed.
+
+        Args:
+            refresh: True to read the metadata even if the model did not change
+
+        Returns:
+            LocalModelMetadata of the model
+        """
+        with self._lock:
+            cached = self._metadata
+            if cached is not None and not refresh:
+                if cached.refresh_state is None:
+                    if time.time() - cached.fetched_at < METADATA_FALLBACK_TTL_SECONDS:
+                        self._stats.metadata_hits += 1
+                        return cached
+                elif self.run(query_refresh_state) == cached.refresh_state:
+                    self._stats.metadata_hits += 1
+                    return cached
+
+            metadata = self.run(read_model_metadata)
+            self._stats.metadata_fetches += 1
+            self._metadata = metadata
+            return metadata
+
+    def invalidate(self) -> None:
+        """Drop the cached metadata, e.g. after the model was changed through TMSL."""
+        with self._lock:
+            self._metadata = None
+
+    def close(self) -> None:
+        """Close the connection and drop the cached metadata."""
+        with self._lock:
+            self._reset()
+            self._metadata = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the session's connection and cache state."""
+        with self._lock:
+            metadata = self._metadata
+            return {
+                'connection_string': self.connection_string,
+                'connected': self._connection is not None,
+                'idle_seconds': round(time.time() - self._last_used_at, 1) if self._last_used_at else None,
+                'metadata_cached': metadata is not None,
+                'metadata_age_seconds': round(time.time() - metadata.fetched_at, 1) if metadata else None,
+                'metadata_objects': {
+                    'tables': len(metadata.tables), 'columns': len(metadata.columns),
+                    'measures': len(metadata.measures), 'relationships': len(metadata.relationships),
+                } if metadata else None,
+                **self._stats.__dict__,
+            }
+
+    def _open(self) -> Any:
+        if self._connection is None:
+            self._connection = self._connection_factory(self.connection_string)
+            self._stats.connections_opened += 1
+        return self._connection
+
+    def _reset(self) -> None:
+        if self._connection is not None:
+            _close_connection(self._connection)
+            self._connection = None
+
+    @staticmethod
+    def _is_open(connection: Any) -> bool:
+        try:
+            return int(connection.State) == _CONNECTION_STATE_OPEN
+        except Exception:
+            return True  # State unknown; rely on the error message
+
+
+def _read_result_sets(connection: Any, query: str, names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    command = connection.CreateCommand()
+    command.CommandText = query
+    reader = command.ExecuteReader()
+    results = {}
+    try:
+        for index, name in enumerate(names):
+            if index > 0 and not reader.NextResult():
+                break
+            results[name] = read_dax_result(reader, max_rows=None, max_bytes=None).to_rows()
+    finally:
+        reader.Close()
+    return results
+
+
+def read_model_metadata(connection: Any) -> LocalModelMetadata:
+    """Read the model metadata, in one round trip where the engine supports multiple EVALUATEs."""
+    refresh_state = query_refresh_state(connection)
+    names = list(METADATA_QUERIES)
+    round_trips = 1
+    try:
+        results = _read_result_sets(connection, "\n".join(METADATA_QUERIES.values()), names)
+    except Exception as e:
+        # Older Power BI Desktop versions only accept one EVALUATE per query
+        if is_connection_error(e):
+            raise
+        logging.debug(f"Batched INFO query failed, reading the metadata per function: {e}")
+        results = {}
+    for name in names:
+        if name not in results:
+            results.update(_read_result_sets(connection, METADATA_QUERIES[name], [name]))
+            round_trips += 1
+    return LocalModelMetadata(refresh_state=refresh_state, round_trips=round_trips, **results)
+
+
+class LocalSessionPool:
+    """Local Power BI Desktop sessions, one per instance."""
+
+    def __init__(self, connection_factory: Callable[[str], Any] = _open_adomd_connection):
+        self._connection_factory = connection_factory
+        self._sessions: Dict[str, LocalPowerBISession] = {}
+        self._lock = threading.Lock()
+
+    def get(self, connection_string: str) -> LocalPowerBISession:
+        """Get the session of a local instance, creating it on first use."""
+        key = session_key(connection_string)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = LocalPowerBISession(connection_string, self._connection_factory)
+                self._sessions[key] = session
+            return session
+
+    def invalidate(self, connection_string: str) -> None:
+        """Drop the cached metadata of a local instance."""
+        with self._lock:
+            session = self._sessions.get(session_key(connection_string))
+        if session is not None:
+            session.invalidate()
+
+    def clear(self) -> int:
+        """
+        Close all sessions.
+
+        Returns:
+            Number of sessions closed
+        """
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+        return len(sessions)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the state of all sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            'session_count': len(sessions),
+            'sessions': [session.get_status() for session in sessions],
+        }
+
+
+# Shared sessions used by all local Power BI Desktop tools
+local_session_pool = LocalSessionPool()
+
+
+def get_local_session(connection_string: str) -> LocalPowerBISession:
+    """Get the shared session of a local Power BI Desktop instance."""
+    return local_session_pool.get(connection_string)
@@ -0,0 +1,295 @@
+"""
+Model Definition Cache
+
+This module caches TMSL model definitions serialized through TOM, shared by
+get_model_definition and the BPA tools. Serializing a large model takes tens of
+seconds, while checking whether it changed is a single schema rowset query on a
+pooled XMLA connection.
+
+Entries are keyed by dataset and serialization profile, and are only reused
+while the dataset's last data and schema update times are unchanged. Callers
+can ask for a subtree (tables, measures, roles, ...) of the cached definition
+instead of the whole database.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.auth import get_access_token
+from core.dax_query_cache import query_refresh_state
+from core.dotnet_loader import TOM_ASSEMBLIES, load_assemblies
+from core.tmsl_document import TmslDocument
+from core.xmla_connection_pool import build_xmla_connection_string, xmla_connection_pool
+
+DEFAULT_MAX_ENTRIES = 16
+
+# TOM SerializeOptions per caller. "default" is what get_model_definition has
+# always returned; "bpa" is what the BPA tools analyze.
+SERIALIZE_PROFILES: Dict[str, Dict[str, bool]] = {
+    "default": {"IgnoreTimestamps": True},
+    "bpa": {
+        "IgnoreInferredObjects": True,
+        "IgnoreInferredProperties": True,
+        "IgnoreTimestamps": True,
+        "SplitMultilineStrings": True,
+    },
+}
+
+MODEL_SUBTREES = ("model", "tables", "columns", "measures", "relationships", "roles", "expressions", "perspectives", "dataSources")
+
+
+@dataclass
+class CachedModelDefinition:
+    """A serialized model definition and the dataset state it was read at."""
+
+    tmsl: str
+    version: Optional[str]
+    fetched_at: float
+    fetch_seconds: float
+    _document: Optional[TmslDocument] = None
+
+    @property
+    def document(self) -> TmslDocument:
+        """The definition parsed into an indexed document, parsed once on first use."""
+        if self._document is None:
+            self._document = TmslDocument(json.loads(self.tmsl), len(self.tmsl))
+        return self._document
+
+    @property
+    def parsed(self) -> dict:
+        """The definition parsed as JSON, parsed once on first use."""
+        return self.document.data
+
+
+@dataclass
+class _CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stale: int = 0
+    invalidations: int = 0
+
+
+class ModelDefinitionCache:
+    """Thread-safe LRU cache of serialized model definitions."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached definitions
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], CachedModelDefinition]" = OrderedDict()
+        self._stats = _CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(workspace_name: str, dataset_name: str, profile: str) -> Tuple[str, str, str]:
+        return workspace_name.strip().lower(), dataset_name.strip().lower(), profile
+
+    def get(self, workspace_name: str, dataset_name: str, profile: str, version: Optional[str]) -> Optional[CachedModelDefinition]:
+        """
+        Get a cached definition if it was read at the given dataset version.
+
+        Args:
+            workspace_name: The Power BI workspace name
+            dataset_name: The dataset name
+            profile: Serialization profile name
+            version: Current dataset version; None never matches
+
+        Returns:
+            The cached definition, or None if missing or stale
+        """
+        key = self._key(workspace_name, dataset_name, profile)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            if version is None or entry.version != version:
+                self._stats.stale += 1
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry
+
+    def put(self, workspace_name: str, dataset_name: str, profile: str, entry: CachedModelDefinition) -> None:
+        """Store a definition, evicting the least recently used over budget."""
+        with self._lock:
+            self._entries[self._key(workspace_name, dataset_name, profile)] = entry
+            self._entries.move_to_end(self._key(workspace_name, dataset_name, profile))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, workspace_name: str, dataset_name: str) -> int:
+        """
+        Drop all cached definitions of a dataset.
+
+        Returns:
+            Number of definitions dropped
+        """
+        dataset_key = self._key(workspace_name, dataset_name, "")[:2]
+        with self._lock:
+            keys = [key for key in self._entries if key[:2] == dataset_key]
+            for key in keys:
+                del self._entries[key]
+            self._stats.invalidations += 1
+        return len(keys)
+
+    def clear(self) -> int:
+        """
+        Drop all cached definitions.
+
+        Returns:
+            Number of definitions dropped
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+    def get_status(self) -> dict:
+        """
+        Get the current status of the cache.
+
+        Returns:
+            Dictionary with the cached definitions and counters
+        """
+        now = time.time()
+        with self._lock:
+            return {
+                "entries": [
+                    {
+                        "workspace_name": key[0],
+                        "dataset_name": key[1],
+                        "profile": key[2],
+                        "size_chars": len(entry.tmsl),
+                        "age_seconds": round(now - entry.fetched_at, 1),
+                        "fetch_seconds": round(entry.fetch_seconds, 2),
+                    }
+                    for key, entry in self._entries.items()
+                ],
+                "max_entries": self.max_entries,
+                "stats": self._stats.__dict__.copy(),
+            }
+
+
+# Shared cache used by get_model_definition and the BPA tools
+model_definition_cache = ModelDefinitionCache()
+
+
+def _get_dataset_version(workspace_name: str, dataset_name: str, access_token: str) -> Optional[str]:
+    """Read the dataset's last data and schema update over a pooled connection."""
+    try:
+        with xmla_connection_pool.connection(workspace_name, dataset_name, access_token) as pooled:
+            return query_refresh_state(pooled.connection)
+    except Exception as e:
+        logging.debug(f"Could not read version of dataset '{dataset_name}': {e}")
+        return None
+
+
+def _serialize_model_definition(workspace_name: str, dataset_name: str, access_token: str, profile: str) -> str:
+    """Serialize the dataset through TOM with the profile's options."""
+    load_assemblies(TOM_ASSEMBLIES)
+    from Microsoft.AnalysisServices.Tabular import Server, JsonSerializer, SerializeOptions  # type: ignore
+
+    server = Server()
+    try:
+        server.Connect(build_xmla_connection_string(workspace_name, access_token))
+        database = server.Databases.FindByName(dataset_name)
+        if database is None:
+            raise ValueError(f"Dataset '{dataset_name}' not found in workspace '{workspace_name}'")
+
+        options = SerializeOptions()
+        for option, value in SERIALIZE_PROFILES[profile].items():
+            setattr(options, option, value)
+        return JsonSerializer.SerializeDatabase(database, options)
+    finally:
+        try:
+            if server.Connected:
+                server.Disconnect()
+        except Exception:
+            pass  # Ignore errors during cleanup
+
+
+def get_cached_model_definition(workspace_name: str, dataset_name: str, profile: str = "default", use_cache: bool = True) -> CachedModelDefinition:
+    """
+    Get the TMSL definition of a dataset, serializing it only when it changed.
+
+    Args:
+        workspace_name: The Power BI workspace name
+        dataset_name: The dataset name
+        profile: Serialization profile name from SERIALIZE_PROFILES
+        use_cache: False to always serialize the model again
+
+    Returns:
+        CachedModelDefinition with the TMSL string
+
+    Raises:
+        ValueError: If the profile is unknown, no access token is available or the dataset does not exist
+    """
+    if profile not in SERIALIZE_PROFILES:
+        raise ValueError(f"Unknown serialization profile: {profile}. Supported: {list(SERIALIZE_PROFILES)}")
+
+    access_token = get_access_token()
+    if not access_token:
+        raise ValueError("No valid access token available")
+
+    version = _get_dataset_version(workspace_name, dataset_name, access_token)
+    if use_cache:
+        entry = model_definition_cache.get(workspace_name, dataset_name, profile, version)
+        if entry is not None:
+            return entry
+
+    started = time.time()
+    tmsl = _serialize_model_definition(workspace_name, dataset_name, access_token, profile)
+    entry = CachedModelDefinition(tmsl=tmsl, version=version, fetched_at=time.time(), fetch_seconds=time.time() - started)
+    if version is not None:
+        model_definition_cache.put(workspace_name, dataset_name, profile, entry)
+    return entry
+
+
+def extract_model_subtree(definition: dict, subtree: str, table_name: Optional[str] = None) -> Any:
+    """
+    Extract part of a serialized database definition.
+
+    Args:
+        definition: Parsed database definition as returned by SerializeDatabase
+        subtree: One of MODEL_SUBTREES. "model" returns the model properties
+            without tables, "columns" and "measures" are flattened across
+            tables with a "table" key added to each object.
+        table_name: Optional table name to restrict tables, columns and measures
+
+    Returns:
+        The requested part of the definition
+
+    Raises:
+        ValueError: If the subtree is unknown
+    """
+    if subtree not in MODEL_SUBTREES:
+        raise ValueError(f"Unknown subtree: {subtree}. Supported: {list(MODEL_SUBTREES)}")
+
+    model = definition.get("model", {})
+    if subtree == "model":
+        return {key: value for key, value in model.items() if key != "tables"}
+
+    tables: List[dict] = model.get("tables", [])
+    if table_name is not None:
+        tables = [table for table in tables if table.get("name") == table_name]
+
+    if subtree == "tables":
+        return tables
+    if subtree in ("columns", "measures"):
+        return [
+            {"table": table.get("name"), **item}
+            for table in tables
+            for item in table.get(subtree, [])
+        ]
+    return model.get(subtree, [])
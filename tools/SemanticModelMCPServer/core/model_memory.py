@@ -0,0 +1,343 @@
+"""
+Model Memory Analysis
+
+This module reads the VertiPaq storage DMVs of a semantic model and computes
+where its memory goes: the size of every table and column split into data,
+dictionary and hierarchy size, column cardinality and encoding, and the size
+of relationships.
+
+The whole model is read with one query per DMV on a single connection, so the
+number of queries does not grow with the number of tables or columns. Sizes are
+computed from the segments and dictionaries loaded in memory; for DirectLake
+models, columns that were not paged in yet show up as not resident with no data
+size.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.dax_result_reader import read_dax_result
+
+# Storage DMVs read for the analysis, one query each
+MEMORY_DMV_QUERIES: Dict[str, str] = {
+    "tables": "SELECT [DIMENSION_NAME], [TABLE_ID], [ROWS_COUNT] FROM $SYSTEM.DISCOVER_STORAGE_TABLES",
+    "columns": "SELECT * FROM $SYSTEM.DISCOVER_STORAGE_TABLE_COLUMNS WHERE [COLUMN_TYPE] = 'BASIC_DATA'",
+    "segments": "SELECT * FROM $SYSTEM.DISCOVER_STORAGE_TABLE_COLUMN_SEGMENTS",
+    "column_storages": "SELECT [ColumnID], [Statistics_DistinctStates] FROM $SYSTEM.TMSCHEMA_COLUMN_STORAGES",
+    "relationships": "SELECT [ID], [FromTableID], [FromColumnID], [ToTableID], [ToColumnID] FROM $SYSTEM.TMSCHEMA_RELATIONSHIPS",
+}
+
+# DMVs that only add detail (cardinality, relationship names); the analysis runs without them
+OPTIONAL_DMVS = {"column_storages", "relationships"}
+
+DEFAULT_TOP_N = 20
+
+# Columns smaller than this are not reported as findings
+FINDING_MIN_BYTES = 1024 * 1024
+# Distinct values per row from which a column counts as nearly unique
+NEARLY_UNIQUE_RATIO = 0.9
+NEARLY_UNIQUE_MIN_ROWS = 100000
+# Share of a column's size in its dictionary from which the dictionary dominates
+DICTIONARY_HEAVY_RATIO = 0.8
+
+_NUMERIC_TYPES = {"int64", "double", "decimal", "currency", "dbtype_i8", "dbtype_r8", "dbtype_cy"}
+
+_ENCODINGS = {1: "hash", 2: "value"}
+
+# Storage ids end with the id of their TOM object, e.g. "Sales (123)"
+_OBJECT_ID = re.compile(r"\((\d+)\)$")
+
+
+def _object_id(storage_id: Any) -> Optional[int]:
+    match = _OBJECT_ID.search(str(storage_id or ""))
+    return int(match.group(1)) if match else None
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _flag(value: Any) -> Optional[bool]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1")
+    return bool(value)
+
+
+def _percent(part: int, total: int) -> float:
+    return round(part * 100.0 / total, 2) if total else 0.0
+
+
+@dataclass
+class ColumnMemory:
+    """Memory used by one column."""
+
+    table: str
+    column: str
+    data_type: str
+    encoding: str
+    data_size: int = 0
+    dictionary_size: int = 0
+    hierarchy_size: int = 0
+    cardinality: Optional[int] = None
+    is_row_number: bool = False
+    is_resident: Optional[bool] = None
+
+    @property
+    def total_size(self) -> int:
+        return self.data_size + self.dictionary_size + self.hierarchy_size
+
+    @property
+    def dictionary_ratio(self) -> float:
+        return round(self.dictionary_size / self.total_size, 3) if self.total_size else 0.0
+
+    def to_dict(self, model_size: int, table_rows: int) -> Dict[str, Any]:
+        data = {
+            "table": self.table,
+            "column": self.column,
+            "total_size_bytes": self.total_size,
+            "data_size_bytes": self.data_size,
+            "dictionary_size_bytes": self.dictionary_size,
+            "hierarchy_size_bytes": self.hierarchy_size,
+            "dictionary_ratio": self.dictionary_ratio,
+            "cardinality": self.cardinality,
+            "table_rows": table_rows,
+            "encoding": self.encoding,
+            "data_type": self.data_type,
+            "percent_of_model": _percent(self.total_size, model_size),
+        }
+        if self.is_resident is not None:
+            data["is_resident"] = self.is_resident
+        return data
+
+
+@dataclass
+class TableMemory:
+    """Memory used by one table and its columns."""
+
+    name: str
+    rows: int = 0
+    columns: List[ColumnMemory] = field(default_factory=list)
+    user_hierarchy_size: int = 0
+    relationship_size: int = 0
+
+    @property
+    def column_size(self) -> int:
+        return sum(column.total_size for column in self.columns)
+
+    @property
+    def total_size(self) -> int:
+        return self.column_size + self.user_hierarchy_size + self.relationship_size
+
+    def to_dict(self, model_size: int) -> Dict[str, Any]:
+        largest = max((column for column in self.columns if not column.is_row_number),
+                      key=lambda column: column.total_size, default=None)
+        return {
+            "table": self.name,
+            "total_size_bytes": self.total_size,
+            "column_size_bytes": self.column_size,
+            "user_hierarchy_size_bytes": self.user_hierarchy_size,
+            "relationship_size_bytes": self.relationship_size,
+            "rows": self.rows,
+            "column_count": sum(1 for column in self.columns if not column.is_row_number),
+            "largest_column": largest.column if largest else None,
+            "percent_of_model": _percent(self.total_size, model_size),
+        }
+
+
+def read_memory_dmvs(connection: Any) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Read the storage DMVs used by the memory analysis.
+
+    Args:
+        connection: Open AdomdConnection with the dataset as catalog
+
+    Returns:
+        Rows of each DMV by the keys of MEMORY_DMV_QUERIES. Optional DMVs that
+        cannot be read (e.g. on older engines) are returned empty.
+    """
+    results = {}
+    for name, query in MEMORY_DMV_QUERIES.items():
+        try:
+            command = connection.CreateCommand()
+            command.CommandText = query
+            reader = command.ExecuteReader()
+            try:
+                results[name] = read_dax_result(reader, max_rows=None, max_bytes=None).to_rows()
+            finally:
+                reader.Close()
+        except Exception as e:
+            if name not in OPTIONAL_DMVS:
+                raise
+            logging.debug(f"Could not read {name} DMV: {e}")
+            results[name] = []
+    return results
+
+
+def _build_tables(dmvs: Dict[str, List[Dict[str, Any]]]) -> Tuple[Dict[str, TableMemory], Dict[Tuple[str, str], ColumnMemory], Dict[str, int]]:
+    # Returns tables by storage table id, columns by (storage table id, storage column id)
+    # and relationship sizes by relationship storage id
+    tables: Dict[str, TableMemory] = {}
+    for row in dmvs.get("tables", []):
+        table_id = str(row.get("TABLE_ID") or "")
+        if table_id and table_id[:2] not in ("H$", "R$", "U$"):
+            tables[table_id] = TableMemory(name=str(row.get("DIMENSION_NAME")), rows=_int(row.get("ROWS_COUNT")))
+
+    cardinalities = {_int(row.get("ColumnID")): row.get("Statistics_DistinctStates")
+                     for row in dmvs.get("column_storages", [])}
+
+    columns: Dict[Tuple[str, str], ColumnMemory] = {}
+    for row in dmvs.get("columns", []):
+        table_id, column_id = str(row.get("TABLE_ID")), str(row.get("COLUMN_ID"))
+        table = tables.setdefault(table_id, TableMemory(name=str(row.get("DIMENSION_NAME"))))
+        cardinality = cardinalities.get(_object_id(column_id))
+        column = ColumnMemory(
+            table=table.name,
+            column=str(row.get("ATTRIBUTE_NAME")),
+            data_type=str(row.get("DATATYPE") or ""),
+            encoding=_ENCODINGS.get(_int(row.get("COLUMN_ENCODING")), str(row.get("COLUMN_ENCODING"))),
+            dictionary_size=_int(row.get("DICTIONARY_SIZE")),
+            cardinality=_int(cardinality) if cardinality is not None else None,
+            is_row_number=bool(_flag(row.get("ISROWNUMBER"))) or str(row.get("ATTRIBUTE_NAME", "")).startswith("RowNumber-"),
+            is_resident=_flag(row.get("DICTIONARY_ISRESIDENT")),
+        )
+        columns[(table_id, column_id)] = column
+        table.columns.append(column)
+
+    tables_by_name = {table.name: table for table in tables.values()}
+    relationship_sizes: Dict[str, int] = {}
+    for row in dmvs.get("segments", []):
+        table_id, size = str(row.get("TABLE_ID") or ""), _int(row.get("USED_SIZE"))
+        prefix = table_id[:2]
+        if prefix == "H$":
+            # Attribute hierarchy of a column: "H$<table id>$<column id>"
+            column = columns.get(tuple(table_id[2:].rsplit("$", 1)))
+            if column is not None:
+                column.hierarchy_size += size
+        elif prefix == "R$":
+            relationship_sizes[table_id] = relationship_sizes.get(table_id, 0) + size
+            table = tables_by_name.get(row.get("DIMENSION_NAME"))
+            if table is not None:
+                table.relationship_size += size
+        elif prefix == "U$":
+            table = tables_by_name.get(row.get("DIMENSION_NAME"))
+            if table is not None:
+                table.user_hierarchy_size += size
+        else:
+            column = columns.get((table_id, str(row.get("COLUMN_ID"))))
+            if column is not None:
+                column.data_size += size
+                if _flag(row.get("ISRESIDENT")):
+                    column.is_resident = True
+
+    return tables, columns, relationship_sizes
+
+
+def _relationship_labels(dmvs: Dict[str, List[Dict[str, Any]]]) -> Dict[int, str]:
+    # "'From'[Column] -> 'To'[Column]" by relationship id, from the object ids in the storage ids
+    table_names, column_names = {}, {}
+    for row in dmvs.get("columns", []):
+        table_names[_object_id(row.get("TABLE_ID"))] = row.get("DIMENSION_NAME")
+        column_names[_object_id(row.get("COLUMN_ID"))] = row.get("ATTRIBUTE_NAME")
+
+    labels = {}
+    for row in dmvs.get("relationships", []):
+        from_table, to_table = table_names.get(_int(row.get("FromTableID"))), table_names.get(_int(row.get("ToTableID")))
+        from_column, to_column = column_names.get(_int(row.get("FromColumnID"))), column_names.get(_int(row.get("ToColumnID")))
+        if from_table and to_table:
+            labels[_int(row.get("ID"))] = f"'{from_table}'[{from_column}] -> '{to_table}'[{to_column}]"
+    return labels
+
+
+def _column_findings(column: ColumnMemory, table_rows: int) -> List[Dict[str, Any]]:
+    if column.is_row_number or column.total_size < FINDING_MIN_BYTES:
+        return []
+
+    findings = []
+    location = {"table": column.table, "column": column.column, "size_bytes": column.total_size}
+    if column.cardinality and table_rows >= NEARLY_UNIQUE_MIN_ROWS and column.cardinality >= NEARLY_UNIQUE_RATIO * table_rows:
+        findings.append({
+            **location,
+            "issue": "nearly_unique_column",
+            "detail": f"{column.cardinality:,} distinct values in {table_rows:,} rows compress poorly. "
+                      "Remove the column if it is not needed, or split or round it (e.g. date and time, fewer decimals).",
+        })
+    if column.dictionary_ratio >= DICTIONARY_HEAVY_RATIO:
+        findings.append({
+            **location,
+            "issue": "large_dictionary",
+            "detail": f"{column.dictionary_ratio:.0%} of the column size is its dictionary. "
+                      "Long or highly distinct text values are expensive; shorten, split or remove them.",
+        })
+    if column.encoding == "hash" and column.data_type.lower() in _NUMERIC_TYPES:
+        findings.append({
+            **location,
+            "issue": "hash_encoded_numeric_column",
+            "detail": "Numeric column with hash encoding. If it is not used for relationships or grouping, "
+                      "setting encodingHint to Value can save its dictionary.",
+        })
+    return findings
+
+
+def analyze_model_memory(dmvs: Dict[str, List[Dict[str, Any]]], top_n: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+    """
+    Compute the memory use of a model from its storage DMVs.
+
+    Args:
+        dmvs: DMV rows as returned by read_memory_dmvs
+        top_n: Number of tables, columns and relationships to list, largest first
+
+    Returns:
+        Dictionary with a summary, the largest tables, columns and
+        relationships, and findings on columns worth optimizing
+    """
+    tables, columns, relationship_sizes = _build_tables(dmvs)
+    model_size = sum(table.total_size for table in tables.values())
+    rows_by_table = {table.name: table.rows for table in tables.values()}
+
+    ranked_tables = sorted(tables.values(), key=lambda table: table.total_size, reverse=True)
+    ranked_columns = sorted((column for column in columns.values() if not column.is_row_number),
+                            key=lambda column: column.total_size, reverse=True)
+
+    labels = _relationship_labels(dmvs)
+    ranked_relationships = sorted(relationship_sizes.items(), key=lambda item: item[1], reverse=True)
+
+    findings = []
+    for column in ranked_columns:
+        findings.extend(_column_findings(column, rows_by_table.get(column.table, 0)))
+
+    not_resident = [f"'{column.table}'[{column.column}]" for column in ranked_columns if column.is_resident is False]
+    summary = {
+        "total_size_bytes": model_size,
+        "total_size_mb": round(model_size / (1024 * 1024), 2),
+        "table_count": len(tables),
+        "column_count": len(ranked_columns),
+        "relationship_size_bytes": sum(relationship_sizes.values()),
+        "dictionary_size_bytes": sum(column.dictionary_size for column in columns.values()),
+        "largest_table": ranked_tables[0].name if ranked_tables else None,
+        "top_columns_percent_of_model": _percent(sum(column.total_size for column in ranked_columns[:top_n]), model_size),
+    }
+    if not_resident:
+        summary["not_resident_column_count"] = len(not_resident)
+
+    return {
+        "summary": summary,
+        "tables": [table.to_dict(model_size) for table in ranked_tables[:top_n]],
+        "columns": [column.to_dict(model_size, rows_by_table.get(column.table, 0)) for column in ranked_columns[:top_n]],
+        "relationships": [
+            {
+                "relationship": labels.get(_object_id(storage_id), storage_id),
+                "size_bytes": size,
+                "percent_of_model": _percent(size, model_size),
+            }
+            for storage_id, size in ranked_relationships[:top_n]
+        ],
+        "findings": findings,
+        "dmv_query_count": len(MEMORY_DMV_QUERIES),
+    }
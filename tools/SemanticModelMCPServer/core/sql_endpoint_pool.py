@@ -0,0 +1,450 @@
+"""
+SQL Analytics Endpoint Connection Pool
+
+This module keeps opened ODBC connections to Fabric Lakehouse SQL Analytics
+Endpoints between tool calls, together with the lakehouse to endpoint
+resolution and the ODBC driver detection, which are the same for every query.
+
+Connections are keyed by (server, database, token identity). When the Azure
+token rotates, connections opened with the previous token are closed rather
+than reused. Query results are read with fetchmany and reading stops once the
+row budget is reached.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.lazy_imports import optional_import
+
+# ODBC drivers in order of preference
+PREFERRED_ODBC_DRIVERS = (
+    "ODBC Driver 18 for SQL Server",
+    "ODBC Driver 17 for SQL Server",
+    "SQL Server",
+)
+
+# SQL_COPT_SS_ACCESS_TOKEN, passes the Azure token in attrs_before
+SQL_COPT_SS_ACCESS_TOKEN = 1256
+
+# Close connections that have not been used for this long
+IDLE_TIMEOUT_SECONDS = 300
+# Close connections older than this even if they are in use regularly
+MAX_CONNECTION_LIFETIME_SECONDS = 45 * 60
+# Idle connections kept per (server, database, token identity)
+MAX_IDLE_CONNECTIONS_PER_KEY = 2
+# How long a resolved lakehouse SQL endpoint is reused
+ENDPOINT_CACHE_TTL_SECONDS = 30 * 60
+# Rows read per fetchmany call
+FETCH_BATCH_SIZE = 500
+
+PoolKey = Tuple[str, str, str]
+
+_driver_lock = threading.Lock()
+_detected_driver: Optional[Tuple[Optional[str], List[str]]] = None
+
+
+def detect_odbc_driver() -> Tuple[Optional[str], List[str]]:
+    """
+    Detect the preferred installed ODBC driver for SQL Server, once per process.
+
+    Returns:
+        Tuple of the driver name (None if no compatible driver is installed)
+        and all installed ODBC drivers
+    """
+    global _detected_driver
+    with _driver_lock:
+        if _detected_driver is None:
+            # pyodbc is imported on first use to keep server startup fast
+            pyodbc = optional_import("pyodbc")
+            installed = list(pyodbc.drivers()) if pyodbc is not None else []
+            driver = next((name for name in PREFERRED_ODBC_DRIVERS if name in installed), None)
+            # Only remember a successful detection, so installing a driver does not need a restart
+            if driver is None:
+                return None, installed
+            _detected_driver = (driver, installed)
+        return _detected_driver
+
+
+def build_sql_endpoint_connection_string(driver: str, server_name: str, database: str) -> str:
+    """
+    Build the ODBC connection string for a SQL Analytics Endpoint.
+
+    Args:
+        driver: ODBC driver name
+        server_name: SQL Analytics Endpoint server name
+        database: Database name, the lakehouse name
+
+    Returns:
+        ODBC connection string without credentials
+    """
+    return (
+        f"Driver={{{driver}}};"
+        f"Server={server_name};"
+        f"Database={database};"
+        f"Encrypt=yes;"
+        f"TrustServerCertificate=yes;"
+        f"Connection Timeout=30;"
+    )
+
+
+def get_token_identity(token_struct: bytes) -> str:
+    """
+    Get a short, non-reversible identity for a packed access token.
+
+    Args:
+        token_struct: Access token packed for SQL_COPT_SS_ACCESS_TOKEN
+
+    Returns:
+        First 16 hex characters of the token's SHA-256 digest
+    """
+    return hashlib.sha256(token_struct).hexdigest()[:16]
+
+
+def _open_odbc_connection(connection_string: str, token_struct: bytes) -> Any:
+    """Open an ODBC connection authenticated with the access token."""
+    pyodbc = optional_import("pyodbc")
+    if pyodbc is None:
+        raise ImportError("pyodbc is not installed. Please install it using: pip install pyodbc")
+    return pyodbc.connect(connection_string, attrs_before={SQL_COPT_SS_ACCESS_TOKEN: token_struct})
+
+
+def _close_connection(connection: Any) -> None:
+    """Close a connection, ignoring errors from already broken connections."""
+    try:
+        connection.close()
+    except Exception as e:
+        logging.debug(f"Error closing SQL endpoint connection: {e}")
+
+
+def fetch_limited(cursor: Any, max_rows: Optional[int], batch_size: int = FETCH_BATCH_SIZE) -> Tuple[List[Any], bool]:
+    """
+    Read up to max_rows rows from an executed cursor.
+
+    One row past the budget is read to tell whether the result was truncated;
+    the rest of the result set is not fetched.
+
+    Args:
+        cursor: Cursor with an executed query
+        max_rows: Maximum number of rows to return, None for no limit
+        batch_size: Rows read per fetchmany call
+
+    Returns:
+        Tuple of the rows read and whether more rows were available
+    """
+    rows: List[Any] = []
+    while max_rows is None or len(rows) <= max_rows:
+        wanted = batch_size if max_rows is None else min(batch_size, max_rows + 1 - len(rows))
+        batch = cursor.fetchmany(wanted)
+        if not batch:
+            break
+        rows.extend(batch)
+    if max_rows is not None and len(rows) > max_rows:
+        return rows[:max_rows], True
+    return rows, False
+
+
+@dataclass
+class PooledSqlConnection:
+    """An opened connection handed out by the pool."""
+
+    key: PoolKey
+    connection: Any
+    created_at: float
+    last_used_at: float
+    use_count: int = 0
+    reused: bool = False
+
+
+@dataclass
+class _PoolStats:
+    opened: int = 0
+    reused: int = 0
+    evicted_idle: int = 0
+    evicted_expired: int = 0
+    evicted_unhealthy: int = 0
+    evicted_token_rotated: int = 0
+    discarded_after_error: int = 0
+
+
+class SqlConnectionPool:
+    """Thread-safe pool of opened SQL Analytics Endpoint connections."""
+
+    def __init__(
+        self,
+        connection_factory: Callable[[str, bytes], Any] = _open_odbc_connection,
+        idle_timeout_seconds: float = IDLE_TIMEOUT_SECONDS,
+        max_lifetime_seconds: float = MAX_CONNECTION_LIFETIME_SECONDS,
+        max_idle_per_key: int = MAX_IDLE_CONNECTIONS_PER_KEY,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            connection_factory: Callable that opens a connection for a connection string and token
+            idle_timeout_seconds: Idle time after which a connection is closed
+            max_lifetime_seconds: Age after which a connection is closed
+            max_idle_per_key: Idle connections kept per pool key
+        """
+        self._connection_factory = connection_factory
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.max_idle_per_key = max_idle_per_key
+        self._idle: Dict[PoolKey, List[PooledSqlConnection]] = {}
+        self._in_use = 0
+        self._stats = _PoolStats()
+        self._lock = threading.Lock()
+
+    def acquire(self, driver: str, server_name: str, database: str, token_struct: bytes) -> PooledSqlConnection:
+        """
+        Get an opened connection for the endpoint database, reusing an idle one when possible.
+
+        Args:
+            driver: ODBC driver name
+            server_name: SQL Analytics Endpoint server name
+            database: Database name, the lakehouse name
+            token_struct: Current access token packed for SQL_COPT_SS_ACCESS_TOKEN
+
+        Returns:
+            PooledSqlConnection to hand back with release()
+        """
+        key = (server_name.lower(), database.lower(), get_token_identity(token_struct))
+        to_close: List[Any] = []
+        pooled = None
+        now = time.time()
+
+        with self._lock:
+            self._evict_locked(now, to_close, rotated_for=key)
+            idle = self._idle.get(key)
+            while idle:
+                candidate = idle.pop()
+                if self._is_healthy(candidate, now):
+                    pooled = candidate
+                    break
+                self._stats.evicted_unhealthy += 1
+                to_close.append(candidate.connection)
+            if idle is not None and not idle:
+                self._idle.pop(key, None)
+            if pooled is not None:
+                self._stats.reused += 1
+            self._in_use += 1
+
+        for connection in to_close:
+            _close_connection(connection)
+
+        if pooled is not None:
+            pooled.reused = True
+            pooled.use_count += 1
+            pooled.last_used_at = now
+            return pooled
+
+        try:
+            logging.debug(f"Opening SQL endpoint connection to {server_name}/{database} with driver: {driver}")
+            connection = self._connection_factory(
+                build_sql_endpoint_connection_string(driver, server_name, database), token_struct
+            )
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+        with self._lock:
+            self._stats.opened += 1
+        return PooledSqlConnection(key=key, connection=connection, created_at=now, last_used_at=now, use_count=1)
+
+    def release(self, pooled: PooledSqlConnection, healthy: bool = True) -> None:
+        """
+        Return a connection to the pool.
+
+        Args:
+            pooled: Connection returned by acquire()
+            healthy: False to close the connection instead of keeping it,
+                e.g. after a connection-level error
+        """
+        now = time.time()
+        to_close: List[Any] = []
+
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+            if not healthy:
+                self._stats.discarded_after_error += 1
+                to_close.append(pooled.connection)
+            elif not self._is_healthy(pooled, now):
+                self._stats.evicted_unhealthy += 1
+                to_close.append(pooled.connection)
+            else:
+                pooled.last_used_at = now
+                idle = self._idle.setdefault(pooled.key, [])
+                idle.append(pooled)
+                while len(idle) > self.max_idle_per_key:
+                    self._stats.evicted_idle += 1
+                    to_close.append(idle.pop(0).connection)
+            self._evict_locked(now, to_close)
+
+        for connection in to_close:
+            _close_connection(connection)
+
+    @contextmanager
+    def connection(self, driver: str, server_name: str, database: str, token_struct: bytes):
+        """
+        Context manager that acquires a connection and releases it afterwards.
+
+        The connection is closed instead of pooled if the block raises.
+
+        Yields:
+            PooledSqlConnection
+        """
+        pooled = self.acquire(driver, server_name, database, token_struct)
+        try:
+            yield pooled
+        except BaseException:
+            self.release(pooled, healthy=False)
+            raise
+        self.release(pooled)
+
+    def clear(self) -> int:
+        """
+        Close all idle connections.
+
+        Returns:
+            Number of connections closed
+        """
+        with self._lock:
+            to_close = [pooled.connection for idle in self._idle.values() for pooled in idle]
+            self._idle.clear()
+        for connection in to_close:
+            _close_connection(connection)
+        return len(to_close)
+
+    def get_status(self) -> dict:
+        """
+        Get the current status of the pool.
+
+        Returns:
+            Dictionary with idle connections per endpoint database, in-use count and counters
+        """
+        now = time.time()
+        with self._lock:
+            idle = [
+                {
+                    "server_name": key[0],
+                    "database": key[1],
+                    "token_identity": key[2],
+                    "idle_connections": len(connections),
+                    "oldest_connection_age_seconds": round(now - min(p.created_at for p in connections), 1),
+                }
+                for key, connections in self._idle.items()
+                if connections
+            ]
+            return {
+                "idle": idle,
+                "idle_connections": sum(entry["idle_connections"] for entry in idle),
+                "in_use_connections": self._in_use,
+                "idle_timeout_seconds": self.idle_timeout_seconds,
+                "max_lifetime_seconds": self.max_lifetime_seconds,
+                "stats": self._stats.__dict__.copy(),
+            }
+
+    def _is_healthy(self, pooled: PooledSqlConnection, now: float) -> bool:
+        """Check that a connection is open and within its lifetime."""
+        if now - pooled.created_at > self.max_lifetime_seconds:
+            return False
+        try:
+            return not getattr(pooled.connection, "closed", False)
+        except Exception:
+            return False
+
+    def _evict_locked(self, now: float, to_close: List[Any], rotated_for: Optional[PoolKey] = None) -> None:
+        """
+        Drop expired idle connections. Must be called with the lock held.
+
+        When rotated_for is given, idle connections for the same server and
+        database opened with a different token are dropped as well.
+        """
+        for key in list(self._idle):
+            kept = []
+            for pooled in self._idle[key]:
+                if rotated_for and key[:2] == rotated_for[:2] and key[2] != rotated_for[2]:
+                    self._stats.evicted_token_rotated += 1
+                    to_close.append(pooled.connection)
+                elif now - pooled.created_at > self.max_lifetime_seconds:
+                    self._stats.evicted_expired += 1
+                    to_close.append(pooled.connection)
+                elif now - pooled.last_used_at > self.idle_timeout_seconds:
+                    self._stats.evicted_idle += 1
+                    to_close.append(pooled.connection)
+                else:
+                    kept.append(pooled)
+            if kept:
+                self._idle[key] = kept
+            else:
+                del self._idle[key]
+
+
+class SqlEndpointCache:
+    """Thread-safe TTL cache of resolved lakehouse SQL endpoints."""
+
+    def __init__(self, ttl_seconds: float = ENDPOINT_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a resolved endpoint is reused
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[str, str], Tuple[Dict[str, Any], float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys(workspace_id: str, lakehouse_id: Optional[str], lakehouse_name: Optional[str]) -> List[Tuple[str, str]]:
+        workspace_key = workspace_id.strip().lower()
+        keys = []
+        if lakehouse_id:
+            keys.append((workspace_key, f"id:{lakehouse_id.strip().lower()}"))
+        if lakehouse_name:
+            keys.append((workspace_key, f"name:{lakehouse_name.strip().lower()}"))
+        return keys
+
+    def get(self, workspace_id: str, lakehouse_id: Optional[str] = None, lakehouse_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the resolved endpoint of a lakehouse, by id or by name.
+
+        Returns:
+            The connection information, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            for key in self._keys(workspace_id, lakehouse_id, lakehouse_name):
+                entry = self._entries.get(key)
+                if entry and now - entry[1] < self.ttl_seconds:
+                    return entry[0]
+        return None
+
+    def put(self, workspace_id: str, connection_info: Dict[str, Any]) -> None:
+        """Store a resolved endpoint under both the lakehouse id and name."""
+        keys = self._keys(workspace_id, connection_info.get("lakehouse_id"), connection_info.get("lakehouse_name"))
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                self._entries[key] = (connection_info, now)
+
+    def clear(self) -> int:
+        """
+        Drop all resolved endpoints.
+
+        Returns:
+            Number of cache keys dropped
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+
+# Shared pool and endpoint cache used by the lakehouse SQL tools
+sql_connection_pool = SqlConnectionPool()
+sql_endpoint_cache = SqlEndpointCache()
@@ -0,0 +1,348 @@
+"""
+TMSL Delta Deployment
+
+This module compares a submitted database definition with the current one and
+builds the smallest TMSL command set that turns one into the other: a
+sequence of create, alter and delete commands on tables, columns, measures,
+partitions, relationships and the other named model objects.
+
+A database level createOrReplace makes the service replace the whole model,
+which can reframe or reprocess every table and drops all caches even when only
+one measure was added. Commands on single objects leave untouched tables and
+their caches alone.
+
+Applying the delta has the same effect as replacing the database with the
+submitted definition: objects missing from it are deleted, and objects whose
+definition differs are altered with their complete submitted definition.
+Changes that cannot be expressed on single objects (database or model
+properties) fall back to a full createOrReplace.
+
+New columns, measures, hierarchies and partitions are created before existing
+ones are altered, and new columns after the new columns they sort by. Renames
+that only change the case of a name fall back to a full createOrReplace, since
+objects are matched by case-insensitive name.
+
+Deletes of columns and tables that the current model still
+references through a sort-by column, a hierarchy level or a relationship run
+after the objects referencing them were altered or deleted, since the service
+rejects deleting an object that is still referenced.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from core.tmsl_document import TmslDocument
+
+# Model collections handled per object, with their TMSL object type
+MODEL_COLLECTIONS: Dict[str, str] = {
+    "dataSources": "dataSource",
+    "expressions": "expression",
+    "tables": "table",
+    "relationships": "relationship",
+    "roles": "role",
+    "perspectives": "perspective",
+    "cultures": "culture",
+}
+
+# Table collections handled per object, with their TMSL object type
+TABLE_COLLECTIONS: Dict[str, str] = {
+    "columns": "column",
+    "partitions": "partition",
+    "measures": "measure",
+    "hierarchies": "hierarchy",
+}
+
+# Object types that nest child objects other than the table collections.
+# alter leaves children untouched, so these are replaced as a whole instead.
+_REPLACED_TYPES = {"hierarchy", "role", "perspective", "culture"}
+
+# Database properties that do not describe the model
+_IGNORED_DATABASE_PROPERTIES = {"name", "id"}
+
+# Deployment phases; a phase only references objects of earlier phases
+_PHASE_DELETE_DEPENDENTS = 0    # cultures, perspectives, roles, relationships
+_PHASE_DELETE_TABLE_OBJECTS = 1  # columns, measures, hierarchies, partitions
+_PHASE_DELETE_TABLES = 2
+_PHASE_SOURCES = 3               # data sources and shared expressions
+_PHASE_TABLES = 4
+# New table objects come before alters, which can make existing objects reference them
+_PHASE_CREATE_TABLE_OBJECTS = 5
+_PHASE_TABLE_OBJECTS = 6
+_PHASE_DEPENDENTS = 7
+# Deletes of objects that altered or deleted objects referenced until now
+_PHASE_DELETE_RELEASED_TABLE_OBJECTS = 8
+_PHASE_DELETE_RELEASED_TABLES = 9
+_PHASE_DELETE_SOURCES = 10
+
+# Key of an object others can reference: ("table", table) or ("column", table, column),
+# with lower-case names
+ObjectKey = Tuple[str, ...]
+
+
+@dataclass
+class TmslDelta:
+    """Commands that turn the current database into the submitted one."""
+
+    database_name: str
+    operations: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)
+    changes: List[str] = field(default_factory=list)
+    full_replace_reason: Optional[str] = None
+
+    @property
+    def is_empty(self) -> bool:
+        """True if the submitted definition matches the current one."""
+        return not self.operations and self.full_replace_reason is None
+
+    def add(self, phase: int, command: Dict[str, Any], change: str) -> None:
+        self.operations.append((phase, command))
+        self.changes.append(change)
+
+    def to_command(self) -> Dict[str, Any]:
+        """
+        Get the TMSL command for the delta.
+
+        Returns:
+            A sequence command with the operations in dependency order
+        """
+        ordered = [command for _, command in sorted(self.operations, key=lambda operation: operation[0])]
+        return {"sequence": {"operations": ordered}}
+
+
+def _name_key(item: dict) -> str:
+    # Analysis Services object names are case-insensitive
+    return str(item.get("name", "")).lower()
+
+
+def _by_name(items: Optional[List[dict]]) -> Dict[str, dict]:
+    return {_name_key(item): item for item in items or [] if isinstance(item, dict)}
+
+
+def _without(definition: dict, keys) -> dict:
+    return {key: value for key, value in definition.items() if key not in keys}
+
+
+def _label(object_type: str, name: str, table_name: Optional[str] = None) -> str:
+    if table_name:
+        return f"{object_type} '{table_name}'[{name}]"
+    return f"{object_type} '{name}'"
+
+
+def _released_references(current_model: dict, submitted_model: dict, current_tables: Dict[str, dict],
+                         submitted_tables: Dict[str, dict]) -> Set[ObjectKey]:
+    """
+    Find the objects that current objects stop referencing.
+
+    These are the sort-by columns, hierarchy level columns and relationship
+    columns and tables referenced by current objects that the submitted
+    definition alters or deletes.
+    """
+    released: Set[ObjectKey] = set()
+    for table_key, table in current_tables.items():
+        submitted_table = submitted_tables.get(table_key) or {}
+        submitted_columns = _by_name(submitted_table.get("columns"))
+        for key, column in _by_name(table.get("columns")).items():
+            sort_by = column.get("sortByColumn")
+            if sort_by and submitted_columns.get(key) != column:
+                released.add(("column", table_key, str(sort_by).lower()))
+        submitted_hierarchies = _by_name(submitted_table.get("hierarchies"))
+        for key, hierarchy in _by_name(table.get("hierarchies")).items():
+            if submitted_hierarchies.get(key) != hierarchy:
+                for level in hierarchy.get("levels") or []:
+                    if isinstance(level, dict) and level.get("column"):
+                        released.add(("column", table_key, str(level["column"]).lower()))
+
+    submitted_relationships = _by_name(submitted_model.get("relationships"))
+    for key, relationship in _by_name(current_model.get("relationships")).items():
+        if submitted_relationships.get(key) != relationship:
+            for side in ("from", "to"):
+                table_key = str(relationship.get(f"{side}Table", "")).lower()
+                released.add(("table", table_key))
+                released.add(("column", table_key, str(relationship.get(f"{side}Column", "")).lower()))
+    return released
+
+
+def _creation_order(items: List[dict]) -> List[dict]:
+    """Order new objects so that new columns follow the new columns they sort by."""
+    by_name = {_name_key(item): item for item in items}
+    ordered: List[dict] = []
+    visited: Set[str] = set()
+
+    def visit(item: dict) -> None:
+        key = _name_key(item)
+        if key in visited:
+            return
+        visited.add(key)
+        target = by_name.get(str(item.get("sortByColumn", "")).lower())
+        if target is not None:
+            visit(target)
+        ordered.append(item)
+
+    for item in items:
+        visit(item)
+    return ordered
+
+
+class _DeltaBuilder:
+    def __init__(self, database_name: str):
+        self.delta = TmslDelta(database_name=database_name)
+        # Objects whose deletes wait for their referencing objects
+        self.released: Set[ObjectKey] = set()
+
+    def _path(self, table_name: Optional[str] = None) -> Dict[str, str]:
+        path = {"database": self.delta.database_name}
+        if table_name:
+            path["table"] = table_name
+        return path
+
+    def create(self, phase: int, object_type: str, definition: dict, table_name: Optional[str] = None) -> None:
+        self.delta.add(
+            phase,
+            {"create": {"parentObject": self._path(table_name), object_type: definition}},
+            f"create {_label(object_type, definition.get('name'), table_name)}",
+        )
+
+    def alter(self, phase: int, object_type: str, name: str, definition: dict, table_name: Optional[str] = None) -> None:
+        command = "createOrReplace" if object_type in _REPLACED_TYPES else "alter"
+        self.delta.add(
+            phase,
+            {command: {"object": {**self._path(table_name), object_type: name}, object_type: definition}},
+            f"{command} {_label(object_type, name, table_name)}",
+        )
+
+    def delete(self, phase: int, object_type: str, name: str, table_name: Optional[str] = None) -> None:
+        self.delta.add(
+            phase,
+            {"delete": {"object": {**self._path(table_name), object_type: name}}},
+            f"delete {_label(object_type, name, table_name)}",
+        )
+
+    def renamed(self, object_type: str, current_name: Any, submitted_name: Any, table_name: Optional[str] = None) -> bool:
+        """Check for a rename that only changes case; it cannot be matched by name, so replace the database."""
+        if current_name == submitted_name:
+            return False
+        if self.delta.full_replace_reason is None:
+            self.delta.full_replace_reason = f"{_label(object_type, current_name, table_name)} was renamed to '{submitted_name}'"
+        return True
+
+    def diff_collection(self, object_type: str, current: Optional[List[dict]], submitted: Optional[List[dict]],
+                        phase: int, delete_phase: int, table_name: Optional[str] = None,
+                        create_phase: Optional[int] = None) -> None:
+        current_items, submitted_items = _by_name(current), _by_name(submitted)
+        for key, item in current_items.items():
+            if key not in submitted_items:
+                phase_of_delete = delete_phase
+                if table_name and (object_type, str(table_name).lower(), key) in self.released:
+                    # Wait until the objects referencing it were altered or deleted
+                    phase_of_delete = _PHASE_DELETE_RELEASED_TABLE_OBJECTS
+                self.delete(phase_of_delete, object_type, item.get("name"), table_name)
+        new_items = [item for key, item in submitted_items.items() if key not in current_items]
+        for item in _creation_order(new_items):
+            self.create(phase if create_phase is None else create_phase, object_type, item, table_name)
+        for key, item in submitted_items.items():
+            existing = current_items.get(key)
+            if existing is None or existing == item:
+                continue
+            if not self.renamed(object_type, existing.get("name"), item.get("name"), table_name):
+                self.alter(phase, object_type, existing.get("name"), item, table_name)
+
+    def diff_table(self, current: dict, submitted: dict) -> None:
+        name = current.get("name")
+        current_properties = _without(current, TABLE_COLLECTIONS)
+        submitted_properties = _without(submitted, TABLE_COLLECTIONS)
+        if current_properties != submitted_properties:
+            if "calculationGroup" in current_properties or "calculationGroup" in submitted_properties:
+                # Calculation items live inside the table definition, replace the whole table
+                self.delta.add(
+                    _PHASE_TABLES,
+                    {"createOrReplace": {"object": self._path(name), "table": submitted}},
+                    f"createOrReplace {_label('table', name)}",
+                )
+                return
+            self.alter(_PHASE_TABLES, "table", name, submitted_properties)
+
+        for collection, object_type in TABLE_COLLECTIONS.items():
+            self.diff_collection(
+                object_type, current.get(collection), submitted.get(collection),
+                _PHASE_TABLE_OBJECTS, _PHASE_DELETE_TABLE_OBJECTS, table_name=name,
+                create_phase=_PHASE_CREATE_TABLE_OBJECTS,
+            )
+
+
+def _collection_phases(object_type: str) -> Tuple[int, int]:
+    if object_type in ("dataSource", "expression"):
+        return _PHASE_SOURCES, _PHASE_DELETE_SOURCES
+    return _PHASE_DEPENDENTS, _PHASE_DELETE_DEPENDENTS
+
+
+def _database_and_tables(definition: Union[dict, TmslDocument]) -> Tuple[dict, Optional[Dict[str, dict]]]:
+    """The database definition and, for a parsed document, its table index."""
+    if isinstance(definition, TmslDocument):
+        return definition.database or {}, definition.tables
+    return definition, None
+
+
+def build_tmsl_delta(current_database: Union[dict, TmslDocument], submitted_database: Union[dict, TmslDocument],
+                     database_name: str) -> TmslDelta:
+    """
+    Build the commands that turn the current database into the submitted one.
+
+    Args:
+        current_database: Current database definition as serialized by TOM,
+            or its parsed document
+        submitted_database: Submitted database definition with a "model"
+            object, or its parsed document
+        database_name: Name of the database the commands target
+
+    Returns:
+        TmslDelta with the operations, or with full_replace_reason set if the
+        change needs a database level createOrReplace
+    """
+    builder = _DeltaBuilder(database_name)
+    delta = builder.delta
+    current_database, current_tables = _database_and_tables(current_database)
+    submitted_database, submitted_tables = _database_and_tables(submitted_database)
+
+    current_model = current_database.get("model")
+    submitted_model = submitted_database.get("model")
+    if not isinstance(current_model, dict) or not isinstance(submitted_model, dict):
+        delta.full_replace_reason = "the definition has no model object"
+        return delta
+
+    for key in set(current_database) | set(submitted_database):
+        if key in _IGNORED_DATABASE_PROPERTIES or key == "model":
+            continue
+        if key in submitted_database and current_database.get(key) != submitted_database[key]:
+            delta.full_replace_reason = f"database property '{key}' changed"
+            return delta
+
+    if _without(current_model, MODEL_COLLECTIONS) != _without(submitted_model, MODEL_COLLECTIONS):
+        delta.full_replace_reason = "model properties changed"
+        return delta
+
+    # Documents index their tables once; plain dictionaries are indexed here
+    if current_tables is None:
+        current_tables = _by_name(current_model.get("tables"))
+    if submitted_tables is None:
+        submitted_tables = _by_name(submitted_model.get("tables"))
+    builder.released = _released_references(current_model, submitted_model, current_tables, submitted_tables)
+    for key, table in current_tables.items():
+        if key not in submitted_tables:
+            phase = _PHASE_DELETE_RELEASED_TABLES if ("table", key) in builder.released else _PHASE_DELETE_TABLES
+            builder.delete(phase, "table", table.get("name"))
+    for key, table in submitted_tables.items():
+        existing = current_tables.get(key)
+        if existing is None:
+            builder.create(_PHASE_TABLES, "table", table)
+        elif existing != table and not builder.renamed("table", existing.get("name"), table.get("name")):
+            builder.diff_table(existing, table)
+
+    for collection, object_type in MODEL_COLLECTIONS.items():
+        if collection == "tables":
+            continue
+        phase, delete_phase = _collection_phases(object_type)
+        builder.diff_collection(object_type, current_model.get(collection), submitted_model.get(collection), phase, delete_phase)
+
+    if delta.full_replace_reason:
+        delta.operations.clear()
+        delta.changes.clear()
+    return delta
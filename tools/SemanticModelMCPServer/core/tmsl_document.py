@@ -0,0 +1,391 @@
+"""
+TMSL Documents
+
+This module parses a TMSL definition once into a document shared by
+validation, node counting, the Best Practice Analyzer and delta deployments.
+Each of them used to parse the JSON string again and walk the result on its
+own, which takes seconds per call on definitions of tens of megabytes.
+
+A document indexes the tables, columns, measures and partitions of its model
+by name on first use and counts the property names of the whole definition in
+a single walk. Recently parsed definitions are kept, so validating and then
+deploying or analyzing the same definition parses it once. Parsed documents
+are shared and must not be modified.
+
+Definitions can optionally be checked against a JSON Schema (requires the
+jsonschema package). The schema is compiled once and reused until its file
+changes.
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from core.lazy_imports import optional_import
+
+# Commands whose payload is the database or table definition
+TMSL_COMMANDS = ("createOrReplace", "create", "alter")
+
+DEFAULT_MAX_ENTRIES = 4
+# Total characters of the definitions kept parsed
+DEFAULT_MAX_CHARS = 200_000_000
+
+# Path of a JSON Schema that definitions are validated against, if set
+SCHEMA_PATH_ENV = "SEMANTIC_MODEL_MCP_TMSL_SCHEMA"
+MAX_SCHEMA_ERRORS = 20
+
+
+def clean_tmsl_text(tmsl_definition: str) -> str:
+    """
+    Undo common formatting issues of a TMSL string that is not valid JSON.
+
+    Handles Windows line endings, definitions wrapped in a JSON string and
+    escaped quotes, backslashes and newlines.
+
+    Args:
+        tmsl_definition: Raw TMSL JSON string
+
+    Returns:
+        Cleaned JSON string ready for parsing
+    """
+    cleaned = tmsl_definition.replace('\r\n', '\n').replace('\r', '\n').strip()
+    try:
+        json.loads(cleaned)
+        return cleaned
+    except json.JSONDecodeError:
+        pass
+
+    # A JSON string containing the definition
+    if cleaned.startswith('"') and cleaned.endswith('"'):
+        try:
+            decoded = json.loads(cleaned)
+            if isinstance(decoded, str):
+                cleaned = decoded
+        except json.JSONDecodeError:
+            cleaned = cleaned[1:-1]
+
+    cleaned = cleaned.replace('\\"', '"').replace('\\\\', '\\')
+    return cleaned.replace('\\n', '\n').replace('\\t', '\t')
+
+
+def _name_key(item: Any) -> str:
+    # Analysis Services object names are case-insensitive
+    return str(item.get("name", "")).lower()
+
+
+def _named(items: Any) -> List[dict]:
+    return [item for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+
+
+class TmslDocument:
+    """
+    A parsed TMSL definition with lazily built indexes.
+
+    Object indexes are keyed by lower-case names, like Analysis Services
+    resolves them. Child objects are keyed by (table, object) name pairs.
+
+    Attributes:
+        data: The parsed definition
+        text_length: Characters of the source text, 0 if parsed from a dictionary
+        cleaned: True if the text was only valid JSON after clean_tmsl_text
+    """
+
+    def __init__(self, data: Any, text_length: int = 0, cleaned: bool = False):
+        self.data = data
+        self.text_length = text_length
+        self.cleaned = cleaned
+        self._node_counts: Optional[Counter] = None
+        self._tables: Optional[Dict[str, dict]] = None
+        self._columns: Dict[Tuple[str, str], dict] = {}
+        self._measures: Dict[Tuple[str, str], dict] = {}
+        self._partitions: Dict[Tuple[str, str], dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def command_type(self) -> Optional[str]:
+        """The TMSL command at the root (createOrReplace, create or alter), if any."""
+        if isinstance(self.data, dict):
+            for command in TMSL_COMMANDS:
+                if isinstance(self.data.get(command), dict):
+                    return command
+        return None
+
+    @property
+    def command(self) -> Optional[dict]:
+        """The payload of the root command, if any."""
+        command_type = self.command_type
+        return self.data[command_type] if command_type else None
+
+    @property
+    def database(self) -> Optional[dict]:
+        """The database definition: the command's database, or the root if it has a model."""
+        command = self.command
+        if command is not None:
+            database = command.get("database")
+            return database if isinstance(database, dict) else None
+        if isinstance(self.data, dict) and isinstance(self.data.get("model"), dict):
+            return self.data
+        return None
+
+    @property
+    def model(self) -> Optional[dict]:
+        """The model object of the database definition, if any."""
+        database = self.database
+        model = database.get("model") if database is not None else None
+        return model if isinstance(model, dict) else None
+
+    @property
+    def single_table(self) -> Optional[dict]:
+        """The table definition of a single-table command, if this is one."""
+        command = self.command
+        table = command.get("table") if command is not None else None
+        return table if isinstance(table, dict) else None
+
+    @property
+    def node_counts(self) -> Counter:
+        """How often each property name occurs anywhere in the definition."""
+        if self._node_counts is None:
+            counts: Counter = Counter()
+            stack = [self.data]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, dict):
+                    counts.update(node.keys())
+                    stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+                elif isinstance(node, list):
+                    stack.extend(value for value in node if isinstance(value, (dict, list)))
+            self._node_counts = counts
+        return self._node_counts
+
+    def count_nodes(self, name: str) -> int:
+        """
+        Count the properties with a name anywhere in the definition.
+
+        Args:
+            name: Property name, e.g. "database" or "table"
+
+        Returns:
+            Number of occurrences
+        """
+        return self.node_counts[name]
+
+    def _build_indexes(self) -> None:
+        with self._lock:
+            if self._tables is not None:
+                return
+            tables: Dict[str, dict] = {}
+            model = self.model
+            for table in _named(model.get("tables")) if model is not None else []:
+                table_key = _name_key(table)
+                tables[table_key] = table
+                for collection, index in (("columns", self._columns), ("measures", self._measures),
+                                          ("partitions", self._partitions)):
+                    for item in _named(table.get(collection)):
+                        index[(table_key, _name_key(item))] = item
+            self._tables = tables
+
+    @property
+    def tables(self) -> Dict[str, dict]:
+        """Tables of the model by name."""
+        if self._tables is None:
+            self._build_indexes()
+        return self._tables
+
+    @property
+    def columns(self) -> Dict[Tuple[str, str], dict]:
+        """Columns of the model by table and column name."""
+        if self._tables is None:
+            self._build_indexes()
+        return self._columns
+
+    @property
+    def measures(self) -> Dict[Tuple[str, str], dict]:
+        """Measures of the model by table and measure name."""
+        if self._tables is None:
+            self._build_indexes()
+        return self._measures
+
+    @property
+    def partitions(self) -> Dict[Tuple[str, str], dict]:
+        """Partitions of the model by table and partition name."""
+        if self._tables is None:
+            self._build_indexes()
+        return self._partitions
+
+    def get_table(self, name: str) -> Optional[dict]:
+        """Look up a table by name, ignoring case."""
+        return self.tables.get(name.lower())
+
+    def get_column(self, table_name: str, column_name: str) -> Optional[dict]:
+        """Look up a column by table and column name, ignoring case."""
+        return self.columns.get((table_name.lower(), column_name.lower()))
+
+    def get_measure(self, table_name: str, measure_name: str) -> Optional[dict]:
+        """Look up a measure by table and measure name, ignoring case."""
+        return self.measures.get((table_name.lower(), measure_name.lower()))
+
+    def get_partition(self, table_name: str, partition_name: str) -> Optional[dict]:
+        """Look up a partition by table and partition name, ignoring case."""
+        return self.partitions.get((table_name.lower(), partition_name.lower()))
+
+
+@dataclass
+class _CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class TmslDocumentCache:
+    """Thread-safe LRU cache of documents parsed from TMSL strings."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_chars: int = DEFAULT_MAX_CHARS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached documents
+            max_chars: Maximum total characters of the cached definitions
+        """
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries: "OrderedDict[str, TmslDocument]" = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self._stats = _CacheStats()
+
+    def get(self, text: str) -> Optional[TmslDocument]:
+        with self._lock:
+            document = self._entries.get(text)
+            if document is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(text)
+            self._stats.hits += 1
+            return document
+
+    def put(self, text: str, document: TmslDocument) -> None:
+        if len(text) > self.max_chars:
+            return
+        with self._lock:
+            if text in self._entries:
+                self._chars -= len(text)
+            self._entries[text] = document
+            self._entries.move_to_end(text)
+            self._chars += len(text)
+            while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+                evicted, _ = self._entries.popitem(last=False)
+                self._chars -= len(evicted)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._chars = 0
+            return count
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "cached_chars": self._chars,
+                "max_chars": self.max_chars,
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+            }
+
+
+tmsl_document_cache = TmslDocumentCache()
+
+
+def parse_tmsl(source: Union[str, dict, TmslDocument], lenient: bool = False) -> TmslDocument:
+    """
+    Parse a TMSL definition, reusing the document of a recent identical string.
+
+    Args:
+        source: TMSL JSON string, parsed dictionary or document
+        lenient: Retry with clean_tmsl_text if the string is not valid JSON
+
+    Returns:
+        The document; shared between callers, so it must not be modified
+
+    Raises:
+        json.JSONDecodeError: If the string is not valid JSON, even after
+            cleaning when lenient
+    """
+    if isinstance(source, TmslDocument):
+        return source
+    if not isinstance(source, str):
+        return TmslDocument(source)
+
+    document = tmsl_document_cache.get(source)
+    if document is not None and (lenient or not document.cleaned):
+        return document
+
+    try:
+        document = TmslDocument(json.loads(source), len(source))
+    except json.JSONDecodeError:
+        if not lenient:
+            raise
+        document = TmslDocument(json.loads(clean_tmsl_text(source)), len(source), cleaned=True)
+    tmsl_document_cache.put(source, document)
+    return document
+
+
+_validators: Dict[Tuple[str, float], Any] = {}
+_validators_lock = threading.Lock()
+
+
+def _compiled_validator(schema_path: str) -> Any:
+    """Compile the schema at a path once per version of the file."""
+    jsonschema = optional_import("jsonschema")
+    if jsonschema is None:
+        return None
+    key = (os.path.abspath(schema_path), os.path.getmtime(schema_path))
+    with _validators_lock:
+        validator = _validators.get(key)
+        if validator is None:
+            with open(schema_path, "r", encoding="utf-8") as file:
+                schema = json.load(file)
+            validator_class = jsonschema.validators.validator_for(schema)
+            validator_class.check_schema(schema)
+            validator = validator_class(schema)
+            # Drop validators compiled from earlier versions of the file
+            for stale in [stale for stale in _validators if stale[0] == key[0]]:
+                del _validators[stale]
+            _validators[key] = validator
+        return validator
+
+
+def validate_schema(document: TmslDocument, schema_path: Optional[str] = None) -> Optional[List[str]]:
+    """
+    Validate a document against a JSON Schema.
+
+    Args:
+        document: The parsed definition
+        schema_path: Path of the schema; defaults to the
+            SEMANTIC_MODEL_MCP_TMSL_SCHEMA environment variable
+
+    Returns:
+        Messages of up to MAX_SCHEMA_ERRORS violations, or None if no schema
+        is configured or jsonschema is not installed
+    """
+    schema_path = schema_path or os.environ.get(SCHEMA_PATH_ENV)
+    if not schema_path:
+        return None
+    validator = _compiled_validator(schema_path)
+    if validator is None:
+        logging.debug(f"jsonschema is not installed, skipping validation against {schema_path}")
+        return None
+
+    messages = []
+    for error in validator.iter_errors(document.data):
+        location = "/".join(str(part) for part in error.absolute_path) or "(root)"
+        messages.append(f"{location}: {error.message}")
+        if len(messages) >= MAX_SCHEMA_ERRORS:
+            break
+    return messages
@@ -0,0 +1,359 @@
+"""
+XMLA Connection Pool
+
+This module keeps opened ADOMD.NET connections to Power BI XMLA endpoints
+between tool calls. Opening a powerbi:// connection costs 1-3 seconds, so
+reusing it lets chains of DAX queries run at query speed.
+
+Connections are keyed by (workspace, dataset, token identity). When the access
+token rotates, connections opened with the previous token are closed rather
+than reused.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.dotnet_loader import ADOMD_ASSEMBLIES, load_assemblies
+
+# Close connections that have not been used for this long
+IDLE_TIMEOUT_SECONDS = 300
+# Close connections older than this even if they are in use regularly
+MAX_CONNECTION_LIFETIME_SECONDS = 45 * 60
+# Idle connections kept per (workspace, dataset, token identity)
+MAX_IDLE_CONNECTIONS_PER_KEY = 2
+
+# System.Data.ConnectionState.Open
+_CONNECTION_STATE_OPEN = 1
+
+PoolKey = Tuple[str, str, str]
+
+
+def build_xmla_connection_string(workspace_name: str, access_token: str, dataset_name: Optional[str] = None) -> str:
+    """
+    Build the connection string for a Power BI XMLA endpoint.
+
+    Args:
+        workspace_name: The Power BI workspace name
+        access_token: Access token used as the connection password
+        dataset_name: Optional dataset name used as the catalog
+
+    Returns:
+        XMLA connection string
+    """
+    workspace_name_encoded = urllib.parse.quote(workspace_name)
+    connection_string = f"Data Source=powerbi://api.powerbi.com/v1.0/myorg/{workspace_name_encoded};Password={access_token}"
+    if dataset_name:
+        connection_string += f";Catalog={dataset_name};"
+    return connection_string
+
+
+def get_token_identity(access_token: str) -> str:
+    """
+    Get a short, non-reversible identity for an access token.
+
+    Args:
+        access_token: The access token
+
+    Returns:
+        First 16 hex characters of the token's SHA-256 digest
+    """
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()[:16]
+
+
+def _open_adomd_connection(connection_string: str) -> Any:
+    """Open an ADOMD.NET connection."""
+    load_assemblies(ADOMD_ASSEMBLIES)
+    from Microsoft.AnalysisServices.AdomdClient import AdomdConnection  # type: ignore
+
+    connection = AdomdConnection(connection_string)
+    connection.Open()
+    return connection
+
+
+def _close_connection(connection: Any) -> None:
+    """Close a connection, ignoring errors from already broken connections."""
+    try:
+        connection.Close()
+    except Exception as e:
+        logging.debug(f"Error closing XMLA connection: {e}")
+
+
+@dataclass
+class PooledConnection:
+    """An opened connection handed out by the pool."""
+
+    key: PoolKey
+    connection: Any
+    created_at: float
+    last_used_at: float
+    use_count: int = 0
+    reused: bool = False
+
+
+@dataclass
+class _PoolStats:
+    opened: int = 0
+    reused: int = 0
+    evicted_idle: int = 0
+    evicted_expired: int = 0
+    evicted_unhealthy: int = 0
+    evicted_token_rotated: int = 0
+    discarded_after_error: int = 0
+
+
+class XmlaConnectionPool:
+    """Thread-safe pool of opened XMLA connections."""
+
+    def __init__(
+        self,
+        connection_factory: Callable[[str], Any] = _open_adomd_connection,
+        idle_timeout_seconds: float = IDLE_TIMEOUT_SECONDS,
+        max_lifetime_seconds: float = MAX_CONNECTION_LIFETIME_SECONDS,
+        max_idle_per_key: int = MAX_IDLE_CONNECTIONS_PER_KEY,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            connection_factory: Callable that opens a connection for a connection string
+            idle_timeout_seconds: Idle time after which a connection is closed
+            max_lifetime_seconds: Age after which a connection is closed
+            max_idle_per_key: Idle connections kept per pool key
+        """
+        self._connection_factory = connection_factory
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_lifetime_seconds = max_lifetime_seconds
+        self.max_idle_per_key = max_idle_per_key
+        self._idle: Dict[PoolKey, List[PooledConnection]] = {}
+        self._in_use = 0
+        self._stats = _PoolStats()
+        self._lock = threading.Lock()
+
+    def acquire(self, workspace_name: str, dataset_name: str, access_token: str) -> PooledConnection:
+        """
+        Get an opened connection for the dataset, reusing an idle one when possible.
+
+        Args:
+            workspace_name: The Power BI workspace name
+            dataset_name: The dataset name
+            access_token: Current access token
+
+        Returns:
+            PooledConnection to hand back with release()
+        """
+        key = (workspace_name, dataset_name, get_token_identity(access_token))
+        to_close: List[Any] = []
+        pooled = None
+        now = time.time()
+
+        with self._lock:
+            self._evict_locked(now, to_close, rotated_for=key)
+            idle = self._idle.get(key)
+            while idle:
+                candidate = idle.pop()
+                if self._is_healthy(candidate, now):
+                    pooled = candidate
+                    break
+                self._stats.evicted_unhealthy += 1
+                to_close.append(candidate.connection)
+            if idle is not None and not idle:
+                self._idle.pop(key, None)
+            if pooled is not None:
+                self._stats.reused += 1
+            self._in_use += 1
+
+        for connection in to_close:
+            _close_connection(connection)
+
+        if pooled is not None:
+            pooled.reused = True
+            pooled.use_count += 1
+            pooled.last_used_at = now
+            return pooled
+
+        try:
+            connection = self._connection_factory(
+                build_xmla_connection_string(workspace_name, access_token, dataset_name)
+            )
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+        with self._lock:
+            self._stats.opened += 1
+        return PooledConnection(key=key, connection=connection, created_at=now, last_used_at=now, use_count=1)
+
+    def release(self, pooled: PooledConnection, healthy: bool = True) -> None:
+        """
+        Return a connection to the pool.
+
+        Args:
+            pooled: Connection returned by acquire()
+            healthy: False to close the connection instead of keeping it,
+                e.g. after a connection-level error
+        """
+        now = time.time()
+        to_close: List[Any] = []
+
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+            if not healthy:
+                self._stats.discarded_after_error += 1
+                to_close.append(pooled.connection)
+            elif not self._is_healthy(pooled, now):
+                self._stats.evicted_unhealthy += 1
+                to_close.append(pooled.connection)
+            else:
+                pooled.last_used_at = now
+                idle = self._idle.setdefault(pooled.key, [])
+                idle.append(pooled)
+                while len(idle) > self.max_idle_per_key:
+                    self._stats.evicted_idle += 1
+                    to_close.append(idle.pop(0).connection)
+            self._evict_locked(now, to_close)
+
+        for connection in to_close:
+            _close_connection(connection)
+
+    @contextmanager
+    def connection(self, workspace_name: str, dataset_name: str, access_token: str):
+        """
+        Context manager that acquires a connection and releases it afterwards.
+
+        The connection is closed instead of pooled if the block raises.
+
+        Yields:
+            PooledConnection
+        """
+        pooled = self.acquire(workspace_name, dataset_name, access_token)
+        try:
+            yield pooled
+        except BaseException:
+            self.release(pooled, healthy=False)
+            raise
+        self.release(pooled)
+
+    def evict_idle(self) -> int:
+        """
+        Close idle connections past their idle timeout or lifetime.
+
+        Returns:
+            Number of connections closed
+        """
+        to_close: List[Any] = []
+        with self._lock:
+            self._evict_locked(time.time(), to_close)
+        for connection in to_close:
+            _close_connection(connection)
+        return len(to_close)
+
+    def clear(self) -> int:
+        """
+        Close all idle connections.
+
+        Returns:
+            Number of connections closed
+        """
+        with self._lock:
+            to_close = [pooled.connection for idle in self._idle.values() for pooled in idle]
+            self._idle.clear()
+        for connection in to_close:
+            _close_connection(connection)
+        return len(to_close)
+
+    def get_status(self) -> dict:
+        """
+        Get the current status of the pool.
+
+        Returns:
+            Dictionary with idle connections per dataset, in-use count and counters
+        """
+        now = time.time()
+        with self._lock:
+            idle = [
+                {
+                    "workspace_name": key[0],
+                    "dataset_name": key[1],
+                    "token_identity": key[2],
+                    "idle_connections": len(connections),
+                    "oldest_connection_age_seconds": round(now - min(p.created_at for p in connections), 1),
+                }
+                for key, connections in self._idle.items()
+                if connections
+            ]
+            return {
+                "idle": idle,
+                "idle_connections": sum(entry["idle_connections"] for entry in idle),
+                "in_use_connections": self._in_use,
+                "idle_timeout_seconds": self.idle_timeout_seconds,
+                "max_lifetime_seconds": self.max_lifetime_seconds,
+                "stats": self._stats.__dict__.copy(),
+            }
+
+    def _is_healthy(self, pooled: PooledConnection, now: float) -> bool:
+        """Check that a connection is open and within its lifetime."""
+        if now - pooled.created_at > self.max_lifetime_seconds:
+            return False
+        try:
+            return int(pooled.connection.State) == _CONNECTION_STATE_OPEN
+        except Exception:
+            return False
+
+    def _evict_locked(self, now: float, to_close: List[Any], rotated_for: Optional[PoolKey] = None) -> None:
+        """
+        Drop expired idle connections. Must be called with the lock held.
+
+        When rotated_for is given, idle connections for the same workspace and
+        dataset opened with a different token are dropped as well.
+        """
+        for key in list(self._idle):
+            kept = []
+            for pooled in self._idle[key]:
+                if rotated_for and key[:2] == rotated_for[:2] and key[2] != rotated_for[2]:
+                    self._stats.evicted_token_rotated += 1
+                    to_close.append(pooled.connection)
+                elif now - pooled.created_at > self.max_lifetime_seconds:
+                    self._stats.evicted_expired += 1
+                    to_close.append(pooled.connection)
+                elif now - pooled.last_used_at > self.idle_timeout_seconds:
+                    self._stats.evicted_idle += 1
+                    to_close.append(pooled.connection)
+                else:
+                    kept.append(pooled)
+            if kept:
+                self._idle[key] = kept
+            else:
+                del self._idle[key]
+
+
+# Shared pool used by the XMLA tools
+xmla_connection_pool = XmlaConnectionPool()
+
+
+def get_xmla_pool_status() -> dict:
+    """
+    Get the status of the shared XMLA connection pool.
+
+    Returns:
+        Dictionary containing pool status information
+    """
+    return xmla_connection_pool.get_status()
+
+
+def clear_xmla_connection_pool() -> int:
+    """
+    Close all idle connections in the shared XMLA connection pool.
+
+    Returns:
+        Number of connections closed
+    """
+    closed = xmla_connection_pool.clear()
+    logging.debug(f"XMLA connection pool cleared, closed {closed} connections")
+    return closed
@@ -74,7 +74,7 @@ def register_prompts(mcp):
     @mcp.prompt
     def model_performance_analysis() -> str:
         """Analyze model performance and suggest optimizations"""
-        return "Can you analyze my semantic model for performance issues? Look at the DAX measures, table structures, and relationships to suggest optimizations."
+        return "Can you analyze my semantic model for performance issues? Analyze the model memory to find the largest tables and columns, look at the DAX measures, table structures, and relationships, and suggest optimizations."
 
     # 🆕 Best Practice Analyzer (BPA) prompts
     @mcp.prompt
@@ -1,17 +1,34 @@
 from fastmcp import FastMCP
 import logging
-import clr
 import os
 import json
 import sys
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
 from core.auth import get_access_token
 from core.azure_token_manager import get_cached_azure_token, clear_token_cache
 from core.bpa_service import BPAService
-from tools.fabric_metadata import list_workspaces, list_datasets, get_workspace_id, list_notebooks, list_delta_tables, list_lakehouses, list_lakehouse_files, get_lakehouse_sql_connection_string as fabric_get_lakehouse_sql_connection_string
+from core.dotnet_loader import ADOMD_ASSEMBLIES, TOM_ASSEMBLIES, load_assemblies
+from core.lazy_imports import optional_import
+from core.dax_result_reader import DaxResult, read_dax_result, DEFAULT_MAX_ROWS, DEFAULT_MAX_BYTES, OUTPUT_FORMATS
+from core.dax_query_cache import dax_query_cache, query_cache_state
+from core.dax_batch import BatchQuery, BatchQueryResult, DEFAULT_MAX_CONCURRENCY, MAX_BATCH_QUERIES, pooled_runner, run_batch
+from core.tmsl_delta import build_tmsl_delta
+from core.tmsl_document import TmslDocument, parse_tmsl
+from core.column_profiler import DEFAULT_TOP_VALUES, DEFAULT_TOP_VALUES_MAX_DISTINCT, profile_tables
+from core.local_powerbi_session import read_model_metadata
+from core.model_memory import DEFAULT_TOP_N, analyze_model_memory as compute_model_memory, read_memory_dmvs
+from core.job_manager import dataset_job_key, start_tool_job
+from core.model_definition_cache import model_definition_cache, get_cached_model_definition, extract_model_subtree
+from core.xmla_connection_pool import xmla_connection_pool, get_token_identity, get_xmla_pool_status, clear_xmla_connection_pool as clear_xmla_pool
+from core.sql_endpoint_pool import detect_odbc_driver, fetch_limited, sql_connection_pool, sql_endpoint_cache, PREFERRED_ODBC_DRIVERS
+from core.fabric_http import fabric_name_cache
+from core.lakehouse_schema_cache import LakehouseSchemaSnapshot, build_columns_queries, lakehouse_schema_cache, SYSTEM_SCHEMAS, TABLES_PER_QUERY
+from tools.fabric_metadata import list_workspaces, list_datasets, get_workspace_id, list_notebooks, list_delta_tables, list_lakehouses, list_lakehouse_files, get_lakehouse_sql_connection_string as fabric_get_lakehouse_sql_connection_string, resolve_lakehouse_sql_endpoint
 from tools.bpa_tools import register_bpa_tools
 from tools.powerbi_desktop_tools import register_powerbi_desktop_tools
 from tools.microsoft_learn_tools import register_microsoft_learn_tools
+from tools.job_tools import register_job_tools
+from tools.dax_benchmark_tools import register_dax_benchmark_tools
 import urllib.parse
 from src.helper import count_nodes_with_name
 from src.tmsl_validator import validate_tmsl_structure
@@ -20,12 +37,6 @@ from datetime import datetime, timedelta
 from prompts import register_prompts
 from __version__ import __version__, __description__
 
-# Try to import pyodbc - it's needed for SQL Analytics Endpoint queries
-try:
-    import pyodbc
-except ImportError:
-    pyodbc = None
-
 mcp = FastMCP(
     name="Semantic Model MCP Server", 
     instructions="""
@@ -39,8 +50,18 @@ mcp = FastMCP(
     - List Fabric Delta Tables
     - List Fabric Data Pipelines
     - Get Power BI Workspace ID
-    - Get Model Definition
-    - Execute DAX Queries
+    - Get Model Definition (cached, optionally a subtree such as tables or measures)
+    - Execute DAX Queries (pooled XMLA connections)
+    - Execute DAX Queries in a Batch (execute_dax_queries_batch: many small queries combined into
+      multi-EVALUATE requests and run concurrently; prefer it over repeated execute_dax_query calls)
+    - Get / Clear XMLA Connection Pool
+    - Get / Clear DAX Query Cache
+    - Profile Columns (profile_columns: row, distinct and blank counts, min/max and top values of every column
+      of chosen tables in two server-side requests, optionally over a sample of huge tables)
+    - Analyze Model Memory (table and column sizes, cardinality, encoding from the storage DMVs)
+    - Benchmark DAX Queries (YAML suite, cold/warm cache runs, percentiles, baseline regressions)
+    - Background Jobs: pass run_async=True to get_model_definition, execute_dax_query, update_model_using_tmsl,
+      analyze_model_memory or the BPA tools, then poll get_job_status / list_jobs, or cancel_job
     - Update Model using TMSL (Enhanced with Validation)
     - Generate DirectLake TMSL Template (NEW)
     - Validate TMSL Structure (Built into update tool)
@@ -105,6 +126,9 @@ mcp = FastMCP(
     
     When users ask questions about these topics, ALWAYS search Microsoft Learn first to provide the most 
     current and authoritative Microsoft documentation before giving general advice.
+    Learn responses are cached locally and frequently used pages can be searched offline
+    (`build_learn_offline_index`, `get_learn_cache_status`, `clear_learn_cache`); a result marked
+    `"cache": {"status": "stale"}` came from the cache because Microsoft Learn could not be reached.
 
     ## Usage:
     - You can ask questions about Power BI workspaces, datasets, notebooks, and models.
@@ -570,6 +594,8 @@ mcp = FastMCP(
     - `explore_local_powerbi_columns` - List columns in local models (all or specific table)
     - `explore_local_powerbi_measures` - List measures with DAX expressions
     - `execute_local_powerbi_dax` - Execute DAX queries against local models
+    - `profile_local_powerbi_columns` - Profile all columns of local tables with server-side DAX aggregates
+    - `get_local_powerbi_session_status` / `clear_local_powerbi_sessions` - Inspect or close the shared local sessions
     
     **Key Features:**
     - **Process Detection**: Automatically find running Power BI Desktop processes
@@ -579,6 +605,7 @@ mcp = FastMCP(
     - **Connection Testing**: Validate connectivity to local instances
     - **Model Exploration**: List tables, columns, and measures in local models
     - **DAX Execution**: Run DAX queries against local instances without authentication
+    - **Shared Sessions**: One connection per local instance; model metadata is read in one round trip and cached until the model changes
     
     **Use Cases:**
     - **Local Development**: Connect to models being developed in Power BI Desktop
@@ -724,29 +751,114 @@ def get_azure_token_status() -> str:
     return json.dumps(status, indent=2)
 
 @mcp.tool
-def execute_dax_query(workspace_name:str, dataset_name: str, dax_query: str, dataset_id: str = None) -> list[dict]:
+def get_xmla_connection_pool_status() -> str:
+    """Gets the current status of the XMLA connection pool used by execute_dax_query.
+    Shows idle connections per dataset, connections in use, and reuse/eviction counters.
+    """
+    return json.dumps(get_xmla_pool_status(), indent=2)
+
+@mcp.tool
+def clear_xmla_connection_pool() -> str:
+    """Closes all idle pooled XMLA connections.
+    Useful after permission changes or for forcing fresh connections to a dataset.
+    """
+    closed = clear_xmla_pool()
+    return f"XMLA connection pool cleared successfully. Closed {closed} idle connections."
+
+@mcp.tool
+def get_fabric_metadata_cache_status() -> str:
+    """Gets the current status of the workspace and item name to ID cache used by the Fabric metadata tools.
+    Shows cached IDs per kind (workspace, dataset, lakehouse) and hit/miss counters.
+    """
+    return json.dumps(fabric_name_cache.get_status(), indent=2)
+
+@mcp.tool
+def clear_fabric_metadata_cache() -> str:
+    """Forgets all cached workspace and item name to ID lookups.
+    Useful after workspaces or lakehouses were renamed or recreated.
+    """
+    cleared = fabric_name_cache.clear()
+    return f"Fabric metadata cache cleared successfully. Forgot {cleared} cached name lookups."
+
+@mcp.tool
+def get_sql_connection_pool_status() -> str:
+    """Gets the current status of the SQL Analytics Endpoint connection pool used by the lakehouse SQL tools.
+    Shows idle connections per endpoint database, connections in use, and reuse/eviction counters.
+    """
+    return json.dumps(sql_connection_pool.get_status(), indent=2)
+
+@mcp.tool
+def clear_sql_connection_pool() -> str:
+    """Closes all idle pooled SQL Analytics Endpoint connections and forgets resolved lakehouse endpoints and cached table schemas.
+    Useful after permission changes or when a lakehouse's SQL endpoint was recreated.
+    """
+    closed = sql_connection_pool.clear()
+    forgotten = sql_endpoint_cache.clear()
+    schemas = lakehouse_schema_cache.clear()
+    return f"SQL connection pool cleared successfully. Closed {closed} idle connections, forgot {forgotten} cached endpoint lookups and {schemas} cached lakehouse schemas."
+
+@mcp.tool
+def get_dax_query_cache_status() -> str:
+    """Gets the current status of the DAX query result cache used by execute_dax_query.
+    Shows cached results per dataset, approximate size, and hit/miss/eviction counters.
+    """
+    return json.dumps(dax_query_cache.get_status(), indent=2)
+
+@mcp.tool
+def clear_dax_query_cache(workspace_name: str = None, dataset_name: str = None) -> str:
+    """Clears cached DAX query results.
+    If workspace_name and dataset_name are given, only that dataset's results are cleared.
+    """
+    if workspace_name and dataset_name:
+        cleared = dax_query_cache.invalidate(workspace_name, dataset_name)
+        return f"Cleared {cleared} cached DAX results for dataset '{dataset_name}' in workspace '{workspace_name}'."
+    cleared = dax_query_cache.clear()
+    return f"DAX query cache cleared successfully. Cleared {cleared} cached results."
+
+@mcp.tool
+def execute_dax_query(workspace_name:str, dataset_name: str, dax_query: str, dataset_id: str = None, max_rows: int = DEFAULT_MAX_ROWS, max_bytes: int = DEFAULT_MAX_BYTES, output_format: str = "rows", use_cache: bool = True, run_async: bool = False) -> list[dict] | dict:
     """Executes a DAX query against the Power BI model.
     This tool connects to the specified Power BI workspace and dataset name, executes the provided DAX query,
     Use the dataset_name to specify the model to query and NOT the dataset ID.
     The function connects to the Power BI service using an access token, executes the DAX query,
     and returns the results.
+
+    Results are limited to max_rows rows (default 10,000) and roughly max_bytes bytes (default 16 MB).
+    output_format controls the shape of the result:
+    - "rows" (default): list of row dictionaries, without truncation metadata. Use one of
+      the other formats to find out whether a limit was hit.
+    - "columnar": {"columns": [...], "data": [[column values], ...]} plus truncation metadata
+    - "csv": {"columns": [...], "csv": "..."} plus truncation metadata
+    - "arrow": {"columns": [...], "arrow_ipc_base64": "..."} plus truncation metadata (requires pyarrow)
+
+    Results are cached per dataset and its last refresh/schema update time, so repeating a query
+    returns the cached result until the dataset is refreshed or updated. Set use_cache=False to
+    always run the query.
+
+    Set run_async=True for long queries: the tool returns a job_id right away and the result
+    is read with get_job_status.
     """  
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    dotnet_dir = os.path.join(script_dir, "dotnet")
-    
-    print(f"Using .NET assemblies from: {dotnet_dir}")
-    
+    if run_async:
+        return start_tool_job(
+            "execute_dax_query",
+            lambda: _execute_dax_query(workspace_name, dataset_name, dax_query, max_rows, max_bytes, output_format, use_cache),
+            description=f"{workspace_name}/{dataset_name}"
+        )
+    return _execute_dax_query(workspace_name, dataset_name, dax_query, max_rows, max_bytes, output_format, use_cache)
+
+
+def _execute_dax_query(workspace_name: str, dataset_name: str, dax_query: str, max_rows: int, max_bytes: int, output_format: str, use_cache: bool) -> list[dict] | dict:
+    """Runs execute_dax_query; also called by its background jobs."""
+    if output_format not in OUTPUT_FORMATS:
+        return [{"error": f"Unsupported output format: {output_format}. Supported: {list(OUTPUT_FORMATS)}", "error_type": "parameter_error"}]
+
     try:
-        #clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.dll"))
-        clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.Tabular.dll"))
-        clr.AddReference(os.path.join(dotnet_dir, "Microsoft.Identity.Client.dll"))
-        clr.AddReference(os.path.join(dotnet_dir, "Microsoft.IdentityModel.Abstractions.dll"))
-        clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
+        load_assemblies(ADOMD_ASSEMBLIES)
     except Exception as e:
         return [{"error": f"Failed to load required .NET assemblies: {str(e)}", "error_type": "assembly_load_error"}]
 
     try:
-        from Microsoft.AnalysisServices.AdomdClient import AdomdConnection ,AdomdDataReader  # type: ignore
+        from Microsoft.AnalysisServices.AdomdClient import AdomdDataReader  # type: ignore
     except ImportError as e:
         return [{"error": f"Failed to import ADOMD libraries: {str(e)}", "error_type": "import_error"}]
 
@@ -765,70 +877,340 @@ def execute_dax_query(workspace_name:str, dataset_name: str, dax_query: str, dat
     if not dax_query or not dax_query.strip():
         return [{"error": "DAX query is required and cannot be empty.", "error_type": "parameter_error"}]
 
-    workspace_name_encoded = urllib.parse.quote(workspace_name)
-    # Use URL-encoded workspace name and standard XMLA connection format
-    # The connection string format is: Data Source=powerbi://api.powerbi.com/v1.0/myorg/{workspace_name};Password={access_token};Catalog={dataset_name};
-    connection_string = f"Data Source=powerbi://api.powerbi.com/v1.0/myorg/{workspace_name_encoded};Password={access_token};Catalog={dataset_name};"
+    # Results are cached per dataset refresh state and token identity; a recently
+    # read refresh state lets a repeated query skip the connection entirely
+    identity = get_token_identity(access_token)
+    refresh_state = dax_query_cache.get_refresh_state(workspace_name, dataset_name) if use_cache else None
+    if refresh_state:
+        cached_result = dax_query_cache.get(workspace_name, dataset_name, identity, refresh_state, dax_query, max_rows, max_bytes)
+        if cached_result is not None:
+            return _format_dax_output(cached_result, output_format)
+
+    # Connections come from the shared pool, keyed by workspace, dataset and token.
+    # A pooled connection can have been dropped by the service while idle, so a
+    # connection-level failure on a reused connection is retried once on a new one.
+    for attempt in range(2):
+        pooled = None
+        try:
+            pooled = xmla_connection_pool.acquire(workspace_name, dataset_name, access_token)
+
+            if use_cache and not refresh_state:
+                refresh_state = query_cache_state(pooled.connection)
+                if refresh_state:
+                    dax_query_cache.set_refresh_state(workspace_name, dataset_name, refresh_state)
+                    cached_result = dax_query_cache.get(workspace_name, dataset_name, identity, refresh_state, dax_query, max_rows, max_bytes)
+                    if cached_result is not None:
+                        xmla_connection_pool.release(pooled)
+                        return _format_dax_output(cached_result, output_format)
+
+            # Execute the DAX query
+            command = pooled.connection.CreateCommand()
+            command.CommandText = dax_query
+            reader: AdomdDataReader = command.ExecuteReader()
+
+            # Read into column buffers, stopping at the row/byte budget. The reader
+            # is closed even if reading fails, so the connection can go back to the pool.
+            result = None
+            try:
+                result = read_dax_result(reader, max_rows=max_rows, max_bytes=max_bytes)
+            finally:
+                try:
+                    # Stop the server from streaming the rest of a truncated or failed result
+                    if result is None or result.truncated:
+                        command.Cancel()
+                finally:
+                    reader.Close()
+            xmla_connection_pool.release(pooled)
+            pooled = None
+
+            if use_cache and refresh_state:
+                dax_query_cache.put(workspace_name, dataset_name, identity, refresh_state, dax_query, result, max_rows, max_bytes)
+            return _format_dax_output(result, output_format)
+            
+        except Exception as e:
+            error_msg = str(e).lower()
+            is_connection_error = "connection" in error_msg or "network" in error_msg or "session" in error_msg
+            if pooled is not None:
+                # Query errors leave the connection usable; anything else closes it
+                query_error = "syntax" in error_msg or "parse" in error_msg or "invalid" in error_msg
+                xmla_connection_pool.release(pooled, healthy=query_error and not is_connection_error)
+            if attempt == 0 and pooled is not None and pooled.reused and is_connection_error:
+                logging.debug(f"Pooled XMLA connection failed, retrying with a new connection: {e}")
+                continue
+            return _dax_error_response(e, workspace_name, dataset_name, dax_query)
+
+
+def _format_dax_output(result: DaxResult, output_format: str) -> list[dict] | dict:
+    """Convert a DAX result to the requested output format, logging truncated row output."""
+    if output_format == "rows" and result.truncated:
+        # Row output is a plain list of rows, so the limit that was hit is only logged
+        logging.warning(f"DAX result truncated at {result.row_count} rows ({result.truncation_reason}); "
+                        f"use a columnar, csv or arrow output_format for truncation metadata")
+    return result.to_output(output_format)
+
+
+def _dax_error_response(e: Exception, workspace_name: str, dataset_name: str, dax_query: str) -> list[dict]:
+    """Categorize a DAX query error and provide a helpful message."""
+    error_msg = str(e).lower()
+    error_details = str(e)
+    
+    if "authentication" in error_msg or "unauthorized" in error_msg or "login" in error_msg:
+        return [{"error": f"Authentication failed: {error_details}. Please check your access token and permissions.", "error_type": "authentication_error"}]
+    elif "workspace" in error_msg or "not found" in error_msg:
+        return [{"error": f"Workspace or dataset not found: {error_details}. Please verify workspace name '{workspace_name}' and dataset name '{dataset_name}' are correct.", "error_type": "not_found_error"}]
+    elif "permission" in error_msg or "access" in error_msg or "forbidden" in error_msg:
+        return [{"error": f"Permission denied: {error_details}. You may not have sufficient permissions to query this dataset.", "error_type": "permission_error"}]
+    elif "syntax" in error_msg or "parse" in error_msg or "invalid" in error_msg:
+        return [{"error": f"DAX query syntax error: {error_details}. Please check your DAX query syntax.", "error_type": "dax_syntax_error", "query": dax_query}]
+    elif "timeout" in error_msg or "timed out" in error_msg:
+        return [{"error": f"Query timeout: {error_details}. The query took too long to execute.", "error_type": "timeout_error"}]
+    elif "connection" in error_msg or "network" in error_msg:
+        return [{"error": f"Connection error: {error_details}. Please check your network connection and try again.", "error_type": "connection_error"}]
+    else:
+        return [{"error": f"Unexpected error executing DAX query: {error_details}", "error_type": "general_error", "query": dax_query}]
+
+@mcp.tool
+def execute_dax_queries_batch(workspace_name: str, dataset_name: str, queries: list[str | dict], max_rows: int = 1000, max_bytes: int = DEFAULT_MAX_BYTES, output_format: str = "rows", multiplex: bool = True, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, use_cache: bool = True, run_async: bool = False) -> str:
+    """Executes many DAX queries against a Power BI model in as few round trips as possible.
+    Use this instead of calling execute_dax_query repeatedly for bursts of small queries, such as row
+    counts per table, distinct counts per column or TOPN samples.
+
+    Queries that are a single EVALUATE without DEFINE are combined into one request with several
+    EVALUATE statements. Other queries run concurrently on pooled connections. Every query gets its
+    own result or error; a failing query does not fail the others. Results are cached like
+    execute_dax_query results.
+
+    Args:
+        workspace_name: The Power BI workspace name
+        dataset_name: The dataset name
+        queries: DAX queries, either as strings or as {"id": "...", "query": "..."} objects
+        max_rows: Maximum rows returned per query (default 1,000)
+        max_bytes: Approximate maximum result size per query (default 16 MB)
+        output_format: "rows" (default), "columnar", "csv" or "arrow", as in execute_dax_query
+        multiplex: Set to False to send every query as its own request
+        max_concurrency: Maximum requests running at the same time (default 4)
+        use_cache: Set to False to always run the queries
+        run_async: Set to True to get a job_id right away and read the results with get_job_status
+
+    Returns:
+        JSON string with per query results, errors and timings, and the number of requests sent
+    """
+    if run_async:
+        return json.dumps(start_tool_job(
+            "execute_dax_queries_batch",
+            lambda: _execute_dax_queries_batch(workspace_name, dataset_name, queries, max_rows, max_bytes, output_format, multiplex, max_concurrency, use_cache),
+            description=f"{workspace_name}/{dataset_name}: {len(queries or [])} queries"
+        ), indent=2)
+    return _execute_dax_queries_batch(workspace_name, dataset_name, queries, max_rows, max_bytes, output_format, multiplex, max_concurrency, use_cache)
+
+
+def _execute_dax_queries_batch(workspace_name: str, dataset_name: str, queries: list, max_rows: int, max_bytes: int, output_format: str, multiplex: bool, max_concurrency: int, use_cache: bool) -> str:
+    """Runs execute_dax_queries_batch; also called by its background jobs."""
+    if output_format not in OUTPUT_FORMATS:
+        return json.dumps({'success': False, 'error': f'Unsupported output format: {output_format}. Supported: {list(OUTPUT_FORMATS)}', 'error_type': 'parameter_error'})
+    if not workspace_name or not workspace_name.strip() or not dataset_name or not dataset_name.strip():
+        return json.dumps({'success': False, 'error': 'Workspace name and dataset name are required.', 'error_type': 'parameter_error'})
+    if not queries:
+        return json.dumps({'success': False, 'error': 'At least one query is required.', 'error_type': 'parameter_error'})
+    if len(queries) > MAX_BATCH_QUERIES:
+        return json.dumps({'success': False, 'error': f'A batch can hold at most {MAX_BATCH_QUERIES} queries.', 'error_type': 'parameter_error'})
+
+    batch = []
+    for index, query in enumerate(queries):
+        query_id, dax_query = (str(query.get('id', index)), query.get('query')) if isinstance(query, dict) else (str(index), query)
+        if not isinstance(dax_query, str) or not dax_query.strip():
+            return json.dumps({'success': False, 'error': f'Query {query_id} is empty.', 'error_type': 'parameter_error'})
+        batch.append(BatchQuery(query_id, dax_query, max_rows, max_bytes))
 
-    connection = None
     try:
-        # Attempt to establish connection
-        connection = AdomdConnection(connection_string)
-        connection.Open()
-        
-        # Execute the DAX query
-        command = connection.CreateCommand()
-        command.CommandText = dax_query
-        reader: AdomdDataReader = command.ExecuteReader()
-        
-        results = []
-        while reader.Read():
-            row = {}
-            for i in range(reader.FieldCount):
-                # Handle different data types and null values
-                value = reader.GetValue(i)
-                if value is None or str(value) == "":
-                    row[reader.GetName(i)] = None
-                elif hasattr(value, 'isoformat'):  # DateTime objects
-                    row[reader.GetName(i)] = value.isoformat()
-                else:
-                    row[reader.GetName(i)] = value
-            results.append(row)
-        
-        reader.Close()
-        return results
-        
+        load_assemblies(ADOMD_ASSEMBLIES)
     except Exception as e:
-        error_msg = str(e).lower()
-        error_details = str(e)
-        
-        # Categorize different types of errors and provide helpful messages
-        if "authentication" in error_msg or "unauthorized" in error_msg or "login" in error_msg:
-            return [{"error": f"Authentication failed: {error_details}. Please check your access token and permissions.", "error_type": "authentication_error"}]
-        elif "workspace" in error_msg or "not found" in error_msg:
-            return [{"error": f"Workspace or dataset not found: {error_details}. Please verify workspace name '{workspace_name}' and dataset name '{dataset_name}' are correct.", "error_type": "not_found_error"}]
-        elif "permission" in error_msg or "access" in error_msg or "forbidden" in error_msg:
-            return [{"error": f"Permission denied: {error_details}. You may not have sufficient permissions to query this dataset.", "error_type": "permission_error"}]
-        elif "syntax" in error_msg or "parse" in error_msg or "invalid" in error_msg:
-            return [{"error": f"DAX query syntax error: {error_details}. Please check your DAX query syntax.", "error_type": "dax_syntax_error", "query": dax_query}]
-        elif "timeout" in error_msg or "timed out" in error_msg:
-            return [{"error": f"Query timeout: {error_details}. The query took too long to execute.", "error_type": "timeout_error"}]
-        elif "connection" in error_msg or "network" in error_msg:
-            return [{"error": f"Connection error: {error_details}. Please check your network connection and try again.", "error_type": "connection_error"}]
+        return json.dumps({'success': False, 'error': f'Failed to load required .NET assemblies: {str(e)}', 'error_type': 'assembly_load_error'})
+
+    access_token = get_access_token()
+    if not access_token:
+        return json.dumps({'success': False, 'error': 'No valid access token available. Please check authentication.', 'error_type': 'authentication_error'})
+
+    started = time.perf_counter()
+    run_on_connection = pooled_runner(workspace_name, dataset_name, access_token)
+    results = {}
+    identity = get_token_identity(access_token)
+    refresh_state = None
+    try:
+        if use_cache:
+            refresh_state = dax_query_cache.get_refresh_state(workspace_name, dataset_name)
+            if not refresh_state:
+                refresh_state = run_on_connection(query_cache_state)
+                if refresh_state:
+                    dax_query_cache.set_refresh_state(workspace_name, dataset_name, refresh_state)
+            if refresh_state:
+                for query in batch:
+                    cached_result = dax_query_cache.get(workspace_name, dataset_name, identity, refresh_state, query.dax_query, max_rows, max_bytes)
+                    if cached_result is not None:
+                        results[id(query)] = BatchQueryResult(query.query_id, result=cached_result, execution="cache")
+
+        to_run = [query for query in batch if id(query) not in results]
+        for query, result in zip(to_run, run_batch(to_run, run_on_connection, multiplex=multiplex, max_concurrency=max_concurrency)):
+            results[id(query)] = result
+            if use_cache and refresh_state and result.result is not None:
+                dax_query_cache.put(workspace_name, dataset_name, identity, refresh_state, query.dax_query, result.result, max_rows, max_bytes)
+    except Exception as e:
+        return json.dumps({'success': False, **_dax_error_response(e, workspace_name, dataset_name, '')[0]})
+
+    query_results = []
+    for query in batch:
+        result = results[id(query)]
+        entry = {'query_id': result.query_id, 'execution': result.execution, 'request': result.request, 'duration_ms': round(result.duration_ms, 1)}
+        if result.error is not None:
+            entry.update({'success': False, **_dax_error_response(result.error, workspace_name, dataset_name, query.dax_query)[0]})
         else:
-            return [{"error": f"Unexpected error executing DAX query: {error_details}", "error_type": "general_error", "query": dax_query}]
-    
-    finally:
-        # Ensure connection is always closed
-        try:
-            if connection is not None and hasattr(connection, 'State') and connection.State == 1:  # ConnectionState.Open = 1
-                connection.Close()
-        except Exception as cleanup_error:
-            print(f"Warning: Error during connection cleanup: {cleanup_error}")
-            # Don't return error here as it would mask the main error
+            entry.update({'success': True, 'row_count': result.result.row_count, 'truncated': result.result.truncated})
+            try:
+                entry['result'] = result.result.to_output(output_format)
+            except ImportError as e:
+                entry.update({'success': False, 'error': str(e), 'error_type': 'import_error'})
+        query_results.append(entry)
+
+    requests_sent = {entry['request'] for entry in query_results if entry['request'] is not None}
+    return json.dumps({
+        'success': all(entry['success'] for entry in query_results),
+        'workspace_name': workspace_name,
+        'dataset_name': dataset_name,
+        'query_count': len(batch),
+        'failed_count': sum(1 for entry in query_results if not entry['success']),
+        'cached_count': sum(1 for entry in query_results if entry['execution'] == 'cache'),
+        'requests_sent': len(requests_sent),
+        'total_ms': round((time.perf_counter() - started) * 1000, 1),
+        'results': query_results
+    }, indent=2, default=str)
+
+@mcp.tool
+def profile_columns(workspace_name: str, dataset_name: str, table_names: List[str], top_values: int = DEFAULT_TOP_VALUES, top_values_max_distinct: int = DEFAULT_TOP_VALUES_MAX_DISTINCT, sample_rows: int = None, run_async: bool = False) -> str:
+    """Profiles every column of the chosen tables with DAX aggregated on the server.
+    Use this instead of reading rows with execute_dax_query to learn what the data looks like.
+    Returns the row count of each table and, per column, the distinct count, blank count and share,
+    minimum, maximum and most frequent values. All statistics are computed in one request with a ROW()
+    query per table, and the top values in a second request, so even a 200 column table takes two round trips.
+
+    Args:
+        workspace_name: The Power BI workspace name
+        dataset_name: The dataset name
+        table_names: Names of the tables to profile
+        top_values: Most frequent values returned per column (default 5, 0 for none)
+        top_values_max_distinct: Columns with more distinct values get no top values (default 100,000)
+        sample_rows: For huge tables, compute the column statistics over the first sample_rows rows of each table;
+            the table row count is always exact
+        run_async: Set to True to get a job_id right away and read the profile with get_job_status
+
+    Returns:
+        JSON string with the statistics per table and column
+    """
+    if run_async:
+        return json.dumps(start_tool_job(
+            "profile_columns",
+            lambda: _profile_columns(workspace_name, dataset_name, table_names, top_values, top_values_max_distinct, sample_rows),
+            description=f"{workspace_name}/{dataset_name}"
+        ), indent=2)
+    return _profile_columns(workspace_name, dataset_name, table_names, top_values, top_values_max_distinct, sample_rows)
+
+
+def _profile_columns(workspace_name: str, dataset_name: str, table_names: List[str], top_values: int, top_values_max_distinct: int, sample_rows: Optional[int]) -> str:
+    """Runs profile_columns; also called by its background jobs."""
+    if not workspace_name or not workspace_name.strip() or not dataset_name or not dataset_name.strip():
+        return json.dumps({'success': False, 'error': 'Workspace name and dataset name are required.', 'error_type': 'parameter_error'})
+    if not table_names:
+        return json.dumps({'success': False, 'error': 'At least one table name is required.', 'error_type': 'parameter_error'})
+
+    try:
+        load_assemblies(ADOMD_ASSEMBLIES)
+    except Exception as e:
+        return json.dumps({'success': False, 'error': f'Failed to load required .NET assemblies: {str(e)}', 'error_type': 'assembly_load_error'})
+
+    access_token = get_access_token()
+    if not access_token:
+        return json.dumps({'success': False, 'error': 'No valid access token available. Please check authentication.', 'error_type': 'authentication_error'})
+
+    started = time.perf_counter()
+    run_on_connection = pooled_runner(workspace_name, dataset_name, access_token)
+    try:
+        metadata = run_on_connection(read_model_metadata)
+        profile = profile_tables(run_on_connection, metadata, table_names, top_values, top_values_max_distinct, sample_rows)
+    except Exception as e:
+        return json.dumps({'success': False, **_dax_error_response(e, workspace_name, dataset_name, '')[0]})
+
+    return json.dumps({
+        'success': True,
+        'workspace_name': workspace_name,
+        'dataset_name': dataset_name,
+        **profile,
+        'requests_sent': profile['requests_sent'] + metadata.round_trips,
+        'total_ms': round((time.perf_counter() - started) * 1000, 1)
+    }, indent=2, default=str)
+
+@mcp.tool
+def analyze_model_memory(workspace_name: str, dataset_name: str, top_n: int = DEFAULT_TOP_N, run_async: bool = False) -> str:
+    """Analyzes where a semantic model's memory goes, like VertiPaq Analyzer.
+    Reads the storage DMVs (tables, columns, segments, dictionaries, relationships) with a few queries
+    and returns the size of every table and the largest columns split into data, dictionary and hierarchy size,
+    with cardinality, encoding and dictionary ratio, ranked largest first.
+    Findings point out columns worth optimizing: nearly unique columns, columns dominated by their dictionary
+    and hash encoded numeric columns.
+    For DirectLake models only columns paged into memory have a data size.
+
+    Args:
+        workspace_name: The Power BI workspace name
+        dataset_name: The dataset name
+        top_n: Number of tables, columns and relationships to list (default 20)
+        run_async: Set to True to get a job_id right away and read the analysis with get_job_status
+
+    Returns:
+        JSON string with the summary, largest tables, columns and relationships, and findings
+    """
+    if run_async:
+        return json.dumps(start_tool_job(
+            "analyze_model_memory",
+            lambda: _analyze_model_memory(workspace_name, dataset_name, top_n),
+            description=f"{workspace_name}/{dataset_name}"
+        ), indent=2)
+    return _analyze_model_memory(workspace_name, dataset_name, top_n)
+
+
+def _analyze_model_memory(workspace_name: str, dataset_name: str, top_n: int) -> str:
+    """Runs analyze_model_memory; also called by its background jobs."""
+    if not workspace_name or not workspace_name.strip() or not dataset_name or not dataset_name.strip():
+        return json.dumps({'success': False, 'error': 'Workspace name and dataset name are required.', 'error_type': 'parameter_error'})
+
+    try:
+        load_assemblies(ADOMD_ASSEMBLIES)
+    except Exception as e:
+        return json.dumps({'success': False, 'error': f'Failed to load required .NET assemblies: {str(e)}', 'error_type': 'assembly_load_error'})
+
+    access_token = get_access_token()
+    if not access_token:
+        return json.dumps({'success': False, 'error': 'No valid access token available. Please check authentication.', 'error_type': 'authentication_error'})
+
+    try:
+        with xmla_connection_pool.connection(workspace_name, dataset_name, access_token) as pooled:
+            dmvs = read_memory_dmvs(pooled.connection)
+    except Exception as e:
+        error = _dax_error_response(e, workspace_name, dataset_name, "")[0]
+        error.pop('query', None)
+        return json.dumps({'success': False, **error})
+
+    analysis = compute_model_memory(dmvs, top_n=max(1, top_n))
+    return json.dumps({
+        'success': True,
+        'workspace_name': workspace_name,
+        'dataset_name': dataset_name,
+        **analysis
+    }, indent=2)
+
+
+# Rows returned by lakehouse SQL queries unless a caller asks for more
+DEFAULT_SQL_MAX_ROWS = 100
 
 # Internal helper function for SQL queries (not exposed as MCP tool)
-def _internal_query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, lakehouse_id: str = None, lakehouse_name: str = None) -> str:
+def _internal_query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, lakehouse_id: str = None, lakehouse_name: str = None, max_rows: int = DEFAULT_SQL_MAX_ROWS) -> str:
     """Executes a SQL query against a Fabric Lakehouse SQL Analytics Endpoint to validate table schemas and data.
     This tool connects to the specified Fabric Lakehouse SQL Analytics Endpoint and executes the provided SQL query.
     Use this tool to:
@@ -837,11 +1219,16 @@ def _internal_query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, la
     - Inspect data samples from lakehouse tables
     - Verify table structures match your model expectations
     
+    The endpoint resolution is cached per lakehouse, the ODBC driver is detected
+    once, and connections are pooled per endpoint. At most max_rows rows are
+    read from the result.
+    
     Args:
         workspace_id: The Fabric workspace ID containing the lakehouse
         sql_query: The SQL query to execute (e.g., "SELECT * FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = 'date'")
         lakehouse_id: Optional specific lakehouse ID to query
         lakehouse_name: Optional lakehouse name to query (alternative to lakehouse_id)
+        max_rows: Maximum number of rows to read and return
     
     Returns:
         JSON string containing query results or error message
@@ -861,7 +1248,8 @@ def _internal_query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, la
             "error": f"Authentication failed: {error}"
         }, indent=2)
 
-    # Check if pyodbc is available
+    # Check if pyodbc is available; it is imported on first use to keep server startup fast
+    pyodbc = optional_import("pyodbc")
     if pyodbc is None:
         return json.dumps({
             "success": False,
@@ -869,21 +1257,18 @@ def _internal_query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, la
         }, indent=2)
     
     try:
-        # Get the SQL Analytics Endpoint connection string
-        connection_info = fabric_get_lakehouse_sql_connection_string(workspace_id, lakehouse_id, lakehouse_name)
-        
-        if "error" in connection_info.lower():
-            return f"Error getting connection string: {connection_info}"
+        # Get the SQL Analytics Endpoint (cached per lakehouse)
+        try:
+            connection_data = resolve_lakehouse_sql_endpoint(workspace_id, lakehouse_id, lakehouse_name)
+        except ValueError as e:
+            return f"Error getting connection string: {str(e)}"
         
-        # Parse the connection info to get the server and endpoint ID
-        connection_data = json.loads(connection_info)
         server_name = connection_data.get("sql_endpoint", {}).get("server_name")
         endpoint_id = connection_data.get("sql_endpoint", {}).get("endpoint_id")
         
         if not server_name or not endpoint_id:
             return "Error: Could not retrieve SQL Analytics Endpoint information"
         
-        # Build connection string for SQL Analytics Endpoint
         # For Fabric SQL Analytics Endpoints, use the lakehouse name as the database
         lakehouse_name = connection_data.get("lakehouse_name")
         if not lakehouse_name:
@@ -892,76 +1277,70 @@ def _internal_query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, la
                 "error": "Could not determine lakehouse name for database connection"
             }, indent=2)
         
-        # Try different ODBC drivers in order of preference
-        available_drivers = [
-            "ODBC Driver 18 for SQL Server",
-            "ODBC Driver 17 for SQL Server", 
-            "SQL Server"
-        ]
-        
-        # Detect which driver is available
-        available_driver = None
-        available_pyodbc_drivers = pyodbc.drivers()
-        
-        for driver in available_drivers:
-            if driver in available_pyodbc_drivers:
-                available_driver = driver
-                break
-        
+        # The driver is detected once per process
+        available_driver, available_pyodbc_drivers = detect_odbc_driver()
         if not available_driver:
             return json.dumps({
                 "success": False,
                 "error": "No compatible ODBC driver found. Please install ODBC Driver for SQL Server.",
-                "available_drivers": list(available_pyodbc_drivers),
-                "looking_for": available_drivers
+                "available_drivers": available_pyodbc_drivers,
+                "looking_for": list(PREFERRED_ODBC_DRIVERS)
             }, indent=2)
         
-        connection_string = (
-            f"Driver={{{available_driver}}};"
-            f"Server={server_name};"
-            f"Database={lakehouse_name};"
-            f"Encrypt=yes;"
-            f"TrustServerCertificate=yes;"
-            f"Connection Timeout=30;"
-        )
+        # Execute the query on a pooled connection authenticated with the access token
+        with sql_connection_pool.connection(available_driver, server_name, lakehouse_name, token_struct) as pooled:
+            cursor = pooled.connection.cursor()
+            try:
+                try:
+                    cursor.execute(sql_query)
+                except pyodbc.ProgrammingError as e:
+                    # Errors in the query itself leave the connection usable
+                    return json.dumps({
+                        "success": False,
+                        "error": f"SQL Error: {str(e)}",
+                        "query": sql_query
+                    }, indent=2)
+                
+                if cursor.description is None:
+                    return json.dumps({
+                        "success": True,
+                        "query": sql_query,
+                        "columns": [],
+                        "row_count": 0,
+                        "results": []
+                    }, indent=2)
+                
+                # Get column names
+                columns = [column[0] for column in cursor.description]
+                
+                # Only read the rows that are returned
+                rows, truncated = fetch_limited(cursor, max_rows)
+            finally:
+                cursor.close()
         
-        # Debug: log connection attempt
-        print(f"Attempting connection with driver: {available_driver}")
-        print(f"Connection string: {connection_string}")
+        # Convert to list of dictionaries
+        results = []
+        for row in rows:
+            row_dict = {}
+            for i, value in enumerate(row):
+                # Handle special data types
+                if hasattr(value, 'isoformat'):  # datetime objects
+                    row_dict[columns[i]] = value.isoformat()
+                elif isinstance(value, (bytes, bytearray)):  # binary data
+                    row_dict[columns[i]] = str(value)
+                else:
+                    row_dict[columns[i]] = value
+            results.append(row_dict)
         
-        # Execute the query using ActiveDirectoryInteractive authentication
-        with pyodbc.connect(connection_string, attrs_before={1256  : token_struct}) as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql_query)
-            
-            # Get column names
-            columns = [column[0] for column in cursor.description]
-            
-            # Fetch results
-            rows = cursor.fetchall()
-            
-            # Convert to list of dictionaries
-            results = []
-            for row in rows:
-                row_dict = {}
-                for i, value in enumerate(row):
-                    # Handle special data types
-                    if hasattr(value, 'isoformat'):  # datetime objects
-                        row_dict[columns[i]] = value.isoformat()
-                    elif isinstance(value, (bytes, bytearray)):  # binary data
-                        row_dict[columns[i]] = str(value)
-                    else:
-                        row_dict[columns[i]] = value
-                results.append(row_dict)
-            
-            return json.dumps({
-                "success": True,
-                "query": sql_query,
-                "columns": columns,
-                "row_count": len(results),
-                "results": results[:100],  # Limit to first 100 rows to avoid large responses
-                "note": f"Showing first 100 rows out of {len(results)} total rows" if len(results) > 100 else None
-            }, indent=2)
+        return json.dumps({
+            "success": True,
+            "query": sql_query,
+            "columns": columns,
+            "row_count": len(results),
+            "results": results,
+            "truncated": truncated,
+            "note": f"Showing the first {max_rows} rows; the query returned more rows" if truncated else None
+        }, indent=2)
             
     except pyodbc.Error as e:
         error_details = str(e)
@@ -972,8 +1351,7 @@ def _internal_query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, la
             "debug_info": {
                 "server_name": server_name if 'server_name' in locals() else "Not available",
                 "lakehouse_name": lakehouse_name if 'lakehouse_name' in locals() else "Not available",
-                "available_driver": available_driver if 'available_driver' in locals() else "Not detected",
-                "connection_string": connection_string if 'connection_string' in locals() else "Not available"
+                "available_driver": available_driver if 'available_driver' in locals() else "Not detected"
             }
         }, indent=2)
     except Exception as e:
@@ -982,7 +1360,7 @@ def _internal_query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, la
             "error": f"Connection Error: {str(e)}",
             "query": sql_query,
             "debug_info": {
-                "connection_info": connection_info if 'connection_info' in locals() else "Not available"
+                "connection_data": connection_data if 'connection_data' in locals() else "Not available"
             }
         }, indent=2)
 
@@ -1012,8 +1390,59 @@ def query_lakehouse_sql_endpoint(workspace_id: str, sql_query: str, lakehouse_id
     """
     return _internal_query_lakehouse_sql_endpoint(workspace_id, sql_query, lakehouse_id, lakehouse_name)
 
+def _map_sql_type_to_directlake(sql_type: str) -> str:
+    """Maps a SQL Analytics Endpoint data type to a DirectLake column data type."""
+    sql_type = sql_type.lower()
+    if sql_type in ["varchar", "nvarchar", "char", "nchar", "text", "ntext"]:
+        return "string"
+    elif sql_type in ["int", "bigint", "smallint", "tinyint"]:
+        return "int64"
+    elif sql_type in ["decimal", "numeric", "float", "real", "money", "smallmoney"]:
+        return "decimal"
+    elif sql_type in ["datetime", "datetime2", "date", "time", "smalldatetime"]:
+        return "dateTime"
+    elif sql_type in ["bit"]:
+        return "boolean"
+    return "string"  # Default fallback
+
+def _get_lakehouse_schema_snapshot(workspace_id: str, lakehouse_key: str, table_names: List[str], lakehouse_id: str = None, lakehouse_name: str = None, use_cache: bool = True) -> LakehouseSchemaSnapshot:
+    """Gets the lakehouse schema snapshot, reading the columns of tables it does not know yet.
+    
+    The columns of all missing tables are read with set-based INFORMATION_SCHEMA.COLUMNS
+    queries (one per chunk of tables) instead of one query per table.
+    
+    Raises:
+        ValueError: If a schema query fails
+    """
+    snapshot = lakehouse_schema_cache.get(workspace_id, lakehouse_key) if use_cache else None
+    if snapshot is None:
+        schema_detection_query = "SELECT DISTINCT TABLE_SCHEMA FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE' ORDER BY TABLE_SCHEMA"
+        schema_data = json.loads(_internal_query_lakehouse_sql_endpoint(workspace_id, schema_detection_query, lakehouse_id, lakehouse_name, max_rows=None))
+        if not schema_data.get("success"):
+            raise ValueError(f"Could not detect lakehouse schemas: {schema_data.get('error', 'Unknown error')}")
+        snapshot = LakehouseSchemaSnapshot(
+            schemas=[row["TABLE_SCHEMA"] for row in schema_data.get("results", [])],
+            fetched_at=time.time()
+        )
+    
+    missing_tables = snapshot.missing_tables(table_names)
+    for start in range(0, len(missing_tables), TABLES_PER_QUERY):
+        chunk = missing_tables[start:start + TABLES_PER_QUERY]
+        columns_query = build_columns_queries(chunk)[0]
+        columns_result = _internal_query_lakehouse_sql_endpoint(workspace_id, columns_query, lakehouse_id, lakehouse_name, max_rows=None)
+        try:
+            columns_data = json.loads(columns_result)
+        except json.JSONDecodeError:
+            raise ValueError(columns_result)
+        if not columns_data.get("success"):
+            raise ValueError(f"Error validating table schemas: {columns_data.get('error', 'Unknown error')}")
+        snapshot.add_columns(chunk, columns_data.get("results", []))
+    
+    lakehouse_schema_cache.put(workspace_id, lakehouse_key, snapshot)
+    return snapshot
+
 @mcp.tool
-def generate_directlake_tmsl_template(workspace_id: str, lakehouse_id: str = None, lakehouse_name: str = None, table_names: Optional[List[str]] = None, model_name: str = "NewDirectLakeModel") -> str:
+def generate_directlake_tmsl_template(workspace_id: str, lakehouse_id: str = None, lakehouse_name: str = None, table_names: Optional[List[str]] = None, model_name: str = "NewDirectLakeModel", refresh_schema: bool = False) -> str:
     """Generates a valid DirectLake TMSL template with proper structure and validated schemas.
     
     This helper tool automatically creates a complete DirectLake TMSL definition by:
@@ -1022,24 +1451,29 @@ def generate_directlake_tmsl_template(workspace_id: str, lakehouse_id: str = Non
     3. Generating proper TMSL structure with all required components
     4. Including validation-ready partitions and expressions
     
+    Table schemas are read for all requested tables at once and cached per
+    lakehouse for 10 minutes, so later templates for the same lakehouse only
+    query tables that were not read yet.
+    
     Args:
         workspace_id: The Fabric workspace ID containing the lakehouse
         lakehouse_id: Optional specific lakehouse ID
         lakehouse_name: Optional lakehouse name (alternative to lakehouse_id)
         table_names: List of table names to include (if not provided, suggests available tables)
         model_name: Name for the new DirectLake model
+        refresh_schema: Set to True to read the table schemas again instead of using cached schemas
     
     Returns:
         Complete TMSL JSON string ready for use with update_model_using_tmsl
     """
     
     try:
-        # Get lakehouse connection information
-        connection_info = fabric_get_lakehouse_sql_connection_string(workspace_id, lakehouse_id, lakehouse_name)
-        if "error" in connection_info.lower():
-            return f"Error getting lakehouse connection: {connection_info}"
+        # Get lakehouse connection information (cached per lakehouse)
+        try:
+            connection_data = resolve_lakehouse_sql_endpoint(workspace_id, lakehouse_id, lakehouse_name)
+        except ValueError as e:
+            return f"Error getting lakehouse connection: {str(e)}"
         
-        connection_data = json.loads(connection_info)
         server_name = connection_data.get("sql_endpoint", {}).get("server_name")
         endpoint_id = connection_data.get("sql_endpoint", {}).get("endpoint_id")
         actual_lakehouse_name = connection_data.get("lakehouse_name")
@@ -1057,72 +1491,50 @@ def generate_directlake_tmsl_template(workspace_id: str, lakehouse_id: str = Non
             except:
                 return f"Error retrieving available tables: {delta_tables_result}"
         
-        # First, detect available schemas in the lakehouse
-        schema_detection_query = "SELECT DISTINCT TABLE_SCHEMA FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE' ORDER BY TABLE_SCHEMA"
-        schema_result = _internal_query_lakehouse_sql_endpoint(workspace_id, schema_detection_query, lakehouse_id, lakehouse_name)
+        # Read the schemas and the columns of all requested tables in set-based queries
+        try:
+            snapshot = _get_lakehouse_schema_snapshot(
+                workspace_id,
+                connection_data.get("lakehouse_id") or actual_lakehouse_name,
+                table_names,
+                lakehouse_id,
+                lakehouse_name,
+                use_cache=not refresh_schema
+            )
+        except ValueError as e:
+            return f"Error validating table schemas: {str(e)}"
         
+        # Prefer 'gold' schema if available, otherwise use first non-system schema
         detected_schema = "dbo"  # Default schema
-        try:
-            schema_data = json.loads(schema_result)
-            if schema_data.get("success"):
-                schemas = [row["TABLE_SCHEMA"] for row in schema_data.get("results", [])]
-                # Prefer 'gold' schema if available, otherwise use first non-system schema
-                if "gold" in schemas:
-                    detected_schema = "gold"
-                elif schemas:
-                    # Filter out system schemas and use the first available
-                    user_schemas = [s for s in schemas if s not in ["INFORMATION_SCHEMA", "sys", "db_accessadmin", "db_backupoperator", 
-                                                                   "db_datareader", "db_datawriter", "db_ddladmin", "db_denydatareader", 
-                                                                   "db_denydatawriter", "db_owner", "db_securityadmin", "guest"]]
-                    if user_schemas:
-                        detected_schema = user_schemas[0]
-        except Exception as e:
-            print(f"Warning: Could not detect schema, using default 'dbo': {e}")
+        if "gold" in snapshot.schemas:
+            detected_schema = "gold"
+        else:
+            user_schemas = [s for s in snapshot.schemas if s not in SYSTEM_SCHEMAS]
+            if user_schemas:
+                detected_schema = user_schemas[0]
         
-        # Validate table schemas
+        # Build the validated tables from the snapshot
         validated_tables = []
         for table_name in table_names:
-            schema_query = f"SELECT COLUMN_NAME, DATA_TYPE, IS_NULLABLE FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = '{table_name}' ORDER BY ORDINAL_POSITION"
-            schema_result = _internal_query_lakehouse_sql_endpoint(workspace_id, schema_query, lakehouse_id, lakehouse_name)
+            table_schema, table_columns = snapshot.get_table(table_name, detected_schema)
+            columns = []
+            for col in table_columns:
+                # Map SQL types to DirectLake types
+                dl_type = _map_sql_type_to_directlake(col["DATA_TYPE"])
+                columns.append({
+                    "name": col["COLUMN_NAME"],
+                    "dataType": dl_type,
+                    "sourceColumn": col["COLUMN_NAME"],
+                    "lineageTag": f"{table_name}_{col['COLUMN_NAME']}",
+                    "sourceLineageTag": col["COLUMN_NAME"],
+                    "summarizeBy": "sum" if dl_type in ["int64", "decimal"] and "quantity" in col["COLUMN_NAME"].lower() else "none"
+                })
             
-            try:
-                schema_data = json.loads(schema_result)
-                if schema_data.get("success"):
-                    columns = []
-                    for col in schema_data.get("results", []):
-                        # Map SQL types to DirectLake types
-                        sql_type = col["DATA_TYPE"].lower()
-                        if sql_type in ["varchar", "nvarchar", "char", "nchar", "text", "ntext"]:
-                            dl_type = "string"
-                        elif sql_type in ["int", "bigint", "smallint", "tinyint"]:
-                            dl_type = "int64"
-                        elif sql_type in ["decimal", "numeric", "float", "real", "money", "smallmoney"]:
-                            dl_type = "decimal"
-                        elif sql_type in ["datetime", "datetime2", "date", "time", "smalldatetime"]:
-                            dl_type = "dateTime"
-                        elif sql_type in ["bit"]:
-                            dl_type = "boolean"
-                        else:
-                            dl_type = "string"  # Default fallback
-                        
-                        columns.append({
-                            "name": col["COLUMN_NAME"],
-                            "dataType": dl_type,
-                            "sourceColumn": col["COLUMN_NAME"],
-                            "lineageTag": f"{table_name}_{col['COLUMN_NAME']}",
-                            "sourceLineageTag": col["COLUMN_NAME"],
-                            "summarizeBy": "sum" if dl_type in ["int64", "decimal"] and "quantity" in col["COLUMN_NAME"].lower() else "none"
-                        })
-                    
-                    validated_tables.append({
-                        "name": table_name,
-                        "columns": columns,
-                        "schema": detected_schema  # Add schema information to each table
-                    })
-                else:
-                    return f"Error validating schema for table '{table_name}': {schema_data.get('error', 'Unknown error')}"
-            except Exception as e:
-                return f"Error processing schema for table '{table_name}': {str(e)}"
+            validated_tables.append({
+                "name": table_name,
+                "columns": columns,
+                "schema": table_schema or detected_schema  # Add schema information to each table
+            })
         
         # Generate complete TMSL structure
         tmsl_template = {
@@ -1208,8 +1620,32 @@ def generate_directlake_tmsl_template(workspace_id: str, lakehouse_id: str = Non
     except Exception as e:
         return f"Error generating DirectLake TMSL template: {str(e)}"
 
+def _plan_delta_deployment(workspace_name: str, dataset_name: str, submitted_database: Union[dict, TmslDocument]) -> Tuple[Optional[str], str]:
+    """Builds the delta TMSL command for a database definition or its parsed document.
+    
+    Returns:
+        Tuple of the TMSL command (None to deploy the full definition, "" if
+        nothing changed) and a note describing the deployment
+    """
+    submitted_model = submitted_database.model if isinstance(submitted_database, TmslDocument) else (
+        submitted_database.get("model") if isinstance(submitted_database, dict) else None)
+    if not isinstance(submitted_model, dict):
+        return None, "Deployed as full database replace."
+    try:
+        current = get_cached_model_definition(workspace_name, dataset_name)
+    except Exception as e:
+        logging.debug(f"No current definition for delta deployment of '{dataset_name}': {e}")
+        return None, "Deployed as full database replace (current definition not available)."
+
+    delta = build_tmsl_delta(current.document, submitted_database, dataset_name)
+    if delta.full_replace_reason:
+        return None, f"Deployed as full database replace ({delta.full_replace_reason})."
+    if delta.is_empty:
+        return "", "No changes to deploy."
+    return json.dumps(delta.to_command()), f"Deployed {len(delta.changes)} object changes: {'; '.join(delta.changes)}."
+
 @mcp.tool
-def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definition: str, validate_only: bool = False) -> str:
+def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definition: str, validate_only: bool = False, delta: bool = True, run_async: bool = False) -> str:
     """Updates the TMSL definition for an Analysis Services Model with enhanced validation.
     
     This tool connects to the specified Power BI workspace and dataset name, validates and updates the TMSL definition,
@@ -1220,6 +1656,11 @@ def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definit
         dataset_name: The dataset/model name to update
         tmsl_definition: Valid TMSL JSON string
         validate_only: If True, only validates the TMSL without executing (default: False)
+        delta: If True (default), a database definition is compared with the current model and only
+            the changed objects are created, altered or deleted. Set to False to always replace the
+            whole database.
+        run_async: If True, returns a job_id right away and the update runs in the background;
+            read the result with get_job_status. Updates of the same dataset run one at a time.
     
     Enhanced Features:
     - Pre-validates TMSL structure before sending to server
@@ -1230,14 +1671,19 @@ def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definit
     Returns:
         Success message or detailed error with suggestions for fixes
     """   
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    dotnet_dir = os.path.join(script_dir, "dotnet")
+    if run_async:
+        return json.dumps(start_tool_job(
+            "update_model_using_tmsl",
+            lambda: _update_model_using_tmsl(workspace_name, dataset_name, tmsl_definition, validate_only, delta),
+            description=f"{workspace_name}/{dataset_name}",
+            serialize_key=None if validate_only else dataset_job_key(workspace_name, dataset_name)
+        ), indent=2)
+    return _update_model_using_tmsl(workspace_name, dataset_name, tmsl_definition, validate_only, delta)
 
-    print(f"Using .NET assemblies from: {dotnet_dir}")
-    clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.dll"))
-    clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.Tabular.dll"))
-    clr.AddReference(os.path.join(dotnet_dir, "Microsoft.Identity.Client.dll"))
-    clr.AddReference(os.path.join(dotnet_dir, "Microsoft.IdentityModel.Abstractions.dll"))
+
+def _update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definition: str, validate_only: bool, delta: bool) -> str:
+    """Runs update_model_using_tmsl; also called by its background jobs."""
+    load_assemblies(TOM_ASSEMBLIES)
 
     from Microsoft.AnalysisServices.Tabular import Server# type: ignore
     from Microsoft.AnalysisServices import XmlaResultCollection  # type: ignore
@@ -1262,21 +1708,29 @@ def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definit
         if validate_only:
             return f"✅ TMSL Validation Passed:\n{validation_result['summary']}\n\n📋 Structure validated successfully - ready for deployment!"
         
-        # Parse the TMSL definition to check its structure
+        # The document parsed by the validation; node counts and the delta reuse it
         try:
-            tmsl = json.loads(tmsl_definition)
+            document = parse_tmsl(tmsl_definition)
         except json.JSONDecodeError as e:
             return f"Error: Invalid JSON in TMSL definition - {e}"
+        tmsl = document.data
         
-        databaseCount = count_nodes_with_name(tmsl, "database")
-        tableCount = count_nodes_with_name(tmsl, "table")
+        databaseCount = count_nodes_with_name(document, "database")
+        tableCount = count_nodes_with_name(document, "table")
+        # Database definition that final_tmsl replaces, if any
+        submitted_database = None
         
         # Check if the tmsl_definition already has createOrReplace at the root level
         if "createOrReplace" in tmsl:
             # TMSL already has createOrReplace wrapper, use as-is
             final_tmsl = tmsl_definition
+            command = tmsl["createOrReplace"]
+            target = command.get("object", {}) if isinstance(command, dict) else {}
+            if isinstance(target, dict) and set(target) == {"database"} and str(target["database"]).lower() == dataset_name.lower():
+                submitted_database = command.get("database")
         elif databaseCount > 0:
             # TMSL contains database definition, wrap with createOrReplace for database
+            submitted_database = tmsl
             final_tmsl = json.dumps({
                 "createOrReplace": {
                     "object": {
@@ -1311,6 +1765,7 @@ def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definit
             })
         else:
             # Assume it's a general model update, wrap with database createOrReplace
+            submitted_database = tmsl
             final_tmsl = json.dumps({
                 "createOrReplace": {
                     "object": {
@@ -1320,11 +1775,23 @@ def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definit
                 }
             })
 
+        # Only send the objects that changed instead of replacing the whole database
+        deployment_note = ""
+        if delta and submitted_database is not None:
+            # The document's table index serves the delta when it holds the submitted database
+            submitted = document if submitted_database is document.database else submitted_database
+            delta_tmsl, deployment_note = _plan_delta_deployment(workspace_name, dataset_name, submitted)
+            deployment_note = f" {deployment_note}"
+            if delta_tmsl == "":
+                return f"TMSL definition for dataset '{dataset_name}' in workspace '{workspace_name}' matches the current model.{deployment_note} ✅"
+            if delta_tmsl:
+                final_tmsl = delta_tmsl
+
         retval: XmlaResultCollection = server.Execute(final_tmsl)
         
         # Check if the execution was successful by examining the XmlaResultCollection
         if retval is None:
-            return f"TMSL definition updated successfully for dataset '{dataset_name}' in workspace '{workspace_name}'. ✅"
+            return f"TMSL definition updated successfully for dataset '{dataset_name}' in workspace '{workspace_name}'.{deployment_note} ✅"
         
         # Iterate through the XmlaResultCollection to check for errors or messages
         errors = []
@@ -1365,16 +1832,16 @@ def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definit
             return f"Error updating TMSL definition for dataset '{dataset_name}' in workspace '{workspace_name}': {error_details}"
         elif warnings:
             warning_details = "; ".join(warnings)
-            success_msg = f"TMSL definition updated for dataset '{dataset_name}' in workspace '{workspace_name}' with warnings: {warning_details} ⚠️"
+            success_msg = f"TMSL definition updated for dataset '{dataset_name}' in workspace '{workspace_name}' with warnings: {warning_details}{deployment_note} ⚠️"
             if messages:
                 success_msg += f" Additional info: {'; '.join(messages)}"
             return success_msg
         elif messages:
             message_details = "; ".join(messages)
-            return f"TMSL definition updated for dataset '{dataset_name}' in workspace '{workspace_name}'. Server messages: {message_details} ✅"
+            return f"TMSL definition updated for dataset '{dataset_name}' in workspace '{workspace_name}'. Server messages: {message_details}{deployment_note} ✅"
         else:
             # No errors, warnings, or messages - successful execution
-            return f"TMSL definition updated successfully for dataset '{dataset_name}' in workspace '{workspace_name}'. ✅"
+            return f"TMSL definition updated successfully for dataset '{dataset_name}' in workspace '{workspace_name}'.{deployment_note} ✅"
         
     except json.JSONDecodeError as e:
         return f"Error: Invalid JSON in TMSL definition - {e}"
@@ -1396,6 +1863,11 @@ def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definit
         else:
             return f"Error updating TMSL definition: {error_message}"
     finally:
+        # Cached DAX results and definitions may describe the model before this update
+        if not validate_only:
+            dax_query_cache.invalidate(workspace_name, dataset_name)
+            model_definition_cache.invalidate(workspace_name, dataset_name)
+
         # Ensure server connection is always closed
         try:
             if server and hasattr(server, 'Connected') and server.Connected:
@@ -1404,45 +1876,53 @@ def update_model_using_tmsl(workspace_name: str, dataset_name: str, tmsl_definit
             pass  # Ignore errors during cleanup
     
 @mcp.tool
-def get_model_definition(workspace_name:str = None, dataset_name:str=None) -> str:
+def get_model_definition(workspace_name:str = None, dataset_name:str=None, subtree: str = None, table_name: str = None, use_cache: bool = True, run_async: bool = False) -> str:
     """Gets TMSL definition for an Analysis Services Model.
     This tool connects to the specified Power BI workspace and dataset name, retrieves the model definition,
     and returns the TMSL definition as a string.
     The function connects to the Power BI service using an access token, retrieves the model definition,
     and returns the result.
     Note: The workspace_name and dataset_name should be valid names in the Power BI service.
-    """
-    
-
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    dotnet_dir = os.path.join(script_dir, "dotnet")
-    
-    print(f"Using .NET assemblies from: {dotnet_dir}")
-    clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.Tabular.dll"))
-    clr.AddReference(os.path.join(dotnet_dir, "Microsoft.Identity.Client.dll"))
-    clr.AddReference(os.path.join(dotnet_dir, "Microsoft.IdentityModel.Abstractions.dll"))
-    
-    from Microsoft.AnalysisServices.Tabular import Server,Database, JsonSerializer,SerializeOptions # type: ignore
-
-    access_token = get_access_token()
-    if not access_token:
-        return "Error: No valid access token available"
 
-    # Use URL-encoded workspace name and standard XMLA connection format
-
-    workspace_name = urllib.parse.quote(workspace_name)
-    connection_string = f"Data Source=powerbi://api.powerbi.com/v1.0/myorg/{workspace_name};Password={access_token}"
+    Definitions are cached until the dataset is refreshed or updated, so repeated calls are fast.
+    Use subtree to return only part of the definition as JSON: "model" (model properties without tables),
+    "tables", "columns", "measures", "relationships", "roles", "expressions", "perspectives" or "dataSources".
+    table_name restricts "tables", "columns" and "measures" to one table.
+    Set use_cache=False to always read the definition from the service.
+    Set run_async=True to get a job_id right away and read the definition with get_job_status.
+    """
+    if run_async:
+        return json.dumps(start_tool_job(
+            "get_model_definition",
+            lambda: _get_model_definition(workspace_name, dataset_name, subtree, table_name, use_cache),
+            description=f"{workspace_name}/{dataset_name}"
+        ), indent=2)
+    return _get_model_definition(workspace_name, dataset_name, subtree, table_name, use_cache)
 
-    server: Server = Server()
-    server.Connect(connection_string)
-    database: Database = server.Databases.GetByName(dataset_name)
 
-    options = SerializeOptions()
-    options.IgnoreTimestamps = True
+def _get_model_definition(workspace_name: str, dataset_name: str, subtree: Optional[str], table_name: Optional[str], use_cache: bool) -> str:
+    """Runs get_model_definition; also called by its background jobs."""
+    try:
+        entry = get_cached_model_definition(workspace_name, dataset_name, use_cache=use_cache)
+        if not subtree:
+            return entry.tmsl
+        return json.dumps(extract_model_subtree(entry.parsed, subtree, table_name), indent=2)
+    except ValueError as e:
+        return f"Error: {e}"
+    except Exception as e:
+        return f"Error getting model definition: {str(e)}"
 
-    tmsl_definition = JsonSerializer.SerializeDatabase(database, options)
-    return tmsl_definition
 
+@mcp.tool
+def clear_model_definition_cache(workspace_name: str = None, dataset_name: str = None) -> str:
+    """Clears cached TMSL model definitions used by get_model_definition and the BPA tools.
+    If workspace_name and dataset_name are given, only that dataset's definitions are cleared.
+    """
+    if workspace_name and dataset_name:
+        cleared = model_definition_cache.invalidate(workspace_name, dataset_name)
+        return f"Cleared {cleared} cached model definitions for dataset '{dataset_name}' in workspace '{workspace_name}'."
+    cleared = model_definition_cache.clear()
+    return f"Model definition cache cleared successfully. Cleared {cleared} cached definitions."
 
 
 def main():
@@ -1452,6 +1932,8 @@ def main():
     register_bpa_tools(mcp)
     register_powerbi_desktop_tools(mcp)
     register_microsoft_learn_tools(mcp)
+    register_job_tools(mcp)
+    register_dax_benchmark_tools(mcp)
 
     logging.info("Starting Semantic Model MCP Server")
     mcp.run()
@@ -2,7 +2,13 @@
 # This file contains utility functions to assist with various tasks in the Semantic Model MCP Server.
 # It includes functions to count nodes with a specific name in a JSON-like structure.
 # This file is part of the Semantic Model MCP Server project.
+from core.tmsl_document import TmslDocument
+
+
 def count_nodes_with_name(data, target_name):
+    # Parsed documents count all names in one walk, shared by all callers
+    if isinstance(data, TmslDocument):
+        return data.count_nodes(target_name)
     count = 0
     if isinstance(data, dict):
         for key, value in data.items():
@@ -8,17 +8,26 @@ deployment failures and structural issues.
 Functions:
 - validate_tmsl_structure: Main validation function for complete TMSL definitions
 - validate_single_table_tmsl: Specialized validation for single table updates
+
+Definitions are parsed with core.tmsl_document.parse_tmsl, so the caller can
+reuse the parsed document for deployment instead of parsing it again.
 """
 
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Union
+
+from core.tmsl_document import TmslDocument, parse_tmsl, validate_schema
 
 
-def validate_tmsl_structure(tmsl_definition: str) -> Dict[str, Any]:
+def validate_tmsl_structure(tmsl_definition: Union[str, TmslDocument]) -> Dict[str, Any]:
     """Validates TMSL structure for common DirectLake mistakes and required components.
     
+    When the SEMANTIC_MODEL_MCP_TMSL_SCHEMA environment variable points to a
+    JSON Schema and jsonschema is installed, the definition is also validated
+    against that schema.
+    
     Args:
-        tmsl_definition: JSON string containing the TMSL definition
+        tmsl_definition: JSON string containing the TMSL definition, or its parsed document
     
     Returns:
         dict: {
@@ -30,7 +39,7 @@ def validate_tmsl_structure(tmsl_definition: str) -> Dict[str, Any]:
         }
     """
     try:
-        tmsl = json.loads(tmsl_definition)
+        document = parse_tmsl(tmsl_definition)
     except json.JSONDecodeError as e:
         return {
             "valid": False,
@@ -44,19 +53,13 @@ def validate_tmsl_structure(tmsl_definition: str) -> Dict[str, Any]:
     warnings = []
     suggestions = []
     
-    # Check for createOrReplace wrapper or extract model content
-    model_content = tmsl
-    if "createOrReplace" in tmsl:
-        if "database" in tmsl["createOrReplace"]:
-            model_content = tmsl["createOrReplace"]["database"]
-        elif "table" in tmsl["createOrReplace"]:
-            # Single table update - different validation
-            return validate_single_table_tmsl(tmsl)
+    # Single table update - different validation
+    if document.database is None and document.single_table is not None:
+        return validate_single_table_tmsl(document.data)
     
     # Validate DirectLake specific requirements
-    if "model" in model_content:
-        model = model_content["model"]
-        
+    model = document.model
+    if model is not None:
         # 🚨 CRITICAL CHECK #1: Expressions block for DirectLake
         if "expressions" not in model:
             errors.append("❌ CRITICAL: Missing 'expressions' block - DirectLake models require DatabaseQuery expression")
@@ -136,6 +139,18 @@ def validate_tmsl_structure(tmsl_definition: str) -> Dict[str, Any]:
                         errors.append(f"❌ CRITICAL: Table '{table_name}' has no DirectLake partition")
                         suggestions.append(f"Add partition with mode='directLake' to table '{table_name}'")
     
+    # Optional JSON Schema validation
+    try:
+        schema_errors = validate_schema(document)
+    except Exception as e:
+        # Missing or invalid schema file
+        schema_errors = None
+        warnings.append(f"⚠️ JSON Schema validation skipped: {e}")
+    for schema_error in schema_errors or []:
+        errors.append(f"❌ Schema violation at {schema_error}")
+    if schema_errors:
+        suggestions.append("Fix the properties reported by the JSON Schema validation")
+    
     # Determine validation result
     is_valid = len(errors) == 0
     
@@ -167,7 +182,7 @@ def validate_single_table_tmsl(tmsl: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         dict: Validation result with same structure as validate_tmsl_structure
     """
-    table_content = tmsl.get("createOrReplace", {}).get("table", {})
+    table_content = parse_tmsl(tmsl).single_table or {}
     table_name = table_content.get("name", "unnamed_table")
     
     errors = []
@@ -0,0 +1,93 @@
+"""
+Benchmark a suite of DAX queries from the command line.
+
+Runs the same harness as the benchmark_dax_queries tool. Without a workspace
+and dataset the suite runs against the local stand-in executor, which checks
+the suite and the harness without a capacity.
+
+Usage:
+    python testing/benchmark_dax.py suite.yaml [--workspace W --dataset D]
+        [--runs 5] [--cache-modes cold warm] [--baseline baseline.json [--save-baseline]]
+
+Exits with code 1 if a query regressed or its row count changed compared to
+the baseline.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.dax_benchmark import (
+    CACHE_MODES, DEFAULT_QUERY_KEY, DEFAULT_REGRESSION_THRESHOLD_PCT, DEFAULT_RUNS,
+    StandInExecutor, XmlaQueryExecutor, build_baseline, compare_to_baseline,
+    load_baseline, parse_benchmark_suite, run_benchmark, save_baseline,
+)
+
+
+def create_executor(workspace_name: str, dataset_name: str):
+    """Create the XMLA executor for a dataset, or the stand-in without one."""
+    if not workspace_name or not dataset_name:
+        print("Running against the local stand-in executor")
+        return StandInExecutor()
+
+    from core.auth import get_access_token
+    from core.dotnet_loader import ADOMD_ASSEMBLIES, load_assemblies
+
+    load_assemblies(ADOMD_ASSEMBLIES)
+    access_token = get_access_token()
+    if not access_token:
+        raise SystemExit("No valid access token available. Please check authentication.")
+    return XmlaQueryExecutor(workspace_name, dataset_name, access_token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("suite", help="YAML suite file")
+    parser.add_argument("--workspace", help="Power BI workspace name")
+    parser.add_argument("--dataset", help="Dataset name")
+    parser.add_argument("--query-key", default=DEFAULT_QUERY_KEY, help="Key of the query text in each entry")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Measured runs per query and cache mode")
+    parser.add_argument("--cache-modes", nargs="+", choices=CACHE_MODES, default=list(CACHE_MODES))
+    parser.add_argument("--baseline", help="Baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the baseline")
+    parser.add_argument("--threshold-pct", type=float, default=DEFAULT_REGRESSION_THRESHOLD_PCT,
+                        help="How much slower a median must be to count as a regression")
+    args = parser.parse_args()
+
+    with open(args.suite, "r", encoding="utf-8") as f:
+        queries = parse_benchmark_suite(f.read(), query_key=args.query_key)
+    executor = create_executor(args.workspace, args.dataset)
+
+    def print_summary(summary: dict) -> None:
+        if "p50_ms" in summary:
+            print(f"{summary['query_id']:>10} {summary['cache_mode']:<5} p50 {summary['p50_ms']:>9.1f} ms  "
+                  f"p95 {summary['p95_ms']:>9.1f} ms  rows {summary.get('row_count')}")
+        else:
+            print(f"{summary['query_id']:>10} {summary['cache_mode']:<5} failed: {summary.get('error')}")
+
+    results = run_benchmark(queries, executor, runs=args.runs, cache_modes=args.cache_modes, on_query_done=print_summary)
+
+    if args.baseline and args.save_baseline:
+        save_baseline(args.baseline, build_baseline(results, suite_name=os.path.basename(args.suite)))
+        print(f"✅ Baseline saved to {args.baseline}")
+    elif args.baseline:
+        comparison = compare_to_baseline(results, load_baseline(args.baseline), threshold_pct=args.threshold_pct)
+        for regression in comparison["regressions"]:
+            print(f"❌ Regression: {json.dumps(regression)}")
+        for change in comparison["row_count_changes"]:
+            print(f"❌ Row count changed: {json.dumps(change)}")
+        for improvement in comparison["improvements"]:
+            print(f"✅ Improvement: {json.dumps(improvement)}")
+        if not comparison["passed"]:
+            sys.exit(1)
+        print("✅ No regressions compared to the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark the startup time of the Semantic Model MCP Server.
+
+MCP clients spawn the server on demand, so the time until it answers the
+initialize request is visible to users. This script starts the server over
+stdio, sends initialize and measures the time to the response, and checks
+that heavy modules (pythonnet, pyodbc, pyarrow, psutil, msal) are not
+imported at startup.
+
+Usage:
+    python testing/benchmark_startup.py [--runs 5] [--budget-ms 2000]
+
+Exits with code 1 if the median time is over budget or a deferred module was
+imported at startup.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.lazy_imports import DEFERRED_MODULES
+
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "startup-benchmark", "version": "1.0"},
+    },
+}
+
+# Imports the server and registers its tools like main() does, then reports the loaded deferred modules
+IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import server
+server.register_bpa_tools(server.mcp)
+server.register_powerbi_desktop_tools(server.mcp)
+server.register_microsoft_learn_tools(server.mcp)
+server.register_job_tools(server.mcp)
+server.register_dax_benchmark_tools(server.mcp)
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {list(DEFERRED_MODULES)!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import() -> dict:
+    """Import the server in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=parent_dir, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_initialize(timeout: float = 60) -> float:
+    """Start the server over stdio and time the initialize response."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "server.py"], cwd=parent_dir,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        process.stdin.write(json.dumps(INITIALIZE_REQUEST) + "\n")
+        process.stdin.flush()
+        while time.perf_counter() - started < timeout:
+            line = process.stdout.readline()
+            if not line:
+                raise RuntimeError("Server exited before answering initialize")
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Not a JSON-RPC message
+            if message.get("id") == INITIALIZE_REQUEST["id"]:
+                return time.perf_counter() - started
+        raise TimeoutError("No initialize response")
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--budget-ms", type=float, default=2000, help="Maximum median time to the initialize response")
+    args = parser.parse_args()
+
+    probe = measure_import()
+    print(f"Import and tool registration: {probe['seconds'] * 1000:.0f} ms")
+
+    timings = [measure_initialize() * 1000 for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"Initialize over stdio ({args.runs} runs): min {min(timings):.0f} ms, median {median:.0f} ms, max {max(timings):.0f} ms")
+
+    failed = False
+    if probe["loaded"]:
+        print(f"❌ Modules imported at startup that should be deferred: {', '.join(probe['loaded'])}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"❌ Median startup {median:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print(f"✅ Startup within the {args.budget_ms:.0f} ms budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Test the Best Practice Analyzer rules against an in-memory model.
+
+The fixture model violates a representative set of the rules in core/bpa.json
+(data types, relationships, DAX patterns, security, date tables, model-wide
+searches) and the tests assert exactly which objects are reported.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import json
+
+from core.bpa_analyzer import BPAAnalyzer
+
+RULES_PATH = os.path.join(parent_dir, "core", "bpa.json")
+
+_analyzer = None
+
+
+def _get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = BPAAnalyzer(RULES_PATH)
+    return _analyzer
+
+
+def _column(name, data_type="int64", **properties):
+    return {"name": name, "dataType": data_type, "sourceColumn": name, **properties}
+
+
+def _partition(name):
+    return {"name": name, "source": {"type": "m", "expression": "let Source = 1 in Source"}}
+
+
+def _fixture_model():
+    return {
+        "name": "Model",
+        "tables": [
+            {
+                "name": "Sales",
+                "description": "Sales facts",
+                "columns": [
+                    _column("SalesKey", isHidden=True),
+                    _column("ProductKey"),
+                    _column("Amount", "double", description="Amount", summarizeBy="none"),
+                    {"name": "Category", "type": "calculated", "dataType": "string",
+                     "expression": "RELATED(Product[Category])", "description": "Product category"},
+                ],
+                "measures": [
+                    {"name": "Total Sales", "expression": "SUM(Sales[Amount])", "formatString": "#,0", "description": "Sum"},
+                    {"name": "Average Price", "expression": "[Total Sales] / COUNTROWS(Sales)", "formatString": "#,0.0", "description": "Average"},
+                    {"name": "Sales Copy", "expression": "[Total Sales]", "formatString": "#,0", "description": "Copy"},
+                    {"name": "Safe Sales", "expression": "IFERROR(SUM(Sales[Amount]), 0)", "formatString": "#,0", "description": "Safe"},
+                ],
+                "partitions": [_partition("Sales")],
+            },
+            {
+                "name": "Product",
+                "description": "Products",
+                "columns": [
+                    _column("ProductKey", description="Key"),
+                    _column("Month Name", "string", description="Month"),
+                ],
+                "partitions": [_partition("Product")],
+            },
+            {
+                "name": "Calendar",
+                "description": "Dates",
+                "columns": [_column("Date", "dateTime", description="Date", formatString="mm/dd/yyyy")],
+                "partitions": [_partition("Calendar")],
+            },
+        ],
+        "relationships": [
+            {"name": "R1", "fromTable": "Sales", "fromColumn": "ProductKey", "toTable": "Product", "toColumn": "ProductKey"},
+        ],
+        "roles": [
+            {"name": "Readers", "modelPermission": "read"},
+            {
+                "name": "Regional",
+                "modelPermission": "read",
+                "members": [{"memberName": "analyst@contoso.com"}],
+                "tablePermissions": [{"name": "Sales", "filterExpression": "Sales[Region] = USERPRINCIPALNAME()"}],
+            },
+        ],
+    }
+
+
+# (rule, scope, table, object) in rule order, then model order
+EXPECTED_VIOLATIONS = [
+    ("AVOID_FLOATING_POINT_DATA_TYPES", "DataColumn", "Sales", "Amount"),
+    ("ISAVAILABLEINMDX_FALSE_NONATTRIBUTE_COLUMNS", "DataColumn", "Sales", "SalesKey"),
+    ("REDUCE_USAGE_OF_CALCULATED_COLUMNS_THAT_USE_THE_RELATED_FUNCTION", "CalculatedColumn", "Sales", "Category"),
+    ("MODEL_SHOULD_HAVE_A_DATE_TABLE", "Model", None, "Model"),
+    ("DATE/CALENDAR_TABLES_SHOULD_BE_MARKED_AS_A_DATE_TABLE", "Table", None, "Calendar"),
+    ("CHECK_IF_DYNAMIC_ROW_LEVEL_SECURITY_(RLS)_IS_NECESSARY", "TablePermission", None, "Regional.Sales"),
+    ("USE_THE_DIVIDE_FUNCTION_FOR_DIVISION", "Measure", "Sales", "Average Price"),
+    ("AVOID_USING_THE_IFERROR_FUNCTION", "Measure", "Sales", "Safe Sales"),
+    ("MEASURES_SHOULD_NOT_BE_DIRECT_REFERENCES_OF_OTHER_MEASURES", "Measure", "Sales", "Sales Copy"),
+    ("UNNECESSARY_COLUMNS", "DataColumn", "Sales", "SalesKey"),
+    ("REMOVE_ROLES_WITH_NO_MEMBERS", "ModelRole", None, "Readers"),
+    ("ENSURE_TABLES_HAVE_RELATIONSHIPS", "Table", None, "Calendar"),
+    ("OBJECTS_WITH_NO_DESCRIPTION", "DataColumn", "Sales", "ProductKey"),
+    ("NUMERIC_COLUMN_SUMMARIZE_BY", "DataColumn", "Sales", "ProductKey"),
+    ("NUMERIC_COLUMN_SUMMARIZE_BY", "DataColumn", "Product", "ProductKey"),
+    ("HIDE_FOREIGN_KEYS", "DataColumn", "Sales", "ProductKey"),
+    ("HIDE_FOREIGN_KEYS", "DataColumn", "Product", "ProductKey"),
+    ("MARK_PRIMARY_KEYS", "DataColumn", "Product", "ProductKey"),
+    ("HIDE_FACT_TABLE_COLUMNS", "DataColumn", "Sales", "Amount"),
+    ("MONTH_(AS_A_STRING)_MUST_BE_SORTED", "DataColumn", "Product", "Month Name"),
+]
+
+
+def _violations(result):
+    return [(v.rule_id, v.object_type, v.table_name, v.object_name) for v in result.violations]
+
+
+def test_all_rules_compile():
+    """Every rule shipped in bpa.json compiles."""
+    analyzer = _get_analyzer()
+    print(f"   {len(analyzer.rules)} rules loaded")
+    assert analyzer.rules
+    assert analyzer.compile_errors == {}, analyzer.compile_errors
+    return True
+
+
+def test_fixture_violations():
+    """The fixture model reports exactly the expected violations."""
+    result = _get_analyzer().analyze({"model": _fixture_model()})
+    violations = _violations(result)
+    for violation in violations:
+        print(f"   {violation}")
+    assert result.model_found
+    assert violations == EXPECTED_VIOLATIONS, violations
+    return True
+
+
+def test_tmsl_command_input():
+    """A TMSL create command string gives the same result as the model dictionary."""
+    tmsl = json.dumps({"create": {"database": {"name": "DB", "model": _fixture_model()}}})
+    analyzer = _get_analyzer()
+    assert _violations(analyzer.analyze(tmsl)) == EXPECTED_VIOLATIONS
+
+    # analyze_model keeps the violations for the get_violations_* methods
+    analyzer.analyze_model(tmsl)
+    assert len(analyzer.get_violations_by_category("Performance")) > 0
+    assert analyzer.get_violations_summary()["total_violations"] == len(EXPECTED_VIOLATIONS)
+
+    assert not analyzer.analyze({"name": "DB"}).model_found
+    return True
+
+
+def test_fixed_objects_no_longer_reported():
+    """Fixing objects removes their violations and leaves the others unchanged."""
+    model = _fixture_model()
+    sales, product, calendar = model["tables"]
+    calendar["dataCategory"] = "Time"
+    calendar["columns"][0]["isKey"] = True
+    sales["columns"][1]["isHidden"] = True
+    product["columns"][0]["isKey"] = True
+    model["roles"][0]["members"] = [{"memberName": "reader@contoso.com"}]
+
+    fixed_rules = {
+        "MODEL_SHOULD_HAVE_A_DATE_TABLE",
+        "DATE/CALENDAR_TABLES_SHOULD_BE_MARKED_AS_A_DATE_TABLE",
+        "REMOVE_ROLES_WITH_NO_MEMBERS",
+        "MARK_PRIMARY_KEYS",
+    }
+    expected = [
+        violation for violation in EXPECTED_VIOLATIONS
+        if violation[0] not in fixed_rules
+        # Hidden columns need no description, summarization or visible key
+        and violation[2:] != ("Sales", "ProductKey")
+    ]
+    # ... but is now a hidden column available in MDX
+    expected.insert(2, ("ISAVAILABLEINMDX_FALSE_NONATTRIBUTE_COLUMNS", "DataColumn", "Sales", "ProductKey"))
+    violations = _violations(_get_analyzer().analyze({"model": model}))
+    assert violations == expected, violations
+    return True
+
+
+def test_evaluation_errors_are_not_violations():
+    """A rule failing for one object does not report it or stop the analysis."""
+    model = _fixture_model()
+    # Not an integer: Convert.ToInt64 fails for this table only
+    model["tables"][0]["annotations"] = [{"name": "Vertipaq_RowCount", "value": "many"}]
+    model["tables"][2]["annotations"] = [{"name": "Vertipaq_RowCount", "value": "30000000"}]
+    violations = _violations(_get_analyzer().analyze({"model": model}))
+    partitioned = [violation for violation in violations if violation[0] == "LARGE_TABLES_SHOULD_BE_PARTITIONED"]
+    assert partitioned == [("LARGE_TABLES_SHOULD_BE_PARTITIONED", "Table", None, "Calendar")], partitioned
+    assert len(violations) == len(EXPECTED_VIOLATIONS) + 1
+    return True
+
+
+def _set_default_mode(model):
+    model["defaultMode"] = "directQuery"
+    model["defaultPowerBIDataSourceVersion"] = "powerBI_V3"
+
+
+def _hide_column(model):
+    model["tables"][1]["columns"][1]["isHidden"] = True
+
+
+def _change_measure_expression(model):
+    # No longer a direct reference, but now a duplicate of Total Sales
+    model["tables"][0]["measures"][2]["expression"] = "SUM( Sales[Amount] )"
+
+
+def _drop_relationship(model):
+    model["relationships"] = []
+
+
+def _sort_by_column(model):
+    model["tables"][1]["columns"][1]["sortByColumn"] = "ProductKey"
+
+
+def _set_data_category(model):
+    calendar = model["tables"][2]
+    calendar["dataCategory"] = "Time"
+    calendar["columns"][0]["isKey"] = True
+
+
+def _reference_column_from_other_table(model):
+    # A measure in Calendar referencing the hidden Sales[SalesKey] column
+    model["tables"][2]["measures"] = [
+        {"name": "Sales Keys", "expression": "DISTINCTCOUNT('Sales'[SalesKey])", "formatString": "#,0", "description": "Keys"}
+    ]
+
+
+def _drop_measure(model):
+    del model["tables"][0]["measures"][0]
+
+
+def _add_role_members_and_rls(model):
+    model["roles"][0]["members"] = [{"memberName": "reader@contoso.com"}]
+    model["roles"][0]["tablePermissions"] = [{"name": "Product", "filterExpression": "LEFT(Product[Month Name], 1) = \"J\""}]
+
+
+def _add_annotation(model):
+    model["tables"][0]["columns"][1]["annotations"] = [{"name": "Vertipaq_Cardinality", "value": "250000"}]
+    model["relationships"][0]["crossFilteringBehavior"] = "bothDirections"
+
+
+def _rename_table(model):
+    model["tables"][2]["name"] = "Date"
+
+
+def _add_table(model):
+    model["tables"].append({
+        "name": "LocalDateTable_1",
+        "columns": [{"name": "Date", "dataType": "dateTime", "type": "calculatedTableColumn", "sourceColumn": "[Date]"}],
+        "partitions": [{"name": "LocalDateTable_1", "source": {"type": "calculated", "expression": "CALENDARAUTO()"}}],
+    })
+
+
+MUTATIONS = [
+    ("model properties", _set_default_mode),
+    ("column hidden", _hide_column),
+    ("measure expression", _change_measure_expression),
+    ("sort-by column", _sort_by_column),
+    ("data category", _set_data_category),
+    ("cross-table DAX reference", _reference_column_from_other_table),
+    ("measure dropped", _drop_measure),
+    ("role members and RLS", _add_role_members_and_rls),
+    ("annotations", _add_annotation),
+    ("relationship dropped", _drop_relationship),
+    ("table renamed", _rename_table),
+    ("table added", _add_table),
+]
+
+
+def _assert_incremental_matches(analyzer, model, previous, label):
+    """Analyze a model incrementally and compare with a full analysis."""
+    result, snapshot = analyzer.analyze_incremental({"model": model}, previous)
+    full = analyzer.analyze({"model": model})
+    assert result.incremental == (previous is not None), label
+    assert result.to_dicts() == full.to_dicts(), f"{label}: {_violations(result)} != {_violations(full)}"
+    return result, snapshot
+
+
+def test_incremental_matches_full_analysis():
+    """Each mutation analyzed against the fixture's snapshot gives the full result."""
+    analyzer = _get_analyzer()
+    _, base_snapshot = _assert_incremental_matches(analyzer, _fixture_model(), None, "fixture")
+    for label, mutate in MUTATIONS:
+        model = _fixture_model()
+        mutate(model)
+        full = _violations(analyzer.analyze({"model": model}))
+        assert full != EXPECTED_VIOLATIONS, f"{label} does not change the violations"
+        result, _ = _assert_incremental_matches(analyzer, model, base_snapshot, label)
+        print(f"   {label}: {result.changed_objects} changed, {result.objects_analyzed} re-evaluated")
+        assert 0 < result.changed_objects and result.objects_analyzed < len(base_snapshot.keyed_objects), label
+    return True
+
+
+def test_incremental_chain():
+    """Applying the mutations one after another keeps matching the full analysis."""
+    analyzer = _get_analyzer()
+    model = _fixture_model()
+    _, snapshot = _assert_incremental_matches(analyzer, model, None, "fixture")
+    for label, mutate in MUTATIONS:
+        mutate(model)
+        _, snapshot = _assert_incremental_matches(analyzer, model, snapshot, label)
+
+    # An unchanged model reuses every result
+    result, _ = _assert_incremental_matches(analyzer, model, snapshot, "unchanged")
+    assert result.changed_objects == 0 and result.rule_evaluations == 0
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Testing the Best Practice Analyzer rules")
+    print("=" * 60)
+
+    tests = [
+        ("All rules compile", test_all_rules_compile),
+        ("Fixture model violations", test_fixture_violations),
+        ("TMSL command input", test_tmsl_command_input),
+        ("Fixed objects no longer reported", test_fixed_objects_no_longer_reported),
+        ("Evaluation errors are not violations", test_evaluation_errors_are_not_violations),
+        ("Incremental analysis matches full analysis", test_incremental_matches_full_analysis),
+        ("Incremental analysis of a chain of edits", test_incremental_chain),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"   ❌ Test failed: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
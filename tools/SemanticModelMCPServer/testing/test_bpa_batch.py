@@ -0,0 +1,172 @@
+"""
+Test batch Best Practice Analysis over in-memory model definitions.
+
+A fake fetcher returns TMSL fixtures with delays that make later models finish
+first, so the tests check that results keep the requested order, that one
+failing model does not stop the others and what the output files contain.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import json
+import tempfile
+import time
+
+from core.bpa_analyzer import BPAAnalyzer
+from core.bpa_batch import VIOLATION_COLUMNS, run_batch_bpa
+from core.lazy_imports import optional_import
+
+RULES_PATH = os.path.join(parent_dir, "core", "bpa.json")
+
+
+def _tmsl(table_name, data_type):
+    return json.dumps({"create": {"database": {"name": table_name, "model": {"name": "Model", "tables": [{
+        "name": table_name,
+        "columns": [{"name": "Value", "dataType": data_type, "sourceColumn": "Value"}],
+        "partitions": [{"name": table_name, "source": {"type": "m", "expression": "let Source = 1 in Source"}}],
+    }]}}}})
+
+
+# Dataset -> (fetch delay in seconds, TMSL or exception)
+DEFINITIONS = {
+    "Sales": (0.15, _tmsl("Sales", "double")),
+    "Broken": (0.10, ConnectionError("XMLA endpoint unavailable")),
+    "Empty": (0.05, json.dumps({"create": {"database": {"name": "Empty"}}})),
+    "Product": (0.0, _tmsl("Product", "string")),
+}
+DATASETS = [("Workspace", name) for name in DEFINITIONS]
+
+
+def _fake_fetch(workspace_name, dataset_name, use_cache):
+    delay, definition = DEFINITIONS[dataset_name]
+    time.sleep(delay)
+    if isinstance(definition, Exception):
+        raise definition
+    return definition
+
+
+def _run(output_format="ndjson", use_processes=False):
+    output_path = os.path.join(tempfile.mkdtemp(), f"violations.{output_format}")
+    done = []
+    result = run_batch_bpa(DATASETS, RULES_PATH, output_path=output_path, output_format=output_format,
+                           fetch_workers=4, analysis_workers=2, use_processes=use_processes,
+                           on_model_done=lambda run: done.append(run.dataset_name), fetch_definition=_fake_fetch)
+    return result, done
+
+
+def _expected_counts():
+    analyzer = BPAAnalyzer(RULES_PATH)
+    return {name: len(analyzer.analyze(DEFINITIONS[name][1]).violations) for name in ("Sales", "Product")}
+
+
+def _check_runs(result, done):
+    runs = {run.dataset_name: run for run in result.runs}
+    # Results keep the requested order, callbacks come in completion order
+    assert [run.dataset_name for run in result.runs] == list(DEFINITIONS)
+    assert sorted(done) == sorted(DEFINITIONS) and done != list(DEFINITIONS), done
+
+    assert runs["Broken"].error == "XMLA endpoint unavailable" and runs["Broken"].error_stage == "fetch"
+    assert runs["Empty"].error == "No model found in the TMSL definition" and runs["Empty"].error_stage == "analyze"
+    expected = _expected_counts()
+    for name, count in expected.items():
+        assert runs[name].error is None and runs[name].violation_count == count > 0, runs[name]
+        assert runs[name].summary["total_violations"] == count
+
+    summary = result.to_dict()
+    assert summary["models_requested"] == 4 and summary["models_failed"] == 2
+    assert summary["total_violations"] == sum(expected.values())
+    return expected
+
+
+def test_ndjson_output():
+    """Violations of every analyzed model are streamed as one JSON object per line."""
+    result, done = _run()
+    print(f"   completion order: {done}")
+    expected = _check_runs(result, done)
+
+    with open(result.output_path, encoding="utf-8") as file:
+        rows = [json.loads(line) for line in file]
+    assert len(rows) == sum(expected.values())
+    for row in rows:
+        assert set(row) == set(VIOLATION_COLUMNS), sorted(row)
+        assert row["workspace_name"] == "Workspace"
+    # Each model's violations are written together, as soon as it finishes
+    datasets = [row["dataset_name"] for row in rows]
+    assert datasets == ["Product"] * expected["Product"] + ["Sales"] * expected["Sales"], datasets
+    assert any(row["rule_id"] == "AVOID_FLOATING_POINT_DATA_TYPES" and row["dataset_name"] == "Sales" for row in rows)
+    return True
+
+
+def test_process_pool():
+    """Analyzing in worker processes gives the same per-model results."""
+    result, done = _run(use_processes=True)
+    _check_runs(result, done)
+    return True
+
+
+def test_parquet_output():
+    """Parquet output has one row per violation, or needs pyarrow."""
+    if optional_import("pyarrow") is None:
+        try:
+            _run("parquet")
+            raise AssertionError("Parquet output without pyarrow did not fail")
+        except ImportError as e:
+            print(f"   pyarrow not installed: {e}")
+        return True
+
+    result, done = _run("parquet")
+    expected = _check_runs(result, done)
+    table = optional_import("pyarrow.parquet").read_table(result.output_path)
+    assert table.column_names == list(VIOLATION_COLUMNS)
+    assert table.num_rows == sum(expected.values())
+    return True
+
+
+def test_unsupported_format():
+    """Unknown output formats are rejected before any model is fetched."""
+    fetched = []
+    try:
+        run_batch_bpa(DATASETS, RULES_PATH, output_format="xlsx",
+                      fetch_definition=lambda *args: fetched.append(args))
+        raise AssertionError("Unsupported format accepted")
+    except ValueError:
+        pass
+    assert fetched == []
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Testing batch Best Practice Analysis")
+    print("=" * 60)
+
+    tests = [
+        ("NDJSON output", test_ndjson_output),
+        ("Process pool", test_process_pool),
+        ("Parquet output", test_parquet_output),
+        ("Unsupported format", test_unsupported_format),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"   ❌ Test failed: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
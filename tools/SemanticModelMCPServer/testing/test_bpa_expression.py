@@ -0,0 +1,264 @@
+"""
+Test the compiler for BPA rule expressions.
+
+Expressions are compiled once and evaluated against the model objects of a
+small in-memory model, covering the parts of the Dynamic LINQ dialect the
+rules in core/bpa.json use.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.bpa_expression import (
+    BPAEvaluationError,
+    BPAExpressionError,
+    compile_expression,
+    expression_identifiers,
+    model_search_identifiers,
+)
+from core.bpa_model import BPAModelIndex
+
+
+def _index():
+    return BPAModelIndex({
+        "name": "Model",
+        "tables": [
+            {
+                "name": "Sales",
+                "columns": [
+                    {"name": "ProductKey", "dataType": "int64", "sourceColumn": "ProductKey"},
+                    {"name": "Amount", "dataType": "double", "sourceColumn": "Amount", "description": "Sales amount"},
+                ],
+                "measures": [
+                    {"name": "Total Sales", "expression": "SUM(Sales[Amount])", "formatString": "#,0"},
+                    {"name": "Sales Copy", "expression": "[Total Sales]"},
+                ],
+            },
+            {
+                "name": "Product",
+                "isHidden": True,
+                "columns": [
+                    {"name": "ProductKey", "dataType": "int64", "sourceColumn": "ProductKey", "isKey": True},
+                    {"name": "Month Name", "dataType": "string", "sourceColumn": "Month Name"},
+                ],
+            },
+        ],
+        "relationships": [
+            {"name": "R1", "fromTable": "Sales", "fromColumn": "ProductKey", "toTable": "Product", "toColumn": "ProductKey"},
+        ],
+    })
+
+
+def _evaluate(expression, obj):
+    return compile_expression(expression)((obj,))
+
+
+def _table(index, name):
+    return index.tables_by_name[name]
+
+
+def _column(index, table, name):
+    return index.columns_by_name[(table, name)]
+
+
+def test_operators_and_precedence():
+    """Arithmetic, comparison and logical operators bind like in C#."""
+    model = _index().model
+    cases = [
+        ("1 + 2 * 3 = 7", True),
+        ("(1 + 2) * 3 == 9", True),
+        ("10 / 4 = 2", True),
+        ("10.0 / 4 = 2.5", True),
+        ("7 % 4 == 3", True),
+        ("-2 + 5 = 3", True),
+        ("2 > 1 and 1 >= 1 and 1 < 2 and 2 <= 2", True),
+        ("1 <> 1 or 1 != 2", True),
+        ("true or false and false", True),
+        ("(true or false) and false", False),
+        ("not true or true", True),
+        ("!(1 = 1)", False),
+        ("true && !false || false", True),
+        ("null == null", True),
+        ("null > 1", False),
+        ("'a' + 1 + 2 == \"a12\"", True),
+        ("\"It\"\"s\" == 'It\"s'", True),
+    ]
+    for expression, expected in cases:
+        result = _evaluate(expression, model)
+        assert result == expected, f"{expression} -> {result}"
+    print(f"   {len(cases)} expressions evaluated")
+    return True
+
+
+def test_members_and_enums():
+    """Members resolve case-insensitively and enum members evaluate to their names."""
+    index = _index()
+    amount = _column(index, "Sales", "Amount")
+    assert _evaluate("DataType = \"Double\"", amount)
+    assert _evaluate("datatype == DataType.Double", amount)
+    assert _evaluate("Table.Name == 'Sales' and Table.IsHidden == false", amount)
+    assert _evaluate("DaxObjectName == \"'Sales'[Amount]\"", amount)
+    assert _evaluate("Table.Columns[1].Name == Name", amount)
+    # Members without a TOM mapping fall back to the TMSL property
+    assert _evaluate("SourceColumn == 'Amount' and sourceColumn == 'Amount'", amount)
+    assert _evaluate("Name.Length == 6 and Table.Columns.Count = 2", amount)
+    return True
+
+
+def test_lambdas_with_it_and_current():
+    """Lambda predicates see the item as it and the rule's object as current."""
+    index = _index()
+    sales = _table(index, "Sales")
+    product = _table(index, "Product")
+    assert _evaluate("Columns.Any(DataType == \"Double\")", sales)
+    assert not _evaluate("Columns.All(DataType == \"Int64\")", sales)
+    assert _evaluate("Columns.Where(DataType == \"Int64\").Count() == 1", sales)
+    assert _evaluate("Columns.Count(it.Name.StartsWith(\"Product\")) = 1", sales)
+    assert _evaluate("Columns.First(IsKey).Name == 'ProductKey'", product)
+    assert _evaluate("Columns.FirstOrDefault(IsKey) == null", sales)
+    assert _evaluate("Columns.Select(Name).Contains('Amount')", sales)
+    assert _evaluate("Name.ToCharArray().Any(char.IsUpper(it))", sales)
+
+    # current and outerIt refer to the object under test inside the lambda
+    assert _evaluate("UsedInRelationships.Any(current.Name == FromTable.Name)", sales)
+    assert not _evaluate("UsedInRelationships.Any(current.Name == ToTable.Name)", sales)
+    assert _evaluate("Model.AllColumns.Any(Name == outerIt.Name and Table.Name != outerIt.Table.Name)", sales.columns[0])
+    assert _evaluate("Model.Tables.Any(Columns.Any(Name == current.Name) and Name != current.Table.Name)", sales.columns[0])
+    assert not _evaluate("Model.Tables.Any(Columns.Any(Name == current.Name) and Name != current.Table.Name)", sales.columns[1])
+
+    # An empty sequence has no first item
+    try:
+        _evaluate("Columns.First(IsKey)", sales)
+        raise AssertionError("First() on an empty sequence did not fail")
+    except BPAEvaluationError:
+        pass
+    return True
+
+
+def test_model_searches():
+    """Model.* searches find other objects, also through the hash lookup path."""
+    index = _index()
+    copy = index.measures[1]
+    total = index.measures[0]
+    expression = "Model.AllMeasures.Any(DaxObjectName == current.Expression)"
+    assert _evaluate(expression, copy)
+    assert not _evaluate(expression, total)
+
+    # The lookup built for the first evaluation must serve the other objects
+    duplicate = "Model.AllMeasures.Any(Expression == current.Expression and Name != current.Name)"
+    assert not _evaluate(duplicate, copy)
+    assert not _evaluate(duplicate, total)
+    assert _evaluate("Model.AllColumns.Where(Name == 'ProductKey').Count() == 2", total)
+    assert _evaluate("Model.AllColumns.Any(Name == current.Name and Table.Name != current.Table.Name)", index.columns[0])
+    assert _evaluate("Model.Relationships.Any(RegEx.IsMatch(FromColumn.Name, 'Key$'))", total)
+    assert not _evaluate("Model.AllMeasures.Any(RegEx.IsMatch(Expression, '(?i)average'))", total)
+
+    assert model_search_identifiers("Model.AllMeasures.Any(Expression == current.Expression)") == {"allmeasures", "any", "expression"}
+    assert model_search_identifiers("Columns.Any(IsKey)") is None
+    assert expression_identifiers("Name.StartsWith(\"Model\")") == {"name", "startswith"}
+    return True
+
+
+def test_string_and_regex_methods():
+    """String methods, static helpers and .NET regular expressions."""
+    index = _index()
+    month = _column(index, "Product", "Month Name")
+    cases = [
+        "Name.ToUpper() == 'MONTH NAME' and Name.ToLower() == 'month name'",
+        "Name.Contains('th N') and Name.StartsWith('Mon') and Name.EndsWith('Name')",
+        "Name.IndexOf('name', 'OrdinalIgnoreCase') == 6 and Name.IndexOf('name') == -1",
+        "Name.Replace(' ', '') == 'MonthName' and Name.Substring(0, 5) == 'Month'",
+        "Name.Substring(6) == 'Name' and ' x '.Trim() == 'x' and Name.Equals('Month Name')",
+        "Name.IndexOf(char(32)) == 5 and Name.IndexOf(char(9)) == -1",
+        "string.IsNullOrWhitespace(Description) and not string.IsNullOrEmpty(Name)",
+        "Convert.ToInt64('42') + Convert.ToInt32(GetAnnotation('Missing')) == 42",
+        "Convert.ToDecimal('2.5') == 2.5 and Math.Max(1, 3) == 3 and Math.Abs(-2) == 2",
+        "RegEx.IsMatch(Name, '(?i)^month\\s+name$')",
+        "RegEx.IsMatch(Name, 'Name' + '$') and not RegEx.IsMatch(Name, '^name')",
+        "RegEx.IsMatch(\"SUM(x)\\n/ 2\", \"\\)\\s*\\/(?!\\/)\")",
+        "IsHidden.ToString() == 'False' and Table.IsHidden.ToString() == 'True'",
+    ]
+    for expression in cases:
+        assert _evaluate(expression, month), expression
+
+    # Null inputs fail the evaluation rather than matching
+    for expression in ("RegEx.IsMatch(GetAnnotation('Missing'), 'x')", "GetAnnotation('Missing').Contains('x')",
+                       "Name.Substring(4, 20) == ''"):
+        try:
+            _evaluate(expression, month)
+            raise AssertionError(f"{expression} did not fail")
+        except BPAEvaluationError:
+            pass
+    print(f"   {len(cases)} expressions evaluated")
+    return True
+
+
+def test_compile_errors():
+    """Unsupported syntax is rejected when the rule is compiled."""
+    invalid = [
+        "",
+        "   ",
+        "Name ==",
+        "(Name == 'x'",
+        "Name == 'x')",
+        "Name == 'unterminated",
+        "Name # 1",
+        "RegEx.IsMatch(Name)",
+        "RegEx.IsMatch(Name, '(unbalanced')",
+        "char(1, 2)",
+        "Columns.Any(IsKey,",
+        "Name.",
+    ]
+    for expression in invalid:
+        try:
+            compile_expression(expression)
+            raise AssertionError(f"{expression!r} compiled")
+        except BPAExpressionError as e:
+            print(f"   {expression!r}: {e}")
+
+    # Unknown members compile but fail on evaluation, for the object only
+    compiled = compile_expression("Name.NoSuchMethod()")
+    try:
+        compiled((_index().model,))
+        raise AssertionError("Unknown method did not fail")
+    except BPAEvaluationError:
+        pass
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Testing BPA rule expressions")
+    print("=" * 60)
+
+    tests = [
+        ("Operators and precedence", test_operators_and_precedence),
+        ("Members and enums", test_members_and_enums),
+        ("Lambdas with it and current", test_lambdas_with_it_and_current),
+        ("Model searches", test_model_searches),
+        ("String and regex methods", test_string_and_regex_methods),
+        ("Compile errors", test_compile_errors),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"   ❌ Test failed: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,112 @@
+"""
+Test the DAX benchmark harness with the stand-in executor.
+
+Durations are simulated, and sleeping is replaced so the tests run instantly.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.dax_benchmark import BenchmarkQuery, QueryExecutor, StandInExecutor, run_benchmark
+
+QUERIES = [BenchmarkQuery("1", "EVALUATE A"), BenchmarkQuery("2", "EVALUATE B")]
+
+
+class _FailingClearExecutor(StandInExecutor):
+    """Stand-in executor whose cache clears fail on the given calls (1-based)."""
+
+    def __init__(self, failing_clears):
+        super().__init__(sleep=lambda seconds: None)
+        self.failing_clears = set(failing_clears)
+
+    def clear_cache(self):
+        super().clear_cache()
+        if self.cache_clears in self.failing_clears:
+            raise RuntimeError("ClearCache was denied")
+
+
+def test_executor_is_abstract():
+    """Executors must implement both execute and clear_cache."""
+    class ExecuteOnly(QueryExecutor):
+        def execute(self, dax_query):
+            return 0
+
+    for executor_class in (QueryExecutor, ExecuteOnly):
+        try:
+            executor_class()
+            raise AssertionError(f"{executor_class.__name__} was instantiated")
+        except TypeError as e:
+            print(f"   {e}")
+    return True
+
+
+def test_runs_per_cache_mode():
+    """Cold runs clear the cache before each run; warm runs never do."""
+    executor = StandInExecutor(sleep=lambda seconds: None, row_counts={"EVALUATE B": 3})
+    summaries = run_benchmark(QUERIES, executor, runs=3)
+    assert [(s["query_id"], s["cache_mode"], s["runs"]) for s in summaries] == [
+        ("1", "cold", 3), ("1", "warm", 3), ("2", "cold", 3), ("2", "warm", 3)], summaries
+    assert executor.cache_clears == 6
+    # Each cold run plus one unmeasured warm-up and three warm runs per query
+    assert executor.executed == 2 * (3 + 1 + 3)
+    assert summaries[2]["row_count"] == 3 and all(s["failed_runs"] == 0 for s in summaries)
+    return True
+
+
+def test_cache_clear_failure_is_a_failed_run():
+    """A failing cache clear is recorded for its run, and later runs continue."""
+    executor = _FailingClearExecutor(failing_clears={2})
+    summaries = run_benchmark(QUERIES[:1], executor, runs=3, cache_modes=["cold"])
+    summary = summaries[0]
+    print(f"   {summary}")
+    assert summary["runs"] == 2 and summary["failed_runs"] == 1
+    assert summary["error"] == "Clearing the cache failed: ClearCache was denied"
+    # The run without a cleared cache was not measured
+    assert executor.executed == 2
+    return True
+
+
+def test_first_cache_clear_failure_stops_the_mode():
+    """Like a failing first execution, a failing first clear skips the query's cold runs."""
+    executor = _FailingClearExecutor(failing_clears={1})
+    summaries = run_benchmark(QUERIES, executor, runs=3, cache_modes=["cold", "warm"])
+    assert summaries[0]["runs"] == 0 and summaries[0]["failed_runs"] == 1
+    # The warm runs and the next query are measured as usual
+    assert [s["runs"] for s in summaries[1:]] == [3, 3, 3], summaries
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Testing the DAX benchmark harness")
+    print("=" * 60)
+
+    tests = [
+        ("Executor is abstract", test_executor_is_abstract),
+        ("Runs per cache mode", test_runs_per_cache_mode),
+        ("Cache clear failure is a failed run", test_cache_clear_failure_is_a_failed_run),
+        ("First cache clear failure stops the mode", test_first_cache_clear_failure_stops_the_mode),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"   ❌ Test failed: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,170 @@
+"""
+Test the DAX query result cache: key normalization, identities, storage modes,
+volatile queries and invalidation.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+from core.dax_query_cache import (
+    MODEL_MODE_QUERY, PARTITION_MODES_QUERY, REFRESH_STATE_QUERY, UNCACHEABLE_STATE,
+    DaxQueryCache, is_cacheable_query, normalize_dax_query, query_cache_state,
+)
+from core.dax_result_reader import DaxResult
+
+
+def _result(value=1, approx_bytes=100):
+    return DaxResult(columns=["[x]"], data=[[value]], row_count=1, approx_bytes=approx_bytes)
+
+
+class _Reader:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.row = None
+
+    def Read(self):
+        if not self.rows:
+            return False
+        self.row = self.rows.pop(0)
+        return True
+
+    def GetValue(self, index):
+        return self.row[index]
+
+    def Close(self):
+        pass
+
+
+class _Command:
+    def __init__(self, responses):
+        self.responses = responses
+        self.CommandText = ""
+
+    def ExecuteReader(self):
+        return _Reader(self.responses[self.CommandText])
+
+
+class _Connection:
+    """Answers the refresh state and storage mode DMVs."""
+
+    def __init__(self, default_mode=0, partition_modes=(0,)):
+        self.responses = {
+            REFRESH_STATE_QUERY: [("2026-01-01", "2026-01-02")],
+            MODEL_MODE_QUERY: [(default_mode,)],
+            PARTITION_MODES_QUERY: [(mode,) for mode in partition_modes],
+        }
+
+    def CreateCommand(self):
+        return _Command(self.responses)
+
+
+def test_normalization():
+    """Whitespace and comments outside literals do not change the key."""
+    assert normalize_dax_query("EVALUATE\n  ROW(\"a\",   1) // note") == 'EVALUATE ROW("a", 1)'
+    assert normalize_dax_query("/* c */ EVALUATE 'My  Table'") == "EVALUATE 'My  Table'"
+    assert normalize_dax_query('EVALUATE ROW("a  b", 1)') != normalize_dax_query('EVALUATE ROW("a b", 1)')
+
+    cache = DaxQueryCache()
+    cache.put("WS", "DS", "id", "state", "EVALUATE\n\tValues('T'[C])", _result())
+    assert cache.get("ws", "ds", "id", "state", "EVALUATE Values('T'[C]) -- again") is not None
+    assert cache.get("ws", "ds", "id", "state", "EVALUATE VALUES('T'[C])") is None, "case is part of the key"
+    return True
+
+
+def test_keys_separate_identity_state_and_budget():
+    """Results are not shared across identities, refresh states or budgets."""
+    cache = DaxQueryCache()
+    query = "EVALUATE 'T'"
+    cache.put("ws", "ds", "user-a", "state-1", query, _result(), max_rows=10)
+    assert cache.get("ws", "ds", "user-a", "state-1", query, max_rows=10) is not None
+    assert cache.get("ws", "ds", "user-b", "state-1", query, max_rows=10) is None
+    assert cache.get("ws", "ds", "user-a", "state-2", query, max_rows=10) is None
+    assert cache.get("ws", "ds", "user-a", "state-1", query, max_rows=20) is None
+    return True
+
+
+def test_volatile_queries_not_cached():
+    """Queries calling volatile functions are never cached."""
+    for query in ("EVALUATE ROW(\"t\", NOW())", "EVALUATE { TODAY () }", "EVALUATE ROW(\"u\", USERPRINCIPALNAME())"):
+        assert not is_cacheable_query(query), query
+    # Names and literals that merely contain the function names are fine
+    assert is_cacheable_query("EVALUATE ROW(\"NOW()\", [Today])")
+    assert is_cacheable_query("EVALUATE 'Today'")
+
+    cache = DaxQueryCache()
+    cache.put("ws", "ds", "id", "state", "EVALUATE ROW(\"t\", NOW())", _result())
+    assert cache.get("ws", "ds", "id", "state", "EVALUATE ROW(\"t\", NOW())") is None
+    assert cache.get_status()["entries"] == 0
+    return True
+
+
+def test_storage_modes():
+    """Only Import models get a cacheable state."""
+    assert query_cache_state(_Connection()) == "2026-01-01|2026-01-02"
+    # Partitions in default mode follow the model's default mode
+    assert query_cache_state(_Connection(default_mode=0, partition_modes=(2, 0))) != UNCACHEABLE_STATE
+    assert query_cache_state(_Connection(default_mode=1, partition_modes=(2,))) == UNCACHEABLE_STATE
+    assert query_cache_state(_Connection(partition_modes=(0, 1))) == UNCACHEABLE_STATE
+    assert query_cache_state(_Connection(partition_modes=(0, 4))) == UNCACHEABLE_STATE
+
+    cache = DaxQueryCache()
+    cache.put("ws", "ds", "id", UNCACHEABLE_STATE, "EVALUATE 'T'", _result())
+    assert cache.get("ws", "ds", "id", UNCACHEABLE_STATE, "EVALUATE 'T'") is None
+    assert cache.get_status()["entries"] == 0
+    return True
+
+
+def test_invalidation_and_eviction():
+    """Invalidating a dataset drops only its entries; LRU evicts the oldest."""
+    cache = DaxQueryCache(max_entries=2)
+    cache.set_refresh_state("ws", "ds", "state")
+    cache.put("ws", "ds", "id", "state", "EVALUATE 'A'", _result())
+    cache.put("ws", "other", "id", "state", "EVALUATE 'A'", _result())
+    assert cache.invalidate("WS", "DS") == 1
+    assert cache.get_refresh_state("ws", "ds") is None
+    assert cache.get("ws", "other", "id", "state", "EVALUATE 'A'") is not None
+
+    cache.put("ws", "other", "id", "state", "EVALUATE 'B'", _result())
+    cache.put("ws", "other", "id", "state", "EVALUATE 'C'", _result())
+    assert cache.get("ws", "other", "id", "state", "EVALUATE 'A'") is None
+    assert cache.get_status()["entries"] == 2
+    assert cache.clear() == 2
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Testing DAX query result cache")
+    print("=" * 60)
+
+    tests = [
+        ("Key normalization", test_normalization),
+        ("Identity, state and budget keys", test_keys_separate_identity_state_and_budget),
+        ("Volatile queries", test_volatile_queries_not_cached),
+        ("Storage modes", test_storage_modes),
+        ("Invalidation and eviction", test_invalidation_and_eviction),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+                print("   ✅ Passed")
+        except AssertionError as e:
+            print(f"   ❌ Test failed: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
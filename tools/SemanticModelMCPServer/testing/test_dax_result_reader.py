@@ -0,0 +1,158 @@
+"""
+Test reading DAX results under row and byte budgets.
+
+A fake data reader stands in for ADOMD.NET's AdomdDataReader, so the tests run
+without the .NET assemblies.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import datetime
+
+from core.dax_result_reader import read_dax_result
+from core.lazy_imports import optional_import
+
+
+class _Reader:
+    """Minimal data reader over a list of rows, counting the rows read."""
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+        self.position = -1
+        self.FieldCount = len(columns)
+
+    def GetName(self, i):
+        return self.columns[i]
+
+    def Read(self):
+        self.position += 1
+        return self.position < len(self.rows)
+
+    def GetValue(self, i):
+        return self.rows[self.position][i]
+
+
+def _reader(row_count=10):
+    return _Reader(["Product[Name]", "[Amount]"], [(f"P{i}", i * 1.5) for i in range(row_count)])
+
+
+def test_within_budget():
+    """A result within both budgets is read completely."""
+    result = read_dax_result(_reader(10), max_rows=10, max_bytes=1000)
+    print(f"   {result.truncation_info()}")
+    assert not result.truncated and result.truncation_reason is None
+    assert result.row_count == 10
+    assert result.columns == ["Product[Name]", "[Amount]"]
+    assert result.data[0][:2] == ["P0", "P1"] and result.data[1][-1] == 13.5
+    # Two string characters plus quotes, and a fixed size for numbers
+    assert result.approx_bytes == 10 * (4 + 8)
+    return True
+
+
+def test_max_rows():
+    """Reading stops at max_rows and flags the result."""
+    reader = _reader(10)
+    result = read_dax_result(reader, max_rows=4, max_bytes=None)
+    print(f"   {result.truncation_info()}")
+    assert result.truncated and result.truncation_reason == "max_rows"
+    assert result.row_count == 4 and len(result.data[0]) == 4
+    assert result.max_rows == 4 and result.max_bytes is None
+    # The row after the budget is read to detect the truncation, no more
+    assert reader.position == 4
+    return True
+
+
+def test_max_bytes():
+    """Reading stops before the row that would exceed max_bytes."""
+    result = read_dax_result(_reader(10), max_rows=None, max_bytes=30)
+    print(f"   {result.truncation_info()}")
+    assert result.truncated and result.truncation_reason == "max_bytes"
+    assert result.row_count == 2 and result.approx_bytes == 24
+    assert result.data == [["P0", "P1"], [0.0, 1.5]]
+
+    # A single row over the budget gives an empty, truncated result
+    result = read_dax_result(_Reader(["Text"], [("x" * 100,)]), max_bytes=10)
+    assert result.truncated and result.row_count == 0 and result.data == [[]]
+    return True
+
+
+def test_no_limits():
+    """None disables a budget."""
+    result = read_dax_result(_reader(500), max_rows=None, max_bytes=None)
+    assert not result.truncated and result.row_count == 500
+    return True
+
+
+def test_value_conversion():
+    """Dates become ISO strings and empty values become null."""
+    rows = [(datetime.datetime(2024, 1, 31, 12, 0), "", None, True)]
+    result = read_dax_result(_Reader(["Date", "Empty", "Null", "Flag"], rows))
+    assert result.to_rows() == [{"Date": "2024-01-31T12:00:00", "Empty": None, "Null": None, "Flag": True}]
+    return True
+
+
+def test_output_formats():
+    """Row output is a plain list; the other formats carry the truncation metadata."""
+    result = read_dax_result(_reader(10), max_rows=3)
+    rows = result.to_output("rows")
+    assert rows == [{"Product[Name]": f"P{i}", "[Amount]": i * 1.5} for i in range(3)], rows
+
+    columnar = result.to_output("columnar")
+    assert columnar["data"] == result.data and columnar["truncated"] and columnar["truncation_reason"] == "max_rows"
+
+    csv_output = result.to_output("csv")
+    assert csv_output["csv"].splitlines() == ["Product[Name],[Amount]", "P0,0.0", "P1,1.5", "P2,3.0"]
+    assert csv_output["row_count"] == 3 and csv_output["max_rows"] == 3
+
+    if optional_import("pyarrow") is not None:
+        arrow_output = result.to_output("arrow")
+        assert arrow_output["arrow_ipc_base64"] and arrow_output["truncated"]
+    else:
+        print("   pyarrow not installed, skipping the arrow format")
+
+    try:
+        result.to_output("xml")
+        raise AssertionError("Unsupported format accepted")
+    except ValueError:
+        pass
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Testing the DAX result reader")
+    print("=" * 60)
+
+    tests = [
+        ("Result within budget", test_within_budget),
+        ("Row budget", test_max_rows),
+        ("Byte budget", test_max_bytes),
+        ("No limits", test_no_limits),
+        ("Value conversion", test_value_conversion),
+        ("Output formats", test_output_formats),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"   ❌ Test failed: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
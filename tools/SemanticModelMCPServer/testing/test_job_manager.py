@@ -0,0 +1,232 @@
+"""
+Test the background job manager.
+
+Jobs block on events the tests control, and the managers have one or two
+workers, so queued, waiting, running and cancelled states can be reached on
+purpose instead of by timing.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import threading
+import time
+
+from core.job_manager import JobManager
+
+TIMEOUT = 5
+
+
+def _wait_for(condition, timeout=TIMEOUT):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("Timed out waiting for the jobs")
+        time.sleep(0.005)
+
+
+def _wait_finished(*jobs):
+    _wait_for(lambda: all(job.is_finished for job in jobs))
+
+
+def _blocking(release, log=None, name=None, result=None):
+    """A job function that waits for an event and records when it runs."""
+    def run():
+        if log is not None:
+            log.append(f"start {name}")
+        if not release.wait(TIMEOUT):
+            raise RuntimeError("not released")
+        if log is not None:
+            log.append(f"end {name}")
+        return result
+    return run
+
+
+def test_per_key_serialization():
+    """Jobs with the same key run one at a time in order, without holding a worker while waiting."""
+    manager = JobManager(max_workers=2)
+    log = []
+    releases = [threading.Event() for _ in range(3)]
+    keyed = [manager.submit("deploy", _blocking(release, log, name), serialize_key="ws/model")
+             for release, name in zip(releases, "ABC")]
+    _wait_for(lambda: keyed[0].status == "running")
+    assert [job.status for job in keyed] == ["running", "queued", "queued"]
+
+    # The waiting jobs leave the second worker free for other work
+    other_release = threading.Event()
+    other = manager.submit("query", _blocking(other_release, log, "other"), serialize_key="ws/other")
+    _wait_for(lambda: other.status == "running")
+    other_release.set()
+
+    for release in releases:
+        release.set()
+    _wait_finished(other, *keyed)
+    keyed_log = [entry for entry in log if "other" not in entry]
+    print(f"   {keyed_log}")
+    assert keyed_log == ["start A", "end A", "start B", "end B", "start C", "end C"], keyed_log
+    assert all(job.status == "succeeded" for job in keyed)
+    assert manager._active_keys == set() and manager._waiting == {}
+    return True
+
+
+def test_cancel_started_but_queued_job():
+    """Cancelling a job queued in the pool hands its key to the next waiting job."""
+    manager = JobManager(max_workers=1)
+    blocker_release = threading.Event()
+    blocker = manager.submit("query", _blocking(blocker_release))
+    _wait_for(lambda: blocker.status == "running")
+
+    ran = []
+    first = manager.submit("deploy", lambda: ran.append("first"), serialize_key="ws/model")
+    second = manager.submit("deploy", lambda: ran.append("second") or "done", serialize_key="ws/model")
+    # The first job owns the key and sits in the pool's queue, the second waits for the key
+    assert first.job_id in manager._futures and second.job_id not in manager._futures
+
+    assert manager.cancel(first.job_id)
+    assert first.status == "cancelled"
+    assert second.job_id in manager._futures, "The key was not handed to the waiting job"
+
+    blocker_release.set()
+    _wait_finished(blocker, second)
+    assert ran == ["second"], ran
+    assert second.status == "succeeded" and second.result == "done"
+    assert manager._active_keys == set()
+    return True
+
+
+def test_cancel_waiting_job():
+    """A job waiting for its key is skipped once the key is released."""
+    manager = JobManager(max_workers=2)
+    release = threading.Event()
+    ran = []
+    first = manager.submit("deploy", _blocking(release), serialize_key="ws/model")
+    waiting = manager.submit("deploy", lambda: ran.append("waiting"), serialize_key="ws/model")
+    last = manager.submit("deploy", lambda: ran.append("last"), serialize_key="ws/model")
+    _wait_for(lambda: first.status == "running")
+
+    assert manager.cancel(waiting.job_id)
+    # Running, finished and unknown jobs cannot be cancelled
+    assert not manager.cancel(first.job_id)
+    assert not manager.cancel(waiting.job_id)
+    assert not manager.cancel("job-unknown")
+
+    release.set()
+    _wait_finished(first, last)
+    assert ran == ["last"], ran
+    assert [job.status for job in (first, waiting, last)] == ["succeeded", "cancelled", "succeeded"]
+    return True
+
+
+def test_cancel_race_with_starting_worker():
+    """A job whose worker already started is cancelled before it runs its function."""
+    manager = JobManager(max_workers=1)
+    entered = threading.Event()
+    proceed = threading.Event()
+    run = manager._run
+
+    def delayed_run(job):
+        # The worker picked up the job but has not taken the lock yet
+        entered.set()
+        proceed.wait(TIMEOUT)
+        run(job)
+    manager._run = delayed_run
+
+    ran = []
+    first = manager.submit("deploy", lambda: ran.append("first"), serialize_key="ws/model")
+    second = manager.submit("deploy", lambda: ran.append("second"), serialize_key="ws/model")
+    assert entered.wait(TIMEOUT)
+
+    future = manager._futures[first.job_id]
+    assert manager.cancel(first.job_id)
+    # Too late for the pool to cancel the future; the job must notice on its own
+    assert not future.cancelled()
+
+    proceed.set()
+    _wait_finished(second)
+    assert ran == ["second"], ran
+    assert first.status == "cancelled" and first.started_at is None
+    assert manager._active_keys == set() and manager._futures == {}
+    return True
+
+
+def test_trim_finished_jobs():
+    """Only the newest finished jobs are kept; unfinished jobs are never dropped."""
+    manager = JobManager(max_workers=2, max_finished_jobs=2)
+    release = threading.Event()
+    running = manager.submit("query", _blocking(release))
+    finished = [manager.submit("query", lambda index=index: index) for index in range(4)]
+    _wait_finished(*finished)
+
+    kept = [job["job_id"] for job in manager.list_jobs()]
+    print(f"   {len(kept)} jobs kept")
+    assert kept == [finished[3].job_id, finished[2].job_id, running.job_id], kept
+    assert manager.get(finished[0].job_id) is None and manager.get_status(finished[1].job_id) is None
+
+    release.set()
+    _wait_finished(running)
+    assert [job["job_id"] for job in manager.list_jobs()] == [finished[3].job_id, finished[2].job_id]
+    return True
+
+
+def test_results_errors_and_progress():
+    """Results are decoded, failures recorded and progress published while running."""
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+
+    def analyze(context):
+        context.set_progress("1 of 2 models analyzed")
+        context.add_partial_result({"model": "A"})
+        release.wait(TIMEOUT)
+        return '{"success": true}'
+
+    job = manager.submit("bpa", analyze, with_context=True)
+    _wait_for(lambda: job.progress is not None)
+    status = manager.get_status(job.job_id)
+    assert status["status"] == "running" and status["partial_results"] == [{"model": "A"}]
+    assert "result" not in status
+    release.set()
+
+    failing = manager.submit("bpa", lambda: 1 / 0)
+    _wait_finished(job, failing)
+    assert manager.get_status(job.job_id)["result"] == {"success": True}
+    assert manager.get_status(failing.job_id)["error"] == "division by zero"
+    assert [job["status"] for job in manager.list_jobs(status="failed")] == ["failed"]
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Testing the background job manager")
+    print("=" * 60)
+
+    tests = [
+        ("Per-key serialization", test_per_key_serialization),
+        ("Cancel a started but queued job", test_cancel_started_but_queued_job),
+        ("Cancel a waiting job", test_cancel_waiting_job),
+        ("Cancel racing a starting worker", test_cancel_race_with_starting_worker),
+        ("Trim finished jobs", test_trim_finished_jobs),
+        ("Results, errors and progress", test_results_errors_and_progress),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"   ❌ Test failed: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,164 @@
+"""
+Test the order of the commands built for delta deployments.
+
+The service rejects deleting a column or table that is still referenced, so
+objects that stop referencing a deleted object must be altered first.
+"""
+
+import os
+import sys
+
+# Add the project root to the path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+import copy
+
+from core.tmsl_delta import build_tmsl_delta
+
+
+def _column(name, **properties):
+    return {"name": name, "dataType": "string", "sourceColumn": name, **properties}
+
+
+def _database(tables, relationships=None):
+    return {"name": "DB", "model": {"name": "Model", "tables": tables, "relationships": relationships or []}}
+
+
+def _changes(current, submitted):
+    delta = build_tmsl_delta(current, submitted, "DB")
+    assert delta.full_replace_reason is None, delta.full_replace_reason
+    # Changes in the order the sequence command runs them
+    labels = dict(zip((id(command) for _, command in delta.operations), delta.changes))
+    return [labels[id(command)] for command in delta.to_command()["sequence"]["operations"]]
+
+
+def test_sort_by_column_dropped():
+    """A column stops sorting by a column that is dropped."""
+    current = _database([{"name": "T", "columns": [_column("A", sortByColumn="B"), _column("B")]}])
+    submitted = _database([{"name": "T", "columns": [_column("A")]}])
+    changes = _changes(current, submitted)
+    print(f"   {changes}")
+    assert changes == ["alter column 'T'[A]", "delete column 'T'[B]"], changes
+    return True
+
+
+def test_hierarchy_level_dropped():
+    """A hierarchy level stops using a column that is dropped."""
+    hierarchy = {"name": "H", "levels": [{"name": "L1", "ordinal": 0, "column": "A"}, {"name": "L2", "ordinal": 1, "column": "B"}]}
+    current = _database([{"name": "T", "columns": [_column("A"), _column("B")], "hierarchies": [hierarchy]}])
+    submitted = copy.deepcopy(current)
+    table = submitted["model"]["tables"][0]
+    table["columns"] = [_column("A")]
+    table["hierarchies"][0]["levels"] = [hierarchy["levels"][0]]
+    changes = _changes(current, submitted)
+    print(f"   {changes}")
+    assert changes == ["createOrReplace hierarchy 'T'[H]", "delete column 'T'[B]"], changes
+    return True
+
+
+def test_relationship_swapped_from_dropped_column():
+    """A kept relationship is switched from a dropped column to a new one."""
+    relationship = {"name": "R", "fromTable": "Sales", "fromColumn": "OldKey", "toTable": "Product", "toColumn": "Key"}
+    current = _database(
+        [{"name": "Sales", "columns": [_column("OldKey")]}, {"name": "Product", "columns": [_column("Key")]}],
+        [relationship],
+    )
+    submitted = _database(
+        [{"name": "Sales", "columns": [_column("NewKey")]}, {"name": "Product", "columns": [_column("Key")]}],
+        [{**relationship, "fromColumn": "NewKey"}],
+    )
+    changes = _changes(current, submitted)
+    print(f"   {changes}")
+    assert changes == ["create column 'Sales'[NewKey]", "alter relationship 'R'", "delete column 'Sales'[OldKey]"], changes
+    return True
+
+
+def test_relationship_swapped_from_dropped_table():
+    """A kept relationship is switched from a table that is dropped."""
+    relationship = {"name": "R", "fromTable": "Sales", "fromColumn": "Key", "toTable": "OldProduct", "toColumn": "Key"}
+    tables = [{"name": "Sales", "columns": [_column("Key")]}]
+    current = _database(tables + [{"name": "OldProduct", "columns": [_column("Key")]}], [relationship])
+    submitted = _database(tables + [{"name": "Product", "columns": [_column("Key")]}], [{**relationship, "toTable": "Product"}])
+    changes = _changes(current, submitted)
+    print(f"   {changes}")
+    assert changes == ["create table 'Product'", "alter relationship 'R'", "delete table 'OldProduct'"], changes
+    return True
+
+
+def test_unreferenced_column_deleted_first():
+    """Columns nothing referenced are still deleted before other changes."""
+    current = _database([{"name": "T", "columns": [_column("A"), _column("B")], "measures": [{"name": "M", "expression": "1"}]}])
+    submitted = _database([{"name": "T", "columns": [_column("A")], "measures": [{"name": "M", "expression": "2"}]}])
+    changes = _changes(current, submitted)
+    print(f"   {changes}")
+    assert changes == ["delete column 'T'[B]", "alter measure 'T'[M]"], changes
+    return True
+
+
+def test_sort_by_new_column():
+    """An existing column starts sorting by a column that is new."""
+    current = _database([{"name": "T", "columns": [_column("A")]}])
+    submitted = _database([{"name": "T", "columns": [_column("A", sortByColumn="B"), _column("B")]}])
+    changes = _changes(current, submitted)
+    print(f"   {changes}")
+    assert changes == ["create column 'T'[B]", "alter column 'T'[A]"], changes
+    return True
+
+
+def test_new_column_sorted_by_new_column():
+    """A new column sorts by a new column listed after it."""
+    current = _database([{"name": "T", "columns": [_column("A")]}])
+    submitted = _database([{"name": "T", "columns": [_column("A"), _column("B", sortByColumn="C"), _column("C")]}])
+    changes = _changes(current, submitted)
+    print(f"   {changes}")
+    assert changes == ["create column 'T'[C]", "create column 'T'[B]"], changes
+    return True
+
+
+def test_case_only_renames_replace_database():
+    """Renames that only change case cannot be matched by name."""
+    current = _database([{"name": "T", "columns": [_column("A")]}])
+    for submitted in (_database([{"name": "t", "columns": [_column("A")]}]),
+                      _database([{"name": "T", "columns": [_column("a")]}])):
+        delta = build_tmsl_delta(current, submitted, "DB")
+        print(f"   {delta.full_replace_reason}")
+        assert delta.full_replace_reason and "renamed" in delta.full_replace_reason, delta.full_replace_reason
+        assert not delta.is_empty and not delta.operations
+    return True
+
+
+def main():
+    """Run all tests."""
+    print("Testing TMSL delta deployment order")
+    print("=" * 60)
+
+    tests = [
+        ("Sort-by column dropped", test_sort_by_column_dropped),
+        ("Hierarchy level column dropped", test_hierarchy_level_dropped),
+        ("Relationship swapped from dropped column", test_relationship_swapped_from_dropped_column),
+        ("Relationship swapped from dropped table", test_relationship_swapped_from_dropped_table),
+        ("Unreferenced column deleted first", test_unreferenced_column_deleted_first),
+        ("Sort-by column is new", test_sort_by_new_column),
+        ("New column sorted by a later new column", test_new_column_sorted_by_new_column),
+        ("Case-only renames", test_case_only_renames_replace_database),
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        print(f"\n🧪 Running {test_name}...")
+        try:
+            if test_func():
+                passed += 1
+        except AssertionError as e:
+            print(f"   ❌ Test failed: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
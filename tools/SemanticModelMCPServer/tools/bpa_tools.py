@@ -8,13 +8,107 @@ and TMSL definitions against best practice rules.
 import os
 from fastmcp import FastMCP
 import json
+from typing import List, Optional, Tuple
 from core.bpa_service import BPAService
+from core.bpa_batch import DEFAULT_FETCH_WORKERS, OUTPUT_FORMATS, BPAModelRun
+from core.job_manager import JobContext, start_tool_job
+from core.model_definition_cache import get_cached_model_definition
+from tools.fabric_metadata import list_workspaces, list_datasets
+
+def _resolve_batch_datasets(workspace_names: List[str], dataset_names: Optional[List[str]] = None) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """Resolve the (workspace, dataset) pairs of a batch run and any lookup errors"""
+    workspaces = list_workspaces()
+    if workspaces.startswith("Error") or workspaces.startswith("No workspaces"):
+        raise ValueError(workspaces)
+    workspace_ids = {workspace['name']: workspace['id'] for workspace in json.loads(workspaces)}
+    
+    wanted = {name.lower() for name in dataset_names} if dataset_names else None
+    pairs = []
+    errors = []
+    for workspace_name in workspace_names:
+        workspace_id = workspace_ids.get(workspace_name)
+        if not workspace_id:
+            errors.append(f"Workspace '{workspace_name}' not found")
+            continue
+        datasets = list_datasets(workspace_id)
+        if datasets.startswith("Error"):
+            errors.append(f"{workspace_name}: {datasets}")
+            continue
+        if datasets.startswith("No datasets"):
+            continue
+        for dataset in json.loads(datasets):
+            name = dataset.get('name')
+            if name and (wanted is None or name.lower() in wanted):
+                pairs.append((workspace_name, name))
+    return pairs, errors
+
+def _analyze_model_bpa(workspace_name: str, dataset_name: str) -> str:
+    """Runs the analyze_model_bpa tool; also called by its background jobs."""
+    try:
+        # The definition is shared with generate_bpa_report through the model definition cache
+        definition = get_cached_model_definition(workspace_name, dataset_name, profile="bpa")
+        server_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        bpa_service = BPAService(server_directory)
+        result = bpa_service.analyze_model_from_tmsl(
+            definition.tmsl,
+            incremental=True,
+            snapshot_key=f"{workspace_name.strip().lower()}/{dataset_name.strip().lower()}"
+        )
+        result['workspace_name'] = workspace_name
+        result['dataset_name'] = dataset_name
+        return json.dumps(result, indent=2)
+
+    except ValueError as e:
+        return json.dumps({
+            'success': False,
+            'error': str(e),
+            'error_type': 'dataset_not_found' if 'not found' in str(e) else 'auth_error'
+        })
+    except Exception as e:
+        return json.dumps({
+            'success': False,
+            'error': f'BPA analysis failed: {str(e)}',
+            'error_type': 'bpa_analysis_error'
+        })
+
+def _generate_bpa_report(workspace_name: str, dataset_name: str, format_type: str = 'summary') -> str:
+    """Runs the generate_bpa_report tool; also called by its background jobs."""
+    try:
+        # The definition is shared with analyze_model_bpa through the model definition cache
+        try:
+            tmsl_definition = get_cached_model_definition(workspace_name, dataset_name, profile="bpa").tmsl
+        except ValueError as e:
+            return json.dumps({
+                'success': False,
+                'error': str(e),
+                'error_type': 'dataset_not_found' if 'not found' in str(e) else 'auth_error'
+            })
+
+        # Generate BPA report
+        server_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        bpa_service = BPAService(server_directory)
+        report = bpa_service.generate_bpa_report(tmsl_definition, format_type)
+
+        return json.dumps({
+            'success': True,
+            'workspace_name': workspace_name,
+            'dataset_name': dataset_name,
+            'format_type': format_type,
+            'report': report
+        }, indent=2)
+
+    except Exception as e:
+        return json.dumps({
+            'success': False,
+            'error': f'Error generating BPA report: {str(e)}',
+            'error_type': 'bpa_report_error'
+        })
 
 def register_bpa_tools(mcp: FastMCP):
     """Register all BPA-related MCP tools"""
 
     @mcp.tool
-    def analyze_model_bpa(workspace_name: str, dataset_name: str) -> str:
+    def analyze_model_bpa(workspace_name: str, dataset_name: str, run_async: bool = False) -> str:
         """Analyze a semantic model against Best Practice Analyzer (BPA) rules.
 
         This tool retrieves the TMSL definition of a model and runs it through
@@ -23,38 +117,134 @@ def register_bpa_tools(mcp: FastMCP):
         Args:
             workspace_name: The Power BI workspace name
             dataset_name: The dataset/model name to analyze
+            run_async: If True, returns a job_id right away and the analysis runs in the
+                background; read the result with get_job_status. Use this to analyze
+                several models in parallel.
 
         Returns:
             JSON string with BPA analysis results including violations and summary
         """
+        if run_async:
+            return json.dumps(start_tool_job(
+                "analyze_model_bpa",
+                lambda: _analyze_model_bpa(workspace_name, dataset_name),
+                description=f"{workspace_name}/{dataset_name}"
+            ), indent=2)
+        return _analyze_model_bpa(workspace_name, dataset_name)
+
+    @mcp.tool
+    def analyze_models_bpa_batch(workspace_names: List[str], dataset_names: List[str] = None,
+                                 output_path: str = None, output_format: str = 'ndjson',
+                                 max_concurrent_fetches: int = DEFAULT_FETCH_WORKERS,
+                                 max_workers: int = None, run_async: bool = False) -> str:
+        """Analyze many semantic models against Best Practice Analyzer (BPA) rules in one run.
+
+        Model definitions are fetched concurrently and analyzed in parallel worker
+        processes. Violations are streamed to a file (one row per violation, with
+        the workspace and dataset name) instead of being returned inline.
+
+        Args:
+            workspace_names: Power BI workspace names whose datasets are analyzed
+            dataset_names: Optional dataset names to restrict the run to
+            output_path: File to write violations to (defaults to a temp file)
+            output_format: 'ndjson' or 'parquet' (requires pyarrow)
+            max_concurrent_fetches: Number of model definitions fetched at once
+            max_workers: Number of analysis processes (defaults to the CPU count)
+            run_async: If True, returns a job_id right away; get_job_status shows each
+                model's outcome as a partial result as soon as it is analyzed
+
+        Returns:
+            JSON string with per-model violation counts, summaries and timings
+        """
         try:
-            # For now, use analyze_tmsl_bpa as a workaround
-            # This is a workaround - use the existing tool pipeline
-            # Get TMSL first, then analyze it
+            if output_format not in OUTPUT_FORMATS:
+                return json.dumps({
+                    'success': False,
+                    'error': f"Unsupported output format: {output_format}. Supported: {list(OUTPUT_FORMATS)}",
+                    'error_type': 'invalid_parameter'
+                })
+            
+            try:
+                datasets, lookup_errors = _resolve_batch_datasets(workspace_names, dataset_names)
+            except ValueError as e:
+                return json.dumps({
+                    'success': False,
+                    'error': str(e),
+                    'error_type': 'workspace_lookup_error'
+                })
+            
+            if not datasets:
+                return json.dumps({
+                    'success': False,
+                    'error': 'No datasets found to analyze',
+                    'lookup_errors': lookup_errors,
+                    'error_type': 'dataset_not_found'
+                })
+            
+            server_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            bpa_service = BPAService(server_directory)
+            
+            if run_async:
+                def run_batch(job: JobContext) -> str:
+                    finished = []
+                    
+                    def on_model_done(run: BPAModelRun) -> None:
+                        finished.append(run)
+                        job.add_partial_result(run.to_dict())
+                        job.set_progress(f"{len(finished)} of {len(datasets)} models analyzed")
+                    
+                    result = bpa_service.analyze_models_batch(
+                        datasets,
+                        output_path=output_path,
+                        output_format=output_format,
+                        fetch_workers=max_concurrent_fetches,
+                        analysis_workers=max_workers,
+                        on_model_done=on_model_done
+                    )
+                    result['lookup_errors'] = lookup_errors
+                    return json.dumps(result, indent=2)
+                
+                return json.dumps(start_tool_job(
+                    "analyze_models_bpa_batch",
+                    run_batch,
+                    description=f"{len(datasets)} models",
+                    with_context=True
+                ), indent=2)
+            
+            result = bpa_service.analyze_models_batch(
+                datasets,
+                output_path=output_path,
+                output_format=output_format,
+                fetch_workers=max_concurrent_fetches,
+                analysis_workers=max_workers
+            )
+            result['lookup_errors'] = lookup_errors
+            return json.dumps(result, indent=2)
+            
+        except ImportError as e:
             return json.dumps({
                 'success': False,
-                'error': 'analyze_model_bpa is temporarily unavailable. Please use get_model_definition followed by analyze_tmsl_bpa as a workaround.',
-                'error_type': 'function_unavailable',
-                'workaround': {
-                    'step1': f'tmsl = get_model_definition("{workspace_name}", "{dataset_name}")',
-                    'step2': 'result = analyze_tmsl_bpa(tmsl["result"])'
-                }
+                'error': str(e),
+                'error_type': 'missing_dependency'
             })
-            
         except Exception as e:
             return json.dumps({
                 'success': False,
-                'error': f'BPA analysis failed: {str(e)}',
+                'error': f'BPA batch analysis failed: {str(e)}',
                 'error_type': 'bpa_analysis_error'
             })
 
     @mcp.tool  
-    def analyze_tmsl_bpa(tmsl_definition: str) -> str:
+    def analyze_tmsl_bpa(tmsl_definition: str, incremental: bool = True) -> str:
         """Analyze a TMSL definition directly against Best Practice Analyzer (BPA) rules.
 
         This tool takes a TMSL JSON string and analyzes it against a comprehensive
         set of best practice rules to identify potential issues.
         
+        Repeated calls for the same database are incremental: the definition is
+        diffed against the last analyzed version and only rules for the changed
+        objects (and rules that search the whole model) are re-evaluated.
+        
         The tool automatically handles JSON formatting issues including:
         - Carriage returns and line ending normalization
         - Escaped quotes and backslashes
@@ -62,6 +252,7 @@ def register_bpa_tools(mcp: FastMCP):
 
         Args:
             tmsl_definition: TMSL JSON string (raw or escaped format)
+            incremental: Set to False to re-analyze the whole model
 
         Returns:
             JSON string with BPA analysis results including violations and summary
@@ -70,7 +261,7 @@ def register_bpa_tools(mcp: FastMCP):
             # Get the server directory (parent of tools directory)
             server_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             bpa_service = BPAService(server_directory)
-            result = bpa_service.analyze_model_from_tmsl(tmsl_definition)
+            result = bpa_service.analyze_model_from_tmsl(tmsl_definition, incremental=incremental)
             return json.dumps(result, indent=2)
         except Exception as e:
             return json.dumps({
@@ -194,95 +385,23 @@ def register_bpa_tools(mcp: FastMCP):
             })
 
     @mcp.tool
-    def generate_bpa_report(workspace_name: str, dataset_name: str, format_type: str = 'summary') -> str:
+    def generate_bpa_report(workspace_name: str, dataset_name: str, format_type: str = 'summary', run_async: bool = False) -> str:
         """Generate a comprehensive Best Practice Analyzer report for a semantic model.
 
         Args:
             workspace_name: The Power BI workspace name
             dataset_name: The dataset/model name to analyze  
             format_type: Report format ('summary', 'detailed', 'by_category')
+            run_async: If True, returns a job_id right away and the report is generated in
+                the background; read it with get_job_status
 
         Returns:
             JSON string with comprehensive BPA report
         """
-        try:
-            # Import required modules for PowerBI connection
-            import urllib.parse
-            import sys
-            import os
-            
-            # Add .NET assemblies path
-            script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            dotnet_dir = os.path.join(script_dir, "dotnet")
-            
-            sys.path.append(script_dir)
-            import clr
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.Tabular.dll"))
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.Identity.Client.dll"))
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.IdentityModel.Abstractions.dll"))
-            
-            from Microsoft.AnalysisServices.Tabular import Server, Database, JsonSerializer, SerializeOptions # type: ignore
-            
-            # Import auth function from core
-            from core.auth import get_access_token
-            
-            # Get access token
-            access_token = get_access_token()
-            if not access_token:
-                return json.dumps({
-                    'success': False,
-                    'error': "No valid access token available",
-                    'error_type': 'auth_error'
-                })
-
-            # Connect to Power BI and get TMSL definition
-            workspace_name_encoded = urllib.parse.quote(workspace_name)
-            connection_string = f"Data Source=powerbi://api.powerbi.com/v1.0/myorg/{workspace_name_encoded};Password={access_token}"
-
-            server = Server()
-            server.Connect(connection_string)
-            
-            # Find the database/dataset
-            database = None
-            for db in server.Databases:
-                if db.Name == dataset_name:
-                    database = db
-                    break
-            
-            if not database:
-                server.Disconnect()
-                return json.dumps({
-                    'success': False,
-                    'error': f"Dataset '{dataset_name}' not found in workspace '{workspace_name}'",
-                    'error_type': 'dataset_not_found'
-                })
-            
-            # Get TMSL definition
-            options = SerializeOptions()
-            options.IgnoreInferredObjects = True
-            options.IgnoreInferredProperties = True
-            options.IgnoreTimestamps = True
-            options.SplitMultilineStrings = True
-            
-            tmsl_definition = JsonSerializer.SerializeDatabase(database, options)
-            server.Disconnect()
-            
-            # Generate BPA report
-            server_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            bpa_service = BPAService(server_directory)
-            report = bpa_service.generate_bpa_report(tmsl_definition, format_type)
-            
-            return json.dumps({
-                'success': True,
-                'workspace_name': workspace_name,
-                'dataset_name': dataset_name,
-                'format_type': format_type,
-                'report': report
-            }, indent=2)
-            
-        except Exception as e:
-            return json.dumps({
-                'success': False,
-                'error': f'Error generating BPA report: {str(e)}',
-                'error_type': 'bpa_report_error'
-            })
+        if run_async:
+            return json.dumps(start_tool_job(
+                "generate_bpa_report",
+                lambda: _generate_bpa_report(workspace_name, dataset_name, format_type),
+                description=f"{workspace_name}/{dataset_name}"
+            ), indent=2)
+        return _generate_bpa_report(workspace_name, dataset_name, format_type)
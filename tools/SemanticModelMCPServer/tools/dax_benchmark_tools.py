@@ -0,0 +1,141 @@
+"""
+DAX Benchmark Tools for Semantic Model MCP Server
+
+This module contains the MCP tool that benchmarks a suite of DAX queries
+against a dataset in cold and warm cache states and compares the timings
+with a stored baseline.
+"""
+
+import json
+import os
+from typing import List
+from fastmcp import FastMCP
+from core.auth import get_access_token
+from core.dax_benchmark import (
+    CACHE_MODES, DEFAULT_QUERY_KEY, DEFAULT_REGRESSION_THRESHOLD_PCT, DEFAULT_RUNS,
+    StandInExecutor, XmlaQueryExecutor, build_baseline, compare_to_baseline,
+    load_baseline, parse_benchmark_suite, run_benchmark, save_baseline,
+)
+from core.dotnet_loader import ADOMD_ASSEMBLIES, load_assemblies
+from core.job_manager import JobContext, dataset_job_key, start_tool_job
+
+
+def _run_dax_benchmark(workspace_name: str, dataset_name: str, suite_yaml: str, suite_path: str, query_key: str,
+                       runs: int, cache_modes: List[str], baseline_path: str, save_as_baseline: bool,
+                       regression_threshold_pct: float, use_stand_in: bool, job: JobContext = None) -> str:
+    """Runs benchmark_dax_queries; also called by its background jobs."""
+    try:
+        if suite_path:
+            with open(suite_path, 'r', encoding='utf-8') as f:
+                suite_yaml = f.read()
+        if not suite_yaml:
+            return json.dumps({'success': False, 'error': 'Either suite_yaml or suite_path is required.', 'error_type': 'parameter_error'})
+        queries = parse_benchmark_suite(suite_yaml, query_key=query_key)
+
+        baseline = None
+        if baseline_path and os.path.exists(baseline_path) and not save_as_baseline:
+            baseline = load_baseline(baseline_path)
+    except (OSError, ValueError) as e:
+        return json.dumps({'success': False, 'error': str(e), 'error_type': 'parameter_error'})
+
+    if use_stand_in:
+        executor = StandInExecutor()
+    else:
+        if not workspace_name or not dataset_name:
+            return json.dumps({'success': False, 'error': 'Workspace name and dataset name are required.', 'error_type': 'parameter_error'})
+        try:
+            load_assemblies(ADOMD_ASSEMBLIES)
+        except Exception as e:
+            return json.dumps({'success': False, 'error': f'Failed to load required .NET assemblies: {str(e)}', 'error_type': 'assembly_load_error'})
+        access_token = get_access_token()
+        if not access_token:
+            return json.dumps({'success': False, 'error': 'No valid access token available. Please check authentication.', 'error_type': 'authentication_error'})
+        executor = XmlaQueryExecutor(workspace_name, dataset_name, access_token)
+
+    on_query_done = None
+    if job is not None:
+        measured = []
+        total = len(queries) * len(cache_modes or CACHE_MODES)
+
+        def on_query_done(summary: dict) -> None:
+            measured.append(summary)
+            job.add_partial_result(summary)
+            job.set_progress(f"{len(measured)} of {total} query and cache mode combinations measured")
+
+    try:
+        results = run_benchmark(queries, executor, runs=runs, cache_modes=cache_modes, on_query_done=on_query_done)
+    except ValueError as e:
+        return json.dumps({'success': False, 'error': str(e), 'error_type': 'parameter_error'})
+    except Exception as e:
+        return json.dumps({'success': False, 'error': f'DAX benchmark failed: {str(e)}', 'error_type': 'benchmark_error'})
+
+    response = {
+        'success': True,
+        'workspace_name': workspace_name,
+        'dataset_name': dataset_name,
+        'executor': 'stand-in' if use_stand_in else 'xmla',
+        'query_count': len(queries),
+        'runs_per_query': runs,
+        'results': results,
+    }
+    if baseline is not None:
+        response['comparison'] = compare_to_baseline(results, baseline, threshold_pct=regression_threshold_pct)
+    elif baseline_path and save_as_baseline:
+        save_baseline(baseline_path, build_baseline(results, suite_name=os.path.basename(suite_path or '')))
+        response['baseline_saved'] = baseline_path
+    elif baseline_path:
+        response['baseline_note'] = f"No baseline at {baseline_path}; run with save_as_baseline=True to create it."
+    return json.dumps(response, indent=2)
+
+
+def register_dax_benchmark_tools(mcp: FastMCP):
+    """Register all DAX benchmark related MCP tools"""
+
+    @mcp.tool
+    def benchmark_dax_queries(workspace_name: str = None, dataset_name: str = None, suite_yaml: str = None,
+                              suite_path: str = None, query_key: str = DEFAULT_QUERY_KEY, runs: int = DEFAULT_RUNS,
+                              cache_modes: List[str] = None, baseline_path: str = None, save_as_baseline: bool = False,
+                              regression_threshold_pct: float = DEFAULT_REGRESSION_THRESHOLD_PCT,
+                              use_stand_in: bool = False, run_async: bool = False) -> str:
+        """Benchmark a suite of DAX queries and flag regressions against a baseline.
+
+        The suite uses the YAML format of the DAXPerformanceTesting notebook, for example:
+            - queryId: 1
+              daxQuery: EVALUATE ROW("Rows", COUNTROWS('Sales'))
+        Each query runs `runs` times per cache mode: "cold" clears the model caches before every run,
+        "warm" fills the caches with one unmeasured run first. Clearing the cache slows down other
+        users of the model for a moment, so prefer "warm" on shared production models.
+
+        Args:
+            workspace_name: The Power BI workspace name
+            dataset_name: The dataset name
+            suite_yaml: The suite as YAML text
+            suite_path: Path of a YAML suite file, instead of suite_yaml
+            query_key: Key of the query text in each entry (the notebook's runQueryType), default "daxQuery"
+            runs: Measured runs per query and cache mode (default 5)
+            cache_modes: Cache modes to measure: "cold" and/or "warm" (default both)
+            baseline_path: JSON baseline file; results are compared with it if it exists
+            save_as_baseline: Set to True to save the results to baseline_path instead of comparing
+            regression_threshold_pct: How much slower the median must be to count as a regression (default 20)
+            use_stand_in: Set to True to run against a local stand-in that simulates durations, to try out a suite
+            run_async: Set to True to get a job_id right away; get_job_status shows each query's timings as it completes
+
+        Returns:
+            JSON string with min/mean/max and p50/p90/p95/p99 durations and row counts per query and cache mode,
+            and regressions, improvements and row count changes compared to the baseline
+        """
+        def run(job: JobContext = None) -> str:
+            return _run_dax_benchmark(workspace_name, dataset_name, suite_yaml, suite_path, query_key, runs, cache_modes,
+                                      baseline_path, save_as_baseline, regression_threshold_pct, use_stand_in, job)
+
+        if run_async:
+            # Benchmarks of one dataset run one at a time so they do not skew each other
+            serialize_key = None if use_stand_in or not workspace_name or not dataset_name else dataset_job_key(workspace_name, dataset_name)
+            return json.dumps(start_tool_job(
+                "benchmark_dax_queries",
+                run,
+                description=f"{workspace_name}/{dataset_name}",
+                serialize_key=serialize_key,
+                with_context=True
+            ), indent=2)
+        return run()
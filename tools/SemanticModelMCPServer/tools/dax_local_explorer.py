@@ -6,6 +6,7 @@ This approach should be more reliable with Power BI Desktop instances.
 import json
 import logging
 from typing import List, Dict, Optional, Any
+from core.local_powerbi_session import get_local_session
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,8 @@ class DAXBasedLocalExplorer:
     """
     Utility class for exploring local Power BI Desktop semantic models
     using DAX queries instead of DMV queries for better compatibility.
+
+    The INFO.* metadata comes from the shared local session of the instance.
     """
     
     def __init__(self, connection_string: str):
@@ -23,6 +26,7 @@ class DAXBasedLocalExplorer:
             connection_string: Local connection string (e.g., "Data Source=localhost:51542")
         """
         self.connection_string = connection_string
+        self.session = get_local_session(connection_string)
     
     def get_tables_via_dax(self) -> List[Dict[str, Any]]:
         """
@@ -31,56 +35,7 @@ class DAXBasedLocalExplorer:
         Returns:
             List of dictionaries containing table information
         """
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                # Use DAX INFO.TABLES() to get table information
-                cmd = conn.CreateCommand()
-                cmd.CommandText = "EVALUATE INFO.TABLES()"
-                
-                reader = cmd.ExecuteReader()
-                tables = []
-                
-                while reader.Read():
-                    # Extract table information from INFO.TABLES() result
-                    table = {
-                        'id': str(reader['[ID]']) if reader['[ID]'] is not None else '',
-                        'name': str(reader['[Name]']) if reader['[Name]'] is not None else '',
-                        'data_category': str(reader['[DataCategory]']) if reader['[DataCategory]'] is not None else '',
-                        'description': str(reader['[Description]']) if reader['[Description]'] is not None else '',
-                        'is_hidden': bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else False,
-                        'is_visible': not bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else True,
-                        'modified_time': str(reader['[ModifiedTime]']) if reader['[ModifiedTime]'] is not None else '',
-                        'lineage_tag': str(reader['[LineageTag]']) if reader['[LineageTag]'] is not None else ''
-                    }
-                    tables.append(table)
-                
-                reader.Close()
-                conn.Close()
-                
-                return tables
-                
-            except Exception as query_error:
-                conn.Close()
-                logger.error(f"Error querying tables via DAX: {str(query_error)}")
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+        return self.session.get_metadata().table_info()
     
     def get_columns_via_dax(self, table_name: str = None) -> List[Dict[str, Any]]:
         """
@@ -92,80 +47,7 @@ class DAXBasedLocalExplorer:
         Returns:
             List of dictionaries containing column information
         """
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                # Use DAX to join columns with table names
-                cmd = conn.CreateCommand()
-                
-                if table_name:
-                    # Filter for specific table by joining with table info
-                    cmd.CommandText = f"""
-                    EVALUATE
-                    ADDCOLUMNS(
-                        FILTER(INFO.COLUMNS(), 
-                            [TableID] IN VALUES(
-                                SELECTCOLUMNS(
-                                    FILTER(INFO.TABLES(), [Name] = "{table_name}"),
-                                    [ID]
-                                )
-                            )
-                        ),
-                        "TableName", 
-                        RELATED(INFO.TABLES()[Name])
-                    )
-                    """
-                else:
-                    # Get all columns with table names - simpler approach
-                    cmd.CommandText = "EVALUATE INFO.COLUMNS()"
-                
-                reader = cmd.ExecuteReader()
-                columns = []
-                
-                while reader.Read():
-                    column = {
-                        'table_id': str(reader['[TableID]']) if reader['[TableID]'] is not None else '',
-                        'table_name': str(reader['[TableName]']) if reader['[TableName]'] is not None else '',
-                        'column_id': str(reader['[ID]']) if reader['[ID]'] is not None else '',
-                        'explicit_name': str(reader['[ExplicitName]']) if reader['[ExplicitName]'] is not None else '',
-                        'inferred_name': str(reader['[InferredName]']) if reader['[InferredName]'] is not None else '',
-                        'data_type': str(reader['[ExplicitDataType]']) if reader['[ExplicitDataType]'] is not None else '',
-                        'is_hidden': bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else False,
-                        'is_visible': not bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else True,
-                        'is_key': bool(reader['[IsKey]']) if reader['[IsKey]'] is not None else False,
-                        'description': str(reader['[Description]']) if reader['[Description]'] is not None else '',
-                        'display_folder': str(reader['[DisplayFolder]']) if reader['[DisplayFolder]'] is not None else '',
-                        'expression': str(reader['[Expression]']) if reader['[Expression]'] is not None else '',
-                        'lineage_tag': str(reader['[LineageTag]']) if reader['[LineageTag]'] is not None else ''
-                    }
-                    columns.append(column)
-                
-                reader.Close()
-                conn.Close()
-                
-                return columns
-                
-            except Exception as query_error:
-                conn.Close()
-                logger.error(f"Error querying columns via DAX: {str(query_error)}")
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+        return self.session.get_metadata().column_info(table_name)
     
     def get_measures_via_dax(self) -> List[Dict[str, Any]]:
         """
@@ -174,59 +56,7 @@ class DAXBasedLocalExplorer:
         Returns:
             List of dictionaries containing measure information
         """
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                # Use DAX to join measures with table names - simpler approach
-                cmd = conn.CreateCommand()
-                cmd.CommandText = "EVALUATE INFO.MEASURES()"
-                
-                reader = cmd.ExecuteReader()
-                measures = []
-                
-                while reader.Read():
-                    measure = {
-                        'table_id': str(reader['[TableID]']) if reader['[TableID]'] is not None else '',
-                        'table_name': str(reader['[TableName]']) if reader['[TableName]'] is not None else '',
-                        'measure_id': str(reader['[ID]']) if reader['[ID]'] is not None else '',
-                        'name': str(reader['[Name]']) if reader['[Name]'] is not None else '',
-                        'description': str(reader['[Description]']) if reader['[Description]'] is not None else '',
-                        'expression': str(reader['[Expression]']) if reader['[Expression]'] is not None else '',
-                        'is_hidden': bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else False,
-                        'is_visible': not bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else True,
-                        'display_folder': str(reader['[DisplayFolder]']) if reader['[DisplayFolder]'] is not None else '',
-                        'data_type': str(reader['[DataType]']) if reader['[DataType]'] is not None else '',
-                        'format_string': str(reader['[FormatString]']) if reader['[FormatString]'] is not None else '',
-                        'lineage_tag': str(reader['[LineageTag]']) if reader['[LineageTag]'] is not None else ''
-                    }
-                    measures.append(measure)
-                
-                reader.Close()
-                conn.Close()
-                
-                return measures
-                
-            except Exception as query_error:
-                conn.Close()
-                logger.error(f"Error querying measures via DAX: {str(query_error)}")
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+        return self.session.get_metadata().measure_info()
 
 def explore_local_powerbi_model_dax(connection_string: str, operation: str = 'tables', table_name: str = None) -> str:
     """
@@ -1,6 +1,9 @@
 # Tool to list Power BI workspaces
 import json
+import requests
 from core.auth import get_access_token
+from core.fabric_http import FABRIC_API_BASE, POWERBI_API_BASE, DEFAULT_TIMEOUT_SECONDS, fabric_name_cache, get_all_pages, get_http_session
+from core.sql_endpoint_pool import detect_odbc_driver, fetch_limited, sql_connection_pool, sql_endpoint_cache
 
 def list_workspaces() -> str:
     """Lists available Power BI workspaces for the current user. This tool retrieves the workspaces using the Power BI REST API.
@@ -8,18 +11,17 @@ def list_workspaces() -> str:
     It is useful for identifying which workspaces you can access and work with.
     It gets an access token using the Power BI REST API.
     """
-    import requests
     access_token = get_access_token()
     if not access_token:
         return "Error: No valid access token available"
-    url = "https://api.powerbi.com/v1.0/myorg/groups"
+    url = f"{POWERBI_API_BASE}/groups"
     headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(url, headers=headers)
+    response, groups = get_all_pages(url, headers)
     if response.status_code != 200:
         return f"Error: {response.status_code} - {response.text}"
-    groups = response.json().get("value", [])
     if not groups:
         return "No workspaces found."
+    fabric_name_cache.put_many("workspace", groups, "name")
     
     # Extract only name and id from each workspace
     filtered_workspaces = [{"name": group.get("name"), "id": group.get("id")} for group in groups]
@@ -29,36 +31,43 @@ def list_workspaces() -> str:
 
 def list_datasets(workspace_id: str) -> str:
     """Lists all datasets in a specified Power BI workspace using REST API."""
-    import requests
     access_token = get_access_token()
     if not access_token:
         return "Error: No valid access token available"
     
-    url = f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/datasets"
+    url = f"{POWERBI_API_BASE}/groups/{workspace_id}/datasets"
     headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(url, headers=headers)
+    response, datasets = get_all_pages(url, headers)
     
     if response.status_code != 200:
         return f"Error: {response.status_code} - {response.text}"
     
-    datasets = response.json().get("value", [])
     if not datasets:
         return "No datasets found in this workspace."
     
+    fabric_name_cache.put_many("dataset", datasets, "name", scope=workspace_id)
     return json.dumps(datasets, indent=2)
 
 # Tool to get workspace ID by name
-def get_workspace_id(workspace_name: str) -> str:
-    """Gets the workspace ID for a given workspace name.  This is useful for retrieving datasets."""
-    import requests
+def get_workspace_id(workspace_name: str, use_cache: bool = True) -> str:
+    """Gets the workspace ID for a given workspace name.  This is useful for retrieving datasets.
+    
+    Resolved ids are cached for a while, and on a cache miss only the matching
+    workspace is requested with an OData filter instead of listing all workspaces.
+    """
+    if use_cache:
+        cached_id = fabric_name_cache.get("workspace", workspace_name)
+        if cached_id:
+            return cached_id
 
     access_token = get_access_token()
     if not access_token:
         return "Error: No valid access token available"
     
-    url = "https://api.powerbi.com/v1.0/myorg/groups"
+    url = f"{POWERBI_API_BASE}/groups"
     headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(url, headers=headers)
+    escaped_name = workspace_name.replace("'", "''")
+    response = get_http_session().get(url, headers=headers, params={"$filter": f"name eq '{escaped_name}'"}, timeout=DEFAULT_TIMEOUT_SECONDS)
     
     if response.status_code != 200:
         return f"Error: {response.status_code} - {response.text}"
@@ -66,6 +75,7 @@ def get_workspace_id(workspace_name: str) -> str:
     groups = response.json().get("value", [])
     for group in groups:
         if group.get("name") == workspace_name:
+            fabric_name_cache.put("workspace", workspace_name, group.get("id"))
             return group.get("id")
     
     return f"Workspace '{workspace_name}' not found"
@@ -81,7 +91,6 @@ def list_notebooks(workspace_id: str) -> str:
     Returns:
         str: JSON string containing notebook information or error message
     """
-    import requests
     
     # Input validation - ensure workspace_id is provided and not empty
     if not workspace_id or not workspace_id.strip():
@@ -95,18 +104,17 @@ def list_notebooks(workspace_id: str) -> str:
         
         # Construct API endpoint URL for listing notebooks
         # Strip whitespace from workspace_id to handle user input errors
-        url = f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id.strip()}/notebooks"
+        url = f"{POWERBI_API_BASE}/groups/{workspace_id.strip()}/notebooks"
         
         # Set up authorization header with Bearer token
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        # Make the API request with 30-second timeout to prevent hanging
-        response = requests.get(url, headers=headers, timeout=30)
+        # Make the API request on the shared session, following continuation links
+        response, notebooks = get_all_pages(url, headers)
         
         # Handle different HTTP status codes with specific error messages
         if response.status_code == 200:
-            # Success - parse the JSON response
-            notebooks = response.json().get("value", [])
+            # Success - all pages were read
             if not notebooks:
                 return "No notebooks found in this workspace."
             # Return formatted JSON with proper indentation
@@ -156,7 +164,6 @@ def list_delta_tables(workspace_id: str, lakehouse_id: str = None) -> str:
     Returns:
         str: JSON string containing Delta Table information or error message
     """
-    import requests
     
     # Input validation - ensure workspace_id is provided and not empty
     if not workspace_id or not workspace_id.strip():
@@ -174,15 +181,15 @@ def list_delta_tables(workspace_id: str, lakehouse_id: str = None) -> str:
         # If no lakehouse_id provided, list all lakehouses in the workspace first
         if not lakehouse_id:
             # List all lakehouses in the workspace
-            lakehouses_url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/lakehouses"
-            lakehouses_response = requests.get(lakehouses_url, headers=headers, timeout=30)
+            lakehouses_url = f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/lakehouses"
+            lakehouses_response, lakehouses = get_all_pages(lakehouses_url, headers)
             
             if lakehouses_response.status_code != 200:
                 return f"Error listing lakehouses: HTTP {lakehouses_response.status_code} - {lakehouses_response.text}"
             
-            lakehouses = lakehouses_response.json().get("value", [])
             if not lakehouses:
                 return "No lakehouses found in this workspace."
+            fabric_name_cache.put_many("lakehouse", lakehouses, "displayName", scope=workspace_id.strip())
             
             # For simplicity, use the first lakehouse if multiple exist
             lakehouse_id = lakehouses[0].get("id")
@@ -190,15 +197,15 @@ def list_delta_tables(workspace_id: str, lakehouse_id: str = None) -> str:
                 return "Error: No valid lakehouse ID found"
         
         # Construct API endpoint URL for listing tables in the lakehouse
-        tables_url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/lakehouses/{lakehouse_id.strip()}/tables"
+        tables_url = f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/lakehouses/{lakehouse_id.strip()}/tables"
         
         # Add timestamp to force fresh API call and avoid caching
         import time
         timestamp = str(int(time.time()))
         print(f"DEBUG: Making API call at {timestamp} to {tables_url}")
         
-        # Make the API request with 30-second timeout to prevent hanging
-        response = requests.get(tables_url, headers=headers, timeout=30)
+        # Make the API request on the shared session, following continuation tokens
+        response, tables = get_all_pages(tables_url, headers)
         
         # Debug information
         print(f"DEBUG: Response status code: {response.status_code}")
@@ -207,9 +214,7 @@ def list_delta_tables(workspace_id: str, lakehouse_id: str = None) -> str:
         
         # Handle different HTTP status codes with specific error messages
         if response.status_code == 200:
-            # Success - parse the JSON response
-            response_json = response.json()
-            tables = response_json.get("data", response_json.get("value", []))
+            # Success - all pages were read
             if not tables:
                 # Return detailed debug information when no tables found
                 return f"No tables found in this lakehouse. API Response: {json.dumps(response.json(), indent=2)}"
@@ -299,15 +304,12 @@ def _list_delta_tables_via_sql_endpoint(workspace_id: str, lakehouse_id: str) ->
         str: JSON string containing table information from SQL endpoint
     """
     try:
-        # Import the SQL query function from the main server module
-        # We need to avoid circular imports, so we'll implement the SQL query logic here
-        
-        # Get lakehouse connection details first
-        lakehouse_info = get_lakehouse_sql_connection_string(workspace_id, lakehouse_id)
-        if not lakehouse_info:
-            return "Error: Could not get lakehouse SQL connection information"
+        # Get lakehouse connection details first (cached per lakehouse)
+        try:
+            lakehouse_info_dict = resolve_lakehouse_sql_endpoint(workspace_id, lakehouse_id)
+        except ValueError as e:
+            return f"Error: Could not get lakehouse SQL connection information: {str(e)}"
         
-        lakehouse_info_dict = json.loads(lakehouse_info)
         server_name = lakehouse_info_dict.get("sql_endpoint", {}).get("server_name")
         lakehouse_name = lakehouse_info_dict.get("lakehouse_name")
         
@@ -343,58 +345,38 @@ def _list_delta_tables_via_sql_endpoint(workspace_id: str, lakehouse_id: str) ->
         if not success:
             return f"Error: Authentication failed: {error}"
         
-        # Try different ODBC drivers in order of preference
-        available_drivers = [
-            "ODBC Driver 18 for SQL Server",
-            "ODBC Driver 17 for SQL Server", 
-            "SQL Server"
-        ]
-        
-        # Detect which driver is available
-        available_driver = None
-        available_pyodbc_drivers = pyodbc.drivers()
-        
-        for driver in available_drivers:
-            if driver in available_pyodbc_drivers:
-                available_driver = driver
-                break
-        
+        # The driver is detected once per process
+        available_driver, available_pyodbc_drivers = detect_odbc_driver()
         if not available_driver:
-            return f"Error: No compatible ODBC driver found. Available drivers: {list(available_pyodbc_drivers)}"
-        
-        # Connection string for Azure SQL with access token - use lakehouse_name as database
-        connection_string = (
-            f"Driver={{{available_driver}}};"
-            f"Server={server_name};"
-            f"Database={lakehouse_name};"
-            f"Encrypt=yes;"
-            f"TrustServerCertificate=yes;"
-            f"Connection Timeout=30;"
-        )
-        
-        # Execute the query
+            return f"Error: No compatible ODBC driver found. Available drivers: {available_pyodbc_drivers}"
+        
+        # Execute the query on a pooled connection
         try:
-            # Connect using access token authentication
-            with pyodbc.connect(connection_string, attrs_before={1256: token_struct}) as conn:
-                cursor = conn.cursor()
-                cursor.execute(sql_query)
-                
-                # Fetch results and format as list of dictionaries
-                columns = [column[0] for column in cursor.description]
-                tables = []
-                for row in cursor.fetchall():
-                    table_info = dict(zip(columns, row))
-                    # Add additional information to match the expected format
-                    table_info['id'] = f"{table_info['TABLE_SCHEMA']}.{table_info['TABLE_NAME']}"
-                    table_info['type'] = 'Delta'
-                    table_info['format'] = 'Delta'
-                    table_info['displayName'] = f"{table_info['TABLE_SCHEMA']}.{table_info['TABLE_NAME']}"
-                    tables.append(table_info)
-                
-                if not tables:
-                    return "No tables found in this schema-enabled lakehouse"
-                
-                return json.dumps(tables, indent=2)
+            with sql_connection_pool.connection(available_driver, server_name, lakehouse_name, token_struct) as pooled:
+                cursor = pooled.connection.cursor()
+                try:
+                    cursor.execute(sql_query)
+                    
+                    # Fetch results and format as list of dictionaries
+                    columns = [column[0] for column in cursor.description]
+                    rows, _ = fetch_limited(cursor, None)
+                finally:
+                    cursor.close()
+            
+            tables = []
+            for row in rows:
+                table_info = dict(zip(columns, row))
+                # Add additional information to match the expected format
+                table_info['id'] = f"{table_info['TABLE_SCHEMA']}.{table_info['TABLE_NAME']}"
+                table_info['type'] = 'Delta'
+                table_info['format'] = 'Delta'
+                table_info['displayName'] = f"{table_info['TABLE_SCHEMA']}.{table_info['TABLE_NAME']}"
+                tables.append(table_info)
+            
+            if not tables:
+                return "No tables found in this schema-enabled lakehouse"
+            
+            return json.dumps(tables, indent=2)
                 
         except pyodbc.Error as e:
             return f"Error connecting to SQL Analytics Endpoint: {str(e)}"
@@ -412,7 +394,6 @@ def list_lakehouse_files(workspace_id: str, lakehouse_id: str = None) -> str:
     Returns:
         str: JSON string containing file information or error message
     """
-    import requests
     
     # Input validation - ensure workspace_id is provided and not empty
     if not workspace_id or not workspace_id.strip():
@@ -430,15 +411,15 @@ def list_lakehouse_files(workspace_id: str, lakehouse_id: str = None) -> str:
         # If no lakehouse_id provided, list all lakehouses in the workspace first
         if not lakehouse_id:
             # List all lakehouses in the workspace
-            lakehouses_url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/lakehouses"
-            lakehouses_response = requests.get(lakehouses_url, headers=headers, timeout=30)
+            lakehouses_url = f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/lakehouses"
+            lakehouses_response, lakehouses = get_all_pages(lakehouses_url, headers)
             
             if lakehouses_response.status_code != 200:
                 return f"Error listing lakehouses: HTTP {lakehouses_response.status_code} - {lakehouses_response.text}"
             
-            lakehouses = lakehouses_response.json().get("value", [])
             if not lakehouses:
                 return "No lakehouses found in this workspace."
+            fabric_name_cache.put_many("lakehouse", lakehouses, "displayName", scope=workspace_id.strip())
             
             # For simplicity, use the first lakehouse if multiple exist
             lakehouse_id = lakehouses[0].get("id")
@@ -447,15 +428,15 @@ def list_lakehouse_files(workspace_id: str, lakehouse_id: str = None) -> str:
         
         # Try different API endpoints to see if files are present
         endpoints_to_try = [
-            f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/lakehouses/{lakehouse_id.strip()}/files",
-            f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/lakehouses/{lakehouse_id.strip()}/items",
-            f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/items"
+            f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/lakehouses/{lakehouse_id.strip()}/files",
+            f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/lakehouses/{lakehouse_id.strip()}/items",
+            f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/items"
         ]
         
         results = {}
         for endpoint in endpoints_to_try:
             try:
-                response = requests.get(endpoint, headers=headers, timeout=30)
+                response = get_http_session().get(endpoint, headers=headers, timeout=DEFAULT_TIMEOUT_SECONDS)
                 results[endpoint] = {
                     "status_code": response.status_code,
                     "response": response.json() if response.status_code == 200 else response.text[:200]
@@ -479,7 +460,6 @@ def get_lakehouse_sql_connection_string(workspace_id: str, lakehouse_id: str = N
     Returns:
         str: JSON string containing SQL endpoint connection information or error message
     """
-    import requests
     
     # Input validation - ensure workspace_id is provided and not empty
     if not workspace_id or not workspace_id.strip():
@@ -499,15 +479,19 @@ def get_lakehouse_sql_connection_string(workspace_id: str, lakehouse_id: str = N
         headers = {"Authorization": f"Bearer {access_token}"}
         
         # If lakehouse_name is provided but not lakehouse_id, find the lakehouse by name
+        id_from_cache = False
+        if lakehouse_name and not lakehouse_id:
+            lakehouse_id = fabric_name_cache.get("lakehouse", lakehouse_name, scope=workspace_id.strip())
+            id_from_cache = lakehouse_id is not None
         if lakehouse_name and not lakehouse_id:
             # List all lakehouses in the workspace to find the one with matching name
-            lakehouses_url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/lakehouses"
-            lakehouses_response = requests.get(lakehouses_url, headers=headers, timeout=30)
+            lakehouses_url = f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/lakehouses"
+            lakehouses_response, lakehouses = get_all_pages(lakehouses_url, headers)
             
             if lakehouses_response.status_code != 200:
                 return f"Error listing lakehouses: HTTP {lakehouses_response.status_code} - {lakehouses_response.text}"
             
-            lakehouses = lakehouses_response.json().get("value", [])
+            fabric_name_cache.put_many("lakehouse", lakehouses, "displayName", scope=workspace_id.strip())
             if not lakehouses:
                 return "No lakehouses found in this workspace."
             
@@ -524,8 +508,13 @@ def get_lakehouse_sql_connection_string(workspace_id: str, lakehouse_id: str = N
                 return f"Lakehouse '{lakehouse_name}' not found. Available lakehouses: {', '.join(available_names)}"
         
         # Get specific lakehouse details to extract SQL endpoint information
-        lakehouse_url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/lakehouses/{lakehouse_id.strip()}"
-        response = requests.get(lakehouse_url, headers=headers, timeout=30)
+        lakehouse_url = f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/lakehouses/{lakehouse_id.strip()}"
+        response = get_http_session().get(lakehouse_url, headers=headers, timeout=DEFAULT_TIMEOUT_SECONDS)
+        
+        # A cached id can be stale if the lakehouse was recreated under the same name
+        if response.status_code == 404 and id_from_cache:
+            fabric_name_cache.discard("lakehouse", lakehouse_name, scope=workspace_id.strip())
+            return get_lakehouse_sql_connection_string(workspace_id, None, lakehouse_name)
         
         # Handle different HTTP status codes
         if response.status_code == 200:
@@ -584,6 +573,38 @@ def get_lakehouse_sql_connection_string(workspace_id: str, lakehouse_id: str = N
     except Exception as e:
         return f"Error: Unexpected error occurred - {str(e)}"
 
+def resolve_lakehouse_sql_endpoint(workspace_id: str, lakehouse_id: str = None, lakehouse_name: str = None, use_cache: bool = True) -> dict:
+    """Resolves the SQL Analytics Endpoint of a lakehouse, reusing earlier resolutions.
+    
+    Resolving a lakehouse by name takes two Fabric REST calls, so results are
+    cached per lakehouse id and name for a while.
+    
+    Args:
+        workspace_id (str): The unique identifier of the Fabric workspace
+        lakehouse_id (str, optional): The unique identifier of the Lakehouse
+        lakehouse_name (str, optional): The display name of the Lakehouse
+        use_cache (bool): False to always resolve the endpoint again
+        
+    Returns:
+        dict: Connection information as returned by get_lakehouse_sql_connection_string
+        
+    Raises:
+        ValueError: If the endpoint could not be resolved
+    """
+    if use_cache and workspace_id:
+        cached = sql_endpoint_cache.get(workspace_id, lakehouse_id, lakehouse_name)
+        if cached is not None:
+            return cached
+    
+    connection_info = get_lakehouse_sql_connection_string(workspace_id, lakehouse_id, lakehouse_name)
+    try:
+        connection_data = json.loads(connection_info)
+    except json.JSONDecodeError:
+        raise ValueError(connection_info)
+    
+    sql_endpoint_cache.put(workspace_id, connection_data)
+    return connection_data
+
 def list_lakehouses(workspace_id: str) -> str:
     """Lists all lakehouses in a specified Fabric workspace.
     
@@ -593,7 +614,6 @@ def list_lakehouses(workspace_id: str) -> str:
     Returns:
         str: JSON string containing lakehouse information or error message
     """
-    import requests
     
     # Input validation - ensure workspace_id is provided and not empty
     if not workspace_id or not workspace_id.strip():
@@ -606,20 +626,20 @@ def list_lakehouses(workspace_id: str) -> str:
             return "Error: No valid access token available"
         
         # Construct API endpoint URL for listing lakehouses
-        url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id.strip()}/lakehouses"
+        url = f"{FABRIC_API_BASE}/workspaces/{workspace_id.strip()}/lakehouses"
         
         # Set up authorization header with Bearer token
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        # Make the API request with 30-second timeout to prevent hanging
-        response = requests.get(url, headers=headers, timeout=30)
+        # Make the API request on the shared session, following continuation tokens
+        response, lakehouses = get_all_pages(url, headers)
         
         # Handle different HTTP status codes with specific error messages
         if response.status_code == 200:
-            # Success - parse the JSON response
-            lakehouses = response.json().get("value", [])
+            # Success - all pages were read
             if not lakehouses:
                 return "No lakehouses found in this workspace."
+            fabric_name_cache.put_many("lakehouse", lakehouses, "displayName", scope=workspace_id.strip())
             # Return formatted JSON with proper indentation
             return json.dumps(lakehouses, indent=2)
         elif response.status_code == 401:
@@ -11,6 +11,9 @@ References:
 import json
 import logging
 from typing import List, Dict, Optional, Any
+from core.dotnet_loader import TOM_ASSEMBLIES, load_assemblies
+from core.local_powerbi_session import get_local_session, is_connection_error
+from core.tmsl_document import parse_tmsl
 
 logger = logging.getLogger(__name__)
 
@@ -32,105 +35,44 @@ class ImprovedDAXExplorer:
         Returns:
             Dictionary with execution results or error information
         """
+        max_rows = 1000  # Safety limit to prevent memory issues
         try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
+            # Runs on the shared local session; values keep their types instead of being stringified
+            result = get_local_session(self.connection_string).execute(dax_query, max_rows=max_rows)
+            return {
+                'success': True,
+                'connection_string': self.connection_string,
+                'dax_query': dax_query,
+                'columns': [{'name': name, 'index': index} for index, name in enumerate(result.columns)],
+                'total_rows': result.row_count,
+                'rows': result.to_rows(),
+                'truncated': result.truncated,
+                'method': 'Improved DAX execution'
+            }
             
-            try:
-                # Execute DAX query
-                cmd = conn.CreateCommand()
-                cmd.CommandText = dax_query
-                
-                reader = cmd.ExecuteReader()
-                
-                # Get column information
-                columns = []
-                for i in range(reader.FieldCount):
-                    columns.append({
-                        'name': reader.GetName(i),
-                        'index': i,
-                        'type': str(reader.GetFieldType(i)) if reader.GetFieldType(i) else 'Unknown'
-                    })
-                
-                # Read data rows with improved error handling
-                rows = []
-                row_count = 0
-                max_rows = 1000  # Safety limit to prevent memory issues
-                
-                while reader.Read() and row_count < max_rows:
-                    row = {}
-                    for i in range(reader.FieldCount):
-                        column_name = reader.GetName(i)
-                        try:
-                            value = reader[i]
-                            if value is None:
-                                row[column_name] = None
-                            elif hasattr(value, 'isoformat'):  # DateTime objects
-                                row[column_name] = value.isoformat()
-                            else:
-                                row[column_name] = str(value)
-                        except Exception as col_error:
-                            logger.warning(f"Error reading column {column_name}: {str(col_error)}")
-                            row[column_name] = f"<read_error: {str(col_error)}>"
-                    
-                    rows.append(row)
-                    row_count += 1
-                
-                reader.Close()
-                conn.Close()
-                
-                return {
-                    'success': True,
-                    'connection_string': self.connection_string,
-                    'dax_query': dax_query,
-                    'columns': columns,
-                    'total_rows': row_count,
-                    'rows': rows,
-                    'truncated': row_count >= max_rows,
-                    'method': 'Improved DAX execution'
-                }
-                
-            except Exception as query_error:
-                conn.Close()
-                error_msg = str(query_error)
-                logger.error(f"DAX query execution error: {error_msg}")
-                
-                # Provide helpful error suggestions
-                suggestions = self._analyze_dax_error(error_msg, dax_query)
-                
+        except Exception as error:
+            error_msg = str(error)
+            if is_connection_error(error):
+                logger.error(f"Connection error: {error_msg}")
                 return {
                     'success': False,
                     'error': error_msg,
-                    'error_type': 'query_execution',
-                    'suggestions': suggestions,
-                    'dax_query': dax_query,
+                    'error_type': 'connection_error',
+                    'suggestions': [
+                        "Verify Power BI Desktop is running",
+                        "Check if the port number is correct",
+                        "Ensure the connection string format is valid"
+                    ],
                     'connection_string': self.connection_string
                 }
-                
-        except Exception as connection_error:
-            error_msg = str(connection_error)
-            logger.error(f"Connection error: {error_msg}")
             
+            logger.error(f"DAX query execution error: {error_msg}")
             return {
                 'success': False,
                 'error': error_msg,
-                'error_type': 'connection_error',
-                'suggestions': [
-                    "Verify Power BI Desktop is running",
-                    "Check if the port number is correct",
-                    "Ensure the connection string format is valid"
-                ],
+                'error_type': 'query_execution',
+                'suggestions': self._analyze_dax_error(error_msg, dax_query),
+                'dax_query': dax_query,
                 'connection_string': self.connection_string
             }
     
@@ -407,15 +349,7 @@ def get_local_tmsl_definition(connection_string: str) -> str:
         - Connection details and metadata
     """
     try:
-        import clr
-        import os
-        
-        # Add references to Analysis Services libraries
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-        
-        # Load required assemblies for TMSL operations
-        clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.Tabular.dll"))
+        load_assemblies(TOM_ASSEMBLIES)
         from Microsoft.AnalysisServices.Tabular import Server, Database, JsonSerializer, SerializeOptions
         
         # Connect to local Power BI Desktop
@@ -527,18 +461,12 @@ def update_local_model_using_tmsl(connection_string: str, tmsl_definition: str,
     """
     import json
     import logging
-    import os
-    import clr
     
     logger = logging.getLogger(__name__)
     
     try:
         # Load and import the necessary .NET assemblies
-        script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        dotnet_dir = os.path.join(script_dir, "dotnet")
-        
-        clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.dll"))
-        clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.Tabular.dll"))
+        load_assemblies(TOM_ASSEMBLIES)
         
         from Microsoft.AnalysisServices.Tabular import Server  # type: ignore
         from Microsoft.AnalysisServices import XmlaResultCollection  # type: ignore
@@ -546,7 +474,7 @@ def update_local_model_using_tmsl(connection_string: str, tmsl_definition: str,
         
         # Validate TMSL structure
         try:
-            tmsl_obj = json.loads(tmsl_definition)
+            tmsl_obj = parse_tmsl(tmsl_definition).data
             
             # Check if it's in the correct createOrReplace format
             if 'createOrReplace' not in tmsl_obj:
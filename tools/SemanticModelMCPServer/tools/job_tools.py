@@ -0,0 +1,78 @@
+"""
+Background Job Tools for Semantic Model MCP Server
+
+This module contains the MCP tools for polling and cancelling tool calls
+started with run_async=True.
+"""
+
+from fastmcp import FastMCP
+import json
+from core.job_manager import JOB_STATUSES, job_manager
+
+def register_job_tools(mcp: FastMCP):
+    """Register all background job related MCP tools"""
+
+    @mcp.tool
+    def get_job_status(job_id: str, include_result: bool = True) -> str:
+        """Get the status and result of a background job started with run_async=True.
+
+        Args:
+            job_id: The job_id returned when the job was started
+            include_result: Set to False to only check the status without the (possibly large) result
+
+        Returns:
+            JSON string with the job status (queued, running, succeeded, failed or cancelled),
+            timings, progress, partial results so far and, once succeeded, the tool result
+        """
+        status = job_manager.get_status(job_id, include_result=include_result)
+        if status is None:
+            return json.dumps({
+                'success': False,
+                'error': f"Job '{job_id}' not found. Finished jobs are kept for the last {job_manager.max_finished_jobs} jobs.",
+                'error_type': 'job_not_found'
+            })
+        return json.dumps({'success': True, **status}, indent=2)
+
+    @mcp.tool
+    def list_jobs(status: str = None) -> str:
+        """List background jobs, newest first, without their results.
+
+        Args:
+            status: Optional status filter: queued, running, succeeded, failed or cancelled
+
+        Returns:
+            JSON string with the jobs and their status
+        """
+        if status is not None and status not in JOB_STATUSES:
+            return json.dumps({
+                'success': False,
+                'error': f"Unknown status: {status}. Supported: {list(JOB_STATUSES)}",
+                'error_type': 'invalid_parameter'
+            })
+        jobs = job_manager.list_jobs(status)
+        return json.dumps({
+            'success': True,
+            'max_concurrent_jobs': job_manager.max_workers,
+            'job_count': len(jobs),
+            'jobs': jobs
+        }, indent=2)
+
+    @mcp.tool
+    def cancel_job(job_id: str) -> str:
+        """Cancel a background job that has not started running yet.
+
+        Args:
+            job_id: The job_id returned when the job was started
+
+        Returns:
+            JSON string saying whether the job was cancelled
+        """
+        if job_manager.cancel(job_id):
+            return json.dumps({'success': True, 'job_id': job_id, 'status': 'cancelled'})
+        job = job_manager.get(job_id)
+        return json.dumps({
+            'success': False,
+            'job_id': job_id,
+            'error': f"Job is {job.status} and cannot be cancelled" if job else f"Job '{job_id}' not found",
+            'error_type': 'job_not_cancellable' if job else 'job_not_found'
+        })
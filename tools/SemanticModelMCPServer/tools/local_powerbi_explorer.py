@@ -9,6 +9,7 @@ and relationships without requiring Power BI Service authentication.
 import json
 import logging
 from typing import List, Dict, Optional, Any
+from core.local_powerbi_session import get_local_session
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,7 @@ class LocalPowerBIModelExplorer:
             connection_string: Local connection string (e.g., "Data Source=localhost:51542")
         """
         self.connection_string = connection_string
+        self.session = get_local_session(connection_string)
     
     def get_tables(self) -> List[Dict[str, Any]]:
         """
@@ -34,25 +36,7 @@ class LocalPowerBIModelExplorer:
         Returns:
             List of dictionaries containing table information
         """
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                # Query DMV to get table information using a simpler approach
-                cmd = conn.CreateCommand()
-                cmd.CommandText = """
+        rows = self.session.execute("""
                 SELECT 
                     [DIMENSION_NAME] as TableName,
                     [DIMENSION_CAPTION] as TableCaption,
@@ -62,35 +46,18 @@ class LocalPowerBIModelExplorer:
                 FROM $SYSTEM.MDSCHEMA_DIMENSIONS
                 WHERE [CUBE_NAME] = 'Model'
                 ORDER BY [DIMENSION_NAME]
-                """
-                
-                reader = cmd.ExecuteReader()
-                tables = []
-                
-                while reader.Read():
-                    table = {
-                        'name': str(reader['TableName']),
-                        'caption': str(reader['TableCaption']) if reader['TableCaption'] else str(reader['TableName']),
-                        'type': str(reader['DimensionType']) if reader['DimensionType'] else 'Regular',
-                        'row_count': int(reader['RowCount']) if reader['RowCount'] else 0,
-                        'description': '',  # Description not available in this DMV
-                        'is_visible': bool(reader['IsVisible']) if reader['IsVisible'] else True
-                    }
-                    tables.append(table)
-                
-                reader.Close()
-                conn.Close()
-                
-                return tables
-                
-            except Exception as query_error:
-                conn.Close()
-                logger.error(f"Error querying tables: {str(query_error)}")
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+                """).to_rows()
+        return [
+            {
+                'name': str(row['TableName']),
+                'caption': str(row['TableCaption']) if row['TableCaption'] else str(row['TableName']),
+                'type': str(row['DimensionType']) if row['DimensionType'] else 'Regular',
+                'row_count': int(row['RowCount']) if row['RowCount'] else 0,
+                'description': '',  # Description not available in this DMV
+                'is_visible': bool(row['IsVisible']) if row['IsVisible'] is not None else True
+            }
+            for row in rows
+        ]
     
     def get_columns(self, table_name: str = None) -> List[Dict[str, Any]]:
         """
@@ -102,86 +69,33 @@ class LocalPowerBIModelExplorer:
         Returns:
             List of dictionaries containing column information
         """
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                # Query DMV to get column information
-                cmd = conn.CreateCommand()
-                
-                if table_name:
-                    cmd.CommandText = f"""
-                    SELECT 
-                        [DIMENSION_UNIQUE_NAME] as TableName,
-                        [LEVEL_NAME] as ColumnName,
-                        [LEVEL_CAPTION] as ColumnCaption,
-                        [LEVEL_TYPE] as ColumnType,
-                        [LEVEL_CARDINALITY] as Cardinality,
-                        [DESCRIPTION] as Description,
-                        [IS_VISIBLE] as IsVisible
-                    FROM $SYSTEM.MDSCHEMA_LEVELS
-                    WHERE [CUBE_NAME] = 'Model' 
-                    AND [DIMENSION_UNIQUE_NAME] = '[{table_name}]'
-                    ORDER BY [LEVEL_NUMBER]
-                    """
-                else:
-                    cmd.CommandText = """
-                    SELECT 
-                        [DIMENSION_UNIQUE_NAME] as TableName,
-                        [LEVEL_NAME] as ColumnName,
-                        [LEVEL_CAPTION] as ColumnCaption,
-                        [LEVEL_TYPE] as ColumnType,
-                        [LEVEL_CARDINALITY] as Cardinality,
-                        [DESCRIPTION] as Description,
-                        [IS_VISIBLE] as IsVisible
-                    FROM $SYSTEM.MDSCHEMA_LEVELS
-                    WHERE [CUBE_NAME] = 'Model'
-                    ORDER BY [DIMENSION_UNIQUE_NAME], [LEVEL_NUMBER]
-                    """
-                
-                reader = cmd.ExecuteReader()
-                columns = []
-                
-                while reader.Read():
-                    # Clean up table name (remove brackets)
-                    table_name_clean = str(reader['TableName']).strip('[]')
-                    
-                    column = {
-                        'table_name': table_name_clean,
-                        'column_name': str(reader['ColumnName']),
-                        'column_caption': str(reader['ColumnCaption']) if reader['ColumnCaption'] else str(reader['ColumnName']),
-                        'column_type': str(reader['ColumnType']) if reader['ColumnType'] else 'Regular',
-                        'cardinality': int(reader['Cardinality']) if reader['Cardinality'] else 0,
-                        'description': str(reader['Description']) if reader['Description'] else '',
-                        'is_visible': bool(reader['IsVisible']) if reader['IsVisible'] else True
-                    }
-                    columns.append(column)
-                
-                reader.Close()
-                conn.Close()
-                
-                return columns
-                
-            except Exception as query_error:
-                conn.Close()
-                logger.error(f"Error querying columns: {str(query_error)}")
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+        table_filter = f"AND [DIMENSION_UNIQUE_NAME] = '[{table_name}]'" if table_name else ""
+        rows = self.session.execute(f"""
+                SELECT 
+                    [DIMENSION_UNIQUE_NAME] as TableName,
+                    [LEVEL_NAME] as ColumnName,
+                    [LEVEL_CAPTION] as ColumnCaption,
+                    [LEVEL_TYPE] as ColumnType,
+                    [LEVEL_CARDINALITY] as Cardinality,
+                    [DESCRIPTION] as Description,
+                    [IS_VISIBLE] as IsVisible
+                FROM $SYSTEM.MDSCHEMA_LEVELS
+                WHERE [CUBE_NAME] = 'Model' {table_filter}
+                ORDER BY [DIMENSION_UNIQUE_NAME], [LEVEL_NUMBER]
+                """).to_rows()
+        return [
+            {
+                # Clean up table name (remove brackets)
+                'table_name': str(row['TableName']).strip('[]'),
+                'column_name': str(row['ColumnName']),
+                'column_caption': str(row['ColumnCaption']) if row['ColumnCaption'] else str(row['ColumnName']),
+                'column_type': str(row['ColumnType']) if row['ColumnType'] else 'Regular',
+                'cardinality': int(row['Cardinality']) if row['Cardinality'] else 0,
+                'description': str(row['Description']) if row['Description'] else '',
+                'is_visible': bool(row['IsVisible']) if row['IsVisible'] is not None else True
+            }
+            for row in rows
+        ]
     
     def get_measures(self) -> List[Dict[str, Any]]:
         """
@@ -190,25 +104,7 @@ class LocalPowerBIModelExplorer:
         Returns:
             List of dictionaries containing measure information
         """
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                # Query DMV to get measure information
-                cmd = conn.CreateCommand()
-                cmd.CommandText = """
+        rows = self.session.execute("""
                 SELECT 
                     [MEASURE_NAME] as MeasureName,
                     [MEASURE_CAPTION] as MeasureCaption,
@@ -218,36 +114,19 @@ class LocalPowerBIModelExplorer:
                 FROM $SYSTEM.MDSCHEMA_MEASURES
                 WHERE [CUBE_NAME] = 'Model'
                 ORDER BY [MEASURE_NAME]
-                """
-                
-                reader = cmd.ExecuteReader()
-                measures = []
-                
-                while reader.Read():
-                    measure = {
-                        'name': str(reader['MeasureName']),
-                        'caption': str(reader['MeasureCaption']) if reader['MeasureCaption'] else str(reader['MeasureName']),
-                        'aggregator': str(reader['Aggregator']) if reader['Aggregator'] else '',
-                        'data_type': str(reader['DataType']) if reader['DataType'] else '',
-                        'description': '',  # Description not available in this DMV
-                        'is_visible': bool(reader['IsVisible']) if reader['IsVisible'] else True,
-                        'expression': ''  # Expression not available in this DMV
-                    }
-                    measures.append(measure)
-                
-                reader.Close()
-                conn.Close()
-                
-                return measures
-                
-            except Exception as query_error:
-                conn.Close()
-                logger.error(f"Error querying measures: {str(query_error)}")
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+                """).to_rows()
+        return [
+            {
+                'name': str(row['MeasureName']),
+                'caption': str(row['MeasureCaption']) if row['MeasureCaption'] else str(row['MeasureName']),
+                'aggregator': str(row['Aggregator']) if row['Aggregator'] else '',
+                'data_type': str(row['DataType']) if row['DataType'] else '',
+                'description': '',  # Description not available in this DMV
+                'is_visible': bool(row['IsVisible']) if row['IsVisible'] is not None else True,
+                'expression': ''  # Expression not available in this DMV
+            }
+            for row in rows
+        ]
     
     def execute_dax_query(self, dax_query: str) -> Dict[str, Any]:
         """
@@ -260,66 +139,16 @@ class LocalPowerBIModelExplorer:
             Dictionary containing query results
         """
         try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                # Execute DAX query
-                cmd = conn.CreateCommand()
-                cmd.CommandText = dax_query
-                
-                reader = cmd.ExecuteReader()
-                
-                # Get column information
-                columns = []
-                for i in range(reader.FieldCount):
-                    columns.append({
-                        'name': reader.GetName(i),
-                        'type': str(reader.GetFieldType(i))
-                    })
-                
-                # Get data rows
-                rows = []
-                while reader.Read():
-                    row = []
-                    for i in range(reader.FieldCount):
-                        value = reader.GetValue(i)
-                        row.append(str(value) if value is not None else None)
-                    rows.append(row)
-                
-                reader.Close()
-                conn.Close()
-                
-                return {
-                    'success': True,
-                    'columns': columns,
-                    'rows': rows,
-                    'row_count': len(rows),
-                    'query': dax_query
-                }
-                
-            except Exception as query_error:
-                conn.Close()
-                logger.error(f"Error executing DAX query: {str(query_error)}")
-                return {
-                    'success': False,
-                    'error': str(query_error),
-                    'query': dax_query
-                }
-                
+            result = self.session.execute(dax_query)
+            return {
+                'success': True,
+                'columns': [{'name': name} for name in result.columns],
+                'rows': [list(values) for values in zip(*result.data)],
+                'row_count': result.row_count,
+                'query': dax_query
+            }
         except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
+            logger.error(f"Error executing DAX query: {str(e)}")
             return {
                 'success': False,
                 'error': str(e),
@@ -4,15 +4,27 @@ import requests
 from typing import Optional, List, Dict, Any
 from urllib.parse import quote, urljoin
 import logging
+from core.learn_cache import FREQUENT_DOC_PAGES, LearnCache, extract_page_text, learn_cache
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for Microsoft Learn before falling back to the cache
+REQUEST_TIMEOUT_SECONDS = 15
+
+SEARCH_SOURCES = ("auto", "local", "online")
+
+
+def _is_error(result: Any) -> bool:
+    return not isinstance(result, dict) or result.get("success") is False or "error" in result
+
+
 class MicrosoftLearnAPI:
     """Client for Microsoft Learn API integration."""
     
     BASE_URL = "https://learn.microsoft.com/api"
     
-    def __init__(self):
+    def __init__(self, cache: LearnCache = learn_cache):
+        self.cache = cache
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Semantic-Model-MCP-Server/1.0',
@@ -20,8 +32,33 @@ class MicrosoftLearnAPI:
             'Content-Type': 'application/json'
         })
     
+    def _cached(self, kind: str, fetch, refresh: bool = False, **params) -> Dict[str, Any]:
+        """
+        Serve a request from the cache, or fetch and cache it.
+
+        If the fetch fails, an expired cached response is returned instead of
+        the error, marked with "cache": {"status": "stale"}.
+        """
+        key = self.cache.make_key(kind, **params)
+        if not refresh:
+            cached = self.cache.get(kind, key)
+            if cached is not None:
+                response, age = cached
+                return {**response, "cache": {"status": "hit", "age_seconds": round(age, 1)}}
+
+        result = fetch()
+        if not _is_error(result):
+            self.cache.put(kind, key, result)
+            return result
+
+        stale = self.cache.get(kind, key, allow_stale=True)
+        if stale is not None:
+            response, age = stale
+            return {**response, "cache": {"status": "stale", "age_seconds": round(age, 1), "online_error": result.get("error")}}
+        return result
+    
     def search_content(self, query: str, locale: str = "en-us", top: int = 10, 
-                      content_type: Optional[str] = None) -> Dict[str, Any]:
+                      content_type: Optional[str] = None, source: str = "auto") -> Dict[str, Any]:
         """
         Search Microsoft Learn content using the docs search endpoint.
         
@@ -30,10 +67,38 @@ class MicrosoftLearnAPI:
             locale: Language locale (default: en-us)
             top: Maximum number of results (default: 10)
             content_type: Filter by content type (e.g., 'documentation', 'learning-path', 'module')
+            source: "auto" to answer from the cache or the offline index before going online,
+                "local" for the offline index only, "online" to always ask Microsoft Learn
         
         Returns:
             Search results from Microsoft Learn
         """
+        if source not in SEARCH_SOURCES:
+            return {"success": False, "error": f"Unknown source '{source}'. Use one of: {', '.join(SEARCH_SOURCES)}"}
+
+        params = dict(query=query, locale=locale, top=top, content_type=content_type)
+        if source == "auto":
+            cached = self.cache.get("search", self.cache.make_key("search", **params))
+            if cached is not None:
+                response, age = cached
+                return {**response, "cache": {"status": "hit", "age_seconds": round(age, 1)}}
+        # The offline index only holds documentation pages
+        if source != "online" and content_type in (None, "documentation"):
+            local_results = self.cache.search_index(query, top)
+            if local_results or source == "local":
+                return {
+                    "success": True,
+                    "query": query,
+                    "source": "local_index",
+                    "total_results": len(local_results),
+                    "results": local_results
+                }
+
+        # The fresh cache entry was already checked above
+        return self._cached("search", lambda: self._search_online(query, locale, top, content_type),
+                            refresh=True, **params)
+
+    def _search_online(self, query: str, locale: str, top: int, content_type: Optional[str]) -> Dict[str, Any]:
         try:
             # Use the Microsoft Docs search endpoint which is publicly available
             url = "https://docs.microsoft.com/api/search"
@@ -48,7 +113,7 @@ class MicrosoftLearnAPI:
             if content_type:
                 params['$filter'] = f"category eq '{content_type}'"
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
             
             if response.status_code == 200:
                 data = response.json()
@@ -103,6 +168,9 @@ class MicrosoftLearnAPI:
         Returns:
             Learning paths from Microsoft Learn
         """
+        return self._cached("learning_paths", lambda: self._get_learning_paths_online(locale, top), locale=locale, top=top)
+
+    def _get_learning_paths_online(self, locale: str, top: int) -> Dict[str, Any]:
         try:
             url = f"{self.BASE_URL}/learningpaths"
             
@@ -111,7 +179,7 @@ class MicrosoftLearnAPI:
                 '$top': top
             }
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
             
             if response.status_code == 200:
                 return response.json()
@@ -142,6 +210,10 @@ class MicrosoftLearnAPI:
         Returns:
             Modules from Microsoft Learn
         """
+        return self._cached("modules", lambda: self._get_modules_online(locale, top, learning_path_id),
+                            locale=locale, top=top, learning_path_id=learning_path_id)
+
+    def _get_modules_online(self, locale: str, top: int, learning_path_id: Optional[str]) -> Dict[str, Any]:
         try:
             url = f"{self.BASE_URL}/modules"
             
@@ -153,7 +225,7 @@ class MicrosoftLearnAPI:
             if learning_path_id:
                 params['learningPathId'] = learning_path_id
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
             
             if response.status_code == 200:
                 return response.json()
@@ -182,6 +254,10 @@ class MicrosoftLearnAPI:
         Returns:
             Content details from Microsoft Learn
         """
+        return self._cached("content", lambda: self._get_content_online(content_url, locale),
+                            content_url=content_url, locale=locale)
+
+    def _get_content_online(self, content_url: str, locale: str) -> Dict[str, Any]:
         try:
             # Extract the path from the URL for API call
             if content_url.startswith('https://learn.microsoft.com/'):
@@ -195,7 +271,7 @@ class MicrosoftLearnAPI:
                 'locale': locale
             }
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT_SECONDS)
             
             if response.status_code == 200:
                 return response.json()
@@ -213,11 +289,58 @@ class MicrosoftLearnAPI:
                 "message": str(e)
             }
 
+    def build_offline_index(self, urls: Optional[List[str]] = None, refresh: bool = False,
+                            on_page_done=None) -> Dict[str, Any]:
+        """
+        Download docs pages into the offline full-text index.
+
+        Args:
+            urls: Page URLs to index (default: FREQUENT_DOC_PAGES)
+            refresh: True to download pages that are already indexed again
+            on_page_done: Optional callback receiving each page's outcome
+
+        Returns:
+            Dictionary with the indexed, skipped and failed pages
+        """
+        if not self.cache.enabled or not self.cache.get_status().get("fts_available"):
+            return {
+                "success": False,
+                "error": "The offline index needs the Learn cache and SQLite FTS5; see get_learn_cache_status."
+            }
+
+        already_indexed = set() if refresh else set(self.cache.indexed_urls())
+        indexed, skipped, failed = [], [], []
+        for url in urls or FREQUENT_DOC_PAGES:
+            if url in already_indexed:
+                skipped.append(url)
+                continue
+            try:
+                response = self.session.get(url, headers={'Accept': 'text/html'}, timeout=REQUEST_TIMEOUT_SECONDS)
+                if response.status_code != 200:
+                    raise ValueError(f"status {response.status_code}")
+                title, text = extract_page_text(response.text)
+                self.cache.index_page(url, title or url, text)
+                outcome = {"url": url, "title": title, "chars": len(text)}
+                indexed.append(outcome)
+            except Exception as e:
+                outcome = {"url": url, "error": str(e)}
+                failed.append(outcome)
+            if on_page_done is not None:
+                on_page_done(outcome)
+
+        return {
+            "success": not failed or bool(indexed),
+            "indexed": indexed,
+            "skipped_already_indexed": skipped,
+            "failed": failed,
+            "indexed_page_count": len(self.cache.indexed_urls())
+        }
+
 # Initialize the API client
 learn_api = MicrosoftLearnAPI()
 
 def search_microsoft_learn(query: str, locale: str = "en-us", top: int = 10, 
-                          content_type: Optional[str] = None) -> str:
+                          content_type: Optional[str] = None, source: str = "auto") -> str:
     """
     Search Microsoft Learn documentation and content.
     
@@ -226,11 +349,12 @@ def search_microsoft_learn(query: str, locale: str = "en-us", top: int = 10,
         locale: Language locale (default: en-us)
         top: Maximum number of results to return (default: 10)
         content_type: Filter by content type (e.g., 'documentation', 'learning-path', 'module')
+        source: "auto", "local" (offline index only) or "online" (always ask Microsoft Learn)
     
     Returns:
         JSON string with search results
     """
-    result = learn_api.search_content(query, locale, top, content_type)
+    result = learn_api.search_content(query, locale, top, content_type, source)
     return json.dumps(result, indent=2)
 
 def get_microsoft_learn_paths(locale: str = "en-us", top: int = 20) -> str:
@@ -276,3 +400,18 @@ def get_microsoft_learn_content(content_url: str, locale: str = "en-us") -> str:
     """
     result = learn_api.get_content_by_url(content_url, locale)
     return json.dumps(result, indent=2)
+
+def build_learn_offline_index(urls: Optional[List[str]] = None, refresh: bool = False, on_page_done=None) -> str:
+    """
+    Download docs pages into the offline Microsoft Learn index.
+    
+    Args:
+        urls: Page URLs to index (default: frequently used DAX, Power BI and Fabric pages)
+        refresh: True to download pages that are already indexed again
+        on_page_done: Optional callback receiving each page's outcome
+    
+    Returns:
+        JSON string with the indexed, skipped and failed pages
+    """
+    result = learn_api.build_offline_index(urls, refresh, on_page_done)
+    return json.dumps(result, indent=2)
@@ -7,26 +7,34 @@ and retrieving educational content.
 
 from fastmcp import FastMCP
 import json
-from tools.microsoft_learn import search_microsoft_learn, get_microsoft_learn_paths, get_microsoft_learn_modules, get_microsoft_learn_content
+from typing import List
+from core.job_manager import JobContext, start_tool_job
+from core.learn_cache import learn_cache
+from tools.microsoft_learn import search_microsoft_learn, get_microsoft_learn_paths, get_microsoft_learn_modules, get_microsoft_learn_content, build_learn_offline_index as _build_learn_offline_index
 
 def register_microsoft_learn_tools(mcp: FastMCP):
     """Register all Microsoft Learn related MCP tools"""
 
     @mcp.tool
-    def search_learn_microsoft_content(query: str, locale: str = "en-us", top: int = 10, content_type: str = None) -> str:
+    def search_learn_microsoft_content(query: str, locale: str = "en-us", top: int = 10, content_type: str = None, source: str = "auto") -> str:
         """Search Microsoft Learn documentation and content.
 
+        Responses are cached locally, and pages in the offline index (see build_learn_offline_index)
+        are searched before going online. If Microsoft Learn cannot be reached, an older cached
+        response is returned marked as stale.
+
         Args:
             query: Search query for Microsoft Learn content
             locale: Language locale (default: en-us)
             top: Maximum number of results to return (default: 10)
             content_type: Filter by content type (e.g., 'documentation', 'learning-path', 'module')
+            source: "auto" (cache, then offline index, then online), "local" (offline index only) or "online" (always ask Microsoft Learn)
 
         Returns:
             JSON string with search results from Microsoft Learn
         """
         try:
-            result = search_microsoft_learn(query, locale, top, content_type)
+            result = search_microsoft_learn(query, locale, top, content_type, source)
             return json.dumps(result, indent=2)
         except Exception as e:
             return json.dumps({
@@ -98,3 +106,61 @@ def register_microsoft_learn_tools(mcp: FastMCP):
                 'error': f'Error getting Microsoft Learn content: {str(e)}',
                 'error_type': 'microsoft_learn_content_error'
             })
+
+    @mcp.tool
+    def build_learn_offline_index(urls: List[str] = None, refresh: bool = False, run_async: bool = False) -> str:
+        """Download Microsoft Learn pages into the local full-text index used by search_learn_microsoft_content.
+
+        Without URLs, frequently used DAX, Power BI, Direct Lake and TMSL pages are indexed. The index is
+        stored in the Learn cache database, which can be copied to machines without internet access.
+
+        Args:
+            urls: Page URLs to index (default: the built-in list of frequently used pages)
+            refresh: Set to True to download pages that are already indexed again
+            run_async: Set to True to get a job_id right away and poll get_job_status for the pages indexed so far
+
+        Returns:
+            JSON string with the indexed, skipped and failed pages
+        """
+        def run(job: JobContext = None) -> str:
+            on_page_done = job.add_partial_result if job is not None else None
+            try:
+                return _build_learn_offline_index(urls, refresh, on_page_done)
+            except Exception as e:
+                return json.dumps({
+                    'success': False,
+                    'error': f'Error building the Microsoft Learn offline index: {str(e)}',
+                    'error_type': 'microsoft_learn_index_error'
+                })
+
+        if run_async:
+            return json.dumps(start_tool_job(
+                "build_learn_offline_index",
+                run,
+                description=f"{len(urls) if urls else 'default'} pages",
+                serialize_key="learn_offline_index",
+                with_context=True
+            ), indent=2)
+        return run()
+
+    @mcp.tool
+    def get_learn_cache_status() -> str:
+        """Get the status of the local Microsoft Learn cache and offline index.
+
+        Returns:
+            JSON string with the cache location, cached responses per kind, indexed pages, TTLs and hit counters
+        """
+        return json.dumps({'success': True, **learn_cache.get_status()}, indent=2)
+
+    @mcp.tool
+    def clear_learn_cache(include_index: bool = False) -> str:
+        """Drop the cached Microsoft Learn responses.
+
+        Args:
+            include_index: Set to True to also drop the pages of the offline index
+
+        Returns:
+            JSON string with the number of responses and pages dropped
+        """
+        cleared = learn_cache.clear(include_index)
+        return json.dumps({'success': True, 'cleared': cleared})
@@ -11,6 +11,7 @@ import re
 import logging
 import psutil
 from typing import List, Dict, Optional, Tuple
+from core.dotnet_loader import ADOMD_ASSEMBLIES, load_assemblies
 
 logger = logging.getLogger(__name__)
 
@@ -318,14 +319,7 @@ class PowerBIDesktopDetector:
         
         try:
             # Try to import Analysis Services libraries
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
+            load_assemblies(ADOMD_ASSEMBLIES)
             from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
             
             # Test connection - Power BI Desktop doesn't require authentication
@@ -7,11 +7,10 @@ and analyzing local Power BI Desktop instances.
 
 from fastmcp import FastMCP
 import json
-from tools.powerbi_desktop_detector import detect_powerbi_desktop_instances, test_powerbi_desktop_connection
-from tools.fast_powerbi_detector import detect_powerbi_desktop_instances_fast
-from tools.ultra_fast_powerbi_detector import detect_powerbi_desktop_instances_ultra_fast
-from tools.improved_dax_explorer import get_local_tmsl_definition, update_local_model_using_tmsl
-from tools.simple_dax_explorer import explore_local_powerbi_simple, execute_local_dax_query
+from typing import List
+
+# The detector and explorer modules import psutil and pythonnet, so the tools
+# import them on first use instead of at server startup.
 
 def register_powerbi_desktop_tools(mcp: FastMCP):
     """Register all Power BI Desktop related MCP tools"""
@@ -34,6 +33,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
         """
         try:
             # Use the ultra-fast detector for maximum performance
+            from tools.ultra_fast_powerbi_detector import detect_powerbi_desktop_instances_ultra_fast
             result = detect_powerbi_desktop_instances_ultra_fast()
             return json.dumps(result, indent=2, default=str)  # Convert dict to JSON string
         except Exception as e:
@@ -62,6 +62,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             - Error details if connection failed
         """
         try:
+            from tools.powerbi_desktop_detector import test_powerbi_desktop_connection
             result = test_powerbi_desktop_connection(port)
             return json.dumps(result, indent=2)
         except Exception as e:
@@ -82,6 +83,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             JSON string with table information including names, row counts, and basic metadata
         """
         try:
+            from tools.simple_dax_explorer import explore_local_powerbi_simple
             result = explore_local_powerbi_simple(connection_string, 'tables')
             return result
         except Exception as e:
@@ -103,8 +105,8 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             JSON string with column information including names, data types, and properties
         """
         try:
-            operation = f'columns:{table_name}' if table_name else 'columns'
-            result = explore_local_powerbi_simple(connection_string, operation)
+            from tools.simple_dax_explorer import explore_local_powerbi_simple
+            result = explore_local_powerbi_simple(connection_string, 'columns', table_name)
             return result
         except Exception as e:
             return json.dumps({
@@ -124,6 +126,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             JSON string with measure information including names, expressions, and properties
         """
         try:
+            from tools.simple_dax_explorer import explore_local_powerbi_simple
             result = explore_local_powerbi_simple(connection_string, 'measures')
             return result
         except Exception as e:
@@ -145,6 +148,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             JSON string with query results including columns and data
         """
         try:
+            from tools.simple_dax_explorer import execute_local_dax_query
             result = execute_local_dax_query(connection_string, dax_query)
             return result
         except Exception as e:
@@ -169,6 +173,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
         try:
             # Construct a simple DAX query to get table data
             dax_query = f"EVALUATE TOPN({max_rows}, '{table_name}')"
+            from tools.simple_dax_explorer import execute_local_dax_query
             result = execute_local_dax_query(connection_string, dax_query)
             
             # Parse the result and add table context
@@ -186,6 +191,42 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
                 'error_type': 'powerbi_table_query_error'
             })
 
+    @mcp.tool
+    def profile_local_powerbi_columns(connection_string: str, table_names: List[str], top_values: int = 5,
+                                      top_values_max_distinct: int = 100000, sample_rows: int = None) -> str:
+        """Profile every column of tables in a local Power BI Desktop model with DAX aggregated in the model.
+
+        Use this instead of reading rows with query_local_powerbi_table. Returns the row count of each table and,
+        per column, the distinct count, blank count and share, minimum, maximum and most frequent values,
+        computed in one request for the statistics and one for the top values.
+
+        Args:
+            connection_string: The connection string to the local Power BI Desktop instance
+            table_names: Names of the tables to profile
+            top_values: Most frequent values returned per column (default 5, 0 for none)
+            top_values_max_distinct: Columns with more distinct values get no top values (default 100,000)
+            sample_rows: For huge tables, compute the column statistics over the first sample_rows rows of each table
+
+        Returns:
+            JSON string with the statistics per table and column
+        """
+        if not table_names:
+            return json.dumps({'success': False, 'error': 'At least one table name is required.', 'error_type': 'parameter_error'})
+        try:
+            from core.column_profiler import profile_tables
+            from core.local_powerbi_session import get_local_session
+            session = get_local_session(connection_string)
+            # The table and column list comes from the session's cached metadata
+            profile = profile_tables(session.run, session.get_metadata(), table_names, top_values,
+                                     top_values_max_distinct, sample_rows)
+            return json.dumps({'success': True, 'connection_string': connection_string, **profile}, indent=2, default=str)
+        except Exception as e:
+            return json.dumps({
+                'success': False,
+                'error': f'Error profiling local Power BI columns: {str(e)}',
+                'error_type': 'powerbi_profile_error'
+            })
+
     @mcp.tool
     def explore_local_powerbi_model_structure(connection_string: str) -> str:
         """Get comprehensive structure information about a local Power BI Desktop model.
@@ -197,35 +238,9 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             JSON string with complete model structure including tables, columns, measures, and relationships
         """
         try:
-            # Get tables
-            tables_result = explore_local_powerbi_simple(connection_string, 'tables')
-            tables_data = json.loads(tables_result)
-            
-            # Get measures
-            measures_result = explore_local_powerbi_simple(connection_string, 'measures')
-            measures_data = json.loads(measures_result)
-            
-            # Get all columns
-            columns_result = explore_local_powerbi_simple(connection_string, 'columns')
-            columns_data = json.loads(columns_result)
-            
-            # Combine into comprehensive structure
-            structure = {
-                'success': True,
-                'connection_string': connection_string,
-                'model_structure': {
-                    'tables': tables_data.get('tables', []) if tables_data.get('success') else [],
-                    'measures': measures_data.get('measures', []) if measures_data.get('success') else [],
-                    'columns': columns_data.get('columns', []) if columns_data.get('success') else []
-                },
-                'summary': {
-                    'table_count': len(tables_data.get('tables', [])) if tables_data.get('success') else 0,
-                    'measure_count': len(measures_data.get('measures', [])) if measures_data.get('success') else 0,
-                    'column_count': len(columns_data.get('columns', [])) if columns_data.get('success') else 0
-                }
-            }
-            
-            return json.dumps(structure, indent=2)
+            # Tables, columns, measures and relationships come from one cached metadata read
+            from tools.simple_dax_explorer import explore_local_powerbi_simple
+            return explore_local_powerbi_simple(connection_string, 'structure')
         except Exception as e:
             return json.dumps({
                 'success': False,
@@ -247,6 +262,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             JSON string with TMSL definition and model metadata
         """
         try:
+            from tools.improved_dax_explorer import get_local_tmsl_definition
             result = get_local_tmsl_definition(connection_string)
             return result
         except Exception as e:
@@ -272,7 +288,11 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             Success message or detailed error with suggestions for fixes
         """
         try:
+            from tools.improved_dax_explorer import update_local_model_using_tmsl
+            from core.local_powerbi_session import local_session_pool
             result = update_local_model_using_tmsl(connection_string, tmsl_definition, validate_only)
+            if not validate_only:
+                local_session_pool.invalidate(connection_string)
             return result
         except Exception as e:
             return json.dumps({
@@ -281,6 +301,29 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
                 'error_type': 'tmsl_update_error'
             })
 
+    @mcp.tool
+    def get_local_powerbi_session_status() -> str:
+        """Get the status of the open local Power BI Desktop sessions.
+
+        The local tools keep one connection per Power BI Desktop instance and cache the model
+        metadata until the model changes.
+
+        Returns:
+            JSON string with each session's connection state, cached metadata and usage counters
+        """
+        from core.local_powerbi_session import local_session_pool
+        return json.dumps({'success': True, **local_session_pool.get_status()}, indent=2)
+
+    @mcp.tool
+    def clear_local_powerbi_sessions() -> str:
+        """Close all local Power BI Desktop sessions and drop their cached metadata.
+
+        Use this if a Power BI Desktop instance was closed or reopened on the same port.
+        """
+        from core.local_powerbi_session import local_session_pool
+        closed = local_session_pool.clear()
+        return json.dumps({'success': True, 'message': f'Closed {closed} local Power BI Desktop sessions.'})
+
     @mcp.tool
     def compare_analysis_services_connections() -> str:
         """Compare different types of Analysis Services connections and their requirements.
@@ -397,6 +440,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             # Test ultra-fast method
             start_time = time.time()
             try:
+                from tools.ultra_fast_powerbi_detector import detect_powerbi_desktop_instances_ultra_fast
                 ultra_fast_result = detect_powerbi_desktop_instances_ultra_fast()
                 ultra_fast_time = (time.time() - start_time) * 1000
                 
@@ -416,6 +460,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             # Test fast method
             start_time = time.time()
             try:
+                from tools.fast_powerbi_detector import detect_powerbi_desktop_instances_fast
                 fast_result = detect_powerbi_desktop_instances_fast()
                 fast_time = (time.time() - start_time) * 1000
                 
@@ -435,6 +480,7 @@ def register_powerbi_desktop_tools(mcp: FastMCP):
             # Test standard method
             start_time = time.time()
             try:
+                from tools.powerbi_desktop_detector import detect_powerbi_desktop_instances
                 standard_result = detect_powerbi_desktop_instances()
                 standard_time = (time.time() - start_time) * 1000
                 
@@ -1,10 +1,15 @@
 """
 Simple local Power BI Desktop explorer using basic DAX queries.
+
+Queries and metadata come from the shared local session of each Power BI
+Desktop instance (core.local_powerbi_session).
 """
 
 import json
 import logging
 from typing import List, Dict, Optional, Any
+from core.dax_result_reader import DEFAULT_MAX_BYTES, DEFAULT_MAX_ROWS
+from core.local_powerbi_session import get_local_session
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +17,9 @@ class SimpleDaxLocalExplorer:
     """
     Simple utility class for exploring local Power BI Desktop semantic models
     using basic DAX queries without complex JOINs.
+
+    All explorers share the local session of their instance, so the metadata is
+    read once per model change instead of once per call.
     """
     
     def __init__(self, connection_string: str):
@@ -22,306 +30,61 @@ class SimpleDaxLocalExplorer:
             connection_string: Local connection string (e.g., "Data Source=localhost:51542")
         """
         self.connection_string = connection_string
-        self._table_cache = None
+        self.session = get_local_session(connection_string)
     
     def _get_table_mapping(self) -> Dict[str, str]:
         """Get mapping of table IDs to table names."""
-        if self._table_cache is not None:
-            return self._table_cache
-            
         try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                cmd = conn.CreateCommand()
-                cmd.CommandText = "EVALUATE INFO.TABLES()"
-                
-                reader = cmd.ExecuteReader()
-                table_mapping = {}
-                
-                while reader.Read():
-                    table_id = str(reader['[ID]'])
-                    table_name = str(reader['[Name]'])
-                    table_mapping[table_id] = table_name
-                
-                reader.Close()
-                conn.Close()
-                
-                self._table_cache = table_mapping
-                return table_mapping
-                
-            except Exception as query_error:
-                conn.Close()
-                raise query_error
-                
+            return self.session.get_metadata().table_names()
         except Exception as e:
             logger.error(f"Error getting table mapping: {str(e)}")
             return {}
     
     def get_tables_simple(self) -> List[Dict[str, Any]]:
-        """Get all tables using basic DAX INFO.TABLES() function."""
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                cmd = conn.CreateCommand()
-                cmd.CommandText = "EVALUATE INFO.TABLES()"
-                
-                reader = cmd.ExecuteReader()
-                tables = []
-                
-                while reader.Read():
-                    table = {
-                        'id': str(reader['[ID]']) if reader['[ID]'] is not None else '',
-                        'name': str(reader['[Name]']) if reader['[Name]'] is not None else '',
-                        'data_category': str(reader['[DataCategory]']) if reader['[DataCategory]'] is not None else '',
-                        'description': str(reader['[Description]']) if reader['[Description]'] is not None else '',
-                        'is_hidden': bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else False,
-                        'is_visible': not bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else True,
-                        'modified_time': str(reader['[ModifiedTime]']) if reader['[ModifiedTime]'] is not None else '',
-                        'lineage_tag': str(reader['[LineageTag]']) if reader['[LineageTag]'] is not None else ''
-                    }
-                    tables.append(table)
-                
-                reader.Close()
-                conn.Close()
-                
-                return tables
-                
-            except Exception as query_error:
-                conn.Close()
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+        """Get all tables from the INFO.TABLES() metadata."""
+        return self.session.get_metadata().table_info()
     
     def get_columns_simple(self, table_name: str = None) -> List[Dict[str, Any]]:
-        """Get columns using basic DAX INFO.COLUMNS() function."""
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Get table mapping
-            table_mapping = self._get_table_mapping()
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                cmd = conn.CreateCommand()
-                cmd.CommandText = "EVALUATE INFO.COLUMNS()"
-                
-                reader = cmd.ExecuteReader()
-                columns = []
-                
-                while reader.Read():
-                    table_id = str(reader['[TableID]'])
-                    mapped_table_name = table_mapping.get(table_id, 'Unknown')
-                    
-                    # Filter by table name if specified
-                    if table_name and mapped_table_name != table_name:
-                        continue
-                    
-                    column = {
-                        'table_id': table_id,
-                        'table_name': mapped_table_name,
-                        'column_id': str(reader['[ID]']) if reader['[ID]'] is not None else '',
-                        'explicit_name': str(reader['[ExplicitName]']) if reader['[ExplicitName]'] is not None else '',
-                        'inferred_name': str(reader['[InferredName]']) if reader['[InferredName]'] is not None else '',
-                        'data_type': str(reader['[ExplicitDataType]']) if reader['[ExplicitDataType]'] is not None else '',
-                        'is_hidden': bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else False,
-                        'is_visible': not bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else True,
-                        'is_key': bool(reader['[IsKey]']) if reader['[IsKey]'] is not None else False,
-                        'description': str(reader['[Description]']) if reader['[Description]'] is not None else '',
-                        'display_folder': str(reader['[DisplayFolder]']) if reader['[DisplayFolder]'] is not None else '',
-                        'expression': str(reader['[Expression]']) if reader['[Expression]'] is not None else '',
-                        'lineage_tag': str(reader['[LineageTag]']) if reader['[LineageTag]'] is not None else ''
-                    }
-                    columns.append(column)
-                
-                reader.Close()
-                conn.Close()
-                
-                return columns
-                
-            except Exception as query_error:
-                conn.Close()
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+        """Get columns from the INFO.COLUMNS() metadata, optionally of one table."""
+        return self.session.get_metadata().column_info(table_name)
     
     def get_measures_simple(self) -> List[Dict[str, Any]]:
-        """Get measures using basic DAX INFO.MEASURES() function."""
-        try:
-            import clr
-            import os
-            
-            # Add references to Analysis Services libraries
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-            
-            clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-            from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-            
-            # Get table mapping
-            table_mapping = self._get_table_mapping()
-            
-            # Connect to local Power BI Desktop
-            conn = AdomdConnection(self.connection_string)
-            conn.Open()
-            
-            try:
-                cmd = conn.CreateCommand()
-                cmd.CommandText = "EVALUATE INFO.MEASURES()"
-                
-                reader = cmd.ExecuteReader()
-                measures = []
-                
-                while reader.Read():
-                    table_id = str(reader['[TableID]'])
-                    mapped_table_name = table_mapping.get(table_id, 'Unknown')
-                    
-                    measure = {
-                        'table_id': table_id,
-                        'table_name': mapped_table_name,
-                        'measure_id': str(reader['[ID]']) if reader['[ID]'] is not None else '',
-                        'name': str(reader['[Name]']) if reader['[Name]'] is not None else '',
-                        'description': str(reader['[Description]']) if reader['[Description]'] is not None else '',
-                        'expression': str(reader['[Expression]']) if reader['[Expression]'] is not None else '',
-                        'is_hidden': bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else False,
-                        'is_visible': not bool(reader['[IsHidden]']) if reader['[IsHidden]'] is not None else True,
-                        'display_folder': str(reader['[DisplayFolder]']) if reader['[DisplayFolder]'] is not None else '',
-                        'data_type': str(reader['[DataType]']) if reader['[DataType]'] is not None else '',
-                        'format_string': str(reader['[FormatString]']) if reader['[FormatString]'] is not None else '',
-                        'lineage_tag': str(reader['[LineageTag]']) if reader['[LineageTag]'] is not None else ''
-                    }
-                    measures.append(measure)
-                
-                reader.Close()
-                conn.Close()
-                
-                return measures
-                
-            except Exception as query_error:
-                conn.Close()
-                raise query_error
-                
-        except Exception as e:
-            logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
-            raise e
+        """Get measures from the INFO.MEASURES() metadata."""
+        return self.session.get_metadata().measure_info()
+    
+    def get_relationships_simple(self) -> List[Dict[str, Any]]:
+        """Get relationships from the INFO.RELATIONSHIPS() metadata."""
+        return self.session.get_metadata().relationship_info()
 
-def execute_local_dax_query(connection_string: str, dax_query: str) -> str:
+def execute_local_dax_query(connection_string: str, dax_query: str, max_rows: int = DEFAULT_MAX_ROWS) -> str:
     """
     Execute a DAX query against a local Power BI Desktop model.
     
     Args:
         connection_string: Connection string for local Power BI Desktop
         dax_query: DAX query to execute
+        max_rows: Maximum number of rows to return
         
     Returns:
         JSON string with query results
     """
     try:
-        import clr
-        import os
-        
-        # Add references to Analysis Services libraries
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        dotnet_dir = os.path.join(os.path.dirname(current_dir), "dotnet")
-        
-        clr.AddReference(os.path.join(dotnet_dir, "Microsoft.AnalysisServices.AdomdClient.dll"))
-        from Microsoft.AnalysisServices.AdomdClient import AdomdConnection
-        
-        # Connect to local Power BI Desktop
-        conn = AdomdConnection(connection_string)
-        conn.Open()
-        
-        try:
-            cmd = conn.CreateCommand()
-            cmd.CommandText = dax_query
-            
-            reader = cmd.ExecuteReader()
-            
-            # Get column information
-            columns = []
-            for i in range(reader.FieldCount):
-                columns.append({
-                    'name': reader.GetName(i),
-                    'index': i
-                })
-            
-            # Read data rows
-            rows = []
-            while reader.Read():
-                row = {}
-                for i in range(reader.FieldCount):
-                    column_name = reader.GetName(i)
-                    try:
-                        value = reader[i]
-                        # Convert to string for JSON serialization
-                        if value is None:
-                            row[column_name] = None
-                        else:
-                            row[column_name] = str(value)
-                    except:
-                        row[column_name] = "<unable to read>"
-                rows.append(row)
-            
-            reader.Close()
-            conn.Close()
-            
-            return json.dumps({
-                'success': True,
-                'connection_string': connection_string,
-                'dax_query': dax_query,
-                'columns': columns,
-                'total_rows': len(rows),
-                'rows': rows,
-                'method': 'Direct DAX execution'
-            }, indent=2)
-            
-        except Exception as query_error:
-            conn.Close()
-            logger.error(f"Error executing DAX query: {str(query_error)}")
-            raise query_error
+        result = get_local_session(connection_string).execute(dax_query, max_rows=max_rows, max_bytes=DEFAULT_MAX_BYTES)
+        response = {
+            'success': True,
+            'connection_string': connection_string,
+            'dax_query': dax_query,
+            'columns': [{'name': name, 'index': index} for index, name in enumerate(result.columns)],
+            'total_rows': result.row_count,
+            'rows': result.to_rows(),
+            'method': 'Direct DAX execution'
+        }
+        if result.truncated:
+            response['truncation'] = result.truncation_info()
+        return json.dumps(response, indent=2, default=str)
             
     except Exception as e:
-        logger.error(f"Error connecting to local Power BI Desktop: {str(e)}")
+        logger.error(f"Error executing DAX query on local Power BI Desktop: {str(e)}")
         return json.dumps({
             'success': False,
             'error': str(e),
@@ -336,7 +99,7 @@ def explore_local_powerbi_simple(connection_string: str, operation: str = 'table
     
     Args:
         connection_string: Connection string for local Power BI Desktop
-        operation: Type of exploration ('tables', 'columns', 'measures')
+        operation: Type of exploration ('tables', 'columns', 'measures', 'relationships', 'structure')
         table_name: Optional table name for column queries
         
     Returns:
@@ -379,11 +142,45 @@ def explore_local_powerbi_simple(connection_string: str, operation: str = 'table
                 'method': 'Simple DAX INFO.MEASURES() with table mapping'
             }, indent=2)
             
+        elif operation == 'relationships':
+            relationships = explorer.get_relationships_simple()
+            return json.dumps({
+                'success': True,
+                'operation': 'relationships',
+                'connection_string': connection_string,
+                'total_relationships': len(relationships),
+                'relationships': relationships,
+                'method': 'Simple DAX INFO.RELATIONSHIPS() with table mapping'
+            }, indent=2)
+            
+        elif operation == 'structure':
+            # One metadata snapshot, read in a single batched round trip
+            metadata = explorer.session.get_metadata()
+            structure = {
+                'tables': metadata.table_info(),
+                'measures': metadata.measure_info(),
+                'columns': metadata.column_info(),
+                'relationships': metadata.relationship_info()
+            }
+            return json.dumps({
+                'success': True,
+                'operation': 'structure',
+                'connection_string': connection_string,
+                'model_structure': structure,
+                'summary': {
+                    'table_count': len(structure['tables']),
+                    'measure_count': len(structure['measures']),
+                    'column_count': len(structure['columns']),
+                    'relationship_count': len(structure['relationships'])
+                },
+                'method': 'Batched DAX INFO.TABLES/COLUMNS/MEASURES/RELATIONSHIPS()'
+            }, indent=2)
+            
         else:
             return json.dumps({
                 'success': False,
                 'error': f"Unknown operation: {operation}",
-                'supported_operations': ['tables', 'columns', 'measures']
+                'supported_operations': ['tables', 'columns', 'measures', 'relationships', 'structure']
             })
             
     except Exception as e:
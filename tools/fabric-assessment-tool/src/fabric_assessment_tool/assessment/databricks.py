@@ -1,3 +1,4 @@
+from collections import Counter
 from dataclasses import asdict, dataclass
 from typing import Any, List, Optional
 
@@ -591,30 +592,32 @@ class DatabricksAssessment:
 
         summary["counts"]["catalogs"] = len(self.catalogs.catalogs)
 
-        total_databases = sum(
-            len(catalog.schemas.schemas) for catalog in self.catalogs.catalogs
-        )
-        summary["counts"]["total_databases"] = total_databases
+        # Walk the catalog tree once for all catalog-level counts and the
+        # table distributions instead of once per statistic
+        total_databases = 0
+        total_tables = 0
+        total_volumes = 0
+        total_functions = 0
+        total_table_size_bytes = 0
+        total_table_rows = 0
+        tables_by_format: Counter = Counter()
+        tables_by_type: Counter = Counter()
+        for catalog in self.catalogs.catalogs:
+            schemas = catalog.schemas.schemas
+            total_databases += len(schemas)
+            for schema in schemas:
+                total_tables += len(schema.tables)
+                total_volumes += len(schema.volumes)
+                total_functions += len(schema.functions)
+                for table in schema.tables:
+                    tables_by_format[table.format or "Unknown"] += 1
+                    tables_by_type[table.type or "Unknown"] += 1
+                    total_table_size_bytes += table.statistics_size_bytes or 0
+                    total_table_rows += table.statistics_row_count or 0
 
-        total_tables = sum(
-            len(schema.tables)
-            for catalog in self.catalogs.catalogs
-            for schema in catalog.schemas.schemas
-        )
+        summary["counts"]["total_databases"] = total_databases
         summary["counts"]["total_tables"] = total_tables
-
-        total_volumes = sum(
-            len(schema.volumes)
-            for catalog in self.catalogs.catalogs
-            for schema in catalog.schemas.schemas
-        )
         summary["counts"]["total_volumes"] = total_volumes
-
-        total_functions = sum(
-            len(schema.functions)
-            for catalog in self.catalogs.catalogs
-            for schema in catalog.schemas.schemas
-        )
         summary["counts"]["total_functions"] = total_functions
 
         # Counts for new resource types
@@ -641,4 +644,23 @@ class DatabricksAssessment:
             len(self.instance_pools.instance_pools) if self.instance_pools else 0
         )
 
+        summary["distributions"] = {
+            "tables_by_format": dict(tables_by_format),
+            "tables_by_type": dict(tables_by_type),
+            "table_size_bytes": total_table_size_bytes,
+            "table_rows": total_table_rows,
+            "notebooks_by_language": dict(
+                Counter(
+                    notebook.default_language or "Unknown"
+                    for notebook in self.notebooks.notebooks
+                )
+            ),
+            "clusters_by_spark_version": dict(
+                Counter(
+                    cluster.spark_version or "Unknown"
+                    for cluster in self.clusters.clusters
+                )
+            ),
+        }
+
         return summary
@@ -1,3 +1,4 @@
+from collections import Counter
 from dataclasses import asdict, dataclass
 from typing import Any, Dict, List, Optional
 
@@ -35,6 +36,23 @@ class TableStatistics:
     table_unused_space_gb: float
 
 
+@dataclass
+class CatalogObject:
+    """Schema-level catalog entry read from a SQL pool's sys.* views.
+
+    Schemas without tables or views are returned with ``object_name`` and
+    ``object_type`` set to None so they are still listed. ``statistics`` is only
+    populated by the dedicated SQL pool catalog snapshot.
+    """
+
+    database_name: str
+    schema_name: str
+    object_name: Optional[str]
+    object_type: Optional[str]  # "TABLE" | "VIEW"
+    column_count: int
+    statistics: Optional[TableStatistics] = None
+
+
 @dataclass
 class CodeObjectCount:
     """Count statistics for Code Object Type"""
@@ -142,8 +160,8 @@ class SynapseServerlessDatabase:
     """Synapse Database information."""
 
     name: str
-    source_provider: str
-    origin_type: str
+    source_provider: Optional[str]
+    origin_type: Optional[str]
     schemas: SynapseSchemas
     json_response: Any
 
@@ -491,110 +509,72 @@ class SynapseAssessment:
         summary["data_warehouse"]["counts"]["serverless"]["databases"] = len(
             self.sql_pools.serverless_pool.databases.databases
         )
-        total_serverless_tables = sum(
-            len(schema.tables.tables)
-            for db in self.sql_pools.serverless_pool.databases.databases
-            for schema in db.schemas.schemas
-        )
+        # Walk each pool's catalog once for every per-table statistic
+        total_serverless_tables = 0
+        total_serverless_views = 0
+        for db in self.sql_pools.serverless_pool.databases.databases:
+            for schema in db.schemas.schemas:
+                total_serverless_tables += len(schema.tables.tables)
+                total_serverless_views += len(schema.views.views)
         summary["data_warehouse"]["counts"]["serverless"][
             "tables"
         ] = total_serverless_tables
-        total_serverless_views = sum(
-            len(schema.views.views)
-            for db in self.sql_pools.serverless_pool.databases.databases
-            for schema in db.schemas.schemas
-        )
         summary["data_warehouse"]["counts"]["serverless"][
             "views"
         ] = total_serverless_views
 
         ## Data Warehouse
-        summary["data_warehouse"]["counts"]["dedicated"] = {}
-        summary["data_warehouse"]["counts"]["dedicated"]["sql_pools"] = len(
-            self.sql_pools.dedicated_pools
-        )
-        summary["data_warehouse"]["counts"]["dedicated"]["databases"] = sum(
-            [1 for pool in self.sql_pools.dedicated_pools]
-        )
-        total_dedicated_tables = sum(
-            len(schema.tables.tables)
-            for pool in self.sql_pools.dedicated_pools
-            for schema in pool.database.schemas.schemas
-        )
-        summary["data_warehouse"]["counts"]["dedicated"][
-            "tables"
-        ] = total_dedicated_tables
-
-        dedicated_table_rows = sum(
-            sum(
-                schema_table.statistics.table_row_count
-                for schema in pool.database.schemas.schemas
-                for schema_table in schema.tables.tables
-                if schema_table.statistics is not None
-            )
-            for pool in self.sql_pools.dedicated_pools
-        )
-        summary["data_warehouse"]["counts"]["dedicated"][
-            "table_rows"
-        ] = dedicated_table_rows
-
-        dedicated_table_size_gb = sum(
-            sum(
-                schema_table.statistics.table_reserved_space_gb
-                for schema in pool.database.schemas.schemas
-                for schema_table in schema.tables.tables
-                if schema_table.statistics is not None
-            )
-            for pool in self.sql_pools.dedicated_pools
-        )
-        summary["data_warehouse"]["counts"]["dedicated"]["table_size_gb"] = round(
-            dedicated_table_size_gb, 2
-        )
-
-        summary["data_warehouse"]["counts"]["dedicated"]["views"] = sum(
-            sum(
-                [
-                    obj.count
-                    for obj in pool.code_objects
-                    if obj.type_description == "VIEW"
-                ]
-            )
-            for pool in self.sql_pools.dedicated_pools
-        )
-
-        summary["data_warehouse"]["counts"]["dedicated"]["view_code_lines"] = sum(
-            sum(
-                [
-                    obj.code_line_number
-                    for obj in pool.code_lines
-                    if obj.type_description == "Views"
-                ]
-            )
-            for pool in self.sql_pools.dedicated_pools
-        )
-
-        summary["data_warehouse"]["counts"]["dedicated"]["stored_procedures"] = sum(
-            sum(
-                [
-                    obj.count
-                    for obj in pool.code_objects
-                    if obj.type_description == "STORED_PROCEDURE"
-                ]
-            )
-            for pool in self.sql_pools.dedicated_pools
-        )
-
-        summary["data_warehouse"]["counts"]["dedicated"][
-            "stored_procedure_code_lines"
-        ] = sum(
-            sum(
-                [
-                    obj.code_line_number
-                    for obj in pool.code_lines
-                    if obj.type_description == "Procedure"
-                ]
-            )
-            for pool in self.sql_pools.dedicated_pools
-        )
+        total_dedicated_tables = 0
+        dedicated_table_rows = 0
+        dedicated_table_size_gb = 0.0
+        tables_by_distribution: Counter = Counter()
+        tables_by_index_type: Counter = Counter()
+        code_object_counts: Counter = Counter()
+        code_line_counts: Counter = Counter()
+        for pool in self.sql_pools.dedicated_pools:
+            for schema in pool.database.schemas.schemas:
+                total_dedicated_tables += len(schema.tables.tables)
+                for schema_table in schema.tables.tables:
+                    statistics = schema_table.statistics
+                    if statistics is None:
+                        continue
+                    dedicated_table_rows += statistics.table_row_count
+                    dedicated_table_size_gb += statistics.table_reserved_space_gb
+                    tables_by_distribution[
+                        statistics.distribution_policy_name or "Unknown"
+                    ] += 1
+                    tables_by_index_type[statistics.index_type_desc or "Unknown"] += 1
+            for obj in pool.code_objects:
+                code_object_counts[obj.type_description] += obj.count
+            for obj in pool.code_lines:
+                code_line_counts[obj.type_description] += obj.code_line_number
+
+        dedicated_counts = summary["data_warehouse"]["counts"]["dedicated"] = {}
+        dedicated_counts["sql_pools"] = len(self.sql_pools.dedicated_pools)
+        dedicated_counts["databases"] = len(self.sql_pools.dedicated_pools)
+        dedicated_counts["tables"] = total_dedicated_tables
+        dedicated_counts["table_rows"] = dedicated_table_rows
+        dedicated_counts["table_size_gb"] = round(dedicated_table_size_gb, 2)
+        dedicated_counts["views"] = code_object_counts["VIEW"]
+        dedicated_counts["view_code_lines"] = code_line_counts["Views"]
+        dedicated_counts["stored_procedures"] = code_object_counts["STORED_PROCEDURE"]
+        dedicated_counts["stored_procedure_code_lines"] = code_line_counts["Procedure"]
+
+        summary["distributions"] = {
+            "notebooks_by_language": dict(
+                Counter(
+                    notebook.language or "Unknown"
+                    for notebook in self.notebooks.notebooks
+                )
+            ),
+            "spark_pools_by_version": dict(
+                Counter(
+                    pool.spark_version or "Unknown"
+                    for pool in self.spark_pools.spark_pools
+                )
+            ),
+            "dedicated_tables_by_distribution": dict(tables_by_distribution),
+            "dedicated_tables_by_index_type": dict(tables_by_index_type),
+        }
 
         return summary
@@ -71,6 +71,10 @@ from .token_provider import TokenProvider, create_token_provider
 
 logger = logging.getLogger(__name__)
 
+# Catalogs whose contents live in the workspace rather than in the Unity
+# Catalog metastore, so they can never be shared between workspaces.
+_WORKSPACE_LOCAL_CATALOGS = frozenset({"hive_metastore"})
+
 
 class _CountOnlyCollection:
     """Lightweight stub for resource collections loaded from disk.
@@ -130,6 +134,8 @@ class DatabricksClient:
         self.extraction_warnings: list[str] = []
         self._max_parallel_api_calls = 8
         self._schema_resource_cache: dict[tuple[str, str, str], Any] = {}
+        self._metastore_resource_cache: dict[str, dict[tuple[str, str], Any]] = {}
+        self._current_metastore_id: Optional[str] = None
         self._reset_api_call_savings_metrics()
 
     def authenticate(self) -> None:
@@ -420,12 +426,44 @@ class DatabricksClient:
             self._schema_resource_cache = {}
         return self._schema_resource_cache
 
+    def _get_metastore_resource_cache(self) -> Optional[dict[tuple[str, str], Any]]:
+        """Return the run-wide cache shared by workspaces on the current metastore.
+
+        Unlike the schema resource cache, this cache survives across
+        ``assess_workspace`` calls so workspaces attached to the same Unity
+        Catalog metastore reuse catalogs, external locations and connections
+        listed for a previous workspace. Returns None when the metastore of the
+        current workspace is unknown, which disables sharing.
+        """
+        metastore_id = getattr(self, "_current_metastore_id", None)
+        if not metastore_id:
+            return None
+        if not hasattr(self, "_metastore_resource_cache"):
+            self._metastore_resource_cache = {}
+        return self._metastore_resource_cache.setdefault(metastore_id, {})
+
+    def _get_current_metastore_id(self) -> Optional[str]:
+        """Get the Unity Catalog metastore assigned to the authenticated workspace."""
+        try:
+            args = Namespace()
+            args.uri = "/api/2.1/unity-catalog/current-metastore-assignment"
+            req = self.api_client.do_request(args)
+            metastore_id = req.json().get("metastore_id")
+        except Exception as e:
+            logger.warning("Failed to get current metastore assignment: %s", e)
+            return None
+        return metastore_id if isinstance(metastore_id, str) and metastore_id else None
+
     def _reset_api_call_savings_metrics(self) -> None:
         self._api_call_savings = {
             "schema_cache_total": 0,
             "schema_cache_tables": 0,
             "schema_cache_volumes": 0,
             "schema_cache_functions": 0,
+            "metastore_cache_total": 0,
+            "metastore_cache_catalogs": 0,
+            "metastore_cache_external_locations": 0,
+            "metastore_cache_connections": 0,
             "notebook_status_skipped": 0,
             "notebook_export_skipped": 0,
         }
@@ -452,9 +490,10 @@ class DatabricksClient:
         schema_cache = counters.get("schema_cache_total", 0)
         status_skips = counters.get("notebook_status_skipped", 0)
         export_skips = counters.get("notebook_export_skipped", 0)
-        total_saved = schema_cache + status_skips + export_skips
+        metastore_cache = counters.get("metastore_cache_total", 0)
+        total_saved = schema_cache + status_skips + export_skips + metastore_cache
         logger.info(
-            "Estimated Databricks API calls saved: total=%d (schema_cache=%d [tables=%d, volumes=%d, functions=%d], notebook_get_status=%d, notebook_export=%d)",
+            "Estimated Databricks API calls saved: total=%d (schema_cache=%d [tables=%d, volumes=%d, functions=%d], notebook_get_status=%d, notebook_export=%d, metastore_cache=%d [catalogs=%d, external_locations=%d, connections=%d])",
             total_saved,
             schema_cache,
             counters.get("schema_cache_tables", 0),
@@ -462,6 +501,10 @@ class DatabricksClient:
             counters.get("schema_cache_functions", 0),
             status_skips,
             export_skips,
+            metastore_cache,
+            counters.get("metastore_cache_catalogs", 0),
+            counters.get("metastore_cache_external_locations", 0),
+            counters.get("metastore_cache_connections", 0),
         )
 
     def _extract_notebook_paths(self, list_endpoint: str) -> list[dict]:
@@ -540,6 +583,15 @@ class DatabricksClient:
                 (lambda r: r in resources) if resources else (lambda r: True)
             )
 
+            # Resolve the Unity Catalog metastore so metastore-level resources
+            # are shared with previously assessed workspaces on the same one
+            self._current_metastore_id = None
+            if any(
+                _should_extract(r)
+                for r in ("catalogs", "external_locations", "connections")
+            ):
+                self._current_metastore_id = self._get_current_metastore_id()
+
             # Load existing data from disk for resources not being re-extracted
             disk_data = {}
             if resources and output_path:
@@ -766,6 +818,119 @@ class DatabricksClient:
             logger.error("Failed to assess workspace %s: %s", workspace_name, e)
             raise Exception(f"Failed to assess workspace {workspace_name}: {e}")
 
+    def collect_plan_counts(
+        self, workspace_name: str, resources: Optional[List[str]] = None
+    ) -> dict[str, Any]:
+        """Collect cheap top-level counts used to plan an assessment.
+
+        Only listing endpoints are called: catalogs and the schemas of each
+        catalog, the jobs list pages, and the workspace tree down to the
+        second level. Nothing is extracted or exported.
+
+        Args:
+            workspace_name: Name of the Databricks workspace
+            resources: Optional list of resource types the assessment would
+                extract. When None, all resources are counted.
+
+        Returns:
+            Dictionary of counts. Counts that could not be collected are None,
+            and ``plan_api_calls`` holds the number of calls made for the plan.
+        """
+        workspace_info = self._get_workspace_info(workspace_name)
+        self._auth_databricks(workspace_info.url)
+
+        _should_count = (lambda r: r in resources) if resources else (lambda r: True)
+        counts: dict[str, Any] = {"plan_api_calls": 0}
+
+        def _list(
+            uri: str,
+            request_params: Optional[dict] = None,
+            auto_paginate: bool = True,
+        ) -> dict:
+            args = Namespace()
+            args.uri = uri
+            if request_params:
+                args.request_params = request_params
+            args.auto_paginate = auto_paginate
+            counts["plan_api_calls"] += 1
+            return self.api_client.do_request(args).json()
+
+        if _should_count("catalogs"):
+            try:
+                catalog_names = [
+                    catalog.get("name") or ""
+                    for catalog in _list("/api/2.1/unity-catalog/catalogs").get(
+                        "catalogs", []
+                    )
+                ]
+                schema_count = 0
+                for catalog_name in catalog_names:
+                    schemas = _list(
+                        "/api/2.1/unity-catalog/schemas",
+                        {"catalog_name": catalog_name},
+                    ).get("schemas", [])
+                    schema_count += len({schema.get("name") for schema in schemas})
+                counts["catalogs"] = len(catalog_names)
+                counts["schemas"] = schema_count
+            except Exception as e:
+                logger.warning("Failed to count catalogs for plan: %s", e)
+                counts["catalogs"] = counts["schemas"] = None
+
+        if _should_count("jobs"):
+            try:
+                job_count = notebook_job_count = job_pages = 0
+                next_page_token: Optional[str] = None
+                while True:
+                    request_params = {"expand_tasks": "true", "limit": "100"}
+                    if next_page_token:
+                        request_params["page_token"] = next_page_token
+                    json_resp = _list(
+                        "api/2.2/jobs/list", request_params, auto_paginate=False
+                    )
+                    job_pages += 1
+                    for job in json_resp.get("jobs", []):
+                        if job.get("job_id") is None:
+                            continue
+                        job_count += 1
+                        if self._settings_has_notebook_tasks(job.get("settings", {})):
+                            notebook_job_count += 1
+                    next_page_token = json_resp.get("next_page_token")
+                    if not next_page_token:
+                        break
+                counts["jobs"] = job_count
+                counts["notebook_jobs"] = notebook_job_count
+                counts["job_pages"] = job_pages
+            except Exception as e:
+                logger.warning("Failed to count jobs for plan: %s", e)
+                counts["jobs"] = counts["notebook_jobs"] = counts["job_pages"] = None
+
+        if _should_count("notebooks"):
+            try:
+                directories = ["/"]
+                notebook_count = 0
+                root_objects = _list("api/2.0/workspace/list", {"path": "/"}).get(
+                    "objects", []
+                )
+                for obj in root_objects:
+                    if obj.get("object_type") == "NOTEBOOK":
+                        notebook_count += 1
+                    elif obj.get("object_type") == "DIRECTORY":
+                        directories.append(obj["path"])
+                        for child in _list(
+                            "api/2.0/workspace/list", {"path": obj["path"]}
+                        ).get("objects", []):
+                            if child.get("object_type") == "NOTEBOOK":
+                                notebook_count += 1
+                            elif child.get("object_type") == "DIRECTORY":
+                                directories.append(child["path"])
+                counts["notebook_directories"] = len(directories)
+                counts["notebooks_sampled"] = notebook_count
+            except Exception as e:
+                logger.warning("Failed to count notebook directories for plan: %s", e)
+                counts["notebook_directories"] = counts["notebooks_sampled"] = None
+
+        return counts
+
     def _load_resources_from_disk(
         self,
         workspace_name: str,
@@ -1841,7 +2006,25 @@ class DatabricksClient:
 
     def _build_catalog(self, catalog: dict) -> DatabricksCatalog:
         catalog_name = catalog.get("name") or ""
-        return DatabricksCatalog(
+        # Workspace-local and workspace-bound catalogs may differ between
+        # workspaces on the same metastore, so they are never shared.
+        shared_cache = (
+            self._get_metastore_resource_cache()
+            if catalog_name not in _WORKSPACE_LOCAL_CATALOGS
+            and catalog.get("isolation_mode") != "ISOLATED"
+            else None
+        )
+        cache_key = ("catalog", catalog_name)
+        if shared_cache is not None and cache_key in shared_cache:
+            cached_catalog = shared_cache[cache_key]
+            # One schemas listing plus tables/volumes/functions per schema
+            self._increment_api_call_savings(
+                "metastore_cache_total", 1 + 3 * len(cached_catalog.schemas.schemas)
+            )
+            self._increment_api_call_savings("metastore_cache_catalogs")
+            return cached_catalog
+
+        built_catalog = DatabricksCatalog(
             name=catalog_name,
             comment=catalog.get("comment"),
             owner=catalog.get("owner"),
@@ -1849,6 +2032,11 @@ class DatabricksClient:
             schemas=self._get_schemas(catalog_name),
             json_response=catalog,
         )
+        # An empty schema list usually means the listing failed; let the next
+        # workspace retry rather than sharing the failure.
+        if shared_cache is not None and built_catalog.schemas.schemas:
+            shared_cache[cache_key] = built_catalog
+        return built_catalog
 
     def _get_schemas(self, catalog_name: str) -> DatabricksSchemas:
         """Get databases and tables in the workspace."""
@@ -1893,6 +2081,12 @@ class DatabricksClient:
 
     def _get_external_locations(self) -> DatabricksExternalLocations:
         """Get external locations in the workspace."""
+        shared_cache = self._get_metastore_resource_cache()
+        cache_key = ("external_locations", "")
+        if shared_cache is not None and cache_key in shared_cache:
+            self._increment_api_call_savings("metastore_cache_total")
+            self._increment_api_call_savings("metastore_cache_external_locations")
+            return shared_cache[cache_key]
         try:
             args = Namespace()
             args.uri = "/api/2.1/unity-catalog/external-locations"
@@ -1907,13 +2101,22 @@ class DatabricksClient:
                 )
                 for location in json_req.get("external_locations", [])
             ]
-            return DatabricksExternalLocations(external_locations=external_locations)
+            result = DatabricksExternalLocations(external_locations=external_locations)
+            if shared_cache is not None:
+                shared_cache[cache_key] = result
+            return result
         except Exception as e:
             logger.error("Failed to get external locations: %s", e)
             return DatabricksExternalLocations(external_locations=[])
 
     def _get_connections(self) -> DatabricksConnections:
         """Get connections in the workspace."""
+        shared_cache = self._get_metastore_resource_cache()
+        cache_key = ("connections", "")
+        if shared_cache is not None and cache_key in shared_cache:
+            self._increment_api_call_savings("metastore_cache_total")
+            self._increment_api_call_savings("metastore_cache_connections")
+            return shared_cache[cache_key]
         try:
             args = Namespace()
             args.uri = "/api/2.1/unity-catalog/connections"
@@ -1929,7 +2132,10 @@ class DatabricksClient:
                 )
                 for connection in json_req.get("connections", [])
             ]
-            return DatabricksConnections(connections=connections)
+            result = DatabricksConnections(connections=connections)
+            if shared_cache is not None:
+                shared_cache[cache_key] = result
+            return result
         except Exception as e:
             logger.error("Failed to get connections: %s", e)
             return DatabricksConnections(connections=[])
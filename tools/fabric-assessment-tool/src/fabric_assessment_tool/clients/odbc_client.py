@@ -2,11 +2,32 @@ from typing import Any, Iterator, Literal, Optional
 
 from mssql_python import connect
 
-from ..assessment.synapse import CodeObjectCount, CodeObjectLines, TableStatistics
+from ..assessment.synapse import (
+    CatalogObject,
+    CodeObjectCount,
+    CodeObjectLines,
+    TableStatistics,
+)
 
 # Supported SQL authentication modes
 SqlAuthMode = Literal["sql", "entra-interactive", "entra-spn", "entra-default"]
 
+# Databases per UNION ALL statement when reading catalogs across databases
+CATALOG_QUERY_DATABASE_CHUNK_SIZE = 50
+
+# Rows fetched per round trip when streaming large catalog result sets
+CATALOG_FETCH_SIZE = 1000
+
+
+def _quote_identifier(name: str) -> str:
+    """Quote a SQL identifier with brackets, escaping closing brackets."""
+    return "[" + name.replace("]", "]]") + "]"
+
+
+def _quote_literal(value: str) -> str:
+    """Quote a SQL Unicode string literal, escaping single quotes."""
+    return "N'" + value.replace("'", "''") + "'"
+
 
 class OdbcClient:
     """ODBC client for connecting to Azure Synapse Analytics dedicated SQL pools.
@@ -139,12 +160,16 @@ class OdbcClient:
             self.open()
         return self._connection
 
-    def execute_query(self, query: str) -> Iterator[Any]:
+    def execute_query(
+        self, query: str, fetch_size: Optional[int] = None
+    ) -> Iterator[Any]:
         """
         Execute a SQL query and yield results row by row.
 
         Args:
             query: SQL query to execute
+            fetch_size: When set, rows are fetched from the server in batches
+                of this size with fetchmany() instead of one at a time
 
         Yields:
             Row objects from the query results
@@ -152,8 +177,15 @@ class OdbcClient:
         conn = self._ensure_connection()
         with conn.cursor() as cursor:
             cursor.execute(query)
-            for row in cursor:
-                yield row
+            if fetch_size is None:
+                for row in cursor:
+                    yield row
+                return
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield from rows
 
     def get_schemas(self) -> list[str]:
         """Get schema names from the dedicated SQL pool.
@@ -185,6 +217,170 @@ ORDER BY TABLE_NAME
 """
         return [row.TABLE_NAME for row in self.execute_query(query)]
 
+    def get_dedicated_catalog(self, database: str) -> Iterator[CatalogObject]:
+        """Get all schemas and tables of a dedicated SQL pool in one query.
+
+        Each table comes with its distribution policy, distribution column,
+        index type and row/space statistics aggregated from the distribution
+        DMVs, matching what the vTableSizes view reports, so no per-schema
+        queries are needed. Rows are streamed with fetchmany().
+
+        Args:
+            database: The database name, used to fill the statistics
+
+        Yields:
+            CatalogObject entries with statistics; schemas without tables are
+            yielded once with object_name set to None
+        """
+        query = """
+SELECT
+    s.name                                                             AS schema_name
+,   t.name                                                             AS table_name
+,   tp.distribution_policy_desc                                        AS distribution_policy_name
+,   c.name                                                             AS distribution_column
+,   i.type_desc                                                        AS index_type_desc
+,   (SELECT COUNT(*) FROM sys.columns col WHERE col.object_id = t.object_id) AS column_count
+,   st.nbr_partitions
+,   st.table_row_count
+,   st.reserved_page_count * 8.0 / 1000000                             AS table_reserved_space_GB
+,   st.data_page_count * 8.0 / 1000000                                 AS table_data_space_GB
+,   (st.used_page_count - st.data_page_count) * 8.0 / 1000000          AS table_index_space_GB
+,   (st.reserved_page_count - st.used_page_count) * 8.0 / 1000000      AS table_unused_space_GB
+FROM sys.schemas s
+LEFT JOIN sys.tables t
+    ON t.schema_id = s.schema_id
+LEFT JOIN sys.pdw_table_distribution_properties tp
+    ON tp.object_id = t.object_id
+LEFT JOIN sys.pdw_column_distribution_properties cdp
+    ON cdp.object_id = t.object_id
+    AND cdp.distribution_ordinal = 1
+LEFT JOIN sys.columns c
+    ON c.object_id = cdp.object_id
+    AND c.column_id = cdp.column_id
+LEFT JOIN sys.indexes i
+    ON i.object_id = t.object_id
+    AND i.index_id <= 1
+LEFT JOIN (
+    SELECT
+        tm.object_id
+    ,   COUNT(DISTINCT nps.partition_number)                           AS nbr_partitions
+    ,   SUM(nps.row_count)                                             AS table_row_count
+    ,   SUM(nps.reserved_page_count)                                   AS reserved_page_count
+    ,   SUM(nps.used_page_count)                                       AS used_page_count
+    ,   SUM(nps.in_row_data_page_count
+            + nps.row_overflow_used_page_count
+            + nps.lob_used_page_count)                                 AS data_page_count
+    FROM sys.pdw_table_mappings tm
+    INNER JOIN sys.pdw_nodes_tables nt
+        ON tm.physical_name = nt.name
+    INNER JOIN sys.dm_pdw_nodes pn
+        ON nt.pdw_node_id = pn.pdw_node_id
+        AND pn.type = 'COMPUTE'
+    INNER JOIN sys.dm_pdw_nodes_db_partition_stats nps
+        ON nt.object_id = nps.object_id
+        AND nt.pdw_node_id = nps.pdw_node_id
+        AND nt.distribution_id = nps.distribution_id
+        AND nps.index_id <= 1
+    GROUP BY tm.object_id
+) st
+    ON st.object_id = t.object_id
+ORDER BY s.name, t.name
+"""
+        for row in self.execute_query(query, fetch_size=CATALOG_FETCH_SIZE):
+            statistics = None
+            if row.table_name is not None and row.table_row_count is not None:
+                statistics = TableStatistics(
+                    database_name=database,
+                    schema_name=row.schema_name,
+                    table_name=row.table_name,
+                    distribution_policy_name=row.distribution_policy_name,
+                    distribution_column=row.distribution_column,
+                    index_type_desc=row.index_type_desc,
+                    nbr_partitions=row.nbr_partitions,
+                    table_row_count=row.table_row_count,
+                    table_reserved_space_gb=row.table_reserved_space_GB,
+                    table_data_space_gb=row.table_data_space_GB,
+                    table_index_space_gb=row.table_index_space_GB,
+                    table_unused_space_gb=row.table_unused_space_GB,
+                )
+            yield CatalogObject(
+                database_name=database,
+                schema_name=row.schema_name,
+                object_name=row.table_name,
+                object_type=None if row.table_name is None else "TABLE",
+                column_count=row.column_count or 0,
+                statistics=statistics,
+            )
+
+    def get_databases(self) -> list[str]:
+        """Get user database names visible on the connected SQL endpoint.
+
+        On a serverless SQL endpoint this includes databases created in SQL as
+        well as lake databases; callers filter as needed.
+
+        Returns:
+            List of database names, excluding system databases
+        """
+        query = """
+SELECT name
+FROM sys.databases
+WHERE name NOT IN ('master', 'tempdb', 'model', 'msdb')
+ORDER BY name
+"""
+        return [row.name for row in self.execute_query(query)]
+
+    def get_catalog_objects(self, database_names: list[str]) -> Iterator[CatalogObject]:
+        """Get schemas, tables and views of several databases in bulk.
+
+        Uses three-part names against each database's sys.* views and combines
+        them with UNION ALL, so a whole chunk of databases is read in a single
+        round trip instead of one REST call per database and object type.
+
+        Args:
+            database_names: Databases to read, e.g. from get_databases()
+
+        Yields:
+            CatalogObject entries; schemas without objects are yielded once
+            with object_name set to None
+        """
+        for start in range(0, len(database_names), CATALOG_QUERY_DATABASE_CHUNK_SIZE):
+            chunk = database_names[start : start + CATALOG_QUERY_DATABASE_CHUNK_SIZE]
+            query = "\nUNION ALL\n".join(
+                self._build_catalog_objects_query(database_name)
+                for database_name in chunk
+            )
+            for row in self.execute_query(query):
+                yield CatalogObject(
+                    database_name=row.database_name,
+                    schema_name=row.schema_name,
+                    object_name=row.object_name,
+                    object_type=(
+                        None
+                        if row.object_type is None
+                        else ("VIEW" if row.object_type.strip() == "V" else "TABLE")
+                    ),
+                    column_count=row.column_count or 0,
+                )
+
+    @staticmethod
+    def _build_catalog_objects_query(database_name: str) -> str:
+        """Build the catalog query for a single database."""
+        db = _quote_identifier(database_name)
+        # schema_id 2-4 are guest, INFORMATION_SCHEMA and sys; ids from 16384
+        # are the fixed database role schemas (db_owner, ...)
+        return f"""
+SELECT
+    {_quote_literal(database_name)} AS database_name
+,   s.name AS schema_name
+,   o.name AS object_name
+,   o.type AS object_type
+,   (SELECT COUNT(*) FROM {db}.sys.columns c WHERE c.object_id = o.object_id) AS column_count
+FROM {db}.sys.schemas s
+LEFT JOIN {db}.sys.objects o
+    ON o.schema_id = s.schema_id AND o.type IN ('U', 'V')
+WHERE s.schema_id NOT IN (2, 3, 4) AND s.schema_id < 16384
+"""
+
     def check_table_statistics_dmv_exists(self) -> bool:
         """
         Check if the vTableSizes view exists in the master database.
@@ -371,7 +567,7 @@ ORDER BY
     table_reserved_space_GB desc
 """
 
-        for row in self.execute_query(query):
+        for row in self.execute_query(query, fetch_size=CATALOG_FETCH_SIZE):
             yield TableStatistics(
                 database_name=row.database_name,
                 schema_name=row.schema_name,
@@ -1,12 +1,13 @@
 import builtins
 import json
 from argparse import Namespace
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 from fabric_assessment_tool.errors.api import FATError
 
 from ..assessment.common import AssessmentStatus
 from ..assessment.synapse import (
+    CatalogObject,
     CodeObjectCount,
     CodeObjectLines,
     SynapseAssessment,
@@ -75,6 +76,7 @@ class SynapseClient:
         sql_client_id: Optional[str] = None,
         sql_client_secret: Optional[str] = None,
         sql_tenant_id: Optional[str] = None,
+        serverless_sql_metadata: bool = False,
         **kwargs,
     ):
         """
@@ -94,6 +96,9 @@ class SynapseClient:
             sql_client_id: Service principal client ID (required for 'entra-spn' mode)
             sql_client_secret: Service principal client secret (required for 'entra-spn' mode)
             sql_tenant_id: Azure tenant ID (optional for 'entra-spn' mode)
+            serverless_sql_metadata: Read serverless SQL pool databases, schemas,
+                tables and views with set-based queries over the serverless SQL
+                endpoint instead of per-database dev endpoint REST calls
         """
         self.token_provider = token_provider or create_token_provider(auth_method)
         self.custom_subscription_id = subscription_id
@@ -103,6 +108,7 @@ class SynapseClient:
         self.sql_client_id = sql_client_id
         self.sql_client_secret = sql_client_secret
         self.sql_tenant_id = sql_tenant_id
+        self.serverless_sql_metadata = serverless_sql_metadata
         self.authenticate()
         self._workspace_cache: dict[str, SynapseWorkspaceInfo] = {}
         self.dev_endpoint_permission_issues = False
@@ -314,18 +320,18 @@ class SynapseClient:
                         )
                     )
 
+                    stats_by_table: dict[tuple[str, str, str], TableStatistics] = {}
+                    for stats in table_statistics:
+                        stats_by_table.setdefault(
+                            (stats.database_name, stats.schema_name, stats.table_name),
+                            stats,
+                        )
                     for schema in db.schemas.schemas:
                         for table in schema.tables.tables:
-                            # Find matching statistics
-                            matching_stats = next(
-                                (
-                                    stats
-                                    for stats in table_statistics
-                                    if stats.database_name == db.name
-                                    and stats.schema_name == schema.name
-                                    and stats.table_name == table.name
-                                ),
-                                None,
+                            # Statistics from the catalog snapshot are kept
+                            # when vTableSizes has no row for the table
+                            matching_stats = stats_by_table.get(
+                                (db.name, schema.name, table.name)
                             )
                             if matching_stats:
                                 table.statistics = matching_stats
@@ -497,7 +503,9 @@ class SynapseClient:
         serverless_pool = SynapseServerlessPool(
             name="Built-in",
             status="Online",
-            databases=self._get_serverless_databases(workspace_name),
+            databases=self._get_serverless_databases(
+                workspace_name, sql_admin_login, sql_admin_password
+            ),
             queries_last_24h=0,
             json_response=None,
         )
@@ -866,9 +874,24 @@ class SynapseClient:
             raise e
 
     def _get_serverless_databases(
-        self, workspace_name: str
+        self,
+        workspace_name: str,
+        sql_admin_login: Optional[str] = None,
+        sql_admin_password: Optional[str] = None,
     ) -> SynapseServerlessDatabases:
-        """Get databases in the workspace."""
+        """Get databases in the workspace.
+
+        Uses set-based SQL queries when serverless SQL metadata is enabled and
+        SQL credentials are available, falls back to the dev endpoint.
+        """
+        if self.serverless_sql_metadata and self._has_sql_credentials(
+            sql_admin_login, sql_admin_password
+        ):
+            databases = self._get_serverless_databases_odbc(
+                workspace_name, sql_admin_login, sql_admin_password
+            )
+            if databases is not None:
+                return databases
 
         try:
             args = Namespace()
@@ -901,6 +924,136 @@ class SynapseClient:
                 return SynapseServerlessDatabases(databases=[])
             raise e
 
+    def _get_serverless_databases_odbc(
+        self,
+        workspace_name: str,
+        sql_admin_login: Optional[str] = None,
+        sql_admin_password: Optional[str] = None,
+    ) -> Optional[SynapseServerlessDatabases]:
+        """Get databases, schemas, tables and views via the serverless SQL endpoint.
+
+        All databases are read over one connection with a handful of bulk
+        catalog queries. The endpoint also lists databases created in SQL, so
+        the databases are restricted to the lake databases the dev endpoint
+        reports, which also provides their source and origin. When that list
+        cannot be read, every SQL database is kept and labelled with its
+        source instead. Returns None when the SQL endpoint cannot be queried
+        so the caller can fall back to the dev endpoint.
+        """
+        try:
+            with self._create_odbc_client(
+                workspace_name=f"{workspace_name}-ondemand",
+                database_name="master",
+                sql_admin_login=sql_admin_login,
+                sql_admin_password=sql_admin_password,
+            ) as odbc_client:
+                database_names = odbc_client.get_databases()
+                lake_databases = self._get_lake_databases()
+                if lake_databases is not None:
+                    database_names = [
+                        name
+                        for name in database_names
+                        if name.lower() in lake_databases
+                    ]
+                catalog_objects = list(odbc_client.get_catalog_objects(database_names))
+        except Exception as e:
+            utils_ui.print_warning(
+                f"Could not query serverless SQL endpoint metadata ({e}), "
+                "falling back to the dev endpoint."
+            )
+            return None
+
+        objects_by_database: dict[str, list[CatalogObject]] = {
+            database_name: [] for database_name in database_names
+        }
+        for obj in catalog_objects:
+            objects_by_database.setdefault(obj.database_name, []).append(obj)
+
+        databases = []
+        for database_name in database_names:
+            if lake_databases is not None:
+                db = lake_databases[database_name.lower()]
+                source_provider = db["properties"].get("Source", {}).get("Provider")
+                origin_type = db["properties"].get("Origin", {}).get("Type")
+                json_response = db
+            else:
+                source_provider = None
+                origin_type = None
+                json_response = {"name": database_name, "source": "serverless_sql"}
+            databases.append(
+                SynapseServerlessDatabase(
+                    name=database_name,
+                    source_provider=source_provider,
+                    origin_type=origin_type,
+                    schemas=self._build_serverless_schemas_from_catalog(
+                        database_name, objects_by_database[database_name]
+                    ),
+                    json_response=json_response,
+                )
+            )
+        return SynapseServerlessDatabases(databases=databases)
+
+    def _get_lake_databases(self) -> Optional[dict[str, Any]]:
+        """List lake databases from the dev endpoint, keyed by lower-case name.
+
+        Returns None when the dev endpoint denies access.
+        """
+        try:
+            args = Namespace()
+            args.uri = f"/databases"
+            args.request_params = {"api-version": "2021-04-01"}
+            req = self.synapse_clients["dev"].do_request(args)
+            return {db["name"].lower(): db for db in req.json()["items"]}
+        except FATError as e:
+            if e.status_code == "Forbidden":
+                return None
+            raise e
+
+    def _build_serverless_schemas_from_catalog(
+        self, database_name: str, catalog_objects: list[CatalogObject]
+    ) -> SynapseSchemas:
+        """Group catalog entries of one database into schemas."""
+        schemas: dict[str, SynapseSchema] = {}
+        for obj in catalog_objects:
+            schema = schemas.get(obj.schema_name)
+            if schema is None:
+                schema = SynapseSchema(
+                    name=obj.schema_name,
+                    database=database_name,
+                    tables=SynapseTables(tables=[]),
+                    views=SynapseViews(views=[]),
+                    json_response={"name": obj.schema_name},
+                )
+                schemas[obj.schema_name] = schema
+
+            if obj.object_name is None:
+                continue
+            json_response = {
+                "name": obj.object_name,
+                "column_count": obj.column_count,
+            }
+            if obj.object_type == "VIEW":
+                schema.views.views.append(
+                    SynapseView(
+                        name=obj.object_name,
+                        database=database_name,
+                        schema=obj.schema_name,
+                        json_response=json_response,
+                    )
+                )
+            else:
+                schema.tables.tables.append(
+                    SynapseTable(
+                        name=obj.object_name,
+                        database=database_name,
+                        schema=obj.schema_name,
+                        statistics=None,
+                        json_response=json_response,
+                    )
+                )
+
+        return SynapseSchemas(schemas=list(schemas.values()))
+
     def _get_serverless_database_schemas(
         self, workspace_name: str, database_name: str
     ) -> SynapseSchemas:
@@ -1128,6 +1281,10 @@ class SynapseClient:
                 sql_admin_password=sql_admin_password,
             )
 
+            snapshot = self._get_dedicated_catalog_snapshot(odbc_client, database_name)
+            if snapshot is not None:
+                return snapshot
+
             schema_names = odbc_client.get_schemas()
 
             schemas = [
@@ -1155,6 +1312,54 @@ class SynapseClient:
                 return SynapseSchemas(schemas=[])
             raise e
 
+    def _get_dedicated_catalog_snapshot(
+        self, odbc_client: OdbcClient, database_name: str
+    ) -> Optional[SynapseSchemas]:
+        """Get all schemas and tables of a dedicated pool with one bulk query.
+
+        Tables carry their distribution and size statistics from the same
+        result set. Returns None when the snapshot query cannot run (e.g. no
+        permission on the distribution DMVs) so the caller can fall back to
+        listing tables schema by schema.
+        """
+        try:
+            catalog_objects = list(odbc_client.get_dedicated_catalog(database_name))
+        except Exception as e:
+            utils_ui.print_warning(
+                f"Could not read catalog snapshot for '{database_name}' ({e}), "
+                "listing tables per schema."
+            )
+            return None
+
+        schemas: dict[str, SynapseSchema] = {}
+        for obj in catalog_objects:
+            schema = schemas.get(obj.schema_name)
+            if schema is None:
+                schema = SynapseSchema(
+                    name=obj.schema_name,
+                    database=database_name,
+                    tables=SynapseTables(tables=[]),
+                    views=SynapseViews(views=[]),
+                    json_response={"name": obj.schema_name},
+                )
+                schemas[obj.schema_name] = schema
+            if obj.object_name is None:
+                continue
+            schema.tables.tables.append(
+                SynapseTable(
+                    name=obj.object_name,
+                    database=database_name,
+                    schema=obj.schema_name,
+                    statistics=obj.statistics,
+                    json_response={
+                        "name": obj.object_name,
+                        "column_count": obj.column_count,
+                    },
+                )
+            )
+
+        return SynapseSchemas(schemas=list(schemas.values()))
+
     def _get_dedicated_schema_tables(
         self,
         workspace_name: str,
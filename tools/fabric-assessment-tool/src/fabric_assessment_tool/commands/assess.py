@@ -45,6 +45,7 @@ Examples:
   fat assess --source databricks --mode full --ws my-workspace --output results/ --format json
   fat assess --source databricks --cloud aws --ws my-workspace --output results/
   fat assess --source databricks --cloud aws --ws dev,prod --resources jobs -o results/
+  fat assess --source databricks --plan -o results/
         """
 
     def configure_parser(self, parser: argparse.ArgumentParser) -> None:
@@ -127,6 +128,17 @@ Examples:
             default=8,
             help="Maximum concurrent Databricks API calls for notebook/job and catalog schema extraction (default: 8).",
         )
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            default=False,
+            help=(
+                "Dry run: estimate API calls, duration and output size per workspace "
+                "from cheap top-level listings, and suggest --max-parallel-api-calls "
+                "and --resources, without running the assessment (Databricks only). "
+                "Writes assessment_plan.json to the output directory."
+            ),
+        )
         parser.add_argument(
             "--log-file",
             default=None,
@@ -167,6 +179,18 @@ Examples:
             ),
         )
 
+        parser.add_argument(
+            "--serverless-sql-metadata",
+            action="store_true",
+            default=False,
+            help=(
+                "Read Synapse serverless SQL pool databases, schemas, tables and views "
+                "with bulk SQL queries using --sql-auth-mode credentials instead of "
+                "per-database REST calls. Falls back to REST if the serverless SQL "
+                "endpoint cannot be queried."
+            ),
+        )
+
         parser.add_argument(
             "--sql-client-id",
             default=None,
@@ -190,7 +214,10 @@ Examples:
         _configure_logging(getattr(args, "log_file", None))
         if getattr(args, "log_file", None):
             logger.info("Logging initialized (log_file=%s)", getattr(args, "log_file"))
-        print(f"Starting assessment of {args.source} workspaces...")
+        if getattr(args, "plan", False):
+            print(f"Planning assessment of {args.source} workspaces...")
+        else:
+            print(f"Starting assessment of {args.source} workspaces...")
 
         # Parse workspace names
         workspaces = [
@@ -202,6 +229,20 @@ Examples:
         if getattr(args, "resources", None):
             resources = [r.strip() for r in args.resources.split(",") if r.strip()]
 
+        if getattr(args, "plan", False):
+            self.assessment_service.plan(
+                source=args.source,
+                workspaces=workspaces,
+                output_path=args.output,
+                cloud=args.cloud,
+                subscription_id=getattr(args, "subscription_id", None),
+                auth_method=getattr(args, "auth_method", None),
+                resources=resources,
+                download_notebooks=getattr(args, "download_notebooks", False),
+                max_parallel_api_calls=getattr(args, "max_parallel_api_calls", 8),
+            )
+            return
+
         try:
             result = self.assessment_service.assess(
                 source=args.source,
@@ -221,6 +262,7 @@ Examples:
                 resources=resources,
                 download_notebooks=getattr(args, "download_notebooks", False),
                 max_parallel_api_calls=getattr(args, "max_parallel_api_calls", 8),
+                serverless_sql_metadata=getattr(args, "serverless_sql_metadata", False),
             )
 
             utils_ui.print(f"Assessment completed successfully!")
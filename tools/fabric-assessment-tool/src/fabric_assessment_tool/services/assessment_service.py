@@ -8,6 +8,7 @@ from fabric_assessment_tool.clients.databricks_client import DatabricksClient
 from fabric_assessment_tool.clients.synapse_client import SynapseClient
 
 from ..utils import ui as utils_ui
+from .plan_service import PlanService
 from .structured_export_service import DecimalEncoder, StructuredExportService
 
 
@@ -17,6 +18,7 @@ class AssessmentService:
     def __init__(self):
         self.clients = {}
         self.export_service = StructuredExportService()
+        self.plan_service = PlanService()
 
     def assess(
         self,
@@ -37,6 +39,7 @@ class AssessmentService:
         resources: Optional[List[str]] = None,
         download_notebooks: bool = False,
         max_parallel_api_calls: int = 8,
+        serverless_sql_metadata: bool = False,
     ) -> Dict[str, Any]:
         """
         Perform assessment on specified workspaces.
@@ -60,6 +63,8 @@ class AssessmentService:
             sql_client_id: Service principal client ID (required for 'entra-spn' mode)
             sql_client_secret: Service principal client secret (required for 'entra-spn' mode)
             sql_tenant_id: Azure tenant ID (optional for 'entra-spn' mode)
+            serverless_sql_metadata: Read Synapse serverless SQL pool metadata
+                with bulk SQL queries instead of per-database REST calls
 
         Returns:
             Assessment results dictionary
@@ -108,6 +113,8 @@ class AssessmentService:
             client_kwargs["sql_client_secret"] = sql_client_secret
         if sql_tenant_id:
             client_kwargs["sql_tenant_id"] = sql_tenant_id
+        if serverless_sql_metadata:
+            client_kwargs["serverless_sql_metadata"] = serverless_sql_metadata
         client = self._get_client(source=source, **client_kwargs)
 
         # Perform assessment
@@ -174,12 +181,16 @@ class AssessmentService:
                 if resources and "jobs" in resources and "notebooks" not in resources:
                     export_resources = list(resources) + ["notebooks"]
 
+                # Computed once and shared by the export and the run summary
+                workspace_summary = workspace_assessment.get_summary()
+
                 export_result = self.export_service.export_assessment(
                     assessment_data=workspace_assessment,
                     workspace_name=workspace,
                     output_path=output_path,
                     format=output_format,
                     resources=export_resources,
+                    summary=workspace_summary,
                 )
 
                 export_results["results"].append(export_result)
@@ -193,7 +204,7 @@ class AssessmentService:
                 result_entry = {
                     "workspace": workspace,
                     "status": result_status,
-                    "summary": workspace_assessment.get_summary(),
+                    "summary": workspace_summary,
                     # "export_info": export_result,
                 }
 
@@ -229,6 +240,57 @@ class AssessmentService:
 
         return assessment_results
 
+    def plan(
+        self,
+        source: str,
+        workspaces: List[str],
+        output_path: str,
+        cloud: str = "azure",
+        subscription_id: Optional[str] = None,
+        auth_method: Optional[str] = None,
+        resources: Optional[List[str]] = None,
+        download_notebooks: bool = False,
+        max_parallel_api_calls: int = 8,
+    ) -> Dict[str, Any]:
+        """
+        Estimate the cost of an assessment without running it.
+
+        Args:
+            source: Source platform (only databricks is supported)
+            workspaces: List of workspace names to plan (all listed workspaces when empty)
+            output_path: Output directory where assessment_plan.json is written
+            cloud: Cloud provider for the source platform ("azure" or "aws")
+            subscription_id: Azure subscription ID (optional)
+            auth_method: Authentication method ("azure-cli", "fabric", or None for auto-detect)
+            resources: Optional list of resource types the assessment would extract
+            download_notebooks: Whether the assessment would download notebook sources
+            max_parallel_api_calls: Parallelism the assessment would run with
+
+        Returns:
+            Plan dictionary with per-workspace estimates and totals
+        """
+        if source != "databricks":
+            raise ValueError("--plan currently supports only --source databricks")
+
+        if cloud == "aws":
+            self._validate_aws_databricks_workspace_selection(workspaces)
+
+        client_kwargs: Dict[str, Any] = {"cloud": cloud}
+        if subscription_id:
+            client_kwargs["subscription_id"] = subscription_id
+        if auth_method:
+            client_kwargs["auth_method"] = auth_method
+        client = self._get_client(source=source, **client_kwargs)
+
+        return self.plan_service.plan(
+            client,
+            workspaces,
+            output_path,
+            resources=resources,
+            download_notebooks=download_notebooks,
+            max_parallel_api_calls=max_parallel_api_calls,
+        )
+
     def _get_client(self, source: str, **kwargs) -> Any:
         """Get or create API client for the specified source."""
         client_key = f"{source}_{hash(str(kwargs))}"
@@ -0,0 +1,311 @@
+import json
+import math
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..utils import ui as utils_ui
+
+# Resources fetched with a single listing call regardless of workspace size
+DATABRICKS_SINGLE_CALL_RESOURCES = [
+    "clusters",
+    "sql_warehouses",
+    "external_locations",
+    "connections",
+    "secret_scopes",
+    "pipelines",
+    "repos",
+    "experiments",
+    "serving_endpoints",
+    "alerts",
+    "genie_spaces",
+    "cluster_policies",
+    "instance_pools",
+]
+
+# Planning assumptions. Databricks throttles most workspace REST APIs to a few
+# dozen requests per second, and typical calls take a few hundred milliseconds.
+AVERAGE_REQUEST_SECONDS = 0.3
+WORKSPACE_REQUESTS_PER_SECOND = 25.0
+MAX_SUGGESTED_PARALLEL_API_CALLS = 16
+# Catalog schema fan-out is capped in DatabricksClient._catalog_parallel_api_calls
+CATALOG_MAX_PARALLEL_API_CALLS = 3
+# Rough exported JSON size per object, used for the output size estimate
+ESTIMATED_TABLES_PER_SCHEMA = 20
+ESTIMATED_BYTES_PER_TABLE = 2500
+ESTIMATED_BYTES_PER_SCHEMA = 600
+ESTIMATED_BYTES_PER_CATALOG = 600
+ESTIMATED_BYTES_PER_JOB = 4000
+ESTIMATED_BYTES_PER_NOTEBOOK = 800
+ESTIMATED_BYTES_PER_NOTEBOOK_SOURCE = 20000
+ESTIMATED_BYTES_FIXED = 50000
+
+
+class PlanService:
+    """Estimate the cost of an assessment from cheap top-level counts."""
+
+    def plan(
+        self,
+        client: Any,
+        workspaces: List[str],
+        output_path: str,
+        resources: Optional[List[str]] = None,
+        download_notebooks: bool = False,
+        max_parallel_api_calls: int = 8,
+    ) -> Dict[str, Any]:
+        """
+        Build a dry-run plan for the given Databricks workspaces.
+
+        Args:
+            client: DatabricksClient used for the top-level listings
+            workspaces: Workspace names to plan. When empty, every workspace
+                the client can list is planned.
+            output_path: Directory where assessment_plan.json is written
+            resources: Optional list of resource types the assessment would extract
+            download_notebooks: Whether the assessment would download notebook sources
+            max_parallel_api_calls: Parallelism the assessment would run with
+
+        Returns:
+            Plan dictionary with per-workspace estimates and totals
+        """
+        if not workspaces:
+            workspaces = [workspace.name for workspace in client.get_workspaces()]
+
+        plan: Dict[str, Any] = {
+            "metadata": {
+                "source": "databricks",
+                "timestamp": datetime.now().isoformat(),
+                "resources": resources,
+                "download_notebooks": download_notebooks,
+                "max_parallel_api_calls": max_parallel_api_calls,
+                "assumptions": {
+                    "average_request_seconds": AVERAGE_REQUEST_SECONDS,
+                    "workspace_requests_per_second": WORKSPACE_REQUESTS_PER_SECOND,
+                },
+            },
+            "workspaces": [],
+            "totals": {
+                "estimated_api_calls": 0,
+                "estimated_duration_seconds": 0.0,
+                "estimated_output_bytes": 0,
+                "plan_api_calls": 0,
+            },
+        }
+
+        for workspace in workspaces:
+            utils_ui.print_extracting(f"Plan for {workspace}")
+            try:
+                counts = client.collect_plan_counts(workspace, resources=resources)
+            except Exception as e:
+                utils_ui.print_error(f"Failed to plan workspace {workspace}: {e}")
+                plan["workspaces"].append(
+                    {"workspace": workspace, "status": "failed", "error": str(e)}
+                )
+                continue
+            estimate = self.estimate_databricks_workspace(
+                counts,
+                resources=resources,
+                download_notebooks=download_notebooks,
+                max_parallel_api_calls=max_parallel_api_calls,
+            )
+            utils_ui.print_extraction_done(f"Plan for {workspace}")
+            plan["workspaces"].append(
+                {"workspace": workspace, "status": "planned", **estimate}
+            )
+            plan["totals"]["estimated_api_calls"] += estimate["estimated_api_calls"]
+            plan["totals"]["estimated_duration_seconds"] += estimate[
+                "estimated_duration_seconds"
+            ]
+            plan["totals"]["estimated_output_bytes"] += estimate[
+                "estimated_output_bytes"
+            ]
+            plan["totals"]["plan_api_calls"] += counts.get("plan_api_calls", 0)
+
+        plan_file = self._save_plan(plan, output_path)
+        self._print_plan(plan)
+        utils_ui.print(f"Assessment plan saved to: {plan_file}")
+        return plan
+
+    def estimate_databricks_workspace(
+        self,
+        counts: Dict[str, Any],
+        resources: Optional[List[str]] = None,
+        download_notebooks: bool = False,
+        max_parallel_api_calls: int = 8,
+    ) -> Dict[str, Any]:
+        """
+        Estimate API calls, duration and output size for one workspace.
+
+        Args:
+            counts: Counts returned by DatabricksClient.collect_plan_counts
+            resources: Optional list of resource types the assessment would extract
+            download_notebooks: Whether notebook sources would be downloaded
+            max_parallel_api_calls: Parallelism the assessment would run with
+
+        Returns:
+            Dictionary with per-resource call estimates, totals and suggestions
+        """
+        selected = (lambda r: r in resources) if resources else (lambda r: True)
+        parallel = max(1, int(max_parallel_api_calls))
+
+        # Calls that run one after another, and calls fanned out in parallel
+        serial_calls: Dict[str, int] = {}
+        parallel_calls: Dict[str, int] = {}
+        catalog_calls = 0
+        output_bytes = ESTIMATED_BYTES_FIXED
+        lower_bound = False
+
+        for resource in DATABRICKS_SINGLE_CALL_RESOURCES:
+            if selected(resource):
+                serial_calls[resource] = 1
+
+        if selected("catalogs"):
+            catalogs = counts.get("catalogs") or 0
+            schemas = counts.get("schemas") or 0
+            lower_bound |= counts.get("catalogs") is None
+            # Catalog listing, one schema listing per catalog, then tables,
+            # volumes and functions per schema
+            catalog_calls = 1 + catalogs + 3 * schemas
+            output_bytes += (
+                catalogs * ESTIMATED_BYTES_PER_CATALOG
+                + schemas * ESTIMATED_BYTES_PER_SCHEMA
+                + schemas * ESTIMATED_TABLES_PER_SCHEMA * ESTIMATED_BYTES_PER_TABLE
+            )
+
+        if any(selected(r) for r in ("catalogs", "external_locations", "connections")):
+            serial_calls["metastore_assignment"] = 1
+
+        if selected("jobs"):
+            lower_bound |= counts.get("jobs") is None
+            serial_calls["jobs"] = counts.get("job_pages") or 1
+            parallel_calls["jobs"] = counts.get("notebook_jobs") or 0
+            output_bytes += (counts.get("jobs") or 0) * ESTIMATED_BYTES_PER_JOB
+
+        if selected("notebooks"):
+            # Only the first two levels of the workspace tree are listed for the
+            # plan, so notebook estimates are lower bounds
+            lower_bound = True
+            serial_calls["notebooks"] = counts.get("notebook_directories") or 1
+            notebooks = counts.get("notebooks_sampled") or 0
+            parallel_calls["notebooks"] = notebooks if download_notebooks else 0
+            output_bytes += notebooks * (
+                ESTIMATED_BYTES_PER_NOTEBOOK
+                + (ESTIMATED_BYTES_PER_NOTEBOOK_SOURCE if download_notebooks else 0)
+            )
+
+        total_serial = sum(serial_calls.values())
+        total_parallel = sum(parallel_calls.values())
+        total_calls = total_serial + total_parallel + catalog_calls
+
+        duration = (
+            total_serial * AVERAGE_REQUEST_SECONDS
+            + total_parallel / self._throughput(parallel)
+            + catalog_calls
+            / self._throughput(min(parallel, CATALOG_MAX_PARALLEL_API_CALLS))
+        )
+
+        suggested_parallel = self._suggest_parallel_api_calls(
+            total_parallel + catalog_calls
+        )
+        api_calls_by_resource = {
+            key: serial_calls.get(key, 0) + parallel_calls.get(key, 0)
+            for key in {**serial_calls, **parallel_calls}
+        }
+        if catalog_calls:
+            api_calls_by_resource["catalogs"] = catalog_calls
+
+        return {
+            "counts": counts,
+            "estimated_api_calls": total_calls,
+            "estimated_api_calls_by_resource": api_calls_by_resource,
+            "estimated_duration_seconds": round(duration, 1),
+            "estimated_output_bytes": output_bytes,
+            "is_lower_bound": lower_bound,
+            "suggested_max_parallel_api_calls": suggested_parallel,
+            "suggestions": self._suggest_resources(
+                api_calls_by_resource, total_calls, download_notebooks
+            ),
+        }
+
+    @staticmethod
+    def _throughput(parallel: int) -> float:
+        """Requests per second achievable with the given parallelism."""
+        return min(parallel / AVERAGE_REQUEST_SECONDS, WORKSPACE_REQUESTS_PER_SECOND)
+
+    @staticmethod
+    def _suggest_parallel_api_calls(parallelizable_calls: int) -> int:
+        """Smallest parallelism that reaches the workspace rate limit."""
+        if parallelizable_calls < 100:
+            return min(4, MAX_SUGGESTED_PARALLEL_API_CALLS)
+        saturating = math.ceil(WORKSPACE_REQUESTS_PER_SECOND * AVERAGE_REQUEST_SECONDS)
+        return max(1, min(saturating, MAX_SUGGESTED_PARALLEL_API_CALLS))
+
+    @staticmethod
+    def _suggest_resources(
+        api_calls_by_resource: Dict[str, int],
+        total_calls: int,
+        download_notebooks: bool,
+    ) -> List[str]:
+        """Suggest resource selections for workspaces dominated by one resource."""
+        suggestions = []
+        if total_calls == 0:
+            return suggestions
+
+        catalog_share = api_calls_by_resource.get("catalogs", 0) / total_calls
+        if catalog_share > 0.5:
+            other_resources = [
+                key
+                for key in api_calls_by_resource
+                if key not in ("catalogs", "metastore_assignment")
+            ]
+            suggestions.append(
+                f"Unity Catalog accounts for {catalog_share:.0%} of the API calls. "
+                "Consider assessing it in a separate run with --resources catalogs"
+                + (
+                    f" and the rest with --resources {','.join(sorted(other_resources))}"
+                    if other_resources
+                    else ""
+                )
+                + "."
+            )
+        if download_notebooks and api_calls_by_resource.get("notebooks", 0) > (
+            total_calls / 2
+        ):
+            suggestions.append(
+                "Notebook source downloads dominate the API calls. Omit "
+                "--download-notebooks unless notebook content is required."
+            )
+        return suggestions
+
+    def _save_plan(self, plan: Dict[str, Any], output_path: str) -> str:
+        """Save the plan to the output directory."""
+        os.makedirs(output_path, exist_ok=True)
+        plan_file = os.path.join(output_path, "assessment_plan.json")
+        with open(plan_file, "w") as f:
+            json.dump(plan, f, indent=2)
+        return plan_file
+
+    def _print_plan(self, plan: Dict[str, Any]) -> None:
+        """Print a short per-workspace summary of the plan."""
+        utils_ui.print("")
+        for entry in plan["workspaces"]:
+            if entry["status"] != "planned":
+                utils_ui.print(f"  {entry['workspace']}: plan failed")
+                continue
+            prefix = ">= " if entry["is_lower_bound"] else ""
+            utils_ui.print(
+                f"  {entry['workspace']}: {prefix}{entry['estimated_api_calls']} API calls, "
+                f"~{entry['estimated_duration_seconds']:.0f}s, "
+                f"~{entry['estimated_output_bytes'] / 1_000_000:.1f} MB output, "
+                f"suggested --max-parallel-api-calls "
+                f"{entry['suggested_max_parallel_api_calls']}"
+            )
+            for suggestion in entry["suggestions"]:
+                utils_ui.print_grey(f"    {suggestion}")
+        totals = plan["totals"]
+        utils_ui.print(
+            f"Total: {totals['estimated_api_calls']} API calls, "
+            f"~{totals['estimated_duration_seconds']:.0f}s, "
+            f"~{totals['estimated_output_bytes'] / 1_000_000:.1f} MB output "
+            f"({totals['plan_api_calls']} calls used for planning)"
+        )
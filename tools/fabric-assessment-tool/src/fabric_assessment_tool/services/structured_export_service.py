@@ -29,6 +29,8 @@ class BaseExporter(ABC):
         assessment_data: Union[SynapseAssessment, DatabricksAssessment],
         output_path: str,
         workspace_name: str,
+        resources: Optional[List[str]] = None,
+        summary: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Export assessment data in specific format."""
         pass
@@ -43,12 +45,14 @@ class JSONExporter(BaseExporter):
         output_path: str,
         workspace_name: str,
         resources: Optional[List[str]] = None,
+        summary: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Export assessment data as structured JSON files in folders.
 
         When resources is specified, only the listed resource folders are
-        cleared and rewritten. Summary is always rewritten.
+        cleared and rewritten. Summary is always rewritten, from the given
+        summary when the caller already computed one.
         """
         workspace_dir = Path(output_path) / workspace_name
         workspace_dir.mkdir(parents=True, exist_ok=True)
@@ -57,7 +61,8 @@ class JSONExporter(BaseExporter):
         data = asdict(assessment_data)
 
         # Create summary with high-level workspace information (always rewritten)
-        summary = assessment_data.get_summary()
+        if summary is None:
+            summary = assessment_data.get_summary()
 
         # In partial mode, preserve existing summary counts for resources not re-extracted
         summary_path = workspace_dir / "summary.json"
@@ -99,6 +104,27 @@ class JSONExporter(BaseExporter):
                             if key in existing_counts:
                                 new_counts[key] = existing_counts[key]
                 summary["counts"] = new_counts
+
+                # Same for distributions computed from resources not re-extracted
+                existing_distributions = existing_summary.get("distributions", {})
+                new_distributions = summary.get("distributions", {})
+                resource_to_distribution_keys = {
+                    "catalogs": [
+                        "tables_by_format",
+                        "tables_by_type",
+                        "table_size_bytes",
+                        "table_rows",
+                    ],
+                    "notebooks": ["notebooks_by_language"],
+                    "clusters": ["clusters_by_spark_version"],
+                }
+                for res_name, keys in resource_to_distribution_keys.items():
+                    if res_name not in resources:
+                        for key in keys:
+                            if key in existing_distributions:
+                                new_distributions[key] = existing_distributions[key]
+                if new_distributions:
+                    summary["distributions"] = new_distributions
             except (json.JSONDecodeError, IOError):
                 pass
 
@@ -1127,6 +1153,8 @@ class CSVExporter(BaseExporter):
         assessment_data: Union[SynapseAssessment, DatabricksAssessment],
         output_path: str,
         workspace_name: str,
+        resources: Optional[List[str]] = None,
+        summary: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Export assessment data as CSV files (scaffolding)."""
         workspace_dir = Path(output_path) / workspace_name
@@ -1158,6 +1186,8 @@ class ParquetExporter(BaseExporter):
         assessment_data: Union[SynapseAssessment, DatabricksAssessment],
         output_path: str,
         workspace_name: str,
+        resources: Optional[List[str]] = None,
+        summary: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Export assessment data as Parquet files (scaffolding)."""
         workspace_dir = Path(output_path) / workspace_name
@@ -1200,6 +1230,7 @@ class StructuredExportService:
         output_path: str,
         format: str = "json",
         resources: Optional[List[str]] = None,
+        summary: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Export assessment data in specified format.
@@ -1211,6 +1242,7 @@ class StructuredExportService:
             format: Export format (json, csv, parquet)
             resources: Optional list of resource types that were re-extracted.
                 When set, only those resource folders are rewritten.
+            summary: Optional summary already computed from assessment_data
 
         Returns:
             Export results dictionary
@@ -1226,7 +1258,11 @@ class StructuredExportService:
             f"Exporting {workspace_name} assessment data in {format} format"
         )
         result = exporter.export(
-            assessment_data, output_path, workspace_name, resources=resources
+            assessment_data,
+            output_path,
+            workspace_name,
+            resources=resources,
+            summary=summary,
         )
         utils_ui.print_extraction_done(
             f"Exporting {workspace_name} assessment data in {format} format"
@@ -402,6 +402,7 @@ class VisualizationService:
             "total_jobs": 0,
             "total_sql_warehouses": 0,
             "platforms": {"synapse": 0, "databricks": 0},
+            "distributions": {},
         }
 
         for ws_name, ws_data in workspaces.items():
@@ -414,9 +415,23 @@ class VisualizationService:
             elif platform == "databricks":
                 summary["platforms"]["databricks"] += 1
                 self._add_databricks_counts(summary, ws_summary)
+            self._add_distributions(summary, ws_summary)
 
         return summary
 
+    def _add_distributions(
+        self, summary: Dict[str, Any], ws_summary: Dict[str, Any]
+    ) -> None:
+        """Merge the precomputed distributions of a workspace summary."""
+        distributions = summary["distributions"]
+        for key, value in (ws_summary.get("distributions") or {}).items():
+            if isinstance(value, dict):
+                merged = distributions.setdefault(key, {})
+                for bucket, count in value.items():
+                    merged[bucket] = merged.get(bucket, 0) + count
+            elif isinstance(value, (int, float)):
+                distributions[key] = distributions.get(key, 0) + value
+
     def _add_synapse_counts(
         self, summary: Dict[str, Any], ws_summary: Dict[str, Any]
     ) -> None:
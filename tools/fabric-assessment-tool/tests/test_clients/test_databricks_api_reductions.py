@@ -1,12 +1,15 @@
 """Unit tests for Databricks API call reduction behaviors."""
 
 import logging
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
 import pytest
 
 from fabric_assessment_tool.assessment.databricks import (
     DatabricksClusters,
+    DatabricksSchema,
+    DatabricksSchemas,
     DatabricksWorkspaceInfo,
 )
 from fabric_assessment_tool.clients.databricks_client import DatabricksClient
@@ -262,3 +265,155 @@ def test_assess_workspace_resets_schema_resource_cache_at_start(caplog):
     assert client._schema_resource_cache == {}
     assert assessment.clusters.clusters == []
     assert "Estimated Databricks API calls saved: total=0" in caplog.text
+
+
+def test_get_current_metastore_id_returns_none_on_failure():
+    client = _client_with_mock_api()
+    client.api_client.do_request.side_effect = Exception("forbidden")
+
+    assert client._get_current_metastore_id() is None
+
+
+def _one_schema(catalog_name: str) -> DatabricksSchemas:
+    return DatabricksSchemas(
+        schemas=[
+            DatabricksSchema(
+                name="s1",
+                catalog=catalog_name,
+                comment=None,
+                storage_root=None,
+                tables=[],
+                volumes=[],
+                functions=[],
+                json_response={},
+            )
+        ]
+    )
+
+
+def test_catalogs_are_shared_across_workspaces_on_same_metastore():
+    client = _client_with_mock_api()
+    client._metastore_resource_cache = {}
+    client._current_metastore_id = "ms-1"
+    client._get_schemas = MagicMock(return_value=_one_schema("main"))
+
+    first = client._build_catalog({"name": "main"})
+    client._reset_schema_resource_cache()
+    second = client._build_catalog({"name": "main"})
+
+    assert second is first
+    assert client._get_schemas.call_count == 1
+    counters = client._get_api_call_savings_metrics()
+    assert counters["metastore_cache_catalogs"] == 1
+    assert counters["metastore_cache_total"] == 4
+
+
+@pytest.mark.parametrize(
+    "catalog",
+    [
+        {"name": "hive_metastore"},
+        {"name": "bound", "isolation_mode": "ISOLATED"},
+    ],
+)
+def test_workspace_local_catalogs_are_not_shared(catalog):
+    client = _client_with_mock_api()
+    client._metastore_resource_cache = {}
+    client._current_metastore_id = "ms-1"
+    # Non-empty, so the catalog would be shared if it were not workspace-local
+    client._get_schemas = MagicMock(return_value=_one_schema(catalog["name"]))
+
+    first = client._build_catalog(catalog)
+    second = client._build_catalog(catalog)
+
+    assert second is not first
+    assert client._get_schemas.call_count == 2
+    assert client._metastore_resource_cache == {}
+    assert client._get_api_call_savings_metrics().get("metastore_cache_catalogs", 0) == 0
+
+
+def test_metastore_level_resources_are_keyed_by_metastore_id():
+    client = _client_with_mock_api()
+    client._metastore_resource_cache = {}
+    client.api_client.do_request.side_effect = lambda args: _json_response(
+        {
+            "external_locations": [{"name": "loc", "url": "abfss://x"}],
+            "connections": [{"name": "conn", "connection_type": "SQLSERVER"}],
+        }
+    )
+
+    client._current_metastore_id = "ms-1"
+    locations = client._get_external_locations()
+    connections = client._get_connections()
+    assert client._get_external_locations() is locations
+    assert client._get_connections() is connections
+    assert client.api_client.do_request.call_count == 2
+
+    client._current_metastore_id = "ms-2"
+    client._get_external_locations()
+    client._get_connections()
+    assert client.api_client.do_request.call_count == 4
+
+    client._current_metastore_id = None
+    client._get_external_locations()
+    assert client.api_client.do_request.call_count == 5
+
+
+def test_collect_plan_counts_uses_only_top_level_listings():
+    client = _client_with_mock_api()
+    client._get_workspace_info = MagicMock(
+        return_value=SimpleNamespace(url="https://adb-1.azuredatabricks.net")
+    )
+    client._auth_databricks = MagicMock()
+
+    def _do_request(args):
+        params = getattr(args, "request_params", {}) or {}
+        if args.uri.endswith("/catalogs"):
+            return _json_response({"catalogs": [{"name": "c1"}, {"name": "c2"}]})
+        if args.uri.endswith("/schemas"):
+            return _json_response({"schemas": [{"name": "s1"}, {"name": "s2"}]})
+        if args.uri == "api/2.2/jobs/list":
+            assert args.auto_paginate is False
+            if "page_token" not in params:
+                return _json_response(
+                    {
+                        "jobs": [
+                            {
+                                "job_id": 1,
+                                "settings": {
+                                    "tasks": [
+                                        {"notebook_task": {"notebook_path": "/a"}}
+                                    ]
+                                },
+                            }
+                        ],
+                        "next_page_token": "next",
+                    }
+                )
+            return _json_response({"jobs": [{"job_id": 2, "settings": {}}]})
+        if args.uri == "api/2.0/workspace/list":
+            if params["path"] == "/":
+                return _json_response(
+                    {"objects": [{"object_type": "DIRECTORY", "path": "/Users"}]}
+                )
+            return _json_response(
+                {
+                    "objects": [
+                        {"object_type": "DIRECTORY", "path": "/Users/me"},
+                        {"object_type": "NOTEBOOK", "path": "/Users/nb"},
+                    ]
+                }
+            )
+        raise AssertionError(f"unexpected call {args.uri}")
+
+    client.api_client.do_request.side_effect = _do_request
+
+    counts = client.collect_plan_counts("ws")
+
+    assert counts["catalogs"] == 2
+    assert counts["schemas"] == 4
+    assert counts["jobs"] == 2
+    assert counts["notebook_jobs"] == 1
+    assert counts["job_pages"] == 2
+    assert counts["notebook_directories"] == 3
+    assert counts["notebooks_sampled"] == 1
+    assert counts["plan_api_calls"] == 1 + 2 + 2 + 2
@@ -0,0 +1,236 @@
+"""Unit tests for set-based SQL pool catalog extraction."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, PropertyMock, patch
+
+from fabric_assessment_tool.assessment.synapse import (
+    CatalogObject,
+    SynapseServerlessDatabases,
+    TableStatistics,
+)
+from fabric_assessment_tool.clients.odbc_client import OdbcClient
+from fabric_assessment_tool.clients.synapse_client import SynapseClient
+from fabric_assessment_tool.errors.api import FATError
+
+
+def _client(serverless_sql_metadata: bool = True) -> SynapseClient:
+    client = SynapseClient.__new__(SynapseClient)
+    client.serverless_sql_metadata = serverless_sql_metadata
+    client.sql_auth_mode = "entra-default"
+    client.sql_client_id = None
+    client.sql_client_secret = None
+    client.sql_tenant_id = None
+    client.synapse_clients = {"dev": MagicMock()}
+    client.dev_endpoint_permission_issues = False
+    client.unreached_components = []
+    return client
+
+
+def _odbc_client_mock(database_names, catalog_objects) -> MagicMock:
+    odbc_client = MagicMock()
+    odbc_client.__enter__.return_value = odbc_client
+    odbc_client.get_databases.return_value = database_names
+    odbc_client.get_catalog_objects.return_value = iter(catalog_objects)
+    return odbc_client
+
+
+def _lake_database(name: str) -> dict:
+    return {
+        "name": name,
+        "properties": {
+            "Source": {"Provider": "ADLS"},
+            "Origin": {"Type": "SPARK"},
+        },
+    }
+
+
+def test_serverless_databases_are_built_from_bulk_catalog_query():
+    client = _client()
+    client.synapse_clients["dev"].do_request.return_value = MagicMock(
+        json=lambda: {"items": [_lake_database("Lake"), _lake_database("empty")]}
+    )
+    odbc_client = _odbc_client_mock(
+        ["empty", "lake", "sql_only"],
+        [
+            CatalogObject("lake", "dbo", "sales", "TABLE", 12),
+            CatalogObject("lake", "dbo", "v_sales", "VIEW", 3),
+            CatalogObject("lake", "staging", None, None, 0),
+        ],
+    )
+    client._create_odbc_client = MagicMock(return_value=odbc_client)
+
+    result = client._get_serverless_databases("ws", None, "__entra_auth__")
+
+    # Only the lake database list comes from the dev endpoint
+    assert client.synapse_clients["dev"].do_request.call_count == 1
+    assert client._create_odbc_client.call_args.kwargs["workspace_name"] == (
+        "ws-ondemand"
+    )
+    odbc_client.get_catalog_objects.assert_called_once_with(["empty", "lake"])
+    assert [db.name for db in result.databases] == ["empty", "lake"]
+    lake = result.databases[1]
+    assert lake.source_provider == "ADLS"
+    assert lake.origin_type == "SPARK"
+    assert lake.json_response == _lake_database("Lake")
+    lake_schemas = lake.schemas.schemas
+    assert [schema.name for schema in lake_schemas] == ["dbo", "staging"]
+    assert [table.name for table in lake_schemas[0].tables.tables] == ["sales"]
+    assert lake_schemas[0].tables.tables[0].json_response["column_count"] == 12
+    assert [view.name for view in lake_schemas[0].views.views] == ["v_sales"]
+    assert lake_schemas[1].tables.tables == []
+    assert result.databases[0].schemas.schemas == []
+
+
+def test_serverless_databases_are_labelled_without_dev_endpoint_access():
+    client = _client()
+    client.synapse_clients["dev"].do_request.side_effect = FATError(
+        "denied", status_code="Forbidden"
+    )
+    odbc_client = _odbc_client_mock(["lake", "sql_only"], [])
+    client._create_odbc_client = MagicMock(return_value=odbc_client)
+
+    result = client._get_serverless_databases("ws", None, "__entra_auth__")
+
+    odbc_client.get_catalog_objects.assert_called_once_with(["lake", "sql_only"])
+    assert [db.name for db in result.databases] == ["lake", "sql_only"]
+    for db in result.databases:
+        assert db.source_provider is None
+        assert db.origin_type is None
+        assert db.json_response == {"name": db.name, "source": "serverless_sql"}
+    assert client.unreached_components == []
+
+
+def test_serverless_databases_fall_back_to_rest_when_sql_fails():
+    client = _client()
+    odbc_client = MagicMock()
+    odbc_client.__enter__.side_effect = Exception("login failed")
+    client._create_odbc_client = MagicMock(return_value=odbc_client)
+    client.synapse_clients["dev"].do_request.return_value = MagicMock(
+        json=lambda: {"items": []}
+    )
+
+    with patch("fabric_assessment_tool.clients.synapse_client.utils_ui"):
+        result = client._get_serverless_databases("ws", None, "__entra_auth__")
+
+    assert result == SynapseServerlessDatabases(databases=[])
+    assert client.synapse_clients["dev"].do_request.call_count == 1
+
+
+def test_serverless_sql_metadata_disabled_uses_rest():
+    client = _client(serverless_sql_metadata=False)
+    client._create_odbc_client = MagicMock()
+    client.synapse_clients["dev"].do_request.return_value = MagicMock(
+        json=lambda: {"items": []}
+    )
+
+    client._get_serverless_databases("ws", None, "__entra_auth__")
+
+    client._create_odbc_client.assert_not_called()
+
+
+def test_catalog_objects_query_batches_databases_with_union_all():
+    odbc_client = OdbcClient(
+        workspace_name="ws-ondemand", database="master", auth_mode="entra-default"
+    )
+    odbc_client.execute_query = MagicMock(
+        return_value=iter(
+            [
+                SimpleNamespace(
+                    database_name="a]b",
+                    schema_name="dbo",
+                    object_name="v",
+                    object_type="V ",
+                    column_count=2,
+                )
+            ]
+        )
+    )
+
+    objects = list(odbc_client.get_catalog_objects(["a]b", "o'c"]))
+
+    odbc_client.execute_query.assert_called_once()
+    query = odbc_client.execute_query.call_args[0][0]
+    assert query.count("UNION ALL") == 1
+    assert "[a]]b].sys.objects" in query
+    assert "N'o''c'" in query
+    assert objects == [CatalogObject("a]b", "dbo", "v", "VIEW", 2)]
+
+
+def _table_statistics(schema_name: str, table_name: str) -> TableStatistics:
+    return TableStatistics(
+        database_name="pool",
+        schema_name=schema_name,
+        table_name=table_name,
+        distribution_policy_name="HASH",
+        distribution_column="id",
+        index_type_desc="CLUSTERED COLUMNSTORE",
+        nbr_partitions=1,
+        table_row_count=100,
+        table_reserved_space_gb=1.0,
+        table_data_space_gb=0.8,
+        table_index_space_gb=0.1,
+        table_unused_space_gb=0.1,
+    )
+
+
+def test_dedicated_schemas_odbc_uses_single_catalog_snapshot():
+    client = _client()
+    stats = _table_statistics("dbo", "fact")
+    odbc_client = MagicMock()
+    odbc_client.get_dedicated_catalog.return_value = iter(
+        [
+            CatalogObject("pool", "dbo", "fact", "TABLE", 8, stats),
+            CatalogObject("pool", "dbo", "dim", "TABLE", 4, None),
+            CatalogObject("pool", "empty", None, None, 0, None),
+        ]
+    )
+    client._create_odbc_client = MagicMock(return_value=odbc_client)
+
+    result = client._get_dedicated_schemas_odbc("ws", "pool", None, "__entra_auth__")
+
+    odbc_client.get_schemas.assert_not_called()
+    odbc_client.get_tables.assert_not_called()
+    assert [schema.name for schema in result.schemas] == ["dbo", "empty"]
+    tables = result.schemas[0].tables.tables
+    assert [table.name for table in tables] == ["fact", "dim"]
+    assert tables[0].statistics is stats
+    assert tables[1].statistics is None
+    assert result.schemas[1].tables.tables == []
+
+
+def test_dedicated_schemas_odbc_falls_back_to_per_schema_listing():
+    client = _client()
+    odbc_client = MagicMock()
+    odbc_client.get_dedicated_catalog.side_effect = Exception("VIEW DATABASE STATE")
+    odbc_client.get_schemas.return_value = ["dbo"]
+    odbc_client.get_tables.return_value = ["fact"]
+    client._create_odbc_client = MagicMock(return_value=odbc_client)
+
+    with patch("fabric_assessment_tool.clients.synapse_client.utils_ui"), patch.object(
+        SynapseClient,
+        "_has_azure_client",
+        new_callable=PropertyMock,
+        return_value=False,
+    ):
+        result = client._get_dedicated_schemas_odbc(
+            "ws", "pool", None, "__entra_auth__"
+        )
+
+    assert [schema.name for schema in result.schemas] == ["dbo"]
+    assert [t.name for t in result.schemas[0].tables.tables] == ["fact"]
+
+
+def test_execute_query_streams_with_fetchmany():
+    odbc_client = OdbcClient(
+        workspace_name="ws", database="pool", auth_mode="entra-default"
+    )
+    cursor = MagicMock()
+    cursor.__enter__.return_value = cursor
+    cursor.fetchmany.side_effect = [[1, 2], [3], []]
+    odbc_client._connection = MagicMock()
+    odbc_client._connection.cursor.return_value = cursor
+
+    rows = list(odbc_client.execute_query("SELECT 1", fetch_size=2))
+
+    assert rows == [1, 2, 3]
+    cursor.fetchmany.assert_called_with(2)
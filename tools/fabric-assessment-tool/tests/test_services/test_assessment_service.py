@@ -138,3 +138,31 @@ def test_synapse_does_not_receive_databricks_parallelization_option(
 
     kwargs = fake_client.assess_workspace.call_args.kwargs
     assert "max_parallel_api_calls" not in kwargs
+
+
+@patch("fabric_assessment_tool.services.assessment_service.StructuredExportService")
+def test_workspace_summary_computed_once(mock_export_service, tmp_path):
+    service = AssessmentService()
+    fake_client = MagicMock()
+    fake_assessment = MagicMock()
+    fake_assessment.status.status = "completed"
+    fake_assessment.get_summary.return_value = {"counts": {"notebooks": 1}}
+    fake_client.assess_workspace.return_value = fake_assessment
+    service._get_client = MagicMock(return_value=fake_client)
+    service._save_assessment_summary = MagicMock(
+        return_value=str(tmp_path / "summary.json")
+    )
+    service._save_export_results = MagicMock(return_value=str(tmp_path / "export.json"))
+    service.export_service.export_assessment.return_value = {}
+
+    results = service.assess(
+        source="synapse",
+        mode="full",
+        workspaces=["syn-ws"],
+        output_path=str(tmp_path),
+    )
+
+    assert fake_assessment.get_summary.call_count == 1
+    export_kwargs = service.export_service.export_assessment.call_args.kwargs
+    assert export_kwargs["summary"] == {"counts": {"notebooks": 1}}
+    assert results["results"][0]["summary"] == {"counts": {"notebooks": 1}}
@@ -0,0 +1,93 @@
+"""Tests for PlanService assessment cost estimation."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fabric_assessment_tool.services.assessment_service import AssessmentService
+from fabric_assessment_tool.services.plan_service import PlanService
+
+
+def _counts(**overrides):
+    counts = {
+        "plan_api_calls": 10,
+        "catalogs": 2,
+        "schemas": 10,
+        "jobs": 150,
+        "notebook_jobs": 40,
+        "job_pages": 2,
+        "notebook_directories": 5,
+        "notebooks_sampled": 30,
+    }
+    counts.update(overrides)
+    return counts
+
+
+def test_estimate_counts_catalog_job_and_notebook_calls():
+    estimate = PlanService().estimate_databricks_workspace(_counts())
+
+    by_resource = estimate["estimated_api_calls_by_resource"]
+    assert by_resource["catalogs"] == 1 + 2 + 3 * 10
+    assert by_resource["jobs"] == 2 + 40
+    assert by_resource["notebooks"] == 5
+    assert by_resource["clusters"] == 1
+    assert estimate["estimated_api_calls"] == sum(by_resource.values())
+    assert estimate["is_lower_bound"] is True
+    assert estimate["estimated_duration_seconds"] > 0
+
+
+def test_estimate_respects_resource_selection():
+    estimate = PlanService().estimate_databricks_workspace(
+        _counts(), resources=["jobs"]
+    )
+
+    assert estimate["estimated_api_calls_by_resource"] == {"jobs": 42}
+    assert estimate["is_lower_bound"] is False
+
+
+def test_estimate_suggests_splitting_catalog_heavy_workspaces():
+    estimate = PlanService().estimate_databricks_workspace(
+        _counts(schemas=1000), max_parallel_api_calls=8
+    )
+
+    assert estimate["suggested_max_parallel_api_calls"] == 8
+    assert any("--resources catalogs" in s for s in estimate["suggestions"])
+
+
+def test_estimate_download_notebooks_adds_export_calls():
+    service = PlanService()
+    without = service.estimate_databricks_workspace(_counts(), resources=["notebooks"])
+    with_download = service.estimate_databricks_workspace(
+        _counts(), resources=["notebooks"], download_notebooks=True
+    )
+
+    assert with_download["estimated_api_calls"] == without["estimated_api_calls"] + 30
+    assert with_download["estimated_output_bytes"] > without["estimated_output_bytes"]
+
+
+@patch("fabric_assessment_tool.services.plan_service.utils_ui")
+def test_plan_lists_all_workspaces_and_writes_plan_file(mock_ui, tmp_path):
+    client = MagicMock()
+    client.get_workspaces.return_value = [
+        SimpleNamespace(name="ws-a"),
+        SimpleNamespace(name="ws-b"),
+    ]
+    client.collect_plan_counts.side_effect = [_counts(), Exception("forbidden")]
+
+    plan = PlanService().plan(client, [], str(tmp_path))
+
+    assert [w["status"] for w in plan["workspaces"]] == ["planned", "failed"]
+    assert plan["totals"]["plan_api_calls"] == 10
+    saved = json.loads((tmp_path / "assessment_plan.json").read_text())
+    assert saved["totals"]["estimated_api_calls"] == (
+        plan["workspaces"][0]["estimated_api_calls"]
+    )
+
+
+def test_assessment_service_plan_rejects_synapse(tmp_path):
+    with pytest.raises(ValueError, match="--plan"):
+        AssessmentService().plan(
+            source="synapse", workspaces=["ws"], output_path=str(tmp_path)
+        )
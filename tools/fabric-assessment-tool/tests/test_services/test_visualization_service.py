@@ -299,6 +299,40 @@ class TestVisualizationService:
         assert summary["total_jobs"] == 5
         assert summary["platforms"]["databricks"] == 1
 
+    def test_calculate_summary_merges_distributions(self, visualization_service):
+        """Test precomputed workspace distributions are merged, not recounted."""
+        workspaces = {
+            "ws1": {
+                "platform": "databricks",
+                "summary": {
+                    "counts": {"notebooks": 3},
+                    "distributions": {
+                        "notebooks_by_language": {"PYTHON": 2, "SQL": 1},
+                        "table_size_bytes": 100,
+                    },
+                },
+            },
+            "ws2": {
+                "platform": "databricks",
+                "summary": {
+                    "counts": {"notebooks": 2},
+                    "distributions": {
+                        "notebooks_by_language": {"PYTHON": 1, "SCALA": 1},
+                        "table_size_bytes": 50,
+                    },
+                },
+            },
+        }
+
+        summary = visualization_service._calculate_summary(workspaces)
+
+        assert summary["distributions"]["notebooks_by_language"] == {
+            "PYTHON": 3,
+            "SQL": 1,
+            "SCALA": 1,
+        }
+        assert summary["distributions"]["table_size_bytes"] == 150
+
     def test_generate_report_overview(
         self, visualization_service, sample_synapse_assessment_dir, tmp_path
     ):